@@ -5,8 +5,9 @@ import OpenEXR
 import Imath
 
 
-# converting .exr file to .png if user gave .exr file as a rendered scene
-def convert_exr_to_png(exr_file, png_file):
+# decoding .exr file to 8-bit RGB image if user gave .exr file as a rendered
+# scene
+def exr_to_image(exr_file):
     file = OpenEXR.InputFile(exr_file)
     pixel_type = Imath.PixelType(Imath.PixelType.FLOAT)
     data_window = file.header()['dataWindow']
@@ -20,7 +21,12 @@ def convert_exr_to_png(exr_file, png_file):
                           (1.055 * (rgb[i] ** (1.0 / 2.4)) - 0.055) * 255.0)
     rgb_8 = [Image.frombytes("F", size, color.tostring()).convert("L") for color
              in rgb]
-    Image.merge("RGB", rgb_8).save(png_file, "PNG")
+    return Image.merge("RGB", rgb_8)
+
+
+# converting .exr file to .png if user gave .exr file as a rendered scene
+def convert_exr_to_png(exr_file, png_file):
+    exr_to_image(exr_file).save(png_file, "PNG")
 
 
 # converting .tga file to .png if user gave .tga file as a rendered scene
@@ -1,13 +1,14 @@
 import os
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable
 
 import OpenEXR
 from PIL import Image
 
 from . import decision_tree
-from .image_format_converter import convert_tga_to_png, convert_exr_to_png
+from .image_format_converter import convert_tga_to_png, convert_exr_to_png, \
+    exr_to_image
 from .image_metrics import ImgageMetrics
 
 
@@ -18,6 +19,81 @@ PKT_FILENAME = "tree35_[crr=87.71][frr=0.92].pkl"
 TREE_PATH = Path(os.path.dirname(os.path.realpath(__file__))) / PKT_FILENAME
 
 
+class MetricsCalculator:
+    """
+    Long-lived counterpart of calculate_metrics(). The classifier and the
+    metric classes are loaded once and every decoded image is kept in memory,
+    so comparing many crops against the same result images does not reload
+    the model nor decode (or convert to PNG) the same file again.
+    """
+
+    def __init__(self):
+        (self.classifier, self.labels, self.available_metrics) = \
+            get_metrics()
+        self._images: Dict[str, Image.Image] = {}
+
+    def load_image(self, image_path) -> Image.Image:
+        image = self._images.get(image_path)
+        if image is None:
+            image = load_image(image_path)
+            self._images[image_path] = image
+        return image
+
+    def preload(self, image_paths: Iterable[str]) -> None:
+        for image_path in image_paths:
+            self.load_image(image_path)
+
+    def compute(
+            self,
+            reference_crop_path,
+            providers_result_image_path,
+            top_left_corner_x,
+            top_left_corner_y,
+    ) -> Dict:
+        """
+        Computes the metrics and the label of a single crop and saves
+        the corresponding fragment of the provider's result.
+        :return: metrics dictionary, ready to be written with ImgageMetrics
+        """
+        print(f"result_image_path = {providers_result_image_path}")
+        print(f"reference_crop_path = {reference_crop_path}")
+        reference_crop = self.load_image(reference_crop_path)
+        (crop_width, crop_height) = reference_crop.size
+        print(
+            f"top_left_corner_x={top_left_corner_x}, "
+            f"top_left_corner_y={top_left_corner_y}, "
+            f"width={crop_width}, height={crop_height}"
+        )
+        providers_result_crop = get_providers_result_crop(
+            self.load_image(providers_result_image_path),
+            top_left_corner_x,
+            top_left_corner_y,
+            crop_width,
+            crop_height
+        )
+
+        print(f"providers_result_crop: {providers_result_crop.getbbox()}")
+        compare_metrics = compare_images(
+            reference_crop,
+            providers_result_crop,
+            self.available_metrics
+        )
+        try:
+            label = classify_with_tree(
+                compare_metrics,
+                self.classifier,
+                self.labels
+            )
+            compare_metrics['Label'] = label
+        except Exception as e:
+            print("There were errors %r" % e, file=sys.stderr)
+            compare_metrics['Label'] = VERIFICATION_FAIL
+        providers_result_crop.save(
+            _generate_path_for_providers_result_crop(reference_crop_path)
+        )
+        return compare_metrics
+
+
 def calculate_metrics(
         reference_crop_path,
         providers_result_image_path,
@@ -28,6 +104,7 @@ def calculate_metrics(
     """
     This is the entry point for calculation of metrics between the
     rendered_scene and the sample(cropped_image) generated for comparison.
+    Use MetricsCalculator directly when comparing more than one crop.
     :param reference_crop_path:
     :param providers_result_image_path:
     :param top_left_corner_x: x position of crop (left, top)
@@ -35,32 +112,11 @@ def calculate_metrics(
     :param metrics_output_filename:
     :return:
     """
-    (cropped_image, providers_result_crop) = \
-        _load_and_prepare_images_for_comparison(
-            reference_crop_path,
-            providers_result_image_path,
-            top_left_corner_x,
-            top_left_corner_y
-        )
-    image_metrics = dict()
-    image_metrics['Label'] = VERIFICATION_FAIL
-
-    (classifier, labels, available_metrics) = get_metrics()
-
-    print(f"providers_result_crop: {providers_result_crop.getbbox()}")
-    compare_metrics = compare_images(
-        cropped_image,
-        providers_result_crop,
-        available_metrics
-    )
-    try:
-        label = classify_with_tree(compare_metrics, classifier, labels)
-        compare_metrics['Label'] = label
-    except Exception as e:
-        print("There were errors %r" % e, file=sys.stderr)
-        compare_metrics['Label'] = VERIFICATION_FAIL
-    providers_result_crop.save(
-        _generate_path_for_providers_result_crop(reference_crop_path)
+    compare_metrics = MetricsCalculator().compute(
+        reference_crop_path,
+        providers_result_image_path,
+        top_left_corner_x,
+        top_left_corner_y
     )
     return ImgageMetrics(compare_metrics).write_to_file(
         metrics_output_filename
@@ -87,42 +143,6 @@ def classify_with_tree(metrics, classifier, feature_labels):
     return results[0].decode('utf-8')
 
 
-def _load_and_prepare_images_for_comparison(
-        reference_crop_path,
-        result_image_path,
-        top_left_corner_x,
-        top_left_corner_y
-):
-    """
-    This function prepares (i.e. crops) the providers_result_image so that it
-    will fit the sample(cropped_image) generated for comparison.
-
-    :param reference_crop_path:
-    :param result_image_path:
-    :param top_left_corner_x: x position of crop (left, top)
-    :param top_left_corner_y: y position of crop (left, top)
-    :return:
-    """
-    print(f"result_image_path = {result_image_path}")
-    print(f"reference_crop_path = {reference_crop_path}")
-    providers_result_image = convert_to_png_if_needed(result_image_path)
-    reference_crop = convert_to_png_if_needed(reference_crop_path)
-    (crop_width, crop_height) = reference_crop.size
-    print(
-        f"top_left_corner_x={top_left_corner_x}, "
-        f"top_left_corner_y={top_left_corner_y}, "
-        f"width={crop_width}, height={crop_height}"
-    )
-    provider_crop = get_providers_result_crop(
-        providers_result_image,
-        top_left_corner_x,
-        top_left_corner_y,
-        crop_width,
-        crop_height
-    )
-    return reference_crop, provider_crop
-
-
 def get_file_extension_lowercase(file_path):
     return os.path.splitext(file_path)[1][1:].lower()
 
@@ -143,6 +163,23 @@ def convert_to_png_if_needed(image_path):
     return Image.open(file_name)
 
 
+def load_image(image_path) -> Image.Image:
+    """
+    Decodes the image into memory. EXR and TGA files are decoded directly,
+    without the PNG round trip done by convert_to_png_if_needed(); the pixels
+    are the same since PNG is lossless.
+    """
+    extension = get_file_extension_lowercase(image_path)
+    if extension == "exr":
+        channels = OpenEXR.InputFile(image_path).header()['channels']
+        if 'RenderLayer.Combined.R' in channels:
+            sys.exit("There is no support for OpenEXR multilayer")
+        return exr_to_image(image_path)
+    image = Image.open(image_path)
+    image.load()
+    return image
+
+
 def get_providers_result_crop(providers_result_image, x, y, width, height):
     return providers_result_image.crop((x, y, x + width, y + height))
 
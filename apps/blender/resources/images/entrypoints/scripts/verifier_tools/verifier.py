@@ -1,4 +1,5 @@
 import json
+import multiprocessing
 import os
 from pathlib import Path
 from pprint import pprint
@@ -8,7 +9,9 @@ from ..render_tools import blender_render as blender
 from .crop_generator import WORK_DIR, OUTPUT_DIR, FloatingPointBox, Crop, \
     Resolution
 from .file_extension.matcher import get_expected_extension
-from .image_metrics_calculator import calculate_metrics
+from .image_metrics import ImgageMetrics
+from .image_metrics_calculator import MetricsCalculator, \
+    VERIFICATION_SUCCESS
 
 
 def get_crop_with_id(id: int, crops: [List[Crop]]) -> Optional[Crop]:
@@ -105,12 +108,40 @@ def prepare_data_for_blender_verification(  # pylint: disable=too-many-locals, t
     return crops, blender_render_parameters
 
 
+# Set in the verifying process before the pool of workers is forked, so
+# the workers share the classifier and the decoded images.
+_calculator: Optional[MetricsCalculator] = None
+
+
+def _compute_crop_metrics(job: Tuple[str, str, int, int]) -> Dict[str, Any]:
+    assert _calculator is not None
+    return _calculator.compute(*job)
+
+
+def _compute_metrics(
+        jobs: List[Tuple[str, str, int, int]],
+        workers: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    global _calculator  # pylint: disable=global-statement
+    _calculator = MetricsCalculator()
+    _calculator.preload(path for job in jobs for path in job[:2])
+
+    workers = min(len(jobs), workers or multiprocessing.cpu_count())
+    if workers <= 1:
+        return [_compute_crop_metrics(job) for job in jobs]
+
+    with multiprocessing.get_context('fork').Pool(workers) as pool:
+        return pool.map(_compute_crop_metrics, jobs)
+
+
 def make_verdict(
         providers_result_images_paths: List[str],
         crops: List[Crop],
         reference_results: List[Dict[str, Any]],
+        workers: Optional[int] = None,
 ) -> None:
-    verdict = True
+    jobs = []
+    metrics_output_filenames = []
 
     for crop_data in reference_results:
         crop = get_crop_with_id(crop_data['crop']['id'], crops)
@@ -123,20 +154,25 @@ def make_verdict(
 
         for crop, providers_result_image_path in zip(
                 crop_data['results'], providers_result_images_paths):
-            crop_path = get_crop_path(OUTPUT_DIR, crop)
-            results_path = calculate_metrics(
-                crop_path,
+            jobs.append((
+                get_crop_path(OUTPUT_DIR, crop),
                 providers_result_image_path,
                 left, top,
-                metrics_output_filename=os.path.join(
-                    OUTPUT_DIR,
-                    crop_data['crop']['outfilebasename'] + "metrics.txt")
-            )
-            print("results_path: ", results_path)
-            with open(results_path, 'r') as f:
-                data = json.load(f)
-            if data['Label'] != "TRUE":
-                verdict = False
+            ))
+            metrics_output_filenames.append(os.path.join(
+                OUTPUT_DIR,
+                crop_data['crop']['outfilebasename'] + "metrics.txt"))
+
+    # Crops are evaluated in parallel; results are written in the original
+    # order, so the metrics files end up the same as in a sequential run.
+    verdict = True
+    for compare_metrics, metrics_output_filename in zip(
+            _compute_metrics(jobs, workers), metrics_output_filenames):
+        results_path = ImgageMetrics(compare_metrics).write_to_file(
+            metrics_output_filename)
+        print("results_path: ", results_path)
+        if compare_metrics['Label'] != VERIFICATION_SUCCESS:
+            verdict = False
 
     with open(os.path.join(OUTPUT_DIR, 'verdict.json'), 'w') as f:
         json.dump({'verdict': verdict}, f)
@@ -1,3 +1,5 @@
+import filecmp
+import hashlib
 from copy import deepcopy
 from pathlib import Path, PurePath
 from typing import (
@@ -45,20 +47,29 @@ class VbrSubtask:
     and subtask related data management from the client code.
     """
     # __DEBUG_COUNTER: int = 0
-    def __init__(self, id_gen, name, params, redundancy_factor):
+    def __init__(self, id_gen, name, params, redundancy_factor,
+                 on_update: Optional[Callable[['VbrSubtask', Optional[str]],
+                                              None]] = None):
         self.id_gen = id_gen
         self.name = name
         self.params = params
         self.result = None
         self.redundancy_factor = redundancy_factor
+        # Called with the subtask id of a new instance or None after a result
+        # has been added, so that the owner can keep its indexes up to date.
+        self.on_update = on_update
 
         self.subtasks = {}
         self.verifier = BucketVerifier(
-            redundancy_factor, WasmTask.cmp_results, referee_count=0)
+            redundancy_factor, WasmTask.cmp_results, referee_count=0,
+            key=WasmTask.digest_results)
 
     def contains(self, s_id) -> bool:
         return s_id in self.subtasks
 
+    def needs_actors(self) -> bool:
+        return self.verifier.more_actors_needed
+
     def is_allowed_node(self, node_id):
         actor = Actor(node_id)
         try:
@@ -81,6 +92,8 @@ class VbrSubtask:
             "actor": actor,
             "results": None
         }
+        if self.on_update:
+            self.on_update(self, s_id)
 
         return s_id, deepcopy(self.params)
 
@@ -93,6 +106,8 @@ class VbrSubtask:
     def add_result(self, s_id, task_result):
         self.verifier.add_result(self.subtasks[s_id]["actor"], task_result)
         self.subtasks[s_id]["results"] = task_result
+        if self.on_update:
+            self.on_update(self, None)
 
     def get_result(self):
         return self.result
@@ -159,6 +174,7 @@ class WasmTask(CoreTask):
 
     JOB_ENTRYPOINT = 'python3 /golem/scripts/job.py'
     REDUNDANCY_FACTOR = 1
+    RESULT_DIGEST_CHUNK_SIZE = 1024 * 1024
     CALLBACKS: Dict[str, Callable] = {}
 
     def __init__(self, total_tasks: int, task_definition: WasmTaskDefinition,
@@ -171,23 +187,63 @@ class WasmTask(CoreTask):
         self.subtasks: List[VbrSubtask] = []
         self.subtasks_given = {}
 
+        # Indexes kept up to date by VbrSubtask.on_update
+        self._vbrsubtasks_by_id: Dict[str, VbrSubtask] = {}
+        # Subtasks which need more actors, in the order of creation
+        self._open_vbrsubtasks: Dict[VbrSubtask, None] = {}
+        # Node id -> unfinished subtasks computed by the node
+        self._node_vbrsubtasks: Dict[str, Set[VbrSubtask]] = {}
+        self._finished_vbrsubtasks: Set[VbrSubtask] = set()
+
         for s_name, s_params in self.options.get_subtask_iterator():
             s_params = {
                 'entrypoint': self.JOB_ENTRYPOINT,
                 **s_params
             }
-            subtask = VbrSubtask(self.create_subtask_id,
-                                 s_name, s_params, self.REDUNDANCY_FACTOR)
-            self.subtasks.append(subtask)
+            self._add_vbrsubtask(s_name, s_params, self.REDUNDANCY_FACTOR)
 
         self.nodes_blacklist: Set[str] = set()
 
+    def _add_vbrsubtask(self, name, params, redundancy_factor) -> VbrSubtask:
+        subtask = VbrSubtask(self.create_subtask_id, name, params,
+                             redundancy_factor,
+                             on_update=self._vbrsubtask_updated)
+        self.subtasks.append(subtask)
+        self._vbrsubtask_updated(subtask, None)
+        return subtask
+
+    def _vbrsubtask_updated(self, subtask: VbrSubtask,
+                            subtask_id: Optional[str]) -> None:
+        if subtask_id is not None:
+            self._vbrsubtasks_by_id[subtask_id] = subtask
+            node_id = subtask.get_instance(subtask_id)['actor'].uuid
+            self._node_vbrsubtasks.setdefault(node_id, set()).add(subtask)
+
+        if subtask.needs_actors():
+            self._open_vbrsubtasks[subtask] = None
+        else:
+            self._open_vbrsubtasks.pop(subtask, None)
+
+        if subtask.is_finished() and subtask not in self._finished_vbrsubtasks:
+            self._finished_vbrsubtasks.add(subtask)
+            for s_id in subtask.get_instances():
+                node_id = subtask.get_instance(s_id)['actor'].uuid
+                node_subtasks = self._node_vbrsubtasks.get(node_id)
+                if node_subtasks is None:
+                    continue
+                node_subtasks.discard(subtask)
+                if not node_subtasks:
+                    del self._node_vbrsubtasks[node_id]
+
+    def _is_computing(self, node_id: str, subtask: VbrSubtask) -> bool:
+        return subtask in self._node_vbrsubtasks.get(node_id, ())
+
     def query_extra_data(
             self, perf_index: float,
             node_id: Optional[str] = None,
             node_name: Optional[str] = None) -> Task.ExtraData:
-        for s in self.subtasks:
-            if s.is_finished():
+        for s in list(self._open_vbrsubtasks):
+            if self._is_computing(node_id, s):
                 continue
             next_subtask = s.new_instance(node_id)
             if next_subtask:
@@ -202,23 +258,33 @@ class WasmTask(CoreTask):
         raise RuntimeError()
 
     def _find_vbrsubtask_by_id(self, subtask_id) -> VbrSubtask:
-        for subtask in self.subtasks:
-            if subtask.contains(subtask_id):
-                return subtask
-        raise KeyError()
+        return self._vbrsubtasks_by_id[subtask_id]
 
     @staticmethod
     def cmp_results(result_list_a: List[Any],
                     result_list_b: List[Any]) -> bool:
         logger.debug("Comparing: %s and %s", result_list_a, result_list_b)
         for r1, r2 in zip(result_list_a, result_list_b):
-            with open(r1, 'rb') as f1, open(r2, 'rb') as f2:
-                b1 = f1.read()
-                b2 = f2.read()
-                if b1 != b2:
-                    return False
+            if not filecmp.cmp(r1, r2, shallow=False):
+                return False
         return True
 
+    @staticmethod
+    def digest_results(result_list: List[Any]) -> Tuple[str, ...]:
+        """Streams each result file once. Equal digests are used by the
+        verifier in place of comparing the files with `cmp_results`."""
+        digests = []
+        for result in result_list:
+            sha = hashlib.sha256()
+            with open(result, 'rb') as f:
+                for chunk in iter(
+                        lambda: f.read(WasmTask.RESULT_DIGEST_CHUNK_SIZE),
+                        b''):
+                    sha.update(chunk)
+            digests.append(sha.hexdigest())
+        logger.debug("Result digests: %s -> %s", result_list, digests)
+        return tuple(digests)
+
     def __resolve_payments(self, subtask: VbrSubtask):
         verdicts = subtask.get_verdicts()
 
@@ -248,9 +314,8 @@ class WasmTask(CoreTask):
         if result is not None:
             self.save_results(subtask.name, result)
         else:
-            new_subtask = VbrSubtask(self.create_subtask_id, subtask.name,
-                                     subtask.params, subtask.redundancy_factor)
-            self.subtasks.append(new_subtask)
+            self._add_vbrsubtask(subtask.name, subtask.params,
+                                 subtask.redundancy_factor)
 
     def computation_finished(self, subtask_id, task_result,
                              verification_finished=None) -> None:
@@ -354,9 +419,13 @@ class WasmTask(CoreTask):
             logger.info("Node %s has been blacklisted for this task", node_id)
             return AcceptClientVerdict.REJECTED
 
-        for s in self.subtasks:
-            if s.is_allowed_node(node_id):
-                return AcceptClientVerdict.ACCEPTED
+        # The node is allowed unless it already computes every subtask
+        # which needs more actors
+        node_subtasks = self._node_vbrsubtasks.get(node_id, set())
+        computed = sum(1 for s in node_subtasks
+                       if s in self._open_vbrsubtasks)
+        if len(self._open_vbrsubtasks) > computed:
+            return AcceptClientVerdict.ACCEPTED
 
         # No subtask has yielded next actor meaning that there is no work
         # to be done at the moment
@@ -374,7 +443,7 @@ class WasmTask(CoreTask):
         return not self.finished_computation()
 
     def finished_computation(self):
-        finished = all([subtask.is_finished() for subtask in self.subtasks])
+        finished = len(self._finished_vbrsubtasks) == len(self.subtasks)
         logger.debug("Finished computation: %d", finished)
         return finished
 
@@ -395,14 +464,11 @@ class WasmTask(CoreTask):
         return (WasmTask.REDUNDANCY_FACTOR + 1) * len(self.subtasks)
 
     def get_active_tasks(self):
-        return sum(
-            [0 if subtask.is_finished() else (WasmTask.REDUNDANCY_FACTOR + 1)
-             for subtask in self.subtasks]
-        )
+        num_unfinished = len(self.subtasks) - len(self._finished_vbrsubtasks)
+        return num_unfinished * (WasmTask.REDUNDANCY_FACTOR + 1)
 
     def get_tasks_left(self):
-        num_finished = len(list(filter(lambda x: x.is_finished(),
-                                       self.subtasks)))
+        num_finished = len(self._finished_vbrsubtasks)
         return self.get_total_tasks() - num_finished
 
     def restart(self):
@@ -434,16 +500,13 @@ class WasmTask(CoreTask):
         """
         Returns current progress.
 
-        Instead of tracking some aux variables, it polls VbrSubtasks
-        directly for their current state; i.e., whether they are finished,
-        or not.
+        Finished VbrSubtasks are tracked as they report their results.
         """
         num_total = self.get_total_tasks()
         if num_total == 0:
             return 0.0
 
-        num_finished = len(list(filter(lambda x: x.is_finished(),
-                                       self.subtasks)))
+        num_finished = len(self._finished_vbrsubtasks)
 
         return (WasmTask.REDUNDANCY_FACTOR + 1) * num_finished / num_total
 
@@ -1,6 +1,7 @@
+import operator
 from abc import ABC, abstractmethod
 from enum import IntEnum
-from typing import Callable, Any, List, Tuple, Optional, Dict
+from typing import Callable, Any, List, Tuple, Optional, Dict, Hashable
 
 
 class Actor:
@@ -125,15 +126,22 @@ class Bucket:
 
 # pylint:disable=too-many-instance-attributes
 class BucketVerifier(VerificationByRedundancy):
+    """When `key` is given, it is called once per result and results are
+    bucketed by its (hashable) return value, e.g. a content digest, instead
+    of comparing each result against every bucket with `comparator`."""
+
     def __init__(self,
                  redundancy_factor: int,
                  comparator: Callable[[Any, Any], bool],
-                 referee_count: int) -> None:
+                 referee_count: int,
+                 key: Optional[Callable[[Any], Hashable]] = None) -> None:
         super().__init__(redundancy_factor, comparator)
+        self.key = key
         self.actors: List[Actor] = []
         self.results: Dict[Actor, Any] = {}
         self.more_actors_needed = True
         self.buckets: List[Bucket] = []
+        self._buckets_by_key: Dict[Hashable, Bucket] = {}
         self.verdicts: Optional[List[Tuple[Actor, Any, VerificationResult]]]\
             = None
         self.normal_actor_count = redundancy_factor + 1
@@ -163,7 +171,9 @@ class BucketVerifier(VerificationByRedundancy):
         self.results[actor] = result
 
         # None represents no result, hence is not counted
-        if result is not None:
+        if result is not None and self.key is not None:
+            self._add_to_keyed_bucket(actor, self.key(result))
+        elif result is not None:
             found = False
             for bucket in self.buckets:
                 if bucket.try_add(key=result, value=actor):
@@ -177,6 +187,15 @@ class BucketVerifier(VerificationByRedundancy):
         # this will set self.more_actors_needed
         self.compute_verdicts()
 
+    def _add_to_keyed_bucket(self, actor: Actor, key: Hashable) -> None:
+        bucket = self._buckets_by_key.get(key)
+        if bucket is None:
+            bucket = Bucket(operator.eq, key=key, value=actor)
+            self._buckets_by_key[key] = bucket
+            self.buckets.append(bucket)
+        else:
+            bucket.values.append(actor)
+
     def get_verdicts(self) -> Optional[List[Tuple[Actor, Any,
                                                   VerificationResult]]]:
         return self.verdicts
@@ -50,6 +50,8 @@ NETWORK_CHECK_INTERVAL = 10.0
 MASK_UPDATE_INTERVAL = 30.0
 MAX_SENDING_DELAY = 360
 OFFER_POOLING_INTERVAL = 15.0
+# Subtasks computed, or having their resources downloaded, at the same time
+MAX_CONCURRENT_SUBTASKS = 4
 # How frequently task archive should be saved to disk (in seconds)
 TASKARCHIVE_MAINTENANCE_INTERVAL = 30
 # Filename for task archive disk file
@@ -158,6 +160,7 @@ class AppConfig:
             enable_monitor=ENABLE_MONITOR,
             # hardware
             hardware_preset_name=CUSTOM_HARDWARE_PRESET_NAME,
+            max_concurrent_subtasks=MAX_CONCURRENT_SUBTASKS,
             # price and trust
             min_price=MIN_PRICE,
             max_price=MAX_PRICE,
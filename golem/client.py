@@ -8,7 +8,7 @@ import time
 import uuid
 from copy import copy, deepcopy
 from datetime import timedelta
-from typing import Any, Dict, Hashable, Optional, Union, List, Iterable, Tuple
+from typing import Any, Callable, Dict, Optional, Union, List, Iterable, Tuple
 
 from golem_messages import datastructures as msg_datastructures
 from pydispatch import dispatcher
@@ -30,15 +30,19 @@ from golem.core.common import (
     string_to_timeout,
     to_unicode,
 )
-from golem.core.fileshelper import du
+from golem.core.fileshelper import format_size
 from golem.hardware.presets import HardwarePresets
 from golem.core.keysauth import KeysAuth
-from golem.core.service import LoopingCallService
+from golem.core.profiler import Profiler
+from golem.core.service import AdaptiveService, IService, \
+    LoopingCallService
 from golem.core.simpleserializer import DictSerializer
 from golem.database import Database
+from golem.diag.profiler import ProfilerDiagnosticsProvider
 from golem.diag.service import DiagnosticsService, DiagnosticsOutputFormat
 from golem.diag.vm import VMDiagnosticsProvider
 from golem.environments.environmentsmanager import EnvironmentsManager
+from golem.envs.docker.telemetry import ContainerTelemetry, TelemetryService
 from golem.manager.nodestatesnapshot import ComputingSubtaskStateSnapshot
 from golem.ethereum import exceptions as eth_exceptions
 from golem.ethereum.fundslocker import FundsLocker
@@ -59,8 +63,9 @@ from golem.network.transport.tcpnetwork import SocketAddress
 from golem.network.upnp.mapper import PortMapperManager
 from golem.ranking.ranking import Ranking
 from golem.report import Component, Stage, StatusPublisher, report_calls
+from golem.resource import diskusage
 from golem.resource.base.resourceserver import BaseResourceServer
-from golem.resource.dirmanager import DirManager, DirectoryType
+from golem.resource.dirmanager import DirectoryType
 from golem.resource.hyperdrive.resourcesmanager import HyperdriveResourceManager
 from golem.rpc import utils as rpc_utils
 from golem.rpc.mapping.rpceventnames import Task, Network, Environment, UI
@@ -74,6 +79,17 @@ from golem.tools.talkback import enable_sentry_logger
 
 logger = logging.getLogger(__name__)
 
+RES_DIRS = {
+    "total received data": DirectoryType.RECEIVED,
+    "total distributed data": DirectoryType.DISTRIBUTED,
+}
+
+# Files in the data directory, by the resource directory type
+DISK_USAGE_LEDGERS = {
+    DirectoryType.RECEIVED: 'disk_usage_received.json',
+    DirectoryType.DISTRIBUTED: 'disk_usage_distributed.json',
+}
+
 
 class ClientTaskComputerEventListener(object):
 
@@ -166,8 +182,9 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
                 int(self.config_desc.network_check_interval)),
             TaskArchiverService(self.task_archiver),
             MessageHistoryService(),
-            DoWorkService(self),
+            *self._network_sync_services(),
             DailyJobsService(),
+            TelemetryService(self._publish),
         ]
 
         clean_resources_older_than = \
@@ -240,6 +257,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         providers = (
             self,
             concent_soft_switch,
+            self.concent_service,
             framerenderingtask,
             MinPerformanceMultiplier,
             self.task_server,
@@ -248,6 +266,9 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             self.transaction_system,
             task_rpc_provider,
             api_ethereum.ETSProvider(self.transaction_system),
+            ContainerTelemetry.instance(),
+            Profiler.instance(),
+            nodeskeeper.NodesCache.instance(),
         )
         mapping = {}
         for rpc_provider in providers:
@@ -319,6 +340,45 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
     def sync(self):
         pass
 
+    def _network_sync_services(self) -> List[IService]:
+        # Components are created when the network starts, look them up
+        # on every run
+        def ping_peers():
+            if self.config_desc.send_pings:
+                self.p2pservice.ping_peers(self.config_desc.pings_interval)
+
+        def p2pservice_pending():
+            p2pservice = self.p2pservice
+            return bool(p2pservice.pending_connections
+                        or p2pservice.pending_sessions)
+
+        def task_server_pending():
+            task_server = self.task_server
+            return bool(task_server.pending_connections
+                        or task_server.pending_sessions
+                        or task_server.forwarded_session_requests
+                        or task_server.results_to_send
+                        or task_server.task_computer.has_assigned_task())
+
+        return [
+            NetworkSyncService(
+                'ping_peers', ping_peers,
+                lambda: bool(self.p2pservice.peers)),
+            NetworkSyncService(
+                'p2pservice', lambda: self.p2pservice.sync_network(),
+                p2pservice_pending, max_interval_seconds=4),
+            NetworkSyncService(
+                'task_server', lambda: self.task_server.sync_network(),
+                task_server_pending, max_interval_seconds=4),
+            NetworkSyncService(
+                'resource_server', lambda: self.resource_server.sync_network(),
+                lambda: bool(self.resource_server.pending_resources),
+                max_interval_seconds=8),
+            NetworkSyncService(
+                'ranking', lambda: self.ranking.sync_network(),
+                lambda: False, max_interval_seconds=8),
+        ]
+
     @report_calls(Component.client, 'start', stage=Stage.pre)
     def start(self):
 
@@ -338,11 +398,13 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         for service in self._services:
             if not service.running:
                 service.start()
+        Profiler.instance().start()
         logger.debug('Started client services')
 
     @report_calls(Component.client, 'stop', stage=Stage.post)
     def stop(self):
         logger.debug('Stopping client services ...')
+        Profiler.instance().stop()
         self.stop_network()
 
         for service in self._services:
@@ -457,6 +519,10 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         logger.info("Restoring resources ...")
         self.task_server.restore_resources()
 
+        disk_usage_service = DiskUsageService(self)
+        disk_usage_service.start()
+        self._services.append(disk_usage_service)
+
         # Start service after restore_resources() to avoid race conditions
         if cleaning_enabled and clean_tasks_older_than > 0:
             logger.debug('Starting task cleaner service ...')
@@ -614,6 +680,7 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             VMDiagnosticsProvider(),
             self.monitor.on_vm_snapshot
         )
+        self.diag_service.register(ProfilerDiagnosticsProvider())
         self.diag_service.start()
 
     def stop_monitor(self):
@@ -913,6 +980,21 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             'subtasks_with_timeout': self.get_comp_stat('tasks_with_timeout'),
         }
 
+    @rpc_utils.expose('comp.tasks.usage')
+    def get_subtasks_usage(
+            self,
+            limit: int = 100,
+            environment: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """ Memory, CPU time and I/O used by recently computed subtasks,
+            newest first """
+        query = model.SubtaskUsage.select()
+        if environment is not None:
+            query = query.where(model.SubtaskUsage.environment == environment)
+        query = query.order_by(
+            model.SubtaskUsage.created_date.desc()).limit(limit)
+        return [usage.to_dict() for usage in query]
+
     def get_supported_task_count(self) -> int:
         if self.task_server:
             return len(self.task_server.task_keeper.supported_tasks)
@@ -1082,13 +1164,13 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
 
     @rpc_utils.expose('res.dirs')
     def get_res_dirs(self):
-        return {"total received data": self.get_received_files_dir(),
-                "total distributed data": self.get_distributed_files_dir()}
+        return {name: self.get_res_dir(dir_type)
+                for name, dir_type in RES_DIRS.items()}
 
     @rpc_utils.expose('res.dirs.size')
     def get_res_dirs_sizes(self):
-        return {str(name): str(du(d))
-                for name, d in list(self.get_res_dirs().items())}
+        return {name: format_size(self._disk_usage(dir_type).size())
+                for name, dir_type in RES_DIRS.items()}
 
     @rpc_utils.expose('res.dir')
     def get_res_dir(self, dir_type):
@@ -1104,6 +1186,11 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
     def get_distributed_files_dir(self):
         return str(self.resource_server.get_distributed_resource_root())
 
+    def _disk_usage(self, dir_type) -> diskusage.DiskUsageLedger:
+        ledger_name = DISK_USAGE_LEDGERS[dir_type]
+        return diskusage.ledger(self.get_res_dir(dir_type),
+                                os.path.join(self.datadir, ledger_name))
+
     @rpc_utils.expose('res.dir.clear')
     def clear_dir(self, dir_type, older_than_seconds: int = 0):
         if dir_type == DirectoryType.DISTRIBUTED:
@@ -1113,14 +1200,14 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
         raise Exception("Unknown dir type: {}".format(dir_type))
 
     def remove_distributed_files(self, older_than_seconds: int = 0):
-        dir_manager = DirManager(self.datadir)
-        dir_manager.clear_dir(self.get_distributed_files_dir(),
-                              older_than_seconds)
+        self._disk_usage(DirectoryType.DISTRIBUTED).clear(older_than_seconds)
 
     def remove_received_files(self, older_than_seconds: int = 0):
-        dir_manager = DirManager(self.datadir)
-        dir_manager.clear_dir(
-            self.get_received_files_dir(), older_than_seconds)
+        self._disk_usage(DirectoryType.RECEIVED).clear(older_than_seconds)
+
+    def reconcile_disk_usage(self, pause: float = 0.) -> None:
+        for dir_type in RES_DIRS.values():
+            self._disk_usage(dir_type).reconcile(pause)
 
     def remove_task(self, task_id):
         self.p2pservice.remove_task(task_id)
@@ -1354,47 +1441,26 @@ class Client:  # noqa pylint: disable=too-many-instance-attributes,too-many-publ
             return False, str(e)
 
 
-class DoWorkService(LoopingCallService):
-    _client = None  # type: Client
-
-    def __init__(self, client: Client) -> None:
-        super().__init__(interval_seconds=1)
-        self._client = client
-        self._check_ts: Dict[Hashable, Any] = {}
-
-    def start(self):
-        super().start(now=False)
-
-    def _run(self):
-        # TODO: split it into separate services. Issue #2431
+class NetworkSyncService(AdaptiveService):
+    """ Runs one of the network sync steps. The steps used to run one after
+        another in a single service, every second, so a slow step delayed
+        all the others """
 
-        if self._client.config_desc.send_pings:
-            self._client.p2pservice.ping_peers(
-                self._client.config_desc.pings_interval)
+    def __init__(self,
+                 name: str,
+                 sync: Callable[[], None],
+                 pending: Callable[[], bool],
+                 **kwargs) -> None:
+        super().__init__(name=name, **kwargs)
+        self._sync = sync
+        self._pending = pending
 
-        try:
-            self._client.p2pservice.sync_network()
-        except Exception:
-            logger.exception("p2pservice.sync_network failed")
-        try:
-            self._client.task_server.sync_network()
-        except Exception:
-            logger.exception("task_server.sync_network failed")
-        try:
-            self._client.resource_server.sync_network()
-        except Exception:
-            logger.exception("resource_server.sync_network failed")
-        try:
-            self._client.ranking.sync_network()
-        except Exception:
-            logger.exception("ranking.sync_network failed")
+    def start(self, now: bool = False):
+        super().start(now=now)
 
-    def _time_for(self, key: Hashable, interval_seconds: float):
-        now = time.time()
-        if now >= self._check_ts.get(key, 0):
-            self._check_ts[key] = now + interval_seconds
-            return True
-        return False
+    def _run(self) -> bool:
+        self._sync()
+        return self._pending()
 
 
 class MonitoringPublisherService(LoopingCallService):
@@ -1471,6 +1537,23 @@ class TaskArchiverService(LoopingCallService):
         self._task_archiver.do_maintenance()
 
 
+class DiskUsageService(LoopingCallService):
+    """ Reconciles the disk usage ledgers of the resource directories with
+        the files on disk, at a slow pace """
+    _client = None  # type: Client
+
+    def __init__(self,
+                 client: Client,
+                 interval_seconds: int = 3600,
+                 pause: float = 0.01) -> None:
+        super().__init__(interval_seconds)
+        self._client = client
+        self.pause = pause
+
+    def _run(self):
+        self._client.reconcile_disk_usage(self.pause)
+
+
 class ResourceCleanerService(LoopingCallService):
     _client = None  # type: Client
     older_than_seconds = 0  # type: int
@@ -49,6 +49,7 @@ class ClientConfigDescriptor(object):
         self.max_resource_size = 0  # KiB
         self.max_memory_size = 0  # KiB
         self.hardware_preset_name = ""
+        self.max_concurrent_subtasks = 1
 
         self.requesting_trust = 0.0
         self.computing_trust = 0.0
@@ -105,6 +106,7 @@ class ConfigApprover(object):
     to_int_opt = {
         'seed_port', 'num_cores', 'opt_peer_num', 'p2p_session_timeout',
         'task_session_timeout', 'pings_interval', 'max_results_sending_delay',
+        'max_concurrent_subtasks',
     }
     to_big_int_opt = {
         'min_price', 'max_price',
@@ -1,4 +1,9 @@
 import abc
+import hmac
+import os
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha256
 from Crypto.Cipher import AES
 from Crypto import Random
@@ -124,3 +129,125 @@ class AESFileEncryptor(FileEncryptor):
                     working = False
 
                 dst.write(chunk)
+
+
+class AESGCMFileEncryptor(FileEncryptor):
+    """ Encrypts files in segments, each authenticated on its own with
+        AES-GCM. Segments are encrypted and decrypted in parallel and
+        decryption stops at the first segment that fails verification.
+
+        Layout: magic (format version), salt, segment size, then the
+        segments, each followed by its tag. The nonce of a segment is its
+        index and a flag marking the last one, so reordered, truncated or
+        extended files are rejected as well. """
+
+    magic = b'golem_aes_gcm_1'
+    salt_len = 16
+    tag_len = 16
+    segment_size = 1024 * 1024
+    workers = None  # defaults to the number of CPUs
+
+    @classmethod
+    def recognizes(cls, path):
+        with open(path, 'rb') as f:
+            return f.read(len(cls.magic)) == cls.magic
+
+    @classmethod
+    def derive_key(cls, secret, salt, key_len=32):
+        # HKDF-SHA256 (RFC 5869) for keys of up to 32 bytes
+        prk = hmac.new(salt, secret, sha256).digest()
+        return hmac.new(prk, cls.magic + b'\x01', sha256).digest()[:key_len]
+
+    @classmethod
+    def encrypt(cls, file_in, file_out, secret, key_len=32):
+
+        salt = Random.new().read(cls.salt_len)
+        key = cls.derive_key(secret, salt, key_len)
+        header = cls.magic + salt + struct.pack('>I', cls.segment_size)
+
+        with FileHelper(file_in, 'rb') as src, \
+                FileHelper(file_out, 'wb') as dst:
+
+            dst.write(header)
+            segments = cls._read_segments(src, cls.segment_size)
+            for chunk in cls._map(cls._encrypt_segment, key, header, segments):
+                dst.write(chunk)
+
+    @classmethod
+    def decrypt(cls, file_in, file_out, secret, key_len=32):
+
+        header_len = len(cls.magic) + cls.salt_len + 4
+
+        with FileHelper(file_in, 'rb') as src, \
+                FileHelper(file_out, 'wb') as dst:
+
+            header = src.read(header_len)
+            if len(header) < header_len or not header.startswith(cls.magic):
+                raise ValueError("Unknown encrypted file format")
+
+            salt = header[len(cls.magic):-4]
+            segment_size, = struct.unpack('>I', header[-4:])
+            key = cls.derive_key(secret, salt, key_len)
+
+            segments = cls._read_segments(src, segment_size + cls.tag_len)
+            for chunk in cls._map(cls._decrypt_segment, key, header, segments):
+                dst.write(chunk)
+
+    @classmethod
+    def _encrypt_segment(cls, key, header, index, data, last):
+        cipher = AES.new(key, AES.MODE_GCM, nonce=cls._nonce(index, last))
+        cipher.update(header)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return ciphertext + tag
+
+    @classmethod
+    def _decrypt_segment(cls, key, header, index, data, last):
+        cipher = AES.new(key, AES.MODE_GCM, nonce=cls._nonce(index, last))
+        cipher.update(header)
+        data = memoryview(data)
+        try:
+            return cipher.decrypt_and_verify(data[:-cls.tag_len],
+                                             data[-cls.tag_len:])
+        except ValueError:
+            raise ValueError(f"Segment {index} failed authentication") from None
+
+    @staticmethod
+    def _nonce(index, last):
+        return struct.pack('>QI', index, int(last))
+
+    @staticmethod
+    def _read_segments(src, size):
+        """ Yield (index, data, last) of consecutive segments; an empty
+            input makes a single, empty segment """
+        index = 0
+        data = src.read(size)
+        while True:
+            next_data = src.read(size)
+            yield index, data, not next_data
+            if not next_data:
+                return
+            index, data = index + 1, next_data
+
+    @classmethod
+    def _map(cls, fn, key, header, segments):
+        """ Apply fn to the segments in a thread pool, in order, with a
+            bounded number of segments in memory. Stops on the first
+            error. """
+        workers = cls.workers or os.cpu_count() or 1
+        if workers == 1:
+            for segment in segments:
+                yield fn(key, header, *segment)
+            return
+
+        with ThreadPoolExecutor(workers) as executor:
+            pending = deque()
+            try:
+                for segment in segments:
+                    pending.append(executor.submit(fn, key, header, *segment))
+                    if len(pending) >= 2 * workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
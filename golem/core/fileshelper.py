@@ -192,7 +192,14 @@ def du(path):
         except OSError as err:
             logger.info("Can't open dir {}: {}".format(path, str(err)))
             return "-1"
+    return format_size(size)
 
+
+def format_size(size):
+    """Formats a size in bytes in human readable format, like du()
+    :param int size: size in bytes
+    :return str: size in human readable format (eg. 6.5 MB)
+    """
     human_readable_size, idx = memoryhelper.dir_size_to_display(size)
     return "{} {}".format(
         human_readable_size,
@@ -14,6 +14,8 @@ class AsyncHTTPRequest:
 
     agent = None
     timeout = 5
+    # Keep-alive connections kept open per host
+    max_persistent_per_host = 8
 
     @implementer(IBodyProducer)
     class BytesBodyProducer:
@@ -45,8 +47,12 @@ class AsyncHTTPRequest:
     @classmethod
     def create_agent(cls):
         from twisted.internet import reactor
-        from twisted.web.client import Agent  # imports reactor
-        return Agent(reactor, connectTimeout=cls.timeout)
+        from twisted.web.client import (  # imports reactor
+            Agent, HTTPConnectionPool,
+        )
+        pool = HTTPConnectionPool(reactor, persistent=True)
+        pool.maxPersistentPerHost = cls.max_persistent_per_host
+        return Agent(reactor, connectTimeout=cls.timeout, pool=pool)
 
 
 class AsyncRequest(object):
@@ -0,0 +1,244 @@
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import (
+    Any, Callable, ClassVar, Deque, Dict, Iterator, List, Optional, Tuple,
+)
+
+from golem.rpc import utils as rpc_utils
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0,
+           5.0)
+
+
+class Histogram:
+    """ Counts of durations in fixed, roughly logarithmic buckets """
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        bounds = [f'{bound * 1000:g}ms' for bound in BUCKETS] + ['inf']
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': dict(zip(bounds, self.counts)),
+        }
+
+
+class Profiler:
+    """ Process-wide timings of the hot paths and of the reactor lag.
+
+        Timed calls are counted in histograms by name. A watchdog thread
+        samples the stack of every timed call that takes longer than
+        `threshold` and, when the reactor does not tick for longer than
+        that, the stack of the reactor thread. Histograms are kept from
+        the start of the process; the lag and the stacks are only measured
+        while the profiler is started. """
+
+    THRESHOLD: ClassVar[float] = 0.1  # seconds
+    LAG_INTERVAL: ClassVar[float] = 0.5  # seconds
+    MAX_SLOW_CALLS: ClassVar[int] = 32
+
+    _instance: ClassVar[Optional['Profiler']] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> 'Profiler':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, threshold: Optional[float] = None) -> None:
+        self.threshold = self.THRESHOLD if threshold is None else threshold
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._slow_calls: Deque[Dict[str, Any]] = \
+            deque(maxlen=self.MAX_SLOW_CALLS)
+        # Thread ID -> timed calls in progress, [name, started, sampled]
+        self._calls: Dict[int, List[list]] = {}
+
+        self._heartbeat: Any = None
+        self._last_beat: Optional[float] = None
+        self._sampled_beat: Optional[float] = None
+        self._reactor_thread: Optional[int] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._robust_apply: Optional[Callable] = None
+
+    def record(self, name: str, duration: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(duration)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        calls = self._calls.setdefault(threading.get_ident(), [])
+        started = time.perf_counter()
+        calls.append([name, started, False])
+        try:
+            yield
+        finally:
+            calls.pop()
+            self.record(name, time.perf_counter() - started)
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        # Same as measure(), inlined as it wraps the hot paths
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            calls = self._calls.setdefault(threading.get_ident(), [])
+            started = time.perf_counter()
+            calls.append([name, started, False])
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                calls.pop()
+                self.record(name, time.perf_counter() - started)
+        return wrapper
+
+    @property
+    def running(self) -> bool:
+        return self._watchdog is not None
+
+    def start(self) -> None:
+        """ Start measuring the reactor lag, sampling the stacks of slow calls
+            and timing dispatcher handlers. Call from the reactor thread. """
+        if self.running:
+            return
+        from twisted.internet.task import LoopingCall
+
+        self._reactor_thread = threading.get_ident()
+        self._last_beat = None
+        self._heartbeat = LoopingCall(self._beat)
+        self._heartbeat.start(self.LAG_INTERVAL)
+
+        self._stopped.clear()
+        self._watchdog = threading.Thread(
+            target=self._watch, name='profiler', daemon=True)
+        self._watchdog.start()
+        self._install_dispatcher_hook()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._uninstall_dispatcher_hook()
+        if self._heartbeat.running:
+            self._heartbeat.stop()
+        self._stopped.set()
+        self._watchdog = None
+
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        if self._last_beat is not None:
+            lag = now - self._last_beat - self.LAG_INTERVAL
+            self.record('reactor.lag', max(0.0, lag))
+        self._last_beat = now
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            try:
+                self._sample()
+            except Exception:  # pylint: disable=broad-except
+                logger.debug("Cannot sample stacks", exc_info=True)
+
+    def _sample(self) -> None:
+        now = time.perf_counter()
+        frames = None
+        for thread_id, calls in list(self._calls.items()):
+            try:
+                call = calls[-1]
+            except IndexError:
+                continue
+            name, started, sampled = call
+            if sampled or now - started < self.threshold:
+                continue
+            call[2] = True
+            if frames is None:
+                frames = sys._current_frames()  # noqa pylint: disable=protected-access
+            self._add_slow_call(name, thread_id, now - started,
+                                frames.get(thread_id))
+
+        # The reactor is blocked outside of any timed call
+        last_beat = self._last_beat
+        thread_id = self._reactor_thread
+        if last_beat is None or last_beat == self._sampled_beat \
+                or self._calls.get(thread_id) \
+                or now - last_beat < self.LAG_INTERVAL + self.threshold:
+            return
+        self._sampled_beat = last_beat
+        frames = frames or sys._current_frames()  # noqa pylint: disable=protected-access
+        self._add_slow_call('reactor', thread_id,
+                            now - last_beat - self.LAG_INTERVAL,
+                            frames.get(thread_id))
+
+    def _add_slow_call(self, name: str, thread_id: Optional[int],
+                       duration: float, frame: Any) -> None:
+        stack = traceback.format_stack(frame) if frame else []
+        logger.debug("Slow call %s (%.3fs so far)", name, duration)
+        self._slow_calls.append({
+            'name': name,
+            'thread': thread_id,
+            'time': time.time(),
+            'duration': duration,
+            'stack': stack,
+        })
+
+    def _install_dispatcher_hook(self) -> None:
+        from pydispatch import robustapply
+
+        robust_apply = self._robust_apply = robustapply.robustApply
+
+        def timed_robust_apply(receiver, *args, **kwargs):
+            name = getattr(receiver, '__qualname__', None) or repr(receiver)
+            with self.measure('dispatcher.' + name):
+                return robust_apply(receiver, *args, **kwargs)
+
+        robustapply.robustApply = timed_robust_apply
+
+    def _uninstall_dispatcher_hook(self) -> None:
+        from pydispatch import robustapply
+
+        if self._robust_apply is not None:
+            robustapply.robustApply = self._robust_apply
+            self._robust_apply = None
+
+    def histograms(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items: List[Tuple[str, Histogram]] = \
+                list(self._histograms.items())
+            return {name: histogram.to_dict() for name, histogram in items}
+
+    @rpc_utils.expose('diag.profile')
+    def profile(self) -> Dict[str, Any]:
+        """ Histograms of the timed calls and of the reactor lag, and the
+            stacks of the recent slow calls """
+        return {
+            'threshold': self.threshold,
+            'histograms': self.histograms(),
+            'slow_calls': list(self._slow_calls),
+        }
@@ -1,7 +1,9 @@
 import logging
 from abc import ABC, abstractmethod
+from typing import Any, Optional
 
 from golem.core import golem_async
+from golem.core.profiler import Profiler
 from twisted.internet.task import LoopingCall
 
 log = logging.getLogger("golem")
@@ -42,6 +44,9 @@ class LoopingCallService(IService):
     def __init__(self, interval_seconds: int = 1):
         self.__interval_seconds = interval_seconds
         self._loopingCall = LoopingCall(self._run_async)
+        # Time every run, whichever thread it is called from
+        self._run = Profiler.instance().timed(  # type: ignore
+            'service.' + type(self).__name__, self._run)
 
     @property
     def running(self) -> bool:
@@ -75,3 +80,110 @@ class LoopingCallService(IService):
 
     def _run(self):
         """ Implement this in the derived class."""
+
+
+class AdaptiveService(IService):
+    """
+    A service that, like LoopingCallService, performs its tasks in _run()
+    in a thread, but schedules every run after the previous one has finished,
+    so a slow run delays only the service it belongs to.
+
+    _run() returns True while there is work pending; the next run follows
+    after `interval_seconds` then. After every idle run the interval doubles,
+    up to `max_interval_seconds`. A run that takes longer than
+    `budget_seconds` is reported as soon as the budget runs out.
+    """
+
+    def __init__(self,
+                 interval_seconds: float = 1.0,
+                 max_interval_seconds: Optional[float] = None,
+                 budget_seconds: Optional[float] = None,
+                 name: Optional[str] = None) -> None:
+        self.interval_seconds = interval_seconds
+        self.max_interval_seconds = max(interval_seconds,
+                                        max_interval_seconds or 0)
+        self.budget_seconds = budget_seconds or interval_seconds
+        self.name = name or type(self).__name__
+        self.delay = interval_seconds
+        self.overruns = 0
+        self.clock: Any = None
+
+        self._running = False
+        self._in_progress = False
+        self._next_call: Any = None
+        self._watchdog_call: Any = None
+        self._run = Profiler.instance().timed(  # type: ignore
+            'service.' + self.name, self._run)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self, now: bool = True):
+        if self.running:
+            raise RuntimeError("service already started")
+        if self.clock is None:
+            from twisted.internet import reactor
+            self.clock = reactor
+        self._running = True
+        self.delay = self.interval_seconds
+        # A run still in progress schedules the next one when it finishes
+        if self._in_progress:
+            return
+        if now:
+            self._tick()
+        else:
+            self._schedule(self.delay)
+
+    def stop(self):
+        if not self.running:
+            raise RuntimeError("service not started")
+        self._running = False
+        if self._next_call and self._next_call.active():
+            self._next_call.cancel()
+        self._next_call = None
+
+    def _schedule(self, delay: float) -> None:
+        self._next_call = self.clock.callLater(delay, self._tick)
+
+    def _tick(self) -> None:
+        self._next_call = None
+        self._in_progress = True
+        self._watchdog_call = self.clock.callLater(self.budget_seconds,
+                                                   self._overrun)
+        self._run_async().addCallback(self._finished)
+
+    def _finished(self, pending: Optional[bool]) -> None:
+        self._in_progress = False
+        if self._watchdog_call and self._watchdog_call.active():
+            self._watchdog_call.cancel()
+        self._watchdog_call = None
+
+        if pending:
+            self.delay = self.interval_seconds
+        else:
+            self.delay = min(self.delay * 2, self.max_interval_seconds)
+        if self.running:
+            self._schedule(self.delay)
+
+    def _overrun(self) -> None:
+        self._watchdog_call = None
+        self.overruns += 1
+        log.warning("%s has been running for longer than %.1fs",
+                    self.name, self.budget_seconds)
+
+    @classmethod
+    def _exceptionHandler(cls, failure):
+        log.exception("Service Error: " + failure.getTraceback())
+        return None  # Treat the run as idle.
+
+    def _run_async(self):
+        return golem_async.async_run(
+            golem_async.AsyncRequest(self._run),
+            error=self._exceptionHandler,
+        )
+
+    def _run(self) -> bool:
+        """ Implement this in the derived class. Return True while there is
+            work pending. """
+        raise NotImplementedError
@@ -1,6 +1,8 @@
 __all__ = [
     'Database',
+    'DatabaseWriter',
     'GolemSqliteDatabase'
 ]
 
 from .database import Database, GolemSqliteDatabase
+from .writer import DatabaseWriter
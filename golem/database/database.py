@@ -6,19 +6,33 @@ import time
 from typing import Optional, Type, Sequence
 
 import peewee
+from twisted.internet.defer import Deferred
 
 from golem.database.migration import default_migrate_dir
 from golem.database.migration.migrate import migrate_schema, MigrationError
+from golem.database.writer import DatabaseWriter
 
 logger = logging.getLogger('golem.db')
 
 
 class GolemSqliteDatabase(peewee.SqliteDatabase):
     RETRY_TIMEOUT = datetime.timedelta(minutes=1)
+    RETRY_DELAY = 0.001  # seconds, doubled on every retry
+    MAX_RETRY_DELAY = 0.1  # seconds
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = DatabaseWriter(self)
 
     def sequence_exists(self, seq):
         raise NotImplementedError()
 
+    def write(self, fn, *args, **kwargs) -> Deferred:
+        """ Make a write on the writer thread, in a transaction shared with
+            the other pending writes. Reads do not wait for it.
+        """
+        return self.writer.write(fn, *args, **kwargs)
+
     def execute_sql(self, sql, params=None, require_commit=True):
         # Loosely based on
         # https://github.com/coleifer/peewee/blob/2.10.2/playhouse/shortcuts.py#L206-L219
@@ -57,11 +71,12 @@ class GolemSqliteDatabase(peewee.SqliteDatabase):
                 )
                 if not self.is_closed():
                     self.close()
-                time.sleep(0)
+                time.sleep(min(self.RETRY_DELAY * 2 ** min(iterations, 10),
+                               self.MAX_RETRY_DELAY))
 
 
 class Database:
-    SCHEMA_VERSION = 34
+    SCHEMA_VERSION = 38
 
     def __init__(self,  # noqa pylint: disable=too-many-arguments
                  db: peewee.Database,
@@ -90,6 +105,8 @@ class Database:
             self._migrate_schema(version, to_version=self.SCHEMA_VERSION)
 
     def close(self):
+        if isinstance(self.db, GolemSqliteDatabase):
+            self.db.writer.stop()
         if not self.db.is_closed():
             self.db.close()
 
@@ -0,0 +1,17 @@
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+import peewee as pw
+
+SCHEMA_VERSION = 35
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+    # Rows without a version hold pickled messages from earlier releases
+    migrator.add_fields(
+        'networkmessage',
+        msg_version=pw.CharField(null=True),
+    )
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.remove_fields('networkmessage', 'msg_version')
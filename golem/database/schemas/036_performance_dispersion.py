@@ -0,0 +1,18 @@
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+import peewee as pw
+
+SCHEMA_VERSION = 36
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+    # Rows without a fingerprint are benchmarked again on the next start
+    migrator.add_fields(
+        'performance',
+        dispersion=pw.FloatField(default=0.0),
+        fingerprint=pw.CharField(null=True),
+    )
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.remove_fields('performance', 'dispersion', 'fingerprint')
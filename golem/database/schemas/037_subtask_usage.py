@@ -0,0 +1,28 @@
+# pylint: disable=no-member,unused-argument
+import datetime
+
+import peewee as pw
+
+SCHEMA_VERSION = 37
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+    @migrator.create_model  # pylint: disable=unused-variable
+    class SubtaskUsage(pw.Model):
+        subtask_id = pw.CharField(primary_key=True)
+        task_id = pw.CharField(index=True)
+        environment = pw.CharField(null=True)
+        success = pw.BooleanField(default=True)
+        peak_memory = pw.BigIntegerField(default=0)
+        cpu_time = pw.FloatField(default=0.0)
+        io_read = pw.BigIntegerField(default=0)
+        io_write = pw.BigIntegerField(default=0)
+        created_date = pw.DateTimeField(default=datetime.datetime.now)
+        modified_date = pw.DateTimeField(default=datetime.datetime.now)
+
+        class Meta:
+            db_table = "subtaskusage"
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.remove_model('subtaskusage')
@@ -0,0 +1,18 @@
+# pylint: disable=no-member
+# pylint: disable=unused-argument
+import peewee as pw
+
+SCHEMA_VERSION = 38
+
+
+def migrate(migrator, database, fake=False, **kwargs):
+    # Rows without a duration are not used to estimate footprints
+    migrator.add_fields(
+        'subtaskusage',
+        duration=pw.FloatField(default=0.0),
+        cpu_count=pw.IntegerField(default=0),
+    )
+
+
+def rollback(migrator, database, fake=False, **kwargs):
+    migrator.remove_fields('subtaskusage', 'duration', 'cpu_count')
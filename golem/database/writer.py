@@ -0,0 +1,116 @@
+import functools
+import logging
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from twisted.internet.defer import Deferred
+from twisted.python.failure import Failure
+
+logger = logging.getLogger('golem.db')
+
+# A write and the Deferred of its result
+Write = Tuple[Callable[[], Any], Deferred]
+
+
+class DatabaseWriter:
+    """ Runs database writes on a single thread.
+
+        The writes queued while a transaction is in progress are committed
+        together in the next one, each in its own savepoint, so that a
+        failing write is rolled back alone. Results are delivered in the
+        reactor thread. While the writer is not running, writes are made
+        in place, in the calling thread.
+
+        Nested transactions have to be opened with `db.atomic()`: in peewee
+        `db.transaction()` rolls back the whole batch on errors. """
+
+    MAX_BATCH = 500
+
+    def __init__(self, db, max_batch: int = MAX_BATCH) -> None:
+        self._db = db
+        self._max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ Commit the queued writes and stop the thread """
+        if not self.running:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        # Writes queued while stopping
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                self._commit([item], threaded=False)
+
+    def write(self, fn: Callable, *args, **kwargs) -> Deferred:
+        """ Queue a write, fired with its result once committed """
+        item = (functools.partial(fn, *args, **kwargs), Deferred())
+        if self.running:
+            self._queue.put(item)
+        else:
+            self._commit([item], threaded=False)
+        return item[1]
+
+    def _run(self) -> None:
+        try:
+            while True:
+                batch: List[Write] = []
+                item = self._queue.get()
+                while item is not None:
+                    batch.append(item)
+                    if len(batch) >= self._max_batch:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._commit(batch)
+                if item is None:
+                    return
+        finally:
+            if not self._db.is_closed():
+                self._db.close()
+
+    def _commit(self, batch: List[Write], threaded: bool = True) -> None:
+        results: List[Tuple[bool, Any]] = []
+        try:
+            with self._db.atomic():
+                for fn, _ in batch:
+                    try:
+                        with self._db.atomic():
+                            results.append((True, fn()))
+                    except Exception:  # pylint: disable=broad-except
+                        results.append((False, Failure()))
+        except Exception:  # pylint: disable=broad-except
+            # The transaction failed as a whole, e.g. on commit
+            logger.warning("Cannot commit %d database writes", len(batch),
+                           exc_info=True)
+            results = [(False, Failure())] * len(batch)
+
+        for (_, deferred), (succeeded, result) in zip(batch, results):
+            fire = deferred.callback if succeeded else deferred.errback
+            if threaded:
+                from twisted.internet import reactor
+                reactor.callFromThread(fire, result)
+            else:
+                fire(result)
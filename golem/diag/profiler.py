@@ -0,0 +1,11 @@
+from golem.core.profiler import Profiler
+from golem.diag.service import DiagnosticsProvider
+
+
+class ProfilerDiagnosticsProvider(DiagnosticsProvider):
+    def __init__(self, profiler=None):
+        self.profiler = profiler or Profiler.instance()
+
+    def get_diagnostics(self, output_format):
+        return self._format_diagnostics(self.profiler.profile(),
+                                        output_format)
@@ -1,14 +1,103 @@
+import json
 import logging
-from typing import Dict, Union, Tuple
+import os
+from threading import Lock
+from typing import ClassVar, Dict, Optional, Union, Tuple
 
 import requests.exceptions
 
-from docker.errors import NotFound, APIError
+from docker.errors import NotFound, APIError, DockerException
 
 from .client import local_client
 
 log = logging.getLogger(__name__)
 
+# Name of the file in the data directory
+IMAGE_CACHE_FILE = 'docker_images.json'
+
+
+class ImageCache:
+    """ IDs of the local Docker images, by name (repository:tag), verified
+        with a single listing of the local images instead of querying the
+        daemon image by image. The IDs are persisted, so that an image
+        replaced under the same name since the previous run is reported.
+        Until the images are listed, no image is known to be available. """
+
+    _instance: ClassVar[Optional['ImageCache']] = None
+    _instance_lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def instance(cls) -> 'ImageCache':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._lock = Lock()
+        self._path: Optional[str] = None
+        self._previous: Dict[str, str] = {}
+        self._images: Optional[Dict[str, str]] = None
+        if path:
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        """ Load the IDs stored by the previous run and store them there """
+        self._path = path
+        try:
+            with open(path) as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            log.debug('Docker image cache not loaded: %r', e)
+            previous = {}
+        with self._lock:
+            self._previous = previous
+
+    def refresh(self) -> bool:
+        """ List the local images. Returns False if the daemon could not be
+            queried, in which case no image is known to be available. """
+        try:
+            listing = local_client().images()
+        except (DockerException, requests.exceptions.ConnectionError) as e:
+            log.debug('Listing Docker images failed: %r', e)
+            with self._lock:
+                self._images = None
+            return False
+
+        images = {
+            name: image['Id']
+            for image in listing
+            for name in image.get('RepoTags') or []
+            if name != '<none>:<none>'
+        }
+        with self._lock:
+            changed = [
+                name for name, image_id in images.items()
+                if self._previous.get(name, image_id) != image_id
+            ]
+            self._images = images
+            self._previous = dict(images)
+        for name in changed:
+            log.warning('Docker image %s changed since the last run', name)
+        self._save(images)
+        return True
+
+    def image_id(self, name: str) -> Optional[str]:
+        with self._lock:
+            if self._images is None:
+                return None
+            return self._images.get(name)
+
+    def _save(self, images: Dict[str, str]) -> None:
+        if not self._path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            with open(self._path, 'w') as f:
+                json.dump(images, f)
+        except OSError as e:
+            log.warning('Cannot save the Docker image cache: %r', e)
+
 
 class DockerImage(object):
 
@@ -43,6 +132,11 @@ class DockerImage(object):
         return di
 
     def is_available(self):
+        # Images pulled since the listing are not cached, ask the daemon
+        image_id = ImageCache.instance().image_id(self.name)
+        if image_id is not None and self.id in (None, image_id):
+            return True
+
         client = local_client()
         try:
             if self.id:
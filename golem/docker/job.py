@@ -194,6 +194,9 @@ class DockerJob:
     def _get_host_params_path(self):
         return os.path.join(self.work_dir, self.PARAMS_FILE)
 
+    def get_host_stats_path(self):
+        return os.path.join(self.stats_dir, self.STATS_FILE)
+
     @staticmethod
     def _host_dir_chmod(dst_dir, mod):
         if isinstance(mod, str):
@@ -1,10 +1,12 @@
 import logging
 import os
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 from threading import Thread
-from typing import Any, Callable, Iterable, List, Optional
+from typing import Any, Callable, Iterable, List, Optional, Set
 
 from golem import hardware
 from golem.core.common import is_linux, is_windows, is_osx
@@ -15,6 +17,7 @@ from golem.docker.config import DockerConfigManager, APPS_DIR, IMAGES_INI, \
 from golem.docker.hypervisor.docker_for_mac import DockerForMac
 from golem.docker.hypervisor.hyperv import HyperVHypervisor
 from golem.docker.hypervisor.virtualbox import VirtualBoxHypervisor
+from golem.docker.image import ImageCache
 from golem.docker.task_thread import DockerBind
 from golem.report import report_calls, Component
 
@@ -23,6 +26,9 @@ logger = logging.getLogger(__name__)
 
 class DockerManager(DockerConfigManager):
 
+    # Images pulled or built at the same time
+    MAX_CONCURRENT_IMAGES = 3
+
     def __init__(self, config_desc=None):
         super().__init__()
 
@@ -216,41 +222,59 @@ class DockerManager(DockerConfigManager):
         return DockerCommandHandler.run(*args, **kwargs)
 
     def build_images(self):
-        entries = []
-
-        for entry in self._collect_images():
-            version = self._image_version(entry)
-
-            if not self._image_supported(entry):
-                logger.warning('Image %s is not supported', version)
-                continue
-
-            if not self.command('images', args=[version]):
-                entries.append(entry)
-
+        entries = self._missing_images()
         if entries:
             self._build_images(entries)
 
     @report_calls(Component.docker, 'images.build')
     def _build_images(self, entries):
-        cwd = os.getcwd()
+        """ Images built from other missing images are built after them,
+            the remaining ones at the same time """
+        pending = list(entries)
+        while pending:
+            missing = {self._image_version(entry) for entry in pending}
+            ready = [
+                entry for entry in pending
+                if not self._base_images(entry) & missing
+            ] or pending[:1]
+            self._run_concurrently(self._build_image, ready)
+            pending = [entry for entry in pending if entry not in ready]
+        ImageCache.instance().refresh()
+
+    def _build_image(self, entry):
+        image, docker_file, _, build_dir = entry[:4]
+        version = self._image_version(entry)
+        logger.warning('Docker: building image %s', version)
+
+        self.command('build', args=['-t', image,
+                                    '-f', os.path.join(APPS_DIR, docker_file),
+                                    os.path.join(APPS_DIR, build_dir)])
+        self.command('tag', args=[image, version])
 
-        for entry in entries:
-            image, docker_file, _, build_dir = entry[:4]
-            version = self._image_version(entry)
+    @staticmethod
+    def _base_images(entry) -> Set[str]:
+        with open(os.path.join(APPS_DIR, entry[1])) as f:
+            return set(re.findall(r'^FROM\s+(\S+)', f.read(), re.M | re.I))
 
-            try:
-                os.chdir(APPS_DIR)
-                logger.warning('Docker: building image %s', version)
+    def pull_images(self):
+        entries = self._missing_images()
+        if entries:
+            self._pull_images(entries)
 
-                self.command('build', args=['-t', image,
-                                            '-f', docker_file,
-                                            build_dir])
-                self.command('tag', args=[image, version])
-            finally:
-                os.chdir(cwd)
+    def _pull_images(self, entries):
+        versions = [self._image_version(entry) for entry in entries]
+        self._run_concurrently(self._pull_image, versions)
+        ImageCache.instance().refresh()
 
-    def pull_images(self):
+    @report_calls(Component.docker, 'images.pull')
+    def _pull_image(self, version):
+        logger.warning('Docker: pulling image %r', version)
+        self.command('pull', args=[version])
+
+    def _missing_images(self) -> List[List[str]]:
+        """ Supported images which are not available locally. The daemon is
+            asked image by image only if the images could not be listed. """
+        listed = ImageCache.instance().refresh()
         entries = []
 
         for entry in self._collect_images():
@@ -260,21 +284,21 @@ class DockerManager(DockerConfigManager):
                 logger.warning('Image %s is not supported', version)
                 continue
 
-            if not self.command('images', args=[version]):
+            if listed:
+                if ImageCache.instance().image_id(version) is None:
+                    entries.append(entry)
+            elif not self.command('images', args=[version]):
                 entries.append(entry)
 
-        if entries:
-            self._pull_images(entries)
-
-    def _pull_images(self, entries):
-        for entry in entries:
-            version = self._image_version(entry)
-            self._pull_image(version)
+        return entries
 
-    @report_calls(Component.docker, 'images.pull')
-    def _pull_image(self, version):
-        logger.warning('Docker: pulling image %r', version)
-        self.command('pull', args=[version])
+    def _run_concurrently(self, fn, items) -> None:
+        """ Raises the first error after all the items are processed """
+        workers = max(1, min(self.MAX_CONCURRENT_IMAGES, len(items)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(fn, item) for item in items]
+        for future in futures:
+            future.result()
 
     @classmethod
     def _image_version(cls, entry):
@@ -1,16 +1,21 @@
 import logging
 from pathlib import Path
-from typing import ClassVar, Optional, TYPE_CHECKING, Tuple, Dict, Union, \
-    List, NamedTuple
+from typing import Any, ClassVar, Optional, TYPE_CHECKING, Tuple, Dict, \
+    Union, List, NamedTuple
 
 import requests
 
 from golem.docker.image import DockerImage
 from golem.docker.job import DockerJob
+from golem.docker.usage import (
+    ContainerUsage,
+    ContainerUsageMonitor,
+    is_cgroup_v2,
+)
 from golem.environments.environmentsmanager import EnvironmentsManager
 from golem.envs.docker import DockerBind
+from golem.envs.docker.telemetry import ContainerTelemetry
 from golem.task.taskthread import TaskThread, JobException, TimeoutException
-from golem.vm.memorychecker import MemoryChecker
 
 if TYPE_CHECKING:
     from .manager import DockerManager  # noqa pylint:disable=unused-import
@@ -74,7 +79,10 @@ class DockerTaskThread(TaskThread):
                  extra_data: Dict,
                  dir_mapping: DockerDirMapping,
                  timeout: int,
-                 check_mem: bool = False) -> None:
+                 check_mem: bool = False,
+                 subtask_id: Optional[str] = None,
+                 cpus: Optional[List[int]] = None,
+                 memory: Optional[int] = None) -> None:
 
         if not docker_images:
             raise AttributeError("docker images is None")
@@ -95,7 +103,12 @@ class DockerTaskThread(TaskThread):
                 break
 
         self.job: Optional[DockerJob] = None
+        self.usage: Optional[ContainerUsage] = None
         self.check_mem = check_mem
+        self.subtask_id = subtask_id
+        # Limits narrower than the hardware preset; memory in KiB
+        self.cpus = cpus
+        self.memory = memory
         self.dir_mapping = dir_mapping
 
     # pylint:disable=too-many-arguments
@@ -123,7 +136,7 @@ class DockerTaskThread(TaskThread):
             if self.use_timeout and self.task_timeout < 0:
                 raise TimeoutException()
 
-            estm_mem = self._run_docker_job()
+            usage = self._run_docker_job()
 
         except (requests.exceptions.ReadTimeout, TimeoutException) as exc:
             if not self.use_timeout:
@@ -139,7 +152,7 @@ class DockerTaskThread(TaskThread):
             self._fail(exc)
 
         else:
-            self._task_computed(estm_mem)
+            self._task_computed(usage)
 
         finally:
             self.job = None
@@ -152,7 +165,11 @@ class DockerTaskThread(TaskThread):
             DockerBind(self.dir_mapping.stats, DockerJob.STATS_DIR)
         ]
 
-    def _run_docker_job(self) -> Optional[int]:
+    def _use_stats_stream(self) -> bool:
+        hypervisor = getattr(self.docker_manager, 'hypervisor', None)
+        return hypervisor is not None or is_cgroup_v2()
+
+    def _run_docker_job(self) -> Optional[ContainerUsage]:
         self.dir_mapping.mkdirs()
 
         binds = self._get_default_binds()
@@ -187,6 +204,10 @@ class DockerTaskThread(TaskThread):
         host_config = self.docker_manager.get_host_config_for_task(binds)
         host_config['devices'] = devices
         host_config['runtime'] = runtime
+        if self.cpus:
+            host_config['cpuset_cpus'] = ','.join(map(str, self.cpus))
+        if self.memory:
+            host_config['mem_limit'] = str(self.memory * 1024)
 
         params = dict(
             image=self.image,
@@ -201,12 +222,19 @@ class DockerTaskThread(TaskThread):
             host_config=host_config
         )
 
-        with DockerJob(**params) as job, MemoryChecker(self.check_mem) as mc:
+        with DockerJob(**params) as job:
             self.job = job
+            monitor = ContainerUsageMonitor(
+                job.get_host_stats_path(), self._use_stats_stream())
             job.start()
-
-            exit_code = job.wait()
-            estm_mem = mc.estm_mem
+            monitor.start(job.container_id)
+            telemetry = ContainerTelemetry.instance()
+            telemetry.track(job.container_id, self.subtask_id)
+            try:
+                exit_code = job.wait()
+            finally:
+                telemetry.untrack(job.container_id)
+                self.usage = monitor.stop()
 
             job.dump_logs(str(self.dir_mapping.logs / self.STDOUT_FILE),
                           str(self.dir_mapping.logs / self.STDERR_FILE))
@@ -221,17 +249,21 @@ class DockerTaskThread(TaskThread):
                                f'tail of stdout:\n{std_out}\n')
                 raise JobException(self._exit_code_message(exit_code))
 
-        return estm_mem
+        return self.usage
 
-    def _task_computed(self, estm_mem: Optional[int]) -> None:
+    def _task_computed(self, usage: Optional[ContainerUsage]) -> None:
         out_files = [
             str(path) for path in self.dir_mapping.output.glob("*")
         ]
-        self.result = {
+        result: Dict[str, Any] = {
             "data": out_files,
         }
-        if estm_mem is not None:
-            self.result = (self.result, estm_mem)
+        if usage is not None:
+            result["usage"] = usage.to_dict()
+        if self.check_mem:
+            self.result = (result, usage.peak_memory if usage else 0)
+        else:
+            self.result = result
         self._deferred.callback(self)
 
     def get_progress(self):
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+from threading import Lock, Thread
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from golem.core.common import is_linux
+from .client import local_client
+
+logger = logging.getLogger(__name__)
+
+CGROUP_V2_CONTROLLERS = '/sys/fs/cgroup/cgroup.controllers'
+
+
+class ContainerUsage(NamedTuple):
+    """ Resources used by a container during its whole run """
+    peak_memory: int = 0  # bytes
+    cpu_time: float = 0.0  # seconds
+    io_read: int = 0  # bytes
+    io_write: int = 0  # bytes
+
+    def merge(self, other: 'ContainerUsage') -> 'ContainerUsage':
+        """ Both the peak and the cumulative counters only grow """
+        return ContainerUsage(*map(max, self, other))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._asdict())
+
+
+def _io_bytes(entries: Optional[Iterable[Dict]]) -> Tuple[int, int]:
+    read = write = 0
+    for entry in entries or ():
+        op = str(entry.get('op', '')).lower()
+        if op == 'read':
+            read += int(entry.get('value', 0))
+        elif op == 'write':
+            write += int(entry.get('value', 0))
+    return read, write
+
+
+def _cpu_time(stats: Dict) -> float:
+    cpu_usage = (stats.get('cpu_stats') or {}).get('cpu_usage') or {}
+    return int(cpu_usage.get('total_usage') or 0) / 1e9
+
+
+def from_cgroup_stats(stats: Dict) -> ContainerUsage:
+    """ Parses the file written by docker-cgroups-stats (libcontainer
+        cgroup statistics) when the container's entrypoint exits """
+    usage = (stats.get('memory_stats') or {}).get('usage') or {}
+    blkio = stats.get('blkio_stats') or {}
+    io_read, io_write = _io_bytes(blkio.get('io_service_bytes_recursive'))
+    return ContainerUsage(
+        peak_memory=int(usage.get('max_usage') or usage.get('usage') or 0),
+        cpu_time=_cpu_time(stats),
+        io_read=io_read,
+        io_write=io_write,
+    )
+
+
+def from_docker_stats(stats: Dict) -> ContainerUsage:
+    """ Parses an entry of the Docker stats stream """
+    memory = stats.get('memory_stats') or {}
+    blkio = stats.get('blkio_stats') or {}
+    io_read, io_write = _io_bytes(blkio.get('io_service_bytes_recursive'))
+    return ContainerUsage(
+        # 'max_usage' is not reported on cgroup v2 hosts
+        peak_memory=int(memory.get('max_usage') or memory.get('usage') or 0),
+        cpu_time=_cpu_time(stats),
+        io_read=io_read,
+        io_write=io_write,
+    )
+
+
+def read_stats_file(path: str) -> Optional[ContainerUsage]:
+    try:
+        with open(path) as f:
+            return from_cgroup_stats(json.load(f))
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.debug("Cannot read container stats from %r: %r", path, e)
+        return None
+
+
+def is_cgroup_v2() -> bool:
+    return is_linux() and os.path.exists(CGROUP_V2_CONTROLLERS)
+
+
+class DockerStatsReader:
+    """ Consumes the Docker stats stream of a single container. Entries are
+        pushed by the daemon (about once a second) until the container
+        stops. """
+
+    def __init__(self, container_id: str) -> None:
+        self.container_id = container_id
+        self._lock = Lock()
+        self._usage: Optional[ContainerUsage] = None
+        self._latest: Optional[Dict] = None
+        self._stream: Optional[Any] = None
+        self._stopped = False
+        self._thread = Thread(
+            target=self._run,
+            name='DockerStatsReader',
+            daemon=True,
+        )
+
+    @property
+    def usage(self) -> Optional[ContainerUsage]:
+        with self._lock:
+            return self._usage
+
+    @property
+    def latest(self) -> Optional[Dict]:
+        """ The most recent entry of the stream """
+        with self._lock:
+            return self._latest
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stopped = True
+        self._thread.join(timeout)
+        stream = self._stream
+        if self._thread.is_alive() and hasattr(stream, 'close'):
+            try:
+                stream.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+    def _run(self) -> None:
+        try:
+            client = local_client()
+            self._stream = client.stats(
+                self.container_id, decode=True, stream=True)
+            for entry in self._stream:
+                usage = from_docker_stats(entry)
+                with self._lock:
+                    self._latest = entry
+                    self._usage = usage if self._usage is None \
+                        else self._usage.merge(usage)
+                if self._stopped:
+                    return
+        except Exception as e:  # pylint: disable=broad-except
+            if not self._stopped:
+                logger.debug("Docker stats stream of container '%s' "
+                             "closed: %r", self.container_id, e)
+
+
+class ContainerUsageMonitor:
+    """ Accounts memory, CPU time and I/O of a job's container.
+
+        The cgroup statistics written by docker-cgroups-stats inside the
+        container are exact but only available on cgroup v1 hosts. When
+        Docker runs in a VM (Docker Machine) or on a cgroup v2 host the
+        Docker stats stream is read as well. """
+
+    def __init__(self, stats_file: str, use_stats_stream: bool) -> None:
+        self.stats_file = stats_file
+        self.use_stats_stream = use_stats_stream
+        self._reader: Optional[DockerStatsReader] = None
+
+    def start(self, container_id: str) -> None:
+        """ To be called once the container is running """
+        if self.use_stats_stream:
+            self._reader = DockerStatsReader(container_id)
+            self._reader.start()
+
+    def stop(self) -> Optional[ContainerUsage]:
+        """ Returns the usage, or None if no statistics were available """
+        streamed: Optional[ContainerUsage] = None
+        if self._reader is not None:
+            self._reader.stop()
+            streamed = self._reader.usage
+            self._reader = None
+
+        usage = read_stats_file(self.stats_file)
+        if usage is None:
+            return streamed
+        if streamed is None:
+            return usage
+        return usage.merge(streamed)
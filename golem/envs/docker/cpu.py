@@ -2,14 +2,15 @@ import logging
 import os
 from pathlib import Path
 from socket import socket, SocketIO, SHUT_WR
-from threading import Thread, Lock
+from threading import Lock
 from time import sleep
-from typing import Optional, Any, Dict, List, Type, ClassVar, \
+from typing import Optional, Any, Callable, Dict, List, Type, ClassVar, \
     NamedTuple, Tuple, Iterator, Union, Iterable
 
 from docker.errors import APIError
 from twisted.internet.defer import Deferred, inlineCallbacks, succeed
 from twisted.internet.threads import deferToThread
+from twisted.python.failure import Failure
 from urllib3.contrib.pyopenssl import WrappedSocket
 
 from golem import hardware
@@ -27,6 +28,9 @@ from golem.envs import (
     EnvId, Prerequisites, RuntimeOutput, RuntimeInput,
 )
 from golem.envs.docker import DockerRuntimePayload, DockerPrerequisites
+from golem.envs.docker.events import DockerEventWatcher
+from golem.envs.docker.pool import ContainerPool
+from golem.envs.docker.telemetry import ContainerTelemetry
 from golem.envs.docker.whitelist import Whitelist
 
 logger = logging.getLogger(__name__)
@@ -142,24 +146,29 @@ class ContainerPortMapper:
 
 class DockerCPURuntime(RuntimeBase):
 
+    """ Container status changes are delivered by the process-wide
+        DockerEventWatcher, which falls back to polling only while the Docker
+        events stream is unavailable. Resource usage of the running container
+        is sampled by ContainerTelemetry. With a ContainerPool the container
+        is taken from the pool if one was created ahead of time and a
+        replacement is created after the runtime is prepared. """
+
     CONTAINER_RUNNING: ClassVar[List[str]] = ["running"]
     CONTAINER_STOPPED: ClassVar[List[str]] = ["exited", "dead"]
 
-    STATUS_UPDATE_INTERVAL = 1.0  # seconds
-
     def __init__(
             self,
             payload: DockerRuntimePayload,
             host_config: Dict[str, Any],
             volumes: Optional[List[str]],
             port_mapper: ContainerPortMapper,
+            container_pool: Optional[ContainerPool] = None,
     ) -> None:
         super().__init__(logger=logger)
 
         image = f"{payload.image}:{payload.tag}"
         client = local_client()
 
-        self._status_update_thread: Optional[Thread] = None
         self._container_id: Optional[str] = None
         self._stdin_socket: Optional[InputSocket] = None
         self._container_config = client.create_container_config(
@@ -174,6 +183,13 @@ class DockerCPURuntime(RuntimeBase):
             stdin_open=True
         )
         self._port_mapper = port_mapper
+        self._container_pool = container_pool
+
+    @staticmethod
+    def _log_failure(message: str) -> Callable[[Failure], None]:
+        def _errback(failure: Failure) -> None:
+            logger.warning("%s %r", message, failure.value)
+        return _errback
 
     def _inspect_container(self) -> Tuple[str, int]:
         """ Inspect Docker container associated with this runtime. Returns
@@ -199,6 +215,23 @@ class DockerCPURuntime(RuntimeBase):
                 container_status, exit_code = self._inspect_container()
             except (APIError, KeyError) as e:
                 self._error_occurred(e, "Error inspecting container.")
+                self._unwatch_container()
+                return
+
+            self._apply_container_status(container_status, exit_code)
+
+    def _apply_container_status(
+            self,
+            container_status: str,
+            exit_code: int
+    ) -> None:
+        """ Update the Runtime's status according to the given container
+            status. Does nothing if the Runtime is not running. Stops watching
+            the container once it is not running anymore. Uses lock for
+            status read & write. """
+
+        with self._status_lock:
+            if self._status != RuntimeStatus.RUNNING:
                 return
 
             if container_status in self.CONTAINER_RUNNING:
@@ -215,15 +248,27 @@ class DockerCPURuntime(RuntimeBase):
                 self._error_occurred(
                     None, f"Unexpected container status: '{container_status}'.")
 
-    def _update_status_loop(self) -> None:
-        """ Periodically call _update_status(). Stop when the container is no
-            longer running. """
-        while self.status() == RuntimeStatus.RUNNING:
-            self._update_status()
-            sleep(self.STATUS_UPDATE_INTERVAL)
+            if self._status != RuntimeStatus.RUNNING:
+                self._unwatch_container()
+
+    def _watch_container(self) -> None:
+        """ Subscribe to status changes of the container. """
+        assert self._container_id is not None
+        DockerEventWatcher.instance().watch(
+            self._container_id,
+            on_state=self._on_container_state,
+            poll=self._update_status,
+        )
+        ContainerTelemetry.instance().track(self._container_id)
+
+    def _unwatch_container(self) -> None:
+        if self._container_id is not None:
+            DockerEventWatcher.instance().unwatch(self._container_id)
+            ContainerTelemetry.instance().untrack(self._container_id)
 
-        logger.info("Runtime is no longer running. "
-                    "Stopping status update thread.")
+    def _on_container_state(self, container_status: str, exit_code: int) \
+            -> None:
+        self._apply_container_status(container_status, exit_code)
 
     def prepare(self) -> Deferred:
         self._change_status(
@@ -233,22 +278,39 @@ class DockerCPURuntime(RuntimeBase):
 
         def _prepare():
             client = local_client()
-            result = client.create_container_from_config(self._container_config)
+            container_id = None
+            if self._container_pool is not None:
+                container_id = self._container_pool.acquire(
+                    self._container_config)
 
-            container_id = result.get("Id")
-            assert isinstance(container_id, str), "Invalid container ID"
-            self._container_id = container_id
+            if container_id is None:
+                result = client.create_container_from_config(
+                    self._container_config)
+                container_id = result.get("Id")
+                assert isinstance(container_id, str), "Invalid container ID"
 
-            for warning in result.get("Warnings") or []:
-                logger.warning("Container creation warning: %s", warning)
+                for warning in result.get("Warnings") or []:
+                    logger.warning("Container creation warning: %s", warning)
 
+            self._container_id = container_id
             sock = client.attach_socket(
                 container_id, params={'stdin': True, 'stream': True}
             )
             self._stdin_socket = InputSocket(sock)
 
+        def _replenish_pool(res):
+            # The next runtime with the same config will not wait for it
+            if self._container_pool is not None:
+                deferToThread(
+                    self._container_pool.create,
+                    self._container_config,
+                ).addErrback(self._log_failure(
+                    "Creating a pooled container failed."))
+            return res
+
         deferred_prepare = deferToThread(_prepare)
         deferred_prepare.addCallback(self._prepared)
+        deferred_prepare.addCallback(_replenish_pool)
         deferred_prepare.addErrback(self._error_callback(
             "Creating container failed."))
         return deferred_prepare
@@ -258,6 +320,8 @@ class DockerCPURuntime(RuntimeBase):
             from_status=[RuntimeStatus.FAILURE, RuntimeStatus.STOPPED],
             to_status=RuntimeStatus.CLEANING_UP)
         logger.info("Cleaning up runtime...")
+        # Idempotent, a no-op if the container was unwatched when it stopped
+        self._unwatch_container()
 
         def _clean_up():
             client = local_client()
@@ -269,7 +333,12 @@ class DockerCPURuntime(RuntimeBase):
                 self._stdin_socket.close()
             return res
 
-        deferred_cleanup = deferToThread(_clean_up)
+        if self._container_pool is not None:
+            deferred_cleanup = deferToThread(
+                self._container_pool.remove,
+                self._container_id)
+        else:
+            deferred_cleanup = deferToThread(_clean_up)
         deferred_cleanup.addCallback(self._torn_down)
         deferred_cleanup.addErrback(self._error_callback(
             f"Failed to remove container '{self._container_id}'."))
@@ -286,15 +355,19 @@ class DockerCPURuntime(RuntimeBase):
             client = local_client()
             client.start(self._container_id)
 
-        def _spawn_status_update_thread(_):
-            logger.debug("Spawning status update thread...")
-            self._status_update_thread = Thread(target=self._update_status_loop)
-            self._status_update_thread.start()
-            logger.debug("Status update thread spawned.")
+        def _watch_status(_):
+            self._watch_container()
+            # The container could have stopped before subscribing
+            return deferToThread(self._update_status)
+
+        def _unwatch(failure):
+            self._unwatch_container()
+            return failure
 
         deferred_start = deferToThread(_start)
         deferred_start.addCallback(self._started)
-        deferred_start.addCallback(_spawn_status_update_thread)
+        deferred_start.addCallback(_watch_status)
+        deferred_start.addErrback(_unwatch)
         deferred_start.addErrback(self._error_callback(
             f"Starting container '{self._container_id}' failed."))
         return deferred_start
@@ -314,13 +387,8 @@ class DockerCPURuntime(RuntimeBase):
             client = local_client()
             client.stop(self._container_id)
 
-        def _join_status_update_thread(res):
-            logger.debug("Joining status update thread...")
-            self._status_update_thread.join(self.STATUS_UPDATE_INTERVAL * 2)
-            if self._status_update_thread.is_alive():
-                logger.warning("Failed to join status update thread.")
-            else:
-                logger.debug("Status update thread joined.")
+        def _unwatch(res):
+            self._unwatch_container()
             return res
 
         def _close_stdin(res):
@@ -332,7 +400,7 @@ class DockerCPURuntime(RuntimeBase):
         deferred_stop.addCallback(self._stopped)
         deferred_stop.addErrback(self._error_callback(
             f"Stopping container '{self._container_id}' failed."))
-        deferred_stop.addBoth(_join_status_update_thread)
+        deferred_stop.addBoth(_unwatch)
         deferred_stop.addBoth(_close_stdin)
         return deferred_stop
 
@@ -487,6 +555,9 @@ class DockerCPUEnvironment(EnvironmentBase):
             raise EnvironmentError("No supported hypervisor found")
         self._hypervisor = hypervisor_cls.instance(self._get_hypervisor_config)
         self._port_mapper = ContainerPortMapper(self._hypervisor)
+        self._container_pool = ContainerPool()
+        # Deferreds waiting for the pulls in progress, by (image, tag)
+        self._pulls: Dict[Tuple[str, str], List[Deferred]] = {}
         self._update_work_dirs(config.work_dirs)
         self._constrain_hypervisor(config)
 
@@ -522,6 +593,8 @@ class DockerCPUEnvironment(EnvironmentBase):
 
         def _clean_up():
             try:
+                # Pooled containers may be bound to the previous config
+                self._container_pool.clear()
                 self._hypervisor.quit()
             except Exception as e:
                 self._error_occurred(e, "Cleaning up environment failed.")
@@ -543,7 +616,9 @@ class DockerCPUEnvironment(EnvironmentBase):
             user=None if is_windows() else str(os.getuid()),
             env={},
         )
-        runtime = self.runtime(payload)
+        # The benchmark runtime is never reused, a pooled replacement
+        # container would only wait to expire
+        runtime = self._runtime(payload, container_pool=None)
         yield runtime.prepare()
         # Connect to stdout before starting the runtime because getting if after
         # the container stops sometimes fails for unclear reasons
@@ -600,7 +675,20 @@ class DockerCPUEnvironment(EnvironmentBase):
             self._prerequisites_installed(prerequisites)
             return True
 
-        return deferToThread(_prepare)
+        def _pulled(result):
+            for waiting in self._pulls.pop(key):
+                waiting.callback(result)
+
+        # Pulls of other images proceed in parallel, the same image is
+        # pulled once for all the callers
+        key = (prerequisites.image, prerequisites.tag)
+        deferred = Deferred()
+        if key in self._pulls:
+            self._pulls[key].append(deferred)
+        else:
+            self._pulls[key] = [deferred]
+            deferToThread(_prepare).addBoth(_pulled)
+        return deferred
 
     @classmethod
     def parse_config(cls, config_dict: Dict[str, Any]) -> DockerCPUConfig:
@@ -682,6 +770,14 @@ class DockerCPUEnvironment(EnvironmentBase):
             self,
             payload: RuntimePayload,
             config: Optional[EnvConfig] = None
+    ) -> DockerCPURuntime:
+        return self._runtime(payload, config, self._container_pool)
+
+    def _runtime(
+            self,
+            payload: RuntimePayload,
+            config: Optional[EnvConfig] = None,
+            container_pool: Optional[ContainerPool] = None,
     ) -> DockerCPURuntime:
         assert isinstance(payload, DockerRuntimePayload)
         if not Whitelist.is_whitelisted(payload.image):
@@ -699,6 +795,7 @@ class DockerCPUEnvironment(EnvironmentBase):
             host_config,
             volumes,
             self._port_mapper,
+            container_pool,
         )
 
     def _create_host_config(
@@ -0,0 +1,176 @@
+import logging
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, ClassVar, Dict, NamedTuple, Optional
+
+from golem.docker.client import local_client
+
+logger = logging.getLogger(__name__)
+
+# (container status, exit code)
+ContainerStateCallback = Callable[[str, int], None]
+PollCallback = Callable[[], None]
+
+
+class _Subscription(NamedTuple):
+    on_state: ContainerStateCallback
+    poll: PollCallback
+
+
+class DockerEventWatcher:
+    """ Process-wide subscriber of the Docker events stream. Dispatches
+        container state transitions to callbacks registered per container.
+
+        While the stream is disconnected, registered containers are polled
+        every POLL_INTERVAL by a single thread until the stream is
+        reconnected. Events emitted while disconnected are replayed after
+        reconnecting ('since' parameter), so no transition is lost. """
+
+    POLL_INTERVAL: ClassVar[float] = 1.0  # seconds
+    RECONNECT_INTERVAL: ClassVar[float] = 5.0  # seconds
+    # Container events which end the 'running' state
+    EVENTS: ClassVar[Dict[str, str]] = {
+        'die': 'exited',
+    }
+
+    _instance: ClassVar[Optional['DockerEventWatcher']] = None
+    _instance_lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def instance(cls) -> 'DockerEventWatcher':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._subscriptions: Dict[str, _Subscription] = {}
+        self._thread: Optional[Thread] = None
+        self._stream: Optional[Any] = None
+        self._stop_event = Event()
+        self._connected = Event()
+        # Events are requested since this timestamp after (re)connecting
+        self._since: int = int(time.time())
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def watch(
+            self,
+            container_id: str,
+            on_state: ContainerStateCallback,
+            poll: PollCallback,
+    ) -> None:
+        """ Register callbacks for the container. `on_state` is called with
+            the state the container transitioned to. `poll` is called to check
+            the container state while the events stream is unavailable. """
+        with self._lock:
+            self._subscriptions[container_id] = _Subscription(on_state, poll)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = Thread(
+                    target=self._run,
+                    name='DockerEventWatcher',
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def unwatch(self, container_id: str) -> None:
+        with self._lock:
+            self._subscriptions.pop(container_id, None)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._close_stream()
+        if self._thread is not None:
+            self._thread.join(self.RECONNECT_INTERVAL)
+            self._thread = None
+
+    def _close_stream(self) -> None:
+        stream = self._stream
+        if stream is not None and hasattr(stream, 'close'):
+            try:
+                stream.close()
+            except Exception:  # pylint: disable=broad-except
+                pass
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._consume()
+            except Exception as e:  # pylint: disable=broad-except
+                if self._stop_event.is_set():
+                    break
+                logger.warning("Docker events stream disconnected: %r", e)
+            finally:
+                self._connected.clear()
+                self._stream = None
+                self._since = max(self._since, int(time.time()) - 1)
+            self._poll_until_reconnect()
+
+    def _consume(self) -> None:
+        client = local_client()
+        self._stream = client.events(
+            since=self._since,
+            filters={'type': 'container', 'event': list(self.EVENTS)},
+            decode=True,
+        )
+        self._connected.set()
+        logger.debug("Docker events stream connected.")
+
+        # Events could have been missed before the first one was received
+        self._poll_all()
+
+        for event in self._stream:
+            if self._stop_event.is_set():
+                return
+            self._since = max(self._since, int(event.get('time', 0)))
+            self._dispatch(event)
+        raise ConnectionError("Docker events stream ended")
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        action = event.get('Action') or event.get('status')
+        status = self.EVENTS.get(action)
+        actor = event.get('Actor') or {}
+        container_id = actor.get('ID') or event.get('id')
+        if status is None or container_id is None:
+            return
+
+        with self._lock:
+            subscription = self._subscriptions.get(container_id)
+        if subscription is None:
+            return
+
+        attributes = actor.get('Attributes') or {}
+        try:
+            exit_code = int(attributes.get('exitCode', 0))
+        except (TypeError, ValueError):
+            exit_code = -1
+
+        logger.debug("Container '%s' %s, exit code %r",
+                     container_id, action, exit_code)
+        try:
+            subscription.on_state(status, exit_code)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Container state callback failed.")
+
+    def _poll_all(self) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        for subscription in subscriptions:
+            try:
+                subscription.poll()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Container status poll failed.")
+
+    def _poll_until_reconnect(self) -> None:
+        """ Fallback polling of registered containers while the stream is
+            down. Returns when it is time to reconnect. """
+        reconnect_at = time.monotonic() + self.RECONNECT_INTERVAL
+        while not self._stop_event.is_set():
+            self._poll_all()
+            if time.monotonic() >= reconnect_at:
+                return
+            self._stop_event.wait(self.POLL_INTERVAL)
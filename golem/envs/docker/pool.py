@@ -0,0 +1,132 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+from docker.errors import APIError
+
+from golem.docker.client import local_client
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerPool:
+    """ Containers created ahead of time from the configs of the runtimes
+        prepared recently, so that the next runtime with the same config
+        (image, command, binds, CPU set and memory limit) skips creating one.
+
+        A pooled container has never been started. A runtime taking it
+        begins with the pristine filesystem of its image and the container
+        is removed after use instead of being returned to the pool. At most
+        `max_idle` containers are kept, the least recently created are
+        evicted first, and containers idle for longer than `max_age` are
+        removed on the next access of the pool. Since the CPU set and memory
+        limit are a part of the config, containers created for the previous
+        hardware preset are never taken; the environment clears the pool
+        when it is cleaned up to reconfigure.
+
+        All the methods block on the Docker API and are meant to be called
+        from a thread. """
+
+    MAX_IDLE: ClassVar[int] = 4
+    MAX_AGE: ClassVar[float] = 300.0  # seconds
+
+    def __init__(
+            self,
+            max_idle: Optional[int] = None,
+            max_age: Optional[float] = None,
+    ) -> None:
+        self.max_idle = self.MAX_IDLE if max_idle is None else max_idle
+        self.max_age = self.MAX_AGE if max_age is None else max_age
+        self._lock = Lock()
+        # Container ID -> (config key, creation time), oldest first
+        self._idle: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+
+    @staticmethod
+    def _key(config: Dict[str, Any]) -> str:
+        return json.dumps(config, sort_keys=True, default=str)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def acquire(self, config: Dict[str, Any]) -> Optional[str]:
+        """ Take an idle container created from the config. Returns None if
+            there is none. """
+        key = self._key(config)
+        container_id = None
+        with self._lock:
+            expired = self._pop_expired()
+            for idle_id, (idle_key, _) in self._idle.items():
+                if idle_key == key:
+                    container_id = idle_id
+                    break
+            if container_id is not None:
+                del self._idle[container_id]
+        self._remove_all(expired)
+        if container_id is not None:
+            logger.debug("Pooled container %s taken", container_id)
+        return container_id
+
+    def create(self, config: Dict[str, Any]) -> Optional[str]:
+        """ Create a container from the config and keep it idle. Returns its
+            ID or None if the pool does not keep any containers. """
+        if self.max_idle <= 0:
+            return None
+
+        client = local_client()
+        result = client.create_container_from_config(config)
+        container_id = result.get("Id")
+        assert isinstance(container_id, str), "Invalid container ID"
+
+        with self._lock:
+            self._idle[container_id] = (self._key(config), time.monotonic())
+            evicted = self._pop_expired()
+            while len(self._idle) > self.max_idle:
+                evicted.append(self._idle.popitem(last=False)[0])
+        self._remove_all(evicted)
+        logger.debug("Container %s created for the pool", container_id)
+        return container_id
+
+    def remove(self, container_id: str) -> None:
+        """ Remove a container taken from the pool or not pooled at all.
+            Unlike the pooled containers removed by the pool, a failed
+            removal raises. """
+        with self._lock:
+            self._idle.pop(container_id, None)
+        client = local_client()
+        client.remove_container(container_id, force=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            container_ids = list(self._idle)
+            self._idle.clear()
+        if container_ids:
+            logger.info("Removing %d pooled containers", len(container_ids))
+        self._remove_all(container_ids)
+
+    def _pop_expired(self) -> List[str]:
+        """ Assumes the lock is held """
+        deadline = time.monotonic() - self.max_age
+        expired = [
+            container_id
+            for container_id, (_, created) in self._idle.items()
+            if created < deadline
+        ]
+        for container_id in expired:
+            del self._idle[container_id]
+        return expired
+
+    @staticmethod
+    def _remove_all(container_ids: List[str]) -> None:
+        if not container_ids:
+            return
+        client = local_client()
+        for container_id in container_ids:
+            try:
+                client.remove_container(container_id, force=True)
+            except APIError as e:
+                logger.warning(
+                    "Failed to remove container '%s': %r", container_id, e)
@@ -0,0 +1,453 @@
+import logging
+import os
+import time
+from array import array
+from collections import OrderedDict
+from threading import Lock
+from typing import (
+    Any, Callable, ClassVar, Dict, Iterable, List, Optional, Sequence, Tuple,
+)
+
+from golem.core import golem_async
+from golem.core.service import LoopingCallService
+from golem.docker.client import local_client
+from golem.docker.usage import DockerStatsReader
+from golem.rpc import utils as rpc_utils
+from golem.rpc.mapping.rpceventnames import Computation
+
+logger = logging.getLogger(__name__)
+
+# Gauges are stored as sampled, counters as per second rates
+GAUGES = ('memory',)
+COUNTERS = ('cpu', 'disk_read', 'disk_write', 'net_rx', 'net_tx')
+METRICS = GAUGES + COUNTERS
+
+Counters = Dict[str, float]
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """ Nearest-rank percentile of unsorted values, None if there are none """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class RingBuffer:
+    """ Fixed-size columnar buffer of samples. When full, the oldest sample
+        is overwritten. """
+
+    def __init__(self, capacity: int, fields: Iterable[str]) -> None:
+        self.capacity = capacity
+        self._columns = {
+            name: array('d', bytes(8 * capacity))
+            for name in ('time',) + tuple(fields)
+        }
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        index = self._next
+        self._columns['time'][index] = timestamp
+        for name, value in values.items():
+            self._columns[name][index] = value
+        self._next = (index + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _indexes(self) -> Iterable[int]:
+        start = (self._next - self._size) % self.capacity
+        return ((start + i) % self.capacity for i in range(self._size))
+
+    def window(self, since: float) -> Dict[str, List[float]]:
+        """ Returns columns of the samples taken at `since` or later, oldest
+            first """
+        times = self._columns['time']
+        indexes = [i for i in self._indexes() if times[i] >= since]
+        return {
+            name: [column[i] for i in indexes]
+            for name, column in self._columns.items()
+        }
+
+    def last(self) -> Optional[Dict[str, float]]:
+        if not self._size:
+            return None
+        index = (self._next - 1) % self.capacity
+        return {name: column[index] for name, column in self._columns.items()}
+
+
+class CgroupSource:
+    """ Reads counters of a container from cgroupfs and procfs of the host.
+        Costs a few small file reads per sample and no threads. """
+
+    def __init__(self, pid: int, cgroups: Dict[str, str],
+                 cgroup_root: str = '/sys/fs/cgroup',
+                 proc_root: str = '/proc') -> None:
+        self.pid = pid
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        # Controller name ('' for the cgroup v2 unified hierarchy) -> path
+        self.cgroups = cgroups
+
+    @classmethod
+    def find(cls, container_id: str, pid: int,
+             cgroup_root: str = '/sys/fs/cgroup',
+             proc_root: str = '/proc') -> Optional['CgroupSource']:
+        """ Returns None unless the process runs on this host in the
+            container's cgroup, e.g. when Docker runs in a VM """
+        try:
+            with open(os.path.join(proc_root, str(pid), 'cgroup')) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return None
+
+        cgroups = {}
+        for line in lines:
+            _, controllers, path = line.split(':', 2)
+            for controller in controllers.split(','):
+                cgroups[controller] = path.lstrip('/')
+        if not any(container_id in path for path in cgroups.values()):
+            return None
+        return cls(pid, cgroups, cgroup_root, proc_root)
+
+    def _path(self, controller: str, name: str) -> str:
+        if controller in self.cgroups:
+            return os.path.join(
+                self.cgroup_root, controller, self.cgroups[controller], name)
+        return os.path.join(self.cgroup_root, self.cgroups.get('', ''), name)
+
+    def _read(self, controller: str, name: str) -> str:
+        with open(self._path(controller, name)) as f:
+            return f.read()
+
+    def read(self) -> Optional[Counters]:
+        try:
+            if 'memory' in self.cgroups:
+                counters = self._read_v1()
+            else:
+                counters = self._read_v2()
+        except (OSError, ValueError):
+            # The container has exited
+            return None
+        counters['net_rx'], counters['net_tx'] = self._read_network()
+        return counters
+
+    def _read_v1(self) -> Counters:
+        disk_read = disk_write = 0
+        for line in self._read(
+                'blkio', 'blkio.throttle.io_service_bytes').splitlines():
+            fields = line.split()
+            if len(fields) == 3 and fields[1] == 'Read':
+                disk_read += int(fields[2])
+            elif len(fields) == 3 and fields[1] == 'Write':
+                disk_write += int(fields[2])
+        return {
+            'memory': int(self._read('memory', 'memory.usage_in_bytes')),
+            'cpu': int(self._read('cpuacct', 'cpuacct.usage')) / 1e9,
+            'disk_read': disk_read,
+            'disk_write': disk_write,
+        }
+
+    def _read_v2(self) -> Counters:
+        cpu_time = 0.0
+        for line in self._read('', 'cpu.stat').splitlines():
+            key, _, value = line.partition(' ')
+            if key == 'usage_usec':
+                cpu_time = int(value) / 1e6
+        disk_read = disk_write = 0
+        for line in self._read('', 'io.stat').splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition('=')
+                if key == 'rbytes':
+                    disk_read += int(value)
+                elif key == 'wbytes':
+                    disk_write += int(value)
+        return {
+            'memory': int(self._read('', 'memory.current')),
+            'cpu': cpu_time,
+            'disk_read': disk_read,
+            'disk_write': disk_write,
+        }
+
+    def _read_network(self) -> Tuple[int, int]:
+        rx = tx = 0
+        try:
+            with open(os.path.join(
+                    self.proc_root, str(self.pid), 'net', 'dev')) as f:
+                lines = f.read().splitlines()[2:]
+        except OSError:
+            return rx, tx
+        for line in lines:
+            name, _, fields = line.partition(':')
+            if name.strip() == 'lo':
+                continue
+            values = fields.split()
+            rx += int(values[0])
+            tx += int(values[8])
+        return rx, tx
+
+    def close(self) -> None:
+        pass
+
+
+class DockerStatsSource:
+    """ Reads counters from the Docker stats stream, for Docker running in
+        a VM. The daemon pushes an entry about once a second. """
+
+    def __init__(self, container_id: str) -> None:
+        self._reader = DockerStatsReader(container_id)
+        self._reader.start()
+
+    def read(self) -> Optional[Counters]:
+        entry = self._reader.latest
+        if entry is None:
+            return None
+        memory = entry.get('memory_stats') or {}
+        cpu_usage = (entry.get('cpu_stats') or {}).get('cpu_usage') or {}
+        disk_read = disk_write = 0
+        blkio = entry.get('blkio_stats') or {}
+        for item in blkio.get('io_service_bytes_recursive') or ():
+            op = str(item.get('op', '')).lower()
+            if op == 'read':
+                disk_read += int(item.get('value', 0))
+            elif op == 'write':
+                disk_write += int(item.get('value', 0))
+        networks = (entry.get('networks') or {}).values()
+        return {
+            'memory': int(memory.get('usage') or 0),
+            'cpu': int(cpu_usage.get('total_usage') or 0) / 1e9,
+            'disk_read': disk_read,
+            'disk_write': disk_write,
+            'net_rx': sum(int(n.get('rx_bytes', 0)) for n in networks),
+            'net_tx': sum(int(n.get('tx_bytes', 0)) for n in networks),
+        }
+
+    def close(self) -> None:
+        self._reader.stop(timeout=0)
+
+
+class _Container:  # pylint: disable=too-few-public-methods
+
+    def __init__(self, container_id: str, subtask_id: Optional[str],
+                 capacity: int) -> None:
+        self.container_id = container_id
+        self.subtask_id = subtask_id
+        self.buffer = RingBuffer(capacity, METRICS)
+        self.source: Optional[Any] = None
+        self.counters: Optional[Counters] = None
+        self.sampled_at: float = 0.0
+        self.started: float = time.time()
+        self.stopped: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'container_id': self.container_id,
+            'subtask_id': self.subtask_id,
+            'started': self.started,
+            'stopped': self.stopped,
+            'last': self.buffer.last(),
+        }
+
+
+class ContainerTelemetry:
+    """ Samples CPU, memory, disk and network usage of running containers
+        into fixed-size ring buffers and answers windowed queries about
+        them. A single sampler serves all containers; the cost per container
+        is constant. Series of stopped containers are kept for MAX_STOPPED
+        most recent containers. """
+
+    SAMPLE_INTERVAL: ClassVar[float] = 5.0  # seconds
+    CAPACITY: ClassVar[int] = 720  # samples, an hour at SAMPLE_INTERVAL
+    MAX_STOPPED: ClassVar[int] = 32
+
+    _instance: ClassVar[Optional['ContainerTelemetry']] = None
+    _instance_lock: ClassVar[Lock] = Lock()
+
+    @classmethod
+    def instance(cls) -> 'ContainerTelemetry':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._running: Dict[str, _Container] = {}
+        self._stopped: 'OrderedDict[str, _Container]' = OrderedDict()
+
+    def track(self, container_id: str, subtask_id: Optional[str] = None) \
+            -> None:
+        """ Start sampling a running container. The data source is chosen
+            on the first sample, off the caller's thread. """
+        with self._lock:
+            self._running[container_id] = _Container(
+                container_id, subtask_id, self.CAPACITY)
+
+    def untrack(self, container_id: str) -> None:
+        with self._lock:
+            container = self._running.pop(container_id, None)
+            if container is None:
+                return
+            container.stopped = time.time()
+            self._stopped[container_id] = container
+            while len(self._stopped) > self.MAX_STOPPED:
+                self._stopped.popitem(last=False)
+        if container.source is not None:
+            container.source.close()
+
+    @staticmethod
+    def _create_source(container_id: str) -> Any:
+        client = local_client()
+        pid = client.inspect_container(container_id)['State']['Pid']
+        return CgroupSource.find(container_id, pid) \
+            or DockerStatsSource(container_id)
+
+    def sample(self) -> None:
+        with self._lock:
+            containers = list(self._running.values())
+        for container in containers:
+            try:
+                self._sample_container(container)
+            except Exception as e:  # pylint: disable=broad-except
+                logger.debug("Cannot sample container '%s': %r",
+                             container.container_id, e)
+
+    def _sample_container(self, container: _Container) -> None:
+        if container.source is None:
+            container.source = self._create_source(container.container_id)
+            if container.stopped is not None:
+                container.source.close()
+                return
+
+        counters = container.source.read()
+        if counters is None:
+            return
+        now = time.time()
+        previous, elapsed = container.counters, now - container.sampled_at
+        container.counters, container.sampled_at = counters, now
+        if previous is None or elapsed <= 0:
+            return
+
+        values = {name: counters[name] for name in GAUGES}
+        for name in COUNTERS:
+            values[name] = max(0.0, counters[name] - previous[name]) / elapsed
+        container.buffer.append(now, values)
+
+    def _find(self, key: str) -> Optional[_Container]:
+        """ Looks up a container by its ID or by the subtask it computes """
+        with self._lock:
+            for containers in (self._running, self._stopped):
+                if key in containers:
+                    return containers[key]
+            for containers in (self._running, self._stopped):
+                for container in reversed(list(containers.values())):
+                    if container.subtask_id == key:
+                        return container
+        return None
+
+    @rpc_utils.expose('comp.telemetry.containers')
+    def containers(self) -> List[Dict[str, Any]]:
+        """ Running and recently stopped containers with the latest
+            sample """
+        with self._lock:
+            containers = list(self._running.values()) \
+                + list(self._stopped.values())
+        return [container.to_dict() for container in containers]
+
+    @rpc_utils.expose('comp.telemetry.query')
+    def query(
+            self,
+            key: str,
+            minutes: float = 5.0,
+            metrics: Optional[List[str]] = None,
+            percentiles: Optional[List[float]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """ Summary of the samples taken within the last `minutes` for a
+            container ID or a subtask ID. CPU is in cores, memory in bytes
+            and the other metrics in bytes per second. The summaries of an
+            empty window are None. """
+        container = self._find(key)
+        if container is None:
+            return None
+        metrics = metrics or list(METRICS)
+        unknown = set(metrics) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+        percentiles = percentiles or [50, 95]
+
+        window = container.buffer.window(time.time() - minutes * 60)
+        result: Dict[str, Any] = {
+            'container_id': container.container_id,
+            'subtask_id': container.subtask_id,
+            'samples': len(window['time']),
+        }
+        for name in metrics:
+            values = window[name]
+            summary = {
+                f'p{pct:g}': percentile(values, pct) for pct in percentiles
+            }
+            summary['mean'] = sum(values) / len(values) if values else None
+            summary['max'] = max(values) if values else None
+            result[name] = summary
+        return result
+
+    def series(self, seconds: float) -> Dict[str, Dict[str, Any]]:
+        """ Mean and maximum of every metric within the last `seconds`, per
+            running container """
+        since = time.time() - seconds
+        with self._lock:
+            containers = list(self._running.values())
+        result = {}
+        for container in containers:
+            window = container.buffer.window(since)
+            if not window['time']:
+                continue
+            series: Dict[str, Any] = {'subtask_id': container.subtask_id}
+            for name in METRICS:
+                values = window[name]
+                series[name] = {
+                    'mean': sum(values) / len(values),
+                    'max': max(values),
+                }
+            result[container.container_id] = series
+        return result
+
+
+class TelemetryService(LoopingCallService):
+    """ Samples containers off the reactor thread and periodically publishes
+        the aggregated series on the telemetry WAMP topic """
+
+    def __init__(
+            self,
+            publish: Callable[..., Any],
+            telemetry: Optional[ContainerTelemetry] = None,
+            publish_interval: float = 30.0,
+    ) -> None:
+        self._telemetry = telemetry or ContainerTelemetry.instance()
+        super().__init__(
+            interval_seconds=self._telemetry.SAMPLE_INTERVAL)
+        self._publish = publish
+        self._publish_interval = publish_interval
+        self._published_at = time.time()
+
+    def _run_async(self):
+        return golem_async.async_run(
+            golem_async.AsyncRequest(self._run),
+            success=self._publish_series,
+            error=self._exceptionHandler,
+        )
+
+    def _run(self):
+        self._telemetry.sample()
+
+    def _publish_series(self, _=None) -> None:
+        now = time.time()
+        if now - self._published_at < self._publish_interval:
+            return
+        self._published_at = now
+        series = self._telemetry.series(self._publish_interval)
+        if series:
+            self._publish(Computation.evt_comp_telemetry, series)
@@ -1,8 +1,10 @@
+import hashlib
 import logging
+import platform
 import sys
 from enum import Enum
 from multiprocessing import cpu_count
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 
 import psutil
 from psutil import virtual_memory
@@ -115,6 +117,33 @@ def cpus() -> List[int]:
     return cpu_list
 
 
+def cpu_model() -> str:
+    """
+    :return str: CPU model name, or the processor type if the name cannot
+    be read
+    """
+    if is_linux():
+        try:
+            with open('/proc/cpuinfo') as f:
+                for line in f:
+                    if line.startswith('model name'):
+                        return line.split(':', 1)[1].strip()
+        except OSError as e:
+            logger.debug("Couldn't read CPU model: %r", e)
+    return platform.processor() or platform.machine()
+
+
+def fingerprint(*extra: Any) -> str:
+    """
+    Identifies the hardware available for computation: CPU model, the cores
+    affined to the process and the memory cap. Additional values, e.g.
+    configuration or image digests, are included in the fingerprint.
+    :return str: hex digest which changes whenever any of the values change
+    """
+    values = (cpu_model(), cpus(), memory()) + extra
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+
 def memory() -> int:
     """
     :return int: 3/4 of total memory in KiB
@@ -14,6 +14,7 @@ from golem_messages import datastructures as msg_dt
 from golem_messages import message
 from golem_messages.datastructures import p2p as dt_p2p
 from peewee import (
+    BigIntegerField,
     BlobField,
     BooleanField,
     CharField,
@@ -41,7 +42,11 @@ db = GolemSqliteDatabase(None, threadlocals=True,
                          pragmas=(
                              ('foreign_keys', True),
                              ('busy_timeout', 1000),
-                             ('journal_mode', 'WAL')))
+                             ('journal_mode', 'WAL'),
+                             # Durable in WAL mode, syncs on checkpoints only
+                             ('synchronous', 'NORMAL'),
+                             ('cache_size', -16 * 1024),  # KiB
+                             ('temp_store', 'MEMORY')))
 
 
 # Use proxy function to always use current .utcnow() (allows mocking)
@@ -245,6 +250,8 @@ class VersionField(CharField):
     """Semantic version field"""
 
     def db_value(self, value):
+        if value is None:
+            return None
         if not isinstance(value, semantic_version.Version):
             raise TypeError(f"Value {value} is not a semantic version")
         return str(value)
@@ -529,23 +536,67 @@ class TaskPreset(BaseModel):
 class Performance(BaseModel):
     """ Keeps information about benchmark performance """
     environment_id = CharField(null=False, index=True, unique=True)
+    # Median of the benchmark runs
     value = FloatField(default=0.0)
+    # Median absolute deviation of the runs, relative to the median
+    dispersion = FloatField(default=0.0)
+    # Hardware and image the benchmark was run on, see
+    # BenchmarkManager.fingerprint
+    fingerprint = CharField(null=True)
     min_accepted_step = FloatField(default=300.0)
 
     class Meta:
         database = db
 
     @classmethod
-    def update_or_create(cls, env_id, performance):
+    def update_or_create(cls, env_id, performance, dispersion=0.0,
+                         fingerprint=None):
         try:
             perf = Performance.get(Performance.environment_id == env_id)
             perf.value = performance
+            perf.dispersion = dispersion
+            perf.fingerprint = fingerprint
             perf.save()
         except Performance.DoesNotExist:
-            perf = Performance(environment_id=env_id, value=performance)
+            perf = Performance(environment_id=env_id, value=performance,
+                               dispersion=dispersion, fingerprint=fingerprint)
             perf.save()
 
 
+class SubtaskUsage(BaseModel):
+    """ Resources used by the container of a subtask computed by this node,
+        see golem.docker.usage """
+    subtask_id = CharField(primary_key=True)
+    task_id = CharField(index=True)
+    environment = CharField(null=True)
+    success = BooleanField(default=True)
+    peak_memory = BigIntegerField(default=0)  # bytes
+    cpu_time = FloatField(default=0.0)  # seconds
+    io_read = BigIntegerField(default=0)  # bytes
+    io_write = BigIntegerField(default=0)  # bytes
+    duration = FloatField(default=0.0)  # seconds
+    cpu_count = IntegerField(default=0)  # cores given to the container
+
+    class Meta:
+        database = db
+
+    def to_dict(self) -> dict:
+        return {
+            'subtask_id': self.subtask_id,
+            'task_id': self.task_id,
+            'environment': self.environment,
+            'success': self.success,
+            'peak_memory': self.peak_memory,
+            'cpu_time': self.cpu_time,
+            'io_read': self.io_read,
+            'io_write': self.io_write,
+            'duration': self.duration,
+            'cpu_count': self.cpu_count,
+            'created_date': common.datetime_to_timestamp_utc(
+                self.created_date),
+        }
+
+
 class DockerWhitelist(BaseModel):
     repository = CharField(primary_key=True)
 
@@ -583,13 +634,23 @@ class NetworkMessage(BaseModel):
     msg_date = DateTimeField(null=False)
     msg_cls = CharField(null=False)
     msg_data = BlobField(null=False)
+    # golem_messages version used to serialize msg_data;
+    # None for messages pickled by earlier releases
+    msg_version = VersionField(null=True)
 
     class Meta:
         database = db
 
     def as_message(self) -> message.base.Message:
-        msg = pickle.loads(self.msg_data)
-        return msg
+        if self.msg_version is None:
+            return pickle.loads(self.msg_data)
+        message.base.verify_version(str(self.msg_version))
+        return golem_messages.load(
+            self.msg_data,
+            None,
+            None,
+            check_time=False,
+        )
 
 
 class QueuedMessage(BaseModel):
@@ -1,7 +1,10 @@
 import calendar
+import collections
+import concurrent.futures
 import datetime
 import logging
 import queue
+import statistics
 import threading
 import time
 import typing
@@ -9,6 +12,7 @@ from urllib.parse import urljoin
 
 from pydispatch import dispatcher
 import requests
+from requests.adapters import HTTPAdapter
 import golem_messages
 from golem_messages import message
 from golem_messages import datastructures as msg_datastructures
@@ -20,6 +24,7 @@ from golem.core import keysauth
 from golem.core import variables
 from golem.network.concent import exceptions
 from golem.network.concent.handlers_library import library
+from golem.rpc import utils as rpc_utils
 from golem.terms import ConcentTermsOfUse
 
 from . import soft_switch
@@ -79,9 +84,12 @@ def verify_response(response: requests.Response) -> None:
 def send_to_concent(
         msg: message.base.Message,
         signing_key: bytes,
-        concent_variant: dict) -> typing.Optional[bytes]:
+        concent_variant: dict,
+        session: typing.Optional[requests.Session] = None) \
+        -> typing.Optional[bytes]:
     """Sends a message to the concent server
 
+    :param session: Optional session to reuse pooled connections
     :return: Raw reply message, None or exception
     :rtype: Bytes|None
     """
@@ -120,7 +128,8 @@ def send_to_concent(
             concent_post_url,
             headers,
         )
-        response = requests.post(
+        post = session.post if session else requests.post
+        response = post(
             concent_post_url,
             data=data,
             headers=headers,
@@ -138,7 +147,9 @@ def receive_from_concent(
         signing_key,
         public_key,
         concent_variant: dict,
-        path: str = '/api/v1/receive/') -> typing.Optional[bytes]:
+        path: str = '/api/v1/receive/',
+        session: typing.Optional[requests.Session] = None) \
+        -> typing.Optional[bytes]:
     concent_receive_url = urljoin(concent_variant['url'], path)
     headers = {
         'Content-Type': 'application/octet-stream',
@@ -155,7 +166,8 @@ def receive_from_concent(
             concent_receive_url,
             headers,
         )
-        response = requests.post(
+        post = session.post if session else requests.post
+        response = post(
             concent_receive_url,
             data=data,
             headers=headers,
@@ -180,22 +192,80 @@ def build_key(*args) -> str:
     return '/'.join(str(a) for a in args)
 
 
+class PendingMessage:
+    """A message waiting in the ConcentClientService queue"""
+
+    __slots__ = ('msg', 'enqueued', 'attempts', 'not_before', 'sent')
+
+    def __init__(self, msg: message.base.Message) -> None:
+        self.msg = msg
+        self.enqueued: float = time.time()
+        self.attempts: int = 0
+        self.not_before: float = 0.
+        self.sent: float = 0.
+
+    def __repr__(self):
+        return '<PendingMessage: {!r}, attempts={}>'.format(
+            self.msg, self.attempts)
+
+
 class ConcentClientService(threading.Thread):
+    """
+    Sends queued messages to Concent through a pipeline of up to
+    `max_in_flight` concurrent requests sharing pooled connections. Replies
+    are matched with messages in the order the messages were sent.
+
+    Messages which could not be delivered because Concent is unavailable are
+    retried up to MAX_ATTEMPTS times, each one backing off independently.
+    """
 
     MIN_GRACE_TIME = 5  # s
     MAX_GRACE_TIME = 5 * 60  # s
     GRACE_FACTOR = 2  # n times on each failure
+    MAX_ATTEMPTS = 10
+    MAX_IN_FLIGHT = 4
+    LATENCY_SAMPLES = 100
+    STOP_TIMEOUT = 5  # s
+    # Delivery failures worth retrying
+    RETRY_ERRORS = (
+        exceptions.ConcentServiceError,
+        exceptions.ConcentUnavailableError,
+    )
 
-    def __init__(self, keys_auth: keysauth.KeysAuth, variant: dict) -> None:
+    def __init__(self,
+                 keys_auth: keysauth.KeysAuth,
+                 variant: dict,
+                 max_in_flight: int = MAX_IN_FLIGHT) -> None:
         super().__init__(daemon=True)
 
         self.keys_auth = keys_auth
         # SEE golem.core.variables.CONCENT_CHOICES
         self.variant: dict = variant
+        self.max_in_flight = max_in_flight
         self._stop_event = threading.Event()
 
         self._queue: queue.Queue = queue.Queue()
+        self._retries: typing.List[PendingMessage] = []
+        self._in_flight: typing.Deque[
+            typing.Tuple[PendingMessage, concurrent.futures.Future]
+        ] = collections.deque()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_in_flight,
+            thread_name_prefix='ConcentClient',
+        )
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
         self._grace_time: int = self.MIN_GRACE_TIME
+        self._receive_not_before: float = 0.
+        self._latencies: typing.Deque[float] = \
+            collections.deque(maxlen=self.LATENCY_SAMPLES)
+        self._round_trips: typing.Deque[float] = \
+            collections.deque(maxlen=self.LATENCY_SAMPLES)
+        self._sent = 0
+        self._failed = 0
 
         self._delayed: dict = dict()
         self.received_messages: queue.Queue = queue.Queue(maxsize=100)
@@ -231,17 +301,62 @@ class ConcentClientService(threading.Thread):
         last_receive = 0.0
         while not self._stop_event.isSet():
             self._loop()
-            if time.time() - last_receive > variables.CONCENT_PULL_INTERVAL:
+            if time.time() - last_receive > variables.CONCENT_PULL_INTERVAL \
+                    and time.time() >= self._receive_not_before:
                 last_receive = time.time()
                 self.receive()
-            time.sleep(1)
+            if self._in_flight:
+                # Wake up as soon as the oldest request completes
+                concurrent.futures.wait([self._in_flight[0][1]], timeout=1)
+            else:
+                time.sleep(1)
+        self._close()
 
     def stop(self) -> None:
         self._stop_event.set()
+        if self.ident is None:
+            # Not started, there is no loop to wait for
+            self._close()
+        elif self is not threading.current_thread():
+            # The loop checks the event at least once a second. If it is
+            # still receiving, it closes the executor itself once it exits.
+            self.join(timeout=self.STOP_TIMEOUT)
         logger.info('Waiting for received messages queue to empty')
         self.received_messages.join()
         logger.info('%s stopped', self)
 
+    def _close(self) -> None:
+        """ Called once the loop has exited, nothing is submitted after """
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    @rpc_utils.expose('golem.concent.queue')
+    def get_queue_stats(self) -> dict:
+        """
+        Returns the number of messages waiting for delivery to Concent and
+        delivery latencies (in seconds) of recently sent messages.
+        """
+        def _summary(samples: typing.Sequence[float]) -> dict:
+            if not samples:
+                return {'mean': None, 'max': None}
+            return {
+                'mean': statistics.mean(samples),
+                'max': max(samples),
+            }
+
+        latencies = list(self._latencies)
+        round_trips = list(self._round_trips)
+        return {
+            'delayed': len(self._delayed),
+            'queued': self._queue.qsize(),
+            'retrying': len(self._retries),
+            'in_flight': len(self._in_flight),
+            'sent': self._sent,
+            'failed': self._failed,
+            'latency': _summary(latencies),
+            'round_trip': _summary(round_trips),
+        }
+
     def submit_task_message(
             self, subtask_id: str, msg: message.base.Message,
             delay: typing.Optional[datetime.timedelta] = None
@@ -325,33 +440,78 @@ class ConcentClientService(threading.Thread):
 
     def _loop(self) -> None:
         """
-        Main service loop. Requests from the queue are sent one by one (FIFO).
-        In case of failure, service enters a grace period.
+        Main service loop. Replies to completed requests are processed in the
+        order the messages were sent, then free pipeline slots are filled with
+        messages due for (re)sending (FIFO).
         """
+        self._reap()
+        self._fill_pipeline()
+
+    def _next_pending(self) -> typing.Optional[PendingMessage]:
+        now = time.time()
+        if self._retries and self._retries[0].not_before <= now:
+            return self._retries.pop(0)
         try:
-            msg = self._queue.get_nowait()
+            return self._queue.get_nowait()
         except queue.Empty:
-            return
+            return None
 
-        if not self.available:
-            logger.debug('Concent disabled. Dropping %r', msg)
-            return
+    def _fill_pipeline(self) -> None:
+        while len(self._in_flight) < self.max_in_flight:
+            pending = self._next_pending()
+            if pending is None:
+                return
 
-        try:
-            res = send_to_concent(
-                msg,
+            if not self.available:
+                logger.debug('Concent disabled. Dropping %r', pending.msg)
+                continue
+
+            pending.attempts += 1
+            pending.sent = time.time()
+            future = self._executor.submit(
+                send_to_concent,
+                pending.msg,
                 self.keys_auth._private_key,  # pylint: disable=protected-access
                 concent_variant=self.variant,
+                session=self._session,
             )
-        except exceptions.ConcentError as e:
-            logger.info('send_to_concent error: %s', e)
-            self._grace_sleep()
-        except Exception:  # pylint: disable=broad-except
-            logger.exception('send_to_concent(%r) failed', msg)
-            self._grace_sleep()
-        else:
-            self._grace_time = self.MIN_GRACE_TIME
-            self.react_to_concent_message(res, response_to=msg)
+            self._in_flight.append((pending, future))
+
+    def _reap(self) -> None:
+        while self._in_flight and self._in_flight[0][1].done():
+            pending, future = self._in_flight.popleft()
+            try:
+                res = future.result()
+            except self.RETRY_ERRORS as e:
+                logger.info('send_to_concent error: %s', e)
+                self._retry_later(pending)
+            except exceptions.ConcentError as e:
+                logger.info('send_to_concent error: %s', e)
+                self._failed += 1
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('send_to_concent(%r) failed', pending.msg)
+                self._failed += 1
+            else:
+                now = time.time()
+                self._sent += 1
+                self._latencies.append(now - pending.enqueued)
+                self._round_trips.append(now - pending.sent)
+                self.react_to_concent_message(res, response_to=pending.msg)
+
+    def _retry_later(self, pending: PendingMessage) -> None:
+        if pending.attempts >= self.MAX_ATTEMPTS:
+            logger.warning('Giving up sending %r to Concent', pending)
+            self._failed += 1
+            return
+
+        delay = min(
+            self.MIN_GRACE_TIME * self.GRACE_FACTOR ** (pending.attempts - 1),
+            self.MAX_GRACE_TIME,
+        )
+        logger.debug('Concent retry of %r in %rs', pending, delay)
+        pending.not_before = time.time() + delay
+        self._retries.append(pending)
+        self._retries.sort(key=lambda p: p.not_before)
 
     def receive(self) -> None:
         if not self.available:
@@ -362,15 +522,17 @@ class ConcentClientService(threading.Thread):
                 signing_key=self.keys_auth._private_key,  # noqa pylint: disable=protected-access
                 public_key=self.keys_auth.public_key,
                 concent_variant=self.variant,
+                session=self._session,
             )
         except exceptions.ConcentError as e:
             logger.warning("Can't receive message from Concent: %s", e)
-            self._grace_sleep()
+            self._grace_backoff()
             return
         except Exception:  # pylint: disable=broad-except
             logger.exception('receive_from_concent() failed')
-            self._grace_sleep()
+            self._grace_backoff()
             return
+        self._grace_time = self.MIN_GRACE_TIME
         self.react_to_concent_message(res)
 
     @staticmethod
@@ -403,17 +565,20 @@ class ConcentClientService(threading.Thread):
         else:
             self.process_synchronous_response(msg, response_to)
 
-    def _grace_sleep(self):
+    def _grace_backoff(self):
+        """
+        Postpones the next receive. Does not block sending messages.
+        """
         self._grace_time = min(self._grace_time * self.GRACE_FACTOR,
                                self.MAX_GRACE_TIME)
 
         logger.debug('Concent grace time: %r', self._grace_time)
-        time.sleep(self._grace_time)
+        self._receive_not_before = time.time() + self._grace_time
 
     def _enqueue(self, key, msg):
         logger.debug("_enqueue(%r, %r)", key, msg)
         self._delayed.pop(key, None)
-        self._queue.put(msg)
+        self._queue.put(PendingMessage(msg))
 
     def income_listener(self, event, **kwargs):
         logger.debug("income listener event: %s", event)
@@ -1,9 +1,13 @@
 import base64
+import concurrent.futures
 import logging
+import threading
+import time
 import typing
 import queue
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import golem_messages
 from golem_messages.message.concents import (
@@ -17,6 +21,19 @@ from .helpers import ssl_kwargs
 
 logger = logging.getLogger(__name__)
 
+# (transferred bytes, total bytes or None if unknown)
+ProgressCallback = typing.Callable[[int, typing.Optional[int]], None]
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _call_back(threaded: bool, callback: typing.Callable, *args):
+    if not threaded:
+        return callback(*args)
+    from twisted.internet import reactor
+    reactor.callFromThread(callback, *args)
+    return None
+
 
 class ConcentFileRequest:
     def __init__(self,  # noqa pylint:disable=too-many-arguments
@@ -25,13 +42,25 @@ class ConcentFileRequest:
                  success: typing.Optional[typing.Callable] = None,
                  error: typing.Optional[typing.Callable] = None,
                  file_category: typing.Optional[
-                     FileTransferToken.FileInfo.Category] = None) -> None:  # noqa pylint:disable=bad-whitespace
+                     FileTransferToken.FileInfo.Category] = None,  # noqa pylint:disable=bad-whitespace
+                 progress: typing.Optional[ProgressCallback] = None) -> None:
         self.file_path = file_path
         self.file_transfer_token = file_transfer_token
         self.success = success
         self.error = error
         self.file_category = file_category or \
             FileTransferToken.FileInfo.Category.results
+        self.progress = progress
+        self.attempts = 0
+        self.transferred = 0
+        self.total: typing.Optional[int] = None
+
+    def update_progress(self, transferred: int,
+                        total: typing.Optional[int]) -> None:
+        self.transferred = transferred
+        self.total = total
+        if self.progress:
+            self.progress(transferred, total)
 
     def __repr__(self):
         return '%s request - path: %r, ftt: %r, category: %r' % (
@@ -46,74 +75,205 @@ class ConcentFiletransferError(Exception):
     pass
 
 
+class _ProgressReader:
+    """
+    File wrapper reporting the number of bytes read. Exposes the file size
+    so that requests streams the body with a Content-Length header.
+    """
+
+    def __init__(self, file, size: int, request: ConcentFileRequest) -> None:
+        self._file = file
+        self._size = size
+        self._request = request
+        self._read = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self._read += len(chunk)
+        self._request.update_progress(self._read, self._size)
+        return chunk
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, 'response', None)
+    return response is not None and response.status_code >= 500
+
+
 class ConcentFiletransferService(LoopingCallService):
     """
     Golem service responsible for exchanging files with the Concent service.
+
+    Up to `max_concurrent_transfers` files are streamed at the same time over
+    a pool of keep-alive connections. Transfers failing on connection errors
+    or server errors are retried `max_attempts` times with exponential
+    backoff starting at `retry_delay` seconds.
     """
 
-    def __init__(self,
+    def __init__(self,  # noqa pylint:disable=too-many-arguments
                  keys_auth: keysauth.KeysAuth,
                  variant: dict,
-                 interval_seconds: int = 1,) -> None:
+                 interval_seconds: int = 1,
+                 max_concurrent_transfers: int = 4,
+                 max_attempts: int = 3,
+                 retry_delay: float = 2.,
+                 timeout: float = 60.) -> None:
         # SEE golem.core.variables.CONCENT_CHOICES
         self.variant = variant
         self.keys_auth = keys_auth
+        self.max_concurrent_transfers = max_concurrent_transfers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timeout = timeout
         self._transfers: queue.Queue = queue.Queue()
+        self._in_progress: typing.List[ConcentFileRequest] = []
+        self._lock = threading.Lock()
+        self._executor: typing.Optional[
+            concurrent.futures.ThreadPoolExecutor] = None
+        self._session = self._create_session()
         super().__init__(interval_seconds=interval_seconds)
 
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_concurrent_transfers,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def start(self, now: bool = True):
         super().start(now=now)
         logger.debug("Concent Filetransfer Service started")
 
     def stop(self):
         self._transfers.join()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         super().stop()
         logger.debug("Concent Filetransfer Service stopped")
 
+    def in_progress(self) -> typing.List[dict]:
+        """
+        Returns the state of transfers currently in progress.
+        """
+        with self._lock:
+            return [
+                {
+                    'path': request.file_path,
+                    'operation': request.file_transfer_token.operation.value,
+                    'transferred': request.transferred,
+                    'total': request.total,
+                    'attempt': request.attempts,
+                }
+                for request in self._in_progress
+            ]
+
+    @property
+    def queue_size(self) -> int:
+        return self._transfers.qsize()
+
     def transfer(self,  # noqa pylint:disable=too-many-arguments
                  file_path: str,
                  file_transfer_token: FileTransferToken,
                  success: typing.Optional[typing.Callable] = None,
                  error: typing.Optional[typing.Callable] = None,
                  file_category: typing.Optional[
-                     FileTransferToken.FileInfo.Category] = None) -> None:  # noqa pylint:disable=bad-whitespace
+                     FileTransferToken.FileInfo.Category] = None,  # noqa pylint:disable=bad-whitespace
+                 progress: typing.Optional[ProgressCallback] = None) -> None:
 
         if not self.running:
             logger.warning("Request scheduled when service is not started")
 
         request = ConcentFileRequest(
             file_path, file_transfer_token,
-            success=success, error=error, file_category=file_category)
+            success=success, error=error, file_category=file_category,
+            progress=progress)
 
         logger.debug("Scheduling: %r", request)
         self._transfers.put(request)
 
     def _run(self):
+        """
+        Hands queued requests over to transfer threads, as long as there are
+        free transfer slots.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_concurrent_transfers,
+                thread_name_prefix='ConcentFiletransfer',
+            )
+
+        while True:
+            with self._lock:
+                if len(self._in_progress) >= self.max_concurrent_transfers:
+                    return
+                try:
+                    request = self._transfers.get_nowait()
+                except queue.Empty:
+                    return
+                self._in_progress.append(request)
+            self._executor.submit(self._process_queued, request)
+
+    def _process_queued(self, request: ConcentFileRequest):
         try:
-            request = self._transfers.get_nowait()
-        except queue.Empty:
-            return
-        self.process(request)
-        self._transfers.task_done()
+            self.process(request, threaded=True)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Concent file transfer failed: %r", request)
+        finally:
+            with self._lock:
+                self._in_progress.remove(request)
+            self._transfers.task_done()
 
-    def process(self, request: ConcentFileRequest):
+    def process(self, request: ConcentFileRequest, threaded: bool = False):
+        """
+        Transfers the file and calls back with the result. On a transfer
+        thread (`threaded`), the callbacks are made in the reactor thread.
+        """
         logger.debug("Processing: %r", request)
         try:
-            if request.file_transfer_token.is_upload:
-                response = self.upload(request)
-            else:
-                response = self.download(request)
-            if not response.ok:
-                raise ConcentFiletransferError(
-                    '{}: {}'.format(response.status_code, response.text))
+            response = self._process_with_retries(request)
         except Exception as e:  # noqa pylint:disable=broad-except
             if request.error:
-                request.error(e)
+                _call_back(threaded, request.error, e)
                 return None
             else:
                 raise e
 
-        return request.success(response) if request.success else response
+        if not request.success:
+            return response
+        return _call_back(threaded, request.success, response)
+
+    def _process_with_retries(self, request: ConcentFileRequest):
+        while True:
+            request.attempts += 1
+            try:
+                if request.file_transfer_token.is_upload:
+                    response = self.upload(request)
+                else:
+                    response = self.download(request)
+                if not response.ok:
+                    error = ConcentFiletransferError(
+                        '{}: {}'.format(response.status_code, response.text))
+                    error.response = response
+                    raise error
+                return response
+            except Exception as e:  # noqa pylint:disable=broad-except
+                if request.attempts >= self.max_attempts \
+                        or not _is_retryable(e):
+                    raise
+                delay = self.retry_delay * 2 ** (request.attempts - 1)
+                logger.warning(
+                    "Concent file transfer attempt %d failed: %r."
+                    " Retrying in %.1fs. request=%r",
+                    request.attempts, e, delay, request)
+                time.sleep(delay)
 
     @staticmethod
     def _get_upload_uri(file_transfer_token: FileTransferToken):
@@ -163,17 +323,38 @@ class ConcentFiletransferService(LoopingCallService):
                      request.file_path, uri, headers)
 
         with open(request.file_path, mode='rb') as f:
-            response = requests.post(
-                uri, data=f, headers=headers, **ssl_kwargs(self.variant))
+            f.seek(0, 2)
+            size = f.tell()
+            f.seek(0)
+            response = self._session.post(
+                uri,
+                data=_ProgressReader(f, size, request),
+                headers=headers,
+                timeout=self.timeout,
+                **ssl_kwargs(self.variant),
+            )
         return response
 
     def download(self, request: ConcentFileRequest):
         uri = self._get_download_uri(request.file_transfer_token,
                                      request.file_category)
         headers = self._get_auth_headers(request.file_transfer_token)
-        response = requests.get(
-            uri, stream=True, headers=headers, **ssl_kwargs(self.variant))
-        with open(request.file_path, mode='wb') as f:
-            for chunk in response.iter_content(chunk_size=None):
+        response = self._session.get(
+            uri,
+            stream=True,
+            headers=headers,
+            timeout=self.timeout,
+            **ssl_kwargs(self.variant),
+        )
+        if not response.ok:
+            return response
+
+        total = response.headers.get('Content-Length')
+        total = int(total) if total else None
+        transferred = 0
+        with response, open(request.file_path, mode='wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
                 f.write(chunk)
+                transferred += len(chunk)
+                request.update_progress(transferred, total)
         return response
@@ -1,19 +1,21 @@
+import collections
 import datetime
 import logging
 import operator
-import pickle
 import queue
 import threading
 from functools import reduce, wraps
-from typing import List
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import golem_messages
+from golem_messages import exceptions as msg_exceptions
 from golem_messages import message
+import semantic_version
 from peewee import (PeeweeException, DataError, ProgrammingError,
                     NotSupportedError, Field, IntegrityError)
 
 from golem.core.service import IService
-from golem.model import NetworkMessage, Actor
+from golem.model import db, NetworkMessage, Actor
 
 logger = logging.getLogger('golem.network.history')
 
@@ -22,6 +24,149 @@ class MessageNotFound(Exception):
     pass
 
 
+# NetworkMessage columns stored in message dicts
+MODEL_FIELDS = (
+    'task',
+    'subtask',
+    'node',
+    'msg_date',
+    'msg_cls',
+    'msg_data',
+    'msg_version',
+    'local_role',
+    'remote_role',
+)
+
+
+def _model_to_dict(model: NetworkMessage) -> dict:
+    return {name: getattr(model, name) for name in MODEL_FIELDS}
+
+
+def _dict_key(msg_dict: dict) -> Tuple:
+    return (
+        msg_dict.get('node'),
+        msg_dict.get('msg_cls'),
+        msg_dict.get('msg_date'),
+    )
+
+
+def _matches(msg_dict: dict, properties: dict) -> bool:
+    return all(
+        msg_dict.get(name) == value
+        for name, value in properties.items()
+    )
+
+
+class RecentMessages:
+    """
+    Bounded, least recently used collection of message dicts, grouped by
+    subtask id.
+
+    An entry is "complete" when it holds every stored message of the subtask,
+    i.e. it has been merged with database contents at least once. Lookups of
+    complete entries do not touch the database.
+    """
+
+    def __init__(self, max_subtasks: int) -> None:
+        self._max_subtasks = max_subtasks
+        self._lock = threading.Lock()
+        self._entries: 'collections.OrderedDict[str, List[dict]]' = \
+            collections.OrderedDict()
+        self._complete: Dict[str, bool] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, subtask: str) -> bool:
+        return subtask in self._entries
+
+    def is_complete(self, subtask: str) -> bool:
+        return self._complete.get(subtask, False)
+
+    def add(self, msg_dict: dict) -> None:
+        subtask = msg_dict.get('subtask')
+        if not subtask:
+            return
+        with self._lock:
+            entry = self._entries.get(subtask)
+            if entry is None:
+                entry = self._entries[subtask] = []
+                self._complete[subtask] = False
+                self._evict()
+            else:
+                self._entries.move_to_end(subtask)
+            entry.append(msg_dict)
+
+    def merge(self, subtask: str, stored: Iterable[dict]) -> None:
+        """
+        Merges stored messages of a subtask with the ones recorded in memory
+        and marks the entry as complete.
+        """
+        with self._lock:
+            entry = self._entries.get(subtask, [])
+            keys = {_dict_key(msg_dict) for msg_dict in entry}
+            merged = [
+                msg_dict for msg_dict in stored
+                if _dict_key(msg_dict) not in keys
+            ] + entry
+            merged.sort(key=lambda msg_dict: msg_dict['msg_date'])
+
+            self._entries[subtask] = merged
+            self._entries.move_to_end(subtask)
+            self._complete[subtask] = True
+            self._evict()
+
+    def get(self, subtask: str, **properties) -> Optional[List[dict]]:
+        """
+        Returns matching messages of a complete subtask entry, ordered by
+        date. None when the entry is missing or incomplete.
+        """
+        with self._lock:
+            if not self._complete.get(subtask, False):
+                return None
+            self._entries.move_to_end(subtask)
+            return [
+                msg_dict for msg_dict in self._entries[subtask]
+                if _matches(msg_dict, properties)
+            ]
+
+    def remove(self, **properties) -> None:
+        subtask = properties.get('subtask')
+        with self._lock:
+            subtasks = [subtask] if subtask else list(self._entries)
+            for key in subtasks:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                self._entries[key] = [
+                    msg_dict for msg_dict in entry
+                    if not _matches(msg_dict, properties)
+                ]
+
+    def sweep(self, oldest: datetime.datetime) -> None:
+        with self._lock:
+            for subtask in list(self._entries):
+                entry = [
+                    msg_dict for msg_dict in self._entries[subtask]
+                    if msg_dict['msg_date'] > oldest
+                ]
+                if entry:
+                    self._entries[subtask] = entry
+                else:
+                    del self._entries[subtask]
+                    del self._complete[subtask]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._complete.clear()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._max_subtasks:
+            subtask, _ = self._entries.popitem(last=False)
+            self._complete.pop(subtask, None)
+
+
 class MessageHistoryService(IService):
     """
     The purpose of this class is to:
@@ -30,9 +175,13 @@ class MessageHistoryService(IService):
     - sweep NetworkMessages past their MESSAGE_LIFETIME every ~ SWEEP_INTERVAL
       (in background)
     - retrieve, save and remove NetworkMessages in-place via *_sync methods
+    - keep messages of RECENT_SUBTASKS most recently used subtasks in memory,
+      so that lookups for active subtasks do not query the database
 
     Assumptions:
     - NetworkMessages have to be saved ASAP
+    - queued messages are saved in batches of up to SAVE_BATCH_SIZE, each
+      batch in a single transaction
     - removal and sweeping is not critical and can be slightly delayed
 
     Background operations performed by this service do not fit the looping call
@@ -42,6 +191,8 @@ class MessageHistoryService(IService):
     MESSAGE_LIFETIME = datetime.timedelta(days=1)
     SWEEP_INTERVAL = datetime.timedelta(hours=12)
     QUEUE_TIMEOUT = datetime.timedelta(seconds=2).total_seconds()
+    SAVE_BATCH_SIZE = 500
+    RECENT_SUBTASKS = 1000
 
     # Decorators (at the end of this file) need to access an instance
     # of MessageHistoryService
@@ -59,6 +210,7 @@ class MessageHistoryService(IService):
         self._save_queue = queue.Queue()
         self._remove_queue = queue.Queue()
         self._sweep_ts = datetime.datetime.now()
+        self._recent = RecentMessages(self.RECENT_SUBTASKS)
 
     def run(self) -> None:
         """
@@ -106,7 +258,29 @@ class MessageHistoryService(IService):
         :return: Collection of NetworkMessage
         """
         clauses = cls.build_clauses(**properties)
+        service = cls.instance
+        subtask = properties.get('subtask')
+
+        if not (service and subtask):
+            return cls._select(clauses)
+
+        properties = {
+            name: value for name, value in properties.items()
+            if name in MODEL_FIELDS
+        }
+        # pylint: disable=protected-access
+        cached = service._recent.get(subtask, **properties)
+        if cached is not None:
+            return [NetworkMessage(**msg_dict) for msg_dict in cached]
+
+        service._load_recent(subtask)
+        cached = service._recent.get(subtask, **properties)
+        if cached is None:  # evicted in the meantime
+            return cls._select(clauses)
+        return [NetworkMessage(**msg_dict) for msg_dict in cached]
 
+    @staticmethod
+    def _select(clauses: List[bool]) -> List[NetworkMessage]:
         result = NetworkMessage.select() \
             .where(reduce(operator.and_, clauses)) \
             .order_by(+NetworkMessage.msg_date)
@@ -121,7 +295,7 @@ class MessageHistoryService(IService):
         db_msg = db_result[0]
         try:
             return db_msg.as_message()
-        except AttributeError:
+        except (AttributeError, msg_exceptions.MessageError):
             # in case an incompatible message from an earlier version of
             # golem-messages is retrieved, just treat it the same
             # as if the message was not found
@@ -133,6 +307,7 @@ class MessageHistoryService(IService):
         :param msg_dict:
         """
         if msg_dict:
+            self._recent.add(msg_dict)
             self._save_queue.put(msg_dict)
 
     def add_sync(self, msg_dict: dict) -> None:
@@ -140,6 +315,10 @@ class MessageHistoryService(IService):
         Saves a message in the database synchronously.
         :param msg_dict: Message to save
         """
+        self._recent.add(msg_dict)
+        self._save(msg_dict)
+
+    def _save(self, msg_dict: dict) -> None:
         try:
             msg = NetworkMessage(**msg_dict)
             msg.save()
@@ -153,6 +332,44 @@ class MessageHistoryService(IService):
             logger.warning("Message '%s' save queued", msg_dict.get('msg_cls'))
             self._save_queue.put(msg_dict)
 
+    def _save_batch(self, msg_dicts: List[dict]) -> None:
+        """
+        Saves messages in a single transaction. Falls back to saving messages
+        one by one if the batch contains an invalid message.
+        """
+        if len(msg_dicts) == 1:
+            self._save(msg_dicts[0])
+            return
+
+        try:
+            with db.atomic():
+                NetworkMessage.insert_many(msg_dicts).execute()
+        except (DataError, ProgrammingError, NotSupportedError,
+                TypeError, IntegrityError) as exc:
+            logger.warning("Cannot save %d messages in a batch: %r. "
+                           "Saving one by one", len(msg_dicts), exc)
+            for msg_dict in msg_dicts:
+                self._save(msg_dict)
+        except PeeweeException:
+            # Temporary error
+            logger.warning("%d messages save queued", len(msg_dicts))
+            for msg_dict in msg_dicts:
+                self._save_queue.put(msg_dict)
+
+    def _load_recent(self, subtask: str) -> None:
+        """
+        Merges stored messages of a subtask into the in-memory collection.
+        """
+        try:
+            stored = NetworkMessage.select() \
+                .where(NetworkMessage.subtask == subtask)
+            stored = [_model_to_dict(model) for model in stored]
+        except PeeweeException as exc:
+            logger.warning("Cannot load messages of subtask %r: %r",
+                           subtask, exc)
+            return
+        self._recent.merge(subtask, stored)
+
     def remove(self, task: str, **properties) -> None:
         """
         Appends task id to the removal queue. Has lower priority than adding
@@ -160,6 +377,7 @@ class MessageHistoryService(IService):
         :param task: Task id
         """
         if task:
+            self._recent.remove(task=task, **properties)
             self._remove_queue.put((task, properties))
 
     def remove_sync(self, task: str, **properties) -> None:
@@ -170,6 +388,7 @@ class MessageHistoryService(IService):
         :return: None
         """
         clauses = self.build_clauses(task=task, **properties)
+        self._recent.remove(task=task, **properties)
 
         try:
             NetworkMessage.delete() \
@@ -209,8 +428,9 @@ class MessageHistoryService(IService):
         """
         Main service loop.
         - calls _sweep every SWEEP_INTERVAL
-        - saves queued (1) messages to database (FIFO)
+        - saves queued (1) messages to database (FIFO), in batches
         - removes queued (2) messages from database
+        - completes in-memory collections of subtasks from saved batches
         """
 
         # Sweep messages.
@@ -232,9 +452,22 @@ class MessageHistoryService(IService):
         try:
             msg_dict = self._save_queue.get(True, self._queue_timeout)
         except queue.Empty:
-            pass
-        else:
-            self.add_sync(msg_dict)
+            return
+
+        batch = [msg_dict]
+        while len(batch) < self.SAVE_BATCH_SIZE:
+            try:
+                batch.append(self._save_queue.get(False))
+            except queue.Empty:
+                break
+        self._save_batch(batch)
+
+        # Read subtask messages saved in earlier sessions outside the reactor
+        subtasks = {msg_dict.get('subtask') for msg_dict in batch}
+        for subtask in subtasks:
+            if subtask in self._recent and \
+                    not self._recent.is_complete(subtask):
+                self._load_recent(subtask)
 
     def _sweep(self) -> None:
         """
@@ -242,6 +475,7 @@ class MessageHistoryService(IService):
         """
         logger.info("Sweeping messages")
         oldest = datetime.datetime.now() - self.MESSAGE_LIFETIME
+        self._recent.sweep(oldest)
 
         try:
             NetworkMessage.delete() \
@@ -267,6 +501,9 @@ def message_to_model(msg: message.base.Message,
     The returned dict representation is used for creating NetworkMessage
     models in MessageHistoryService thread.
 
+    Messages are stored in golem_messages binary format (signature included,
+    no encryption) which is both more compact and faster than pickle.
+
     :param local_role: Local node's role in computation
     :param remote_role: Remote node's role in computation
     :return: Dict representation of NetworkMessage
@@ -277,7 +514,8 @@ def message_to_model(msg: message.base.Message,
         'node': node_id,
         'msg_date': datetime.datetime.now(),
         'msg_cls': msg.__class__.__name__,
-        'msg_data': pickle.dumps(msg),
+        'msg_data': golem_messages.dump(msg, None, None),
+        'msg_version': semantic_version.Version(golem_messages.__version__),
         'local_role': local_role,
         'remote_role': remote_role,
     }
@@ -1,14 +1,17 @@
 import json
 import logging
 import math
+from concurrent.futures import ThreadPoolExecutor
 from ipaddress import AddressValueError, ip_address
-from typing import Optional, Dict, Tuple, List, Iterable, Callable, Union
+from typing import Optional, Dict, Tuple, List, Iterable, Callable, Union, \
+    TypeVar
 
 import collections
 
 import requests
 from requests import HTTPError
-from twisted.internet.defer import Deferred
+from requests.adapters import HTTPAdapter
+from twisted.internet.defer import Deferred, DeferredList, DeferredSemaphore
 
 from golem_messages import helpers as msg_helpers
 
@@ -17,6 +20,11 @@ from golem.resource.client import IClient, ClientOptions
 
 log = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Maximum number of uploads sent to the daemon at the same time
+MAX_IN_FLIGHT = 8
+
 
 def to_hyperg_peer(host: str, port: int) -> Dict[str, Tuple[str, int]]:
     return {'TCP': (host, port)}
@@ -38,7 +46,7 @@ class HyperdriveClient(IClient):
     CLIENT_ID = 'hyperg'
     VERSION = 1.1
 
-    def __init__(self, port, host, timeout=None):
+    def __init__(self, port, host, timeout=None, max_in_flight=MAX_IN_FLIGHT):
         super(HyperdriveClient, self).__init__()
 
         # API destination address
@@ -46,11 +54,18 @@ class HyperdriveClient(IClient):
         self.port = port
         # connection / read timeout
         self.timeout = timeout
+        # maximum number of concurrent requests
+        self.max_in_flight = max_in_flight
 
         # default POST request headers
         self._url = 'http://{}:{}/api'.format(self.host, self.port)
         self._headers = {'content-type': 'application/json'}
 
+        # keep-alive connections to the daemon
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_in_flight))
+
     def __repr__(self):
         return f'<{self.__class__.__name__} {self.CLIENT_ID} at {self._url}>'
 
@@ -91,6 +106,42 @@ class HyperdriveClient(IClient):
         )
         return response['hash']
 
+    def add_many(self, entries: Iterable[Tuple[dict, Optional[ClientOptions]]]
+                 ) -> List[Union[str, Exception]]:
+        """
+        Add many resource sets, given as (files, client options) pairs.
+        The daemon has no batch command, the requests are pipelined over the
+        pooled connections. Returns the hash, or the error, of every set.
+        """
+        return self._run_many(
+            lambda entry: self.add(entry[0], client_options=entry[1]),
+            entries)
+
+    def restore_many(self,
+                     entries: Iterable[Tuple[str, Optional[ClientOptions]]]
+                     ) -> List[Union[str, Exception]]:
+        """
+        Restore many resource sets, given as (hash, client options) pairs.
+        Returns the hash, or the error, of every set.
+        """
+        return self._run_many(
+            lambda entry: self.restore(entry[0], client_options=entry[1]),
+            entries)
+
+    def _run_many(self, fn: Callable[..., T], entries: Iterable
+                  ) -> List[Union[T, Exception]]:
+        def run(entry):
+            try:
+                return fn(entry)
+            except Exception as exc:  # pylint: disable=broad-except
+                return exc
+
+        entries = list(entries)
+        if len(entries) < 2:
+            return [run(entry) for entry in entries]
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            return list(executor.map(run, entries))
+
     def get(self, content_hash, client_options=None, **kwargs):
         path = kwargs['filepath']
         params = self._download_params(content_hash, client_options, **kwargs)
@@ -127,10 +178,10 @@ class HyperdriveClient(IClient):
         return response['hash']
 
     def _request(self, **data):
-        response = requests.post(url=self._url,
-                                 headers=self._headers,
-                                 data=json.dumps(data),
-                                 timeout=self.timeout)
+        response = self._session.post(url=self._url,
+                                      headers=self._headers,
+                                      data=json.dumps(data),
+                                      timeout=self.timeout)
 
         try:
             response.raise_for_status()
@@ -146,14 +197,15 @@ class HyperdriveClient(IClient):
 
 class HyperdriveAsyncClient(HyperdriveClient):
 
-    def __init__(self, port, host, timeout=None):
+    def __init__(self, port, host, timeout=None, max_in_flight=MAX_IN_FLIGHT):
         from twisted.web.http_headers import Headers  # imports reactor
 
-        super().__init__(port, host, timeout)
+        super().__init__(port, host, timeout, max_in_flight)
 
         # default POST request headers
         self._url_bytes = self._url.encode('utf-8')
         self._headers_obj = Headers({'Content-Type': ['application/json']})
+        self._in_flight = DeferredSemaphore(max_in_flight)
 
     def add_async(self, files, client_options=None, **kwargs):
         timeout = client_options.timeout if client_options else None
@@ -164,7 +216,7 @@ class HyperdriveAsyncClient(HyperdriveClient):
             timeout=round_timeout(timeout)
         )
 
-        return self._async_request(
+        return self._limited_async_request(
             params,
             lambda response: response['hash']
         )
@@ -178,7 +230,7 @@ class HyperdriveAsyncClient(HyperdriveClient):
             timeout=round_timeout(timeout)
         )
 
-        return self._async_request(
+        return self._limited_async_request(
             params,
             lambda response: response['hash']
         )
@@ -203,6 +255,42 @@ class HyperdriveAsyncClient(HyperdriveClient):
             lambda response: response['hash']
         )
 
+    def add_many_async(self,
+                       entries: Iterable[Tuple[dict, Optional[ClientOptions]]]
+                       ) -> Deferred:
+        """ Asynchronous add_many """
+        return self._run_many_async([
+            self.add_async(files, client_options=client_options)
+            for files, client_options in entries
+        ])
+
+    def restore_many_async(self,
+                           entries: Iterable[Tuple[str,
+                                                   Optional[ClientOptions]]]
+                           ) -> Deferred:
+        """ Asynchronous restore_many """
+        return self._run_many_async([
+            self.restore_async(content_hash, client_options=client_options)
+            for content_hash, client_options in entries
+        ])
+
+    @staticmethod
+    def _run_many_async(deferreds: List[Deferred]) -> Deferred:
+        deferred = DeferredList(deferreds, consumeErrors=True)
+        deferred.addCallback(lambda results: [
+            result if success else result.value
+            for success, result in results
+        ])
+        return deferred
+
+    def _limited_async_request(self, params, response_parser):
+        """ Sends the upload once fewer than `max_in_flight` are pending.
+            Downloads hold their request open until the download ends and
+            cancels must reach the daemon while they do, so neither is
+            limited. """
+        return self._in_flight.run(self._async_request, params,
+                                   response_parser)
+
     def _async_request(self, params, response_parser):
         from twisted.web.client import readBody  # imports reactor
 
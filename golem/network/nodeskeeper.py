@@ -1,38 +1,202 @@
+import collections
 import logging
+import threading
+from typing import Any, ClassVar, Dict, Optional
+
+from golem_messages.datastructures import p2p as dt_p2p
 
 from golem import decorators
 from golem import model
+from golem.core.profiler import Profiler
+from golem.rpc import utils as rpc_utils
 
 logger = logging.getLogger(__name__)
 
-def get(node_id):
-    try:
-        return model.CachedNode.select().where(
-            model.CachedNode.node == node_id,
-        ).get().node_field
-    except model.CachedNode.DoesNotExist:
-        return None
+# Nodes kept in the database
+MAX_STORED = 1000
+# Nodes kept in memory, unknown nodes included
+MAX_CACHED = 1000
+# Rows per INSERT, within the SQLite limit of 999 bound parameters
+FLUSH_BATCH_SIZE = 200
+# Rows over MAX_STORED evicted by a flush, on top of the rows it added
+EVICT_BATCH_SIZE = 100
+
+
+class NodesCache:
+    """ Bounded LRU cache in front of CachedNode, remembering unknown nodes
+        too. Stored nodes are written on the database writer thread, all
+        the nodes stored until the write runs in one batch, each node once.
+        Every write evicts the oldest rows over MAX_STORED. The cache is
+        emptied when the database is switched. """
+
+    _instance: ClassVar[Optional['NodesCache']] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> 'NodesCache':
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self,
+                 max_cached: int = MAX_CACHED,
+                 max_stored: int = MAX_STORED) -> None:
+        self._max_cached = max_cached
+        self._max_stored = max_stored
+        self._lock = threading.Lock()
+        self._database: Optional[str] = None
+        self._nodes: 'collections.OrderedDict[str, Optional[dt_p2p.Node]]' = \
+            collections.OrderedDict()
+        self._pending: Dict[str, dt_p2p.Node] = {}
+        self._flush_scheduled = False
+        self._counters: collections.Counter = collections.Counter()
+
+    def _check_database(self) -> None:
+        if self._database != model.db.database:
+            self._database = model.db.database
+            self._nodes.clear()
+            self._pending.clear()
+            self._flush_scheduled = False
+
+    def _put(self, node_id: str, node: Optional[dt_p2p.Node]) -> None:
+        self._nodes[node_id] = node
+        self._nodes.move_to_end(node_id)
+        while len(self._nodes) > self._max_cached:
+            self._nodes.popitem(last=False)
+
+    def get(self, node_id: str) -> Optional[dt_p2p.Node]:
+        with self._lock:
+            self._check_database()
+            if node_id in self._pending:
+                self._counters['hits'] += 1
+                return self._pending[node_id]
+            if node_id in self._nodes:
+                self._nodes.move_to_end(node_id)
+                node = self._nodes[node_id]
+                self._counters[
+                    'hits' if node is not None else 'negative_hits'] += 1
+                return node
+
+        try:
+            node = model.CachedNode.select().where(
+                model.CachedNode.node == node_id,
+            ).get().node_field
+        except model.CachedNode.DoesNotExist:
+            node = None
+
+        with self._lock:
+            self._counters['misses'] += 1
+            # Stored while it was read
+            if node_id in self._nodes:
+                return self._nodes[node_id]
+            self._put(node_id, node)
+        return node
+
+    def store(self, node: dt_p2p.Node) -> None:
+        with self._lock:
+            self._check_database()
+            self._counters['stores'] += 1
+            if node.key in self._pending:
+                self._counters['coalesced'] += 1
+            self._pending[node.key] = node
+            self._put(node.key, node)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        model.db.write(self.flush).addErrback(_log_failure, 'store')
 
-def store(node):
+    def flush(self) -> None:
+        """ Write the stored nodes and evict the oldest rows """
+        with self._lock:
+            nodes = list(self._pending.values())
+            self._pending.clear()
+            self._flush_scheduled = False
+        if not nodes:
+            return
+
+        now = model.default_now()
+        rows = [{
+            'node': node.key,
+            'node_field': node,
+            'created_date': now,
+            'modified_date': now,
+        } for node in nodes]
+
+        with model.db.atomic():
+            for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+                model.CachedNode.insert_many(
+                    rows[start:start + FLUSH_BATCH_SIZE]
+                ).upsert().execute()
+            evicted = self.evict(len(rows) + EVICT_BATCH_SIZE)
+
+        with self._lock:
+            self._counters['flushes'] += 1
+            self._counters['flushed'] += len(rows)
+            self._counters['evicted'] += evicted
+
+    def evict(self, limit: Optional[int] = None) -> int:
+        """ Remove the least recently stored rows over MAX_STORED, at most
+            `limit` of them """
+        excess = model.CachedNode.select().count() - self._max_stored
+        if limit is not None:
+            excess = min(excess, limit)
+        if excess <= 0:
+            return 0
+        oldest = model.CachedNode.select(
+            model.CachedNode.node,
+        ).order_by(
+            model.CachedNode.modified_date.asc(),
+        ).limit(excess)
+        return model.CachedNode.delete().where(
+            model.CachedNode.node.in_(oldest),
+        ).execute()
+
+    @rpc_utils.expose('net.nodes.cache')
+    def stats(self) -> Dict[str, Any]:
+        """ Hit rate of the cache, its writes and the latency of the
+            lookups and stores """
+        with self._lock:
+            counters = dict(self._counters)
+            cached = len(self._nodes)
+            pending = len(self._pending)
+        hits = counters.get('hits', 0) + counters.get('negative_hits', 0)
+        lookups = hits + counters.get('misses', 0)
+        histograms = Profiler.instance().histograms()
+        return {
+            'cached': cached,
+            'pending': pending,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'counters': counters,
+            'get': histograms.get('nodeskeeper.get'),
+            'store': histograms.get('nodeskeeper.store'),
+        }
+
+
+def _log_failure(failure, operation: str) -> None:
+    logger.warning("Cannot %s nodes. %s", operation,
+                   failure.getErrorMessage())
+
+
+def get(node_id: str) -> Optional[dt_p2p.Node]:
+    with Profiler.instance().measure('nodeskeeper.get'):
+        return NodesCache.instance().get(node_id)
+
+
+def store(node: dt_p2p.Node) -> None:
     """Creates or refreshes node entry"""
-    instance, created = model.CachedNode.get_or_create(
-        node=node.key,
-        defaults={'node_field': node, },
-    )
-    if not created:
-        instance.node_field = node
-        instance.save()
+    with Profiler.instance().measure('nodeskeeper.store'):
+        NodesCache.instance().store(node)
+
 
 @decorators.run_with_db()
 def sweep():
-    """Sweeps ancient entries"""
-    subq = model.CachedNode.select(
-        model.CachedNode.node,
-    ).order_by(
-        model.CachedNode.modified_date.desc(),
-    ).limit(1000)
-    count = model.CachedNode.delete().where(
-        model.CachedNode.node.not_in(subq),
-    ).execute()
-    if count:
-        logger.info('Sweeped ancient nodes from cache. count=%d', count)
+    """Sweeps ancient entries left over by the eviction on store"""
+    def _sweep():
+        NodesCache.instance().flush()
+        count = NodesCache.instance().evict()
+        if count:
+            logger.info('Sweeped ancient nodes from cache. count=%d', count)
+
+    model.db.write(_sweep).addErrback(_log_failure, 'sweep')
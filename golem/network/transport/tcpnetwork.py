@@ -1,10 +1,11 @@
 import logging
 import struct
 import time
+from typing import Dict, List, Optional
 
 import golem_messages
 from golem_messages import message
-from twisted.internet.defer import maybeDeferred
+from twisted.internet.defer import CancelledError, Deferred, maybeDeferred
 from twisted.internet.endpoints import TCP4ServerEndpoint, \
     TCP4ClientEndpoint, TCP6ServerEndpoint, TCP6ClientEndpoint, \
     HostnameEndpoint
@@ -33,6 +34,11 @@ MAX_MESSAGE_SIZE = 2 * 1024 * 1024
 
 class TCPNetwork(Network):
 
+    # Delay between the staggered connection attempts to the consecutive
+    # addresses of a node. If None, the next address is tried only after
+    # the previous attempt fails.
+    CONNECT_ATTEMPT_DELAY: Optional[float] = 0.25  # s
+
     def __init__(self, protocol_factory, use_ipv6=False, timeout=5,
                  limit_connection_rate=False):
         """
@@ -133,68 +139,32 @@ class TCPNetwork(Network):
 
         if self.rate_limiter:
             self.rate_limiter.call(self.__try_to_connect_to_address,
-                                   connect_info)
-        else:
-            self.__try_to_connect_to_address(connect_info)
-
-    def __try_to_connect_to_address(self, connect_info: TCPConnectInfo):
-        address = connect_info.socket_addresses[0].address
-        port = connect_info.socket_addresses[0].port
-
-        logger.debug("Connection to host %r: %r", address, port)
-
-        use_ipv6 = connect_info.socket_addresses[0].ipv6
-        use_hostname = connect_info.socket_addresses[0].hostname
-        if use_ipv6:
-            endpoint = TCP6ClientEndpoint(self.reactor, address, port,
-                                          self.timeout)
-        elif use_hostname:
-            endpoint = HostnameEndpoint(self.reactor, address, port,
-                                        self.timeout)
-        else:
-            endpoint = TCP4ClientEndpoint(self.reactor, address, port,
-                                          self.timeout)
-
-        defer = endpoint.connect(self.outgoing_protocol_factory)
-
-        defer.addCallback(self.__connection_established,
-                          self.__connection_to_address_established,
-                          connect_info)
-        defer.addErrback(self.__connection_failure,
-                         self.__connection_to_address_failure,
-                         connect_info)
-
-    @staticmethod
-    def __connection_established(conn, established_callback,
-                                 connect_info: TCPConnectInfo):
-        pp = conn.transport.getPeer()
-        logger.debug("Connection established %r %r", pp.host, pp.port)
-        TCPNetwork.__call_established_callback(
-            established_callback,
-            conn.session,
-            connect_info,
-        )
-
-    @staticmethod
-    def __connection_failure(err_desc, failure_callback,
-                             connect_info: TCPConnectInfo):
-        logger.debug("Connection failure. %r", err_desc)
-        TCPNetwork.__call_failure_callback(failure_callback, connect_info)
-
-    @staticmethod
-    def __connection_to_address_established(conn,
-                                            connect_info: TCPConnectInfo):
-        TCPNetwork.__call_established_callback(
-            connect_info.established_callback,
-            conn,
-        )
-
-    def __connection_to_address_failure(self, connect_info: TCPConnectInfo):
-        if len(connect_info.socket_addresses) > 1:
-            connect_info.socket_addresses.pop(0)
-            self.__try_to_connect_to_addresses(connect_info)
+                                   connect_info, addresses)
         else:
-            TCPNetwork.__call_failure_callback(connect_info.failure_callback)
+            self.__try_to_connect_to_address(connect_info, addresses)
+
+    def __try_to_connect_to_address(self, connect_info: TCPConnectInfo,
+                                    addresses: List[SocketAddress]):
+        ConnectionRace(self, connect_info, addresses).start()
+
+    def _create_endpoint(self, socket_address: SocketAddress):
+        address = socket_address.address
+        port = socket_address.port
+
+        if socket_address.ipv6:
+            return TCP6ClientEndpoint(self.reactor, address, port,
+                                      self.timeout)
+        if socket_address.hostname:
+            return HostnameEndpoint(self.reactor, address, port,
+                                    self.timeout)
+        return TCP4ClientEndpoint(self.reactor, address, port,
+                                  self.timeout)
+
+    def _connect_to_address(self, socket_address: SocketAddress) -> Deferred:
+        logger.debug("Connection to host %r: %r",
+                     socket_address.address, socket_address.port)
+        endpoint = self._create_endpoint(socket_address)
+        return endpoint.connect(self.outgoing_protocol_factory)
 
     def __try_to_listen_on_port(self, listen_info: TCPListenInfo):
         if self.use_ipv6:
@@ -258,6 +228,86 @@ class TCPNetwork(Network):
         logger.error("Can't stop listening %r", fail)
         TCPNetwork.__call_failure_callback(errback)
 
+
+class ConnectionRace:
+    """
+    Connects to one of the addresses of a node, "Happy Eyeballs" style
+    (RFC 8305). Attempts are started in the order of the addresses, each
+    one CONNECT_ATTEMPT_DELAY after the previous one or as soon as
+    the previous one fails. The first connection established wins,
+    the remaining attempts are cancelled and connections established
+    by them afterwards are aborted.
+    """
+
+    def __init__(self, network: TCPNetwork, connect_info: TCPConnectInfo,
+                 addresses: List[SocketAddress]) -> None:
+        self.network = network
+        self.connect_info = connect_info
+        self.finished = False
+        self._queued: List[SocketAddress] = list(addresses)
+        self._attempts: Dict[Deferred, SocketAddress] = {}
+        self._delayed_call = None
+
+    def start(self) -> None:
+        self._attempt_next()
+
+    def _attempt_next(self) -> None:
+        self._cancel_delayed_call()
+        if self.finished or not self._queued:
+            return
+
+        socket_address = self._queued.pop(0)
+        deferred = self.network._connect_to_address(socket_address)  # noqa pylint: disable=protected-access
+        self._attempts[deferred] = socket_address
+
+        delay = self.network.CONNECT_ATTEMPT_DELAY
+        if self._queued and delay is not None:
+            self._delayed_call = self.network.reactor.callLater(
+                delay, self._attempt_next)
+
+        deferred.addCallbacks(
+            self._established, self._failed,
+            callbackArgs=(deferred,), errbackArgs=(deferred,))
+
+    def _established(self, conn, deferred: Deferred) -> None:
+        socket_address = self._attempts.pop(deferred)
+        if self.finished:
+            logger.debug("Aborting redundant connection to %s",
+                         socket_address)
+            conn.transport.abortConnection()
+            return
+
+        self.finished = True
+        self._cancel_delayed_call()
+        for attempt in list(self._attempts):
+            attempt.cancel()
+
+        pp = conn.transport.getPeer()
+        logger.debug("Connection established %r %r", pp.host, pp.port)
+        if self.connect_info.established_callback:
+            self.connect_info.established_callback(conn.session)
+
+    def _failed(self, failure, deferred: Deferred) -> None:
+        socket_address = self._attempts.pop(deferred)
+        if self.finished:
+            if not failure.check(CancelledError):
+                logger.debug("Connection to %s failure. %r",
+                             socket_address, failure)
+            return
+
+        logger.debug("Connection to %s failure. %r", socket_address, failure)
+        if self._queued:
+            self._attempt_next()
+        elif not self._attempts:
+            self.finished = True
+            if self.connect_info.failure_callback:
+                self.connect_info.failure_callback()
+
+    def _cancel_delayed_call(self) -> None:
+        if self._delayed_call and self._delayed_call.active():
+            self._delayed_call.cancel()
+        self._delayed_call = None
+
 #############
 # Protocols #
 #############
@@ -119,6 +119,8 @@ class PendingConnectionsServer(TCPServer):
         self.conn_failure_for_type: Dict[int, Callable] = {}
         #  Reactions for final connection attempts failure
         self.conn_final_failure_for_type: Dict[int, Callable] = {}
+        #  Addresses of the last successful connections to nodes
+        self.last_node_addresses: Dict[str, SocketAddress] = {}
 
         # Set reactions
         self._set_conn_established()
@@ -166,6 +168,11 @@ class PendingConnectionsServer(TCPServer):
                 "`_add_pending_request`: no sockets found. node=%r", node)
             return False
 
+        # The address that worked last time is tried first
+        last_address = self.last_node_addresses.get(node.key)
+        if last_address and last_address in sockets:
+            self._prepend_address(sockets, last_address)
+
         logger.info("Connecting to peer. node=%s, adresses=%r",
                     node_info_str(node.node_name, node.key),
                     [str(socket) for socket in sockets])
@@ -175,7 +182,8 @@ class PendingConnectionsServer(TCPServer):
                                self.conn_established_for_type[request_type],
                                self.conn_failure_for_type[request_type],
                                self.conn_final_failure_for_type[request_type],
-                               args)
+                               args,
+                               node_key=node.key)
         self.pending_connections[pc.id] = pc
         return True
 
@@ -287,6 +295,8 @@ class PendingConnectionsServer(TCPServer):
             if ad in pc.socket_addresses:
                 pc.socket_addresses.remove(ad)
             pc.socket_addresses = [ad] + pc.socket_addresses
+            if pc.node_key:
+                self.last_node_addresses[pc.node_key] = ad
 
 
 class PenConnStatus(object):
@@ -309,7 +319,8 @@ class PendingConnection:
                  established: Optional[Callable] = None,
                  failure: Optional[Callable] = None,
                  final_failure: Optional[Callable] = None,
-                 kwargs: Kwargs = {}) -> None:
+                 kwargs: Kwargs = {},
+                 node_key: Optional[str] = None) -> None:
         """ Create new pending connection
         :param type_: connection type that allows to select proper reactions
         :param socket_addresses: list of socket_addresses that the node should
@@ -318,12 +329,14 @@ class PendingConnection:
         :param failure: connection errback
         :param kwargs: arguments that should be passed to established or
                        failure function
+        :param node_key: key of the node to connect to
         """
         self.connect_info = TCPConnectInfo(socket_addresses, established,
                                            failure, final_failure, kwargs)
         self.last_try_time = time.time()
         self.type = type_
         self.status = PenConnStatus.Inactive
+        self.node_key = node_key
 
     @property
     def id(self):
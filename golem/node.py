@@ -34,11 +34,13 @@ from golem.core import golem_async
 from golem.core.variables import PRIVATE_KEY
 from golem.core import virtualization
 from golem.database import Database
+from golem.docker.image import IMAGE_CACHE_FILE, ImageCache
 from golem.docker.manager import DockerManager
 from golem.ethereum.transactionsystem import TransactionSystem
 from golem.model import DB_MODELS, db, DB_FIELDS
 from golem.network.transport.tcpnetwork_helpers import SocketAddress
-from golem.report import StatusPublisher, Component, Stage, report_calls
+from golem.report import StatusPublisher, Component, Stage, report_call, \
+    report_calls
 from golem.rpc import utils as rpc_utils
 from golem.rpc.mapping import rpceventnames
 from golem.rpc.router import CrossbarRouter
@@ -58,6 +60,9 @@ if TYPE_CHECKING:
 F = TypeVar('F', bound=Callable[..., Any])
 logger = logging.getLogger(__name__)
 
+# RPC procedures reading the database, registered once it is loaded
+DATABASE_PROCEDURES = ('golem.terms', 'golem.concent.terms', 'env.hw.preset')
+
 
 def require_rpc_session() -> Callable:
     def wrapped(f: F) -> F:
@@ -132,9 +137,8 @@ class Node(HardwarePresetsMixin):
 
         self._peers: List[SocketAddress] = peers or []
 
-        # Initialize database
-        self._db = Database(
-            db, fields=DB_FIELDS, models=DB_MODELS, db_dir=datadir)
+        # Initialized in the background after start
+        self._db: Optional[Database] = None
 
         self.client: Optional[Client] = None
 
@@ -158,25 +162,29 @@ class Node(HardwarePresetsMixin):
         self.tempfs = TempFS()
         self.remotefs = RemoteFS(self.tempfs, UploadController(self.tempfs))
 
-        if password is not None:
-            if not self.set_password(password):
-                raise Exception("Password incorrect")
+        # Unlocked in the background after start
+        self._password = password
 
         self._crossbar_serializer = crossbar_serializer
 
     def start(self) -> None:
-        HardwarePresets.initialize(self._datadir)
-        HardwarePresets.update_config(self._config_desc.hardware_preset_name,
-                                      self._config_desc)
-
         try:
+            # The database and the apps are loaded while RPC is starting.
+            # Docker needs the hardware preset stored in the database.
+            database = self._start_database()
+            apps = self._start_apps()
             rpc = self._start_rpc()
 
             def on_rpc_ready() -> Deferred:
-                terms_ = self._check_terms()
                 keys = self._start_keys_auth()
-                docker = self._start_docker()
-                return gatherResults([terms_, keys, docker], consumeErrors=True)
+                # The terms and the hardware presets are stored in the
+                # database. Terms can be accepted while Docker starts.
+                database.addCallback(
+                    lambda _: self._register_database_procedures())
+                database.addCallback(lambda _: self._start_docker())
+                database.addCallback(lambda _: self._check_terms())
+                return gatherResults([keys, database, apps],
+                                     consumeErrors=True)
 
             def on_start_error(failure: FirstError):
                 exception = failure.value
@@ -222,7 +230,11 @@ class Node(HardwarePresetsMixin):
         Thread(target=_quit).start()
 
     @rpc_utils.expose('golem.password.set')
-    def set_password(self, password: str) -> bool:
+    def set_password(self, password: str) -> Deferred:
+        # Decrypting the key file is costly, keep the reactor responsive
+        return threads.deferToThread(self._unlock, password)
+
+    def _unlock(self, password: str) -> bool:
         logger.info("Got password")
 
         try:
@@ -314,7 +326,10 @@ class Node(HardwarePresetsMixin):
 
         def on_connect(*_):
             methods = self.get_rpc_mapping()
-            self.rpc_session.add_procedures(methods)
+            self.rpc_session.add_procedures({
+                uri: method for uri, method in methods.items()
+                if not uri.startswith(DATABASE_PROCEDURES)
+            })
             self._rpc_publisher = Publisher(self.rpc_session)
             StatusPublisher.initialize(self._rpc_publisher)
 
@@ -443,6 +458,14 @@ class Node(HardwarePresetsMixin):
                      task_provider_progress)
         return bool(task_provider_progress)
 
+    @require_rpc_session()
+    def _register_database_procedures(self) -> Deferred:
+        methods = self.get_rpc_mapping()
+        return self.rpc_session.add_procedures({  # type: ignore
+            uri: method for uri, method in methods.items()
+            if uri.startswith(DATABASE_PROCEDURES)
+        })
+
     @require_rpc_session()
     def _check_terms(self) -> Deferred:
 
@@ -461,8 +484,13 @@ class Node(HardwarePresetsMixin):
     def _start_keys_auth(self) -> Deferred:
 
         def create_keysauth():
-            # If keys_auth already exists it means we used command line flag
-            # and don't need to inform client about required password
+            # Password provided with a command line flag, no need to inform
+            # client about required password
+            if self._password is not None:
+                password, self._password = self._password, None
+                if not self._unlock(password):
+                    raise Exception("Password incorrect")
+
             if self.is_account_unlocked():
                 return
 
@@ -486,11 +514,36 @@ class Node(HardwarePresetsMixin):
 
         return threads.deferToThread(create_keysauth)
 
+    def _start_database(self) -> Deferred:
+
+        def start_database():
+            with report_call(Component.database, 'start'):
+                self._db = Database(
+                    db, fields=DB_FIELDS, models=DB_MODELS,
+                    db_dir=self._datadir)
+                db.writer.start()
+                HardwarePresets.initialize(self._datadir)
+                HardwarePresets.update_config(
+                    self._config_desc.hardware_preset_name,
+                    self._config_desc)
+
+        return threads.deferToThread(start_database)
+
+    def _start_apps(self) -> Deferred:
+
+        def load_apps():
+            with report_call(Component.apps, 'load'):
+                self.apps_manager.load_all_apps()
+
+        return threads.deferToThread(load_apps)
+
     def _start_docker(self) -> Deferred:
         if not self._use_docker_manager:
             return succeed(None)
 
         def start_docker():
+            ImageCache.instance().load(str(Path(self._datadir) /
+                                           IMAGE_CACHE_FILE))
             # pylint: disable=no-member
             self._docker_manager = DockerManager.install(self._config_desc)
             self._docker_manager.check_environment()
@@ -562,8 +615,6 @@ class Node(HardwarePresetsMixin):
             self._stop_on_error("client", "Client is not available")
             return
 
-        self.apps_manager.load_all_apps()
-
         for env in self.apps_manager.get_env_list():
             env.accept_tasks = True
             self.client.environments_manager.add_environment(env)
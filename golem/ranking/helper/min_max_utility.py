@@ -1,5 +1,7 @@
 import logging
 
+import numpy as np
+
 from golem.ranking.helper.trust_const import MAX_TRUST, MIN_TRUST
 
 POS_WEIGHT = 1.0
@@ -29,3 +31,19 @@ def vec_to_trust(val):
         return None
     return min(MAX_TRUST, max(MIN_TRUST, float(a) / float(
         b))) if a != 0.0 and b != 0.0 else 0.0
+
+
+def count_trusts(pos: np.ndarray, neg: np.ndarray) -> np.ndarray:
+    """ count_trust of every element of the arrays """
+    pw = pos * POS_WEIGHT
+    nw = neg * NEG_WEIGHT
+    result = (pw - nw) / np.maximum(pw + nw, MIN_OPERATION_NUMBER)
+    return np.clip(result, MIN_TRUST, MAX_TRUST)
+
+
+def vecs_to_trust(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """ vec_to_trust of every pair of a value and a weight """
+    result = np.zeros(np.broadcast(values, weights).shape)
+    np.divide(values, weights, out=result,
+              where=(values != 0.0) & (weights != 0.0))
+    return np.clip(result, MIN_TRUST, MAX_TRUST)
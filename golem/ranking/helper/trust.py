@@ -35,11 +35,18 @@ class Trust(Enum):
     def increase(self, node_id, mod=1.0):
         with self.lock:
             try:
-                self.val['increase'](node_id, mod)
+                self.val['increase'](node_id, mod).addErrback(
+                    _log_failure, 'increase', node_id)
             except KeyError:
                 logger.error("Wrong key for stat type {}".format(self.val))
                 raise
 
     def decrease(self, node_id, mod=1.0):
         with self.lock:
-            self.val['decrease'](node_id, mod)
+            self.val['decrease'](node_id, mod).addErrback(
+                _log_failure, 'decrease', node_id)
+
+
+def _log_failure(failure, operation: str, node_id: str) -> None:
+    logger.warning("Cannot %s trust. node_id=%r, %s", operation, node_id,
+                   failure.getErrorMessage())
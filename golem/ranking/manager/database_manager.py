@@ -1,9 +1,12 @@
 import datetime
+import functools
 import logging
 
 from peewee import IntegrityError
+from twisted.internet.defer import Deferred
 
-from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db
+from golem.model import LocalRank, GlobalRank, NeighbourLocRank, db, \
+    default_now
 from golem.ranking import ProviderEfficacy
 from golem.task.taskstate import SubtaskOp
 
@@ -13,12 +16,25 @@ logger = logging.getLogger(__name__)
 REQUESTOR_FORGETTING_FACTOR = 0.9
 PROVIDER_FORGETTING_FACTOR = 0.9
 
+# Rows per INSERT, within the SQLite limit of 999 bound parameters
+GLOBAL_RANK_BATCH_SIZE = 100
 
+
+def _queued(fn):
+    """ Make the update on the database writer thread, batched with the
+        other pending writes """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> Deferred:
+        return db.write(fn, *args, **kwargs)
+    return wrapper
+
+
+@_queued
 def increase_positive_computed(node_id, trust_mod):
     logger.debug('increase_positive_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, positive_computed=trust_mod)
     except IntegrityError:
         LocalRank.update(positive_computed=LocalRank.positive_computed + trust_mod,
@@ -26,11 +42,12 @@ def increase_positive_computed(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_negative_computed(node_id, trust_mod):
     logger.debug('increase_negative_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, negative_computed=trust_mod)
     except IntegrityError:
         LocalRank.update(negative_computed=LocalRank.negative_computed + trust_mod,
@@ -38,11 +55,12 @@ def increase_negative_computed(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_wrong_computed(node_id, trust_mod):
     logger.debug('increase_wrong_computed. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, wrong_computed=trust_mod)
     except IntegrityError:
         LocalRank.update(wrong_computed=LocalRank.wrong_computed + trust_mod,
@@ -50,11 +68,12 @@ def increase_wrong_computed(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_positive_requested(node_id, trust_mod):
     logger.debug('increase_positive_requested. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, positive_requested=trust_mod)
     except IntegrityError:
         LocalRank.update(positive_requested=LocalRank.positive_requested + trust_mod,
@@ -62,11 +81,12 @@ def increase_positive_requested(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_negative_requested(node_id, trust_mod):
     logger.debug('increase_negative_requested. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, negative_requested=trust_mod)
     except IntegrityError:
         LocalRank.update(negative_requested=LocalRank.negative_requested + trust_mod,
@@ -74,11 +94,12 @@ def increase_negative_requested(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_positive_payment(node_id, trust_mod):
     logger.debug('increase_positive_payment. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, positive_payment=trust_mod)
     except IntegrityError:
         LocalRank.update(positive_payment=LocalRank.positive_payment + trust_mod,
@@ -86,11 +107,12 @@ def increase_positive_payment(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_negative_payment(node_id, trust_mod):
     logger.debug('increase_negative_payment. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, negative_payment=trust_mod)
     except IntegrityError:
         LocalRank.update(negative_payment=LocalRank.negative_payment + trust_mod,
@@ -98,11 +120,12 @@ def increase_negative_payment(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_positive_resource(node_id, trust_mod):
     logger.debug('increase_positive_resource. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, positive_resource=trust_mod)
     except IntegrityError:
         LocalRank.update(positive_resource=LocalRank.positive_resource + trust_mod,
@@ -110,11 +133,12 @@ def increase_positive_resource(node_id, trust_mod):
             .where(LocalRank.node_id == node_id).execute()
 
 
+@_queued
 def increase_negative_resource(node_id, trust_mod):
     logger.debug('increase_negative_resource. node_id=%r, trust_mod=%r',
                  node_id, trust_mod)
     try:
-        with db.transaction():
+        with db.atomic():
             LocalRank.create(node_id=node_id, negative_resource=trust_mod)
     except IntegrityError:
         LocalRank.update(negative_resource=LocalRank.negative_resource + trust_mod,
@@ -138,7 +162,7 @@ def _calculate_efficiency(efficiency: float,
 
 
 def get_requestor_efficiency(node_id: str) -> float:
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         efficiency = rank.requestor_efficiency
         return efficiency or 1.0
@@ -153,7 +177,7 @@ def update_requestor_efficiency(node_id: str,
     Update efficiency function from both Requestor and Provider perspective as
     proposed in https://docs.golem.network/About/img/Brass_Golem_Marketplace.pdf
     """
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         efficiency = rank.requestor_efficiency
 
@@ -169,7 +193,7 @@ def update_requestor_efficiency(node_id: str,
 
 
 def get_requestor_assigned_sum(node_id: str) -> int:
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         return rank.requestor_assigned_sum or 0
 
@@ -180,7 +204,7 @@ def update_requestor_assigned_sum(node_id: str, amount: int) -> None:
     proposed in https://docs.golem.network/About/img/Brass_Golem_Marketplace.pdf
     """
 
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.requestor_assigned_sum += amount
         rank.save()
@@ -192,20 +216,20 @@ def update_requestor_paid_sum(node_id: str, amount: int) -> None:
     proposed in https://docs.golem.network/About/img/Brass_Golem_Marketplace.pdf
     """
 
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.requestor_paid_sum += amount
         rank.save()
 
 
 def get_requestor_paid_sum(node_id: str) -> int:
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         return rank.requestor_paid_sum or 0
 
 
 def get_provider_efficiency(node_id: str) -> float:
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         return rank.provider_efficiency
 
@@ -214,7 +238,7 @@ def update_provider_efficiency(node_id: str,
                                timeout: float,
                                computation_time: float) -> None:
 
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         efficiency = rank.provider_efficiency
 
@@ -224,14 +248,14 @@ def update_provider_efficiency(node_id: str,
 
 
 def get_provider_efficacy(node_id: str) -> ProviderEfficacy:
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         return rank.provider_efficacy
 
 
 def update_provider_efficacy(node_id: str, op: SubtaskOp) -> None:
 
-    with db.transaction():
+    with db.atomic():
         rank, _ = LocalRank.get_or_create(node_id=node_id)
         rank.provider_efficacy.update(op)
         rank.save()
@@ -241,9 +265,10 @@ def get_global_rank(node_id):
     return GlobalRank.select().where(GlobalRank.node_id == node_id).first()
 
 
+@_queued
 def upsert_global_rank(node_id, comp_trust, req_trust, comp_weight, req_weight):
     try:
-        with db.transaction():
+        with db.atomic():
             GlobalRank.create(node_id=node_id, requesting_trust_value=req_trust, computing_trust_value=comp_trust,
                               gossip_weight_computing=comp_weight, gossip_weight_requesting=req_weight)
     except IntegrityError:
@@ -253,6 +278,30 @@ def upsert_global_rank(node_id, comp_trust, req_trust, comp_weight, req_weight):
             .where(GlobalRank.node_id == node_id).execute()
 
 
+@_queued
+def upsert_global_ranks(ranks):
+    """ Save the global ranks of many nodes in a single transaction
+    :param ranks: iterable of (node_id, comp_trust, req_trust, comp_weight,
+                  req_weight)
+    """
+    now = default_now()
+    rows = [{
+        'node_id': node_id,
+        'computing_trust_value': comp_trust,
+        'requesting_trust_value': req_trust,
+        'gossip_weight_computing': comp_weight,
+        'gossip_weight_requesting': req_weight,
+        'created_date': now,
+        'modified_date': now,
+    } for node_id, comp_trust, req_trust, comp_weight, req_weight in ranks]
+
+    with db.atomic():
+        for start in range(0, len(rows), GLOBAL_RANK_BATCH_SIZE):
+            GlobalRank.insert_many(
+                rows[start:start + GLOBAL_RANK_BATCH_SIZE]
+            ).upsert().execute()
+
+
 def get_local_rank(node_id):
     return LocalRank.select().where(LocalRank.node_id == node_id).first()
 
@@ -261,17 +310,33 @@ def get_local_rank_for_all():
     return LocalRank.select()
 
 
+def get_local_rank_counts():
+    """ Counters the local trusts are computed from, as tuples of
+        (node_id, positive_computed, negative_computed, wrong_computed,
+        positive_payment, negative_requested, negative_payment) """
+    return LocalRank.select(
+        LocalRank.node_id,
+        LocalRank.positive_computed,
+        LocalRank.negative_computed,
+        LocalRank.wrong_computed,
+        LocalRank.positive_payment,
+        LocalRank.negative_requested,
+        LocalRank.negative_payment,
+    ).tuples()
+
+
 def get_neighbour_loc_rank(neighbour_id, about_id):
     return NeighbourLocRank.select().where(
         (NeighbourLocRank.node_id == neighbour_id) & (NeighbourLocRank.about_node_id == about_id)).first()
 
 
+@_queued
 def upsert_neighbour_loc_rank(neighbour_id, about_id, loc_rank):
     try:
         if neighbour_id == about_id:
             logger.warning("Removing {} self trust".format(about_id))
             return
-        with db.transaction():
+        with db.atomic():
             NeighbourLocRank.create(node_id=neighbour_id, about_node_id=about_id,
                                     requesting_trust_value=loc_rank[1], computing_trust_value=loc_rank[0])
     except IntegrityError:
@@ -1,8 +1,12 @@
-from golem.ranking.helper.min_max_utility import count_trust
+from typing import List, Tuple
+
+import numpy as np
+
+from golem.ranking.helper.min_max_utility import count_trust, count_trusts
 from golem.ranking.helper.trust_const import \
     UNKNOWN_TRUST, NEIGHBOUR_WEIGHT_BASE, NEIGHBOUR_WEIGHT_POWER
 from golem.ranking.manager.database_manager \
-    import get_neighbour_loc_rank, get_local_rank
+    import get_neighbour_loc_rank, get_local_rank, get_local_rank_counts
 
 
 def __neighbour_weight(local_trust):
@@ -68,3 +72,22 @@ def requested_neighbours_rank(node_id, neighbours):
         sum_trust += (weight - 1) * neighbour_trust_to_node_id
         sum_weight += weight
     return sum_trust, sum_weight
+
+
+#########
+# local #
+#########
+
+def local_trusts() -> Tuple[List[str], np.ndarray]:
+    """ Computed and requested local trust of every node with a local rank
+    :return: node ids and an array of their [computed, requested] trusts
+    """
+    rows = list(get_local_rank_counts())
+    if not rows:
+        return [], np.zeros((0, 2))
+    node_ids = [row[0] for row in rows]
+    counts = np.array([row[1:] for row in rows], dtype=float)
+    trusts = np.empty((len(rows), 2))
+    trusts[:, 0] = count_trusts(counts[:, 0], counts[:, 1] + counts[:, 2])
+    trusts[:, 1] = count_trusts(counts[:, 3], counts[:, 4] + counts[:, 5])
+    return node_ids, trusts
@@ -1,9 +1,10 @@
 import logging
-import operator
 import random
 
 from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 from twisted.internet.task import deferLater
 
 from golem.ranking.helper import min_max_utility as util
@@ -19,6 +20,100 @@ MAX_STEPS = 10
 EPSILON = 0.01
 LOC_RANK_PUSH_DELTA = 0.1
 
+# Shape of a trust vector, [[computing, weight], [requesting, weight]]
+VECTOR_SHAPE = (2, 2)
+
+
+class NodeTable(object):
+    """ Consecutive indices of node ids, the rows of NodeVectors """
+
+    def __init__(self) -> None:
+        self.node_ids: List[str] = []
+        self._indices: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def get(self, node_id: str) -> Optional[int]:
+        return self._indices.get(node_id)
+
+    def index(self, node_id: str) -> int:
+        """ Index of the node, added to the table if unknown """
+        index = self._indices.get(node_id)
+        if index is None:
+            index = self._indices[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+        return index
+
+    def indices(self, node_ids: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.index(node_id) for node_id in node_ids),
+                           dtype=np.intp)
+
+
+class NodeVectors(object):
+    """ An array of values of the nodes in a NodeTable. The table may grow,
+        the nodes without a value are masked out and have zero values. """
+
+    def __init__(self, table: NodeTable, shape: Tuple[int, ...] = ()) -> None:
+        self.table = table
+        self._data = np.zeros((len(table),) + shape)
+        self._present = np.zeros(len(table), dtype=bool)
+
+    @property
+    def data(self) -> np.ndarray:
+        missing = len(self.table) - len(self._present)
+        if missing > 0:
+            self._data = np.concatenate(
+                [self._data, np.zeros((missing,) + self._data.shape[1:])])
+            self._present = np.concatenate(
+                [self._present, np.zeros(missing, dtype=bool)])
+        return self._data
+
+    @property
+    def present(self) -> np.ndarray:
+        _ = self.data
+        return self._present
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._present))
+
+    def __contains__(self, node_id: str) -> bool:
+        index = self.table.get(node_id)
+        return index is not None and index < len(self._present) \
+            and bool(self._present[index])
+
+    def __getitem__(self, node_id: str) -> np.ndarray:
+        if node_id not in self:
+            raise KeyError(node_id)
+        return self._data[self.table.get(node_id)]
+
+    def values(self) -> np.ndarray:
+        return self.data[self.present]
+
+    def items(self) -> Iterable[Tuple[str, np.ndarray]]:
+        data = self.data
+        node_ids = self.table.node_ids
+        for index in np.flatnonzero(self.present):
+            yield node_ids[index], data[index]
+
+    def set(self, indices: np.ndarray, values: np.ndarray) -> None:
+        self.data[indices] = values
+        self.present[indices] = True
+
+    def add(self, indices: np.ndarray, values: np.ndarray) -> None:
+        """ Sum the values into the rows, repeated indices included """
+        np.add.at(self.data, indices, values)
+        self.present[indices] = True
+
+
+def _trusts(vectors: np.ndarray) -> np.ndarray:
+    """ [computing, requesting] trusts of an array of trust vectors """
+    return util.vecs_to_trust(vectors[..., 0], vectors[..., 1])
+
+
+def _log_failure(failure, operation: str) -> None:
+    logger.warning("Cannot %s. %s", operation, failure.getErrorMessage())
+
 
 class Ranking(object):
     def __init__(self, client, max_steps=MAX_STEPS, epsilon=EPSILON,
@@ -31,8 +126,9 @@ class Ranking(object):
         self.neighbours = []
         self.step = 0
         self.max_steps = max_steps
-        self.working_vec = {}
-        self.prevRank = {}
+        self.nodes = NodeTable()
+        self.working_vec = NodeVectors(self.nodes, VECTOR_SHAPE)
+        self.prevRank = NodeVectors(self.nodes, VECTOR_SHAPE[:1])
         self.globRank = {}
         self.received_gossip = []
         self.finished = False
@@ -40,7 +136,7 @@ class Ranking(object):
         self.global_finished = False
         self.reactor = None
         self.initLocRankPush = True
-        self.prev_loc_rank = {}
+        self.prev_loc_rank = NodeVectors(NodeTable(), VECTOR_SHAPE[:1])
         self.loc_rank_push_delta = loc_rank_push_delta
         self.lock = Lock()
 
@@ -53,27 +149,29 @@ class Ranking(object):
     def __init_stage(self):
         try:
             logger.debug("New gossip stage")
-            self.__push_local_ranks()
+            node_ids, trusts = tm.local_trusts()
+            self.__push_local_ranks(node_ids, trusts)
             self.finished = False
             self.global_finished = False
             self.step = 0
             self.finished_neighbours = set()
-            self.__init_working_vec()
+            self.__init_working_vec(node_ids, trusts)
         finally:
             deferLater(self.reactor,
                        self.round_oracle.sec_to_round(),
                        self.__new_round)
 
-    def __init_working_vec(self):
+    def __init_working_vec(self, node_ids, trusts):
         with self.lock:
-            self.working_vec = {}
-            self.prevRank = {}
-            for loc_rank in dm.get_local_rank_for_all():
-                comp_trust = tm.computed_trust_local(loc_rank)
-                req_trust = tm.requested_trust_local(loc_rank)
-                self.working_vec[loc_rank.node_id] = \
-                    [[comp_trust, 1.0], [req_trust, 1.0]]
-                self.prevRank[loc_rank.node_id] = [comp_trust, req_trust]
+            # A new table every stage, nodes do not pile up over stages
+            self.nodes = NodeTable()
+            self.working_vec = NodeVectors(self.nodes, VECTOR_SHAPE)
+            self.prevRank = NodeVectors(self.nodes, VECTOR_SHAPE[:1])
+            indices = self.nodes.indices(node_ids)
+            vectors = np.ones((len(indices),) + VECTOR_SHAPE)
+            vectors[:, :, 0] = trusts
+            self.working_vec.set(indices, vectors)
+            self.prevRank.set(indices, trusts)
 
     def __new_round(self):
         logger.debug("New gossip round")
@@ -98,7 +196,7 @@ class Ranking(object):
             self.received_gossip = \
                 self.client.collect_gossip() + self.received_gossip
             self.__make_prev_rank()
-            self.working_vec = {}
+            self.working_vec = NodeVectors(self.nodes, VECTOR_SHAPE)
             self.__add_gossip()
             self.__check_finished()
         finally:
@@ -184,21 +282,20 @@ class Ranking(object):
         neighbours_loc_ranks = self.client.collect_neighbours_loc_ranks()
         for [neighbour_id, about_id, loc_rank] in neighbours_loc_ranks:
             with self.lock:
-                dm.upsert_neighbour_loc_rank(neighbour_id, about_id, loc_rank)
-
-    def __push_local_ranks(self):
-        for loc_rank in dm.get_local_rank_for_all():
-            comp_trust = tm.computed_trust_local(loc_rank)
-            req_trust = tm.requested_trust_local(loc_rank)
-            trust = [comp_trust, req_trust]
-            if loc_rank.node_id in self.prev_loc_rank:
-                prev_trust = self.prev_loc_rank[loc_rank.node_id]
-            else:
-                prev_trust = [float("inf")] * 2
-            if max(map(abs, map(operator.sub, prev_trust, trust))) \
-                    > self.loc_rank_push_delta:
-                self.client.push_local_rank(loc_rank.node_id, trust)
-                self.prev_loc_rank[loc_rank.node_id] = trust
+                dm.upsert_neighbour_loc_rank(
+                    neighbour_id, about_id, loc_rank,
+                ).addErrback(_log_failure, 'save local rank')
+
+    def __push_local_ranks(self, node_ids, trusts):
+        indices = self.prev_loc_rank.table.indices(node_ids)
+        prev_trusts = self.prev_loc_rank.data[indices]
+        changed = ~self.prev_loc_rank.present[indices] | (
+            np.abs(prev_trusts - trusts).max(axis=1)
+            > self.loc_rank_push_delta)
+        for position in np.flatnonzero(changed):
+            self.client.push_local_rank(node_ids[position],
+                                        trusts[position].tolist())
+        self.prev_loc_rank.set(indices[changed], trusts[changed])
 
     def __check_finished(self):
         if self.global_finished:
@@ -220,23 +317,10 @@ class Ranking(object):
                 set(self.neighbours) <= self.finished_neighbours
 
     def __compare_working_vec_and_prev_rank(self):
-        aggregated_trust = 0.0
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            if node_id in self.prevRank:
-                comp_trust_old = self.prevRank[node_id][0]
-                req_trust_old = self.prevRank[node_id][1]
-            else:
-                comp_trust_old, req_trust_old = 0, 0
-            aggregated_trust += abs(comp_trust - comp_trust_old)
-            aggregated_trust += abs(req_trust - req_trust_old)
-        return aggregated_trust
+        # Nodes without a previous rank have zeros there
+        present = self.working_vec.present
+        trusts = _trusts(self.working_vec.data[present])
+        return float(np.abs(trusts - self.prevRank.data[present]).sum())
 
     def __set_k(self):
         degrees = self.__get_neighbours_degree()
@@ -254,62 +338,65 @@ class Ranking(object):
         return degrees
 
     def __make_prev_rank(self):
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            self.prevRank[node_id] = [comp_trust, req_trust]
+        present = self.working_vec.present
+        self.prevRank.set(present, _trusts(self.working_vec.data[present]))
 
     def __save_working_vec(self):
-        for node_id, val in list(self.working_vec.items()):
-            try:
-                computing, requesting = val
-            except (TypeError, ValueError):
-                logger.warning("Wrong trust vector element {}".format(val))
-                break
-            comp_trust = util.vec_to_trust(computing)
-            req_trust = util.vec_to_trust(requesting)
-            dm.upsert_global_rank(node_id,
-                                  comp_trust,
-                                  req_trust,
-                                  computing[1],
-                                  requesting[1])
+        node_ids = self.nodes.node_ids
+        present = np.flatnonzero(self.working_vec.present)
+        vectors = self.working_vec.data[present]
+        trusts = _trusts(vectors)
+        dm.upsert_global_ranks(
+            (node_ids[index], comp_trust, req_trust, comp_weight, req_weight)
+            for index, (comp_trust, req_trust), (comp_weight, req_weight)
+            in zip(present.tolist(), trusts.tolist(),
+                   vectors[:, :, 1].tolist())
+        ).addErrback(_log_failure, 'save global ranks')
 
     def __prepare_gossip(self):
-        gossip_vec = []
-        for node_id, val in list(self.working_vec.items()):
-            comp_trust = list(map(self.__scale_gossip, val[0]))
-            req_trust = list(map(self.__scale_gossip, val[1]))
-            gossip_vec.append([node_id, [comp_trust, req_trust]])
-        return gossip_vec
-
-    def __scale_gossip(self, val):
-        return val / float(self.k + 1)
+        # The wire format stays a list of [node_id, [[comp, weight],
+        # [req, weight]]]
+        scaled = self.working_vec.values() / float(self.k + 1)
+        node_ids = self.nodes.node_ids
+        present = np.flatnonzero(self.working_vec.present)
+        return [[node_ids[index], vector]
+                for index, vector in zip(present.tolist(), scaled.tolist())]
 
     def __add_gossip(self):
         for gossip_group in self.received_gossip:
-            for gossip in gossip_group:
-                try:
-                    node_id, [comp, req] = gossip
-                    if node_id in self.working_vec:
-                        [prev_comp, prev_req] = self.working_vec[node_id]
-                        self.working_vec[node_id] = [
-                            self.__sum_gossip(comp, prev_comp),
-                            self.__sum_gossip(req, prev_req)]
-                    else:
-                        self.working_vec[node_id] = [comp, req]
-                except Exception as err:
-                    logger.error("Wrong gossip {}, {}".format(gossip, err))
+            node_ids, vectors = self.__parse_gossip(gossip_group)
+            if node_ids:
+                self.working_vec.add(self.nodes.indices(node_ids), vectors)
 
         self.received_gossip = []
 
     @staticmethod
-    def __sum_gossip(a, b):
-        return list(map(sum, zip(a, b)))
+    def __parse_gossip(gossip_group) -> Tuple[List[str], np.ndarray]:
+        try:
+            node_ids = [node_id for node_id, _ in gossip_group]
+            vectors = np.array([vector for _, vector in gossip_group],
+                               dtype=float)
+            if vectors.shape[1:] == VECTOR_SHAPE and all(
+                    isinstance(node_id, str) for node_id in node_ids):
+                return node_ids, vectors
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+        # Skip the malformed entries one by one
+        node_ids, vectors = [], []
+        for gossip in gossip_group:
+            try:
+                node_id, vector = gossip
+                vector = np.array(vector, dtype=float)
+                if not isinstance(node_id, str) \
+                        or vector.shape != VECTOR_SHAPE:
+                    raise ValueError("not a node id and a trust vector")
+            except Exception as err:  # pylint: disable=broad-except
+                logger.error("Wrong gossip {}, {}".format(gossip, err))
+                continue
+            node_ids.append(node_id)
+            vectors.append(vector)
+        return node_ids, np.array(vectors).reshape((-1,) + VECTOR_SHAPE)
 
     def __send_finished(self):
         self.client.send_stop_gossip()
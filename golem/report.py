@@ -28,6 +28,8 @@ class Component(object):
     hypervisor = 'hypervisor'
     ethereum = 'ethereum'
     hyperdrive = 'hyperdrive'
+    database = 'database'
+    apps = 'apps'
 
 
 class StatusPublisher(object):
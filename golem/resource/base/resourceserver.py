@@ -6,6 +6,7 @@ import os
 from twisted.internet.defer import Deferred
 
 from golem.core import golem_async
+from golem.resource import diskusage
 from golem.task.result.resultpackage import ZipPackager
 
 logger = logging.getLogger(__name__)
@@ -39,6 +40,8 @@ class BaseResourceServer:
 
         self.packager = ZipPackager()
         self.pending_resources = {}
+        # Packages extracted so far, until all the resources are collected
+        self._package_paths = {}
 
     def get_distributed_resource_root(self):
         return self.resource_manager.storage.get_root()
@@ -64,10 +67,13 @@ class BaseResourceServer:
     def create_resource_package(self, files, res_id) -> Deferred:
         resource_dir = self.resource_manager.storage.get_dir(res_id)
         package_path = os.path.join(resource_dir, res_id)
-        request = golem_async.AsyncRequest(
-            self.packager.create,
-            package_path, files,
-        )
+
+        def create_package():
+            created = self.packager.create(package_path, files)
+            diskusage.touch(package_path)
+            return created
+
+        request = golem_async.AsyncRequest(create_package)
         return golem_async.async_run(request)
 
     @staticmethod
@@ -79,6 +85,9 @@ class BaseResourceServer:
         self.resource_manager.remove_resources(res_id)
 
     def download_resources(self, resources, res_id, client_options=None):
+        """ Starts pulling all the resources at once. Every package is
+            extracted as soon as it is downloaded and the client is notified
+            when all the packages are extracted. """
         with self._lock:
             for resource in resources:
                 self._add_pending_resource(resource, res_id, client_options)
@@ -87,6 +96,9 @@ class BaseResourceServer:
 
         if collected:
             self.client.resource_collected(res_id)
+        else:
+            # Do not wait for the next network sync
+            self._download_resources()
 
     def _add_pending_resource(self, resource, res_id, client_options):
         if res_id not in self.pending_resources:
@@ -96,6 +108,13 @@ class BaseResourceServer:
             resource, res_id, client_options, TransferStatus.idle
         ))
 
+    def _get_pending_resource(self, resource, res_id):
+        with self._lock:
+            for pending_resource in self.pending_resources.get(res_id, []):
+                if pending_resource.resource == resource:
+                    return pending_resource
+        return None
+
     def _remove_pending_resource(self, resource, res_id):
         with self._lock:
             pending_resources = self.pending_resources.get(res_id, [])
@@ -109,24 +128,38 @@ class BaseResourceServer:
             self.pending_resources.pop(res_id, None)
             return res_id
 
-    def _download_resources(self, async_=True):
-        download_statuses = [TransferStatus.idle, TransferStatus.failed]
-        pending = dict(self.pending_resources)
+    def cancel_resources(self, res_id):
+        """ Forgets the pending resources; transfers already started are
+            ignored once they finish """
+        with self._lock:
+            pending_resources = self.pending_resources.pop(res_id, [])
+            self._package_paths.pop(res_id, None)
 
-        for _, entries in pending.items():
-            for entry in entries:
+        for pending_resource in pending_resources:
+            pending_resource.status = TransferStatus.cancelled
 
-                if entry.status not in download_statuses:
-                    continue
-                entry.status = TransferStatus.transferring
+    def _download_resources(self, async_=True):
+        download_statuses = [TransferStatus.idle, TransferStatus.failed]
+        to_download = []
 
-                self.resource_manager.pull_resource(
-                    entry.resource, entry.res_id,
-                    client_options=entry.client_options,
-                    success=self._download_success,
-                    error=self._download_error,
-                    async_=async_
-                )
+        # Called from the reactor and from the network sync thread; each
+        # resource is marked as transferring once, so it is pulled once
+        with self._lock:
+            for entries in self.pending_resources.values():
+                for entry in entries:
+                    if entry.status not in download_statuses:
+                        continue
+                    entry.status = TransferStatus.transferring
+                    to_download.append(entry)
+
+        for entry in to_download:
+            self.resource_manager.pull_resource(
+                entry.resource, entry.res_id,
+                client_options=entry.client_options,
+                success=self._download_success,
+                error=self._download_error,
+                async_=async_
+            )
 
     def _download_success(self, resource, _, res_id):
         if not resource:
@@ -134,14 +167,23 @@ class BaseResourceServer:
                                  resource, res_id)
             return
 
-        if not self._remove_pending_resource(resource, res_id):
-            logger.warning("Resources for id %r were re-downloaded", res_id)
+        pending_resource = self._get_pending_resource(resource, res_id)
+        if not pending_resource \
+                or pending_resource.status != TransferStatus.transferring:
+            logger.warning("Resources for id %r were re-downloaded or "
+                           "cancelled", res_id)
             return
 
+        pending_resource.status = TransferStatus.complete
         self._extract_resources(resource, res_id)
 
     def _download_error(self, error, resource, res_id):
-        self._remove_pending_resource(resource, res_id)
+        if res_id not in self.pending_resources:
+            logger.debug("Ignoring error of a cancelled download. res_id=%r",
+                         res_id)
+            return
+        # The remaining resources are of no use
+        self.cancel_resources(res_id)
         self.client.resource_failure(res_id, error)
 
     def _extract_resources(self, resource, res_id):
@@ -155,11 +197,24 @@ class BaseResourceServer:
                 package_paths.append(package_path)
                 logger.info('Extracting task resource: %r', package_path)
                 self.packager.extract(package_path, resource_dir)
-
+            diskusage.touch(resource_dir)
+            return package_paths
+
+        def extracted(package_paths):
+            if not self._get_pending_resource(resource, res_id):
+                return  # Cancelled
+            with self._lock:
+                self._package_paths.setdefault(res_id, []) \
+                    .extend(package_paths)
+            if not self._remove_pending_resource(resource, res_id):
+                return
+            with self._lock:
+                package_paths = self._package_paths.pop(res_id, [])
             ctk.add_package_paths(res_id, package_paths)
+            self.client.resource_collected(res_id)
 
         async_req = golem_async.AsyncRequest(extract_packages, resource[1])
         golem_async.async_run(async_req).addCallbacks(
-            lambda _: self.client.resource_collected(res_id),
+            extracted,
             lambda e: self._download_error(e, resource, res_id)
         )
@@ -4,6 +4,8 @@ import shutil
 import time
 from typing import Iterator
 
+from golem.resource import diskusage
+
 logger = logging.getLogger(__name__)
 
 
@@ -102,6 +104,8 @@ class DirManager(object):
                 if not os.listdir(path):
                     shutil.rmtree(path, ignore_errors=True)
 
+        diskusage.touch(d)
+
     def create_dir(self, full_path):
         """ Create new directory, remove old directory if it exists.
         :param str full_path: path to directory that should be created
@@ -0,0 +1,189 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+from golem.core.fileshelper import get_dir_size
+
+logger = logging.getLogger(__name__)
+
+# Root path -> ledger
+_ledgers: Dict[str, 'DiskUsageLedger'] = {}
+_ledgers_lock = threading.Lock()
+
+
+def ledger(root: str, ledger_path: Optional[str] = None) -> 'DiskUsageLedger':
+    """ Return the ledger of the given directory, create it if needed
+    :param root: directory whose top-level entries are accounted for
+    :param ledger_path: file the ledger is kept in between the runs
+    """
+    root = os.path.abspath(root)
+    with _ledgers_lock:
+        if root not in _ledgers:
+            _ledgers[root] = DiskUsageLedger(root, ledger_path)
+        return _ledgers[root]
+
+
+def touch(path: str) -> None:
+    """ Mark the entry containing the given path as changed in the ledger of
+        its directory, if there is one. Call after writing or removing files.
+    """
+    path = os.path.abspath(path)
+    with _ledgers_lock:
+        ledgers = list(_ledgers.values())
+    for entry_ledger in ledgers:
+        entry_ledger.touch(path)
+
+
+class DiskUsageLedger:
+    """ Sizes and ages of the top-level entries of a directory: a task or
+        a resource id each.
+
+        An entry is measured when it appears and again after it has been
+        touched, so the size and the cleanup cost a directory listing
+        instead of a walk of all the files. Changes made without touching
+        the entry are picked up by reconcile(), meant to run rarely in
+        the background.
+    """
+
+    def __init__(self, root: str, ledger_path: Optional[str] = None) -> None:
+        self.root = root
+        self.ledger_path = ledger_path
+        self._lock = threading.Lock()
+        # Held while the ledger file is written, the writes share a temporary
+        # file
+        self._save_lock = threading.Lock()
+        # Entry name -> [size in bytes, last change timestamp]
+        self._entries: Dict[str, List[float]] = {}
+        # Entry name -> when it was touched
+        self._dirty: Dict[str, float] = {}
+        self._load()
+
+    def touch(self, path: str) -> None:
+        now = time.time()
+        if path == self.root:
+            with self._lock:
+                self._dirty.update(dict.fromkeys(self._entries, now))
+            return
+        if not path.startswith(os.path.join(self.root, '')):
+            return
+        name = os.path.relpath(path, self.root).split(os.sep)[0]
+        with self._lock:
+            self._dirty[name] = now
+
+    def size(self) -> int:
+        """ Total size of the directory contents, in bytes """
+        self._refresh()
+        with self._lock:
+            return int(sum(size for size, _ in self._entries.values()))
+
+    def clear(self, older_than_seconds: int = 0) -> None:
+        """ Remove the entries that have not changed for the given amount of
+            seconds, or all of them """
+        self._refresh()
+        min_allowed_mtime = time.time() - older_than_seconds
+        with self._lock:
+            names = [name for name, (_, mtime) in self._entries.items()
+                     if older_than_seconds <= 0 or mtime <= min_allowed_mtime]
+
+        for name in names:
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.lexists(path):
+                os.remove(path)
+            with self._lock:
+                self._entries.pop(name, None)
+                self._dirty.pop(name, None)
+        if names:
+            self._save()
+
+    def reconcile(self, pause: float = 0.) -> None:
+        """ Measure all the entries anew, pausing for the given amount of
+            seconds between the entries to stay in the background """
+        for name in self._list():
+            if pause:
+                time.sleep(pause)
+            measured = self._measure(name)
+            with self._lock:
+                if measured:
+                    self._entries[name] = measured
+                else:
+                    self._entries.pop(name, None)
+        self._refresh()
+        self._save()
+
+    def _refresh(self) -> None:
+        names = set(self._list())
+        with self._lock:
+            for name in set(self._entries) - names:
+                del self._entries[name]
+            stale = {name: self._dirty.get(name, 0.) for name in names
+                     if name not in self._entries or name in self._dirty}
+            self._dirty.clear()
+        if not stale:
+            return
+
+        for name, touched in stale.items():
+            measured = self._measure(name, touched)
+            with self._lock:
+                if measured:
+                    self._entries[name] = measured
+                else:
+                    self._entries.pop(name, None)
+        self._save()
+
+    def _list(self) -> List[str]:
+        try:
+            return os.listdir(self.root)
+        except OSError:
+            return []
+
+    def _measure(self, name: str,
+                 touched: float = 0.) -> Optional[List[float]]:
+        path = os.path.join(self.root, name)
+        try:
+            mtime = os.path.getmtime(path)
+            if os.path.isdir(path):
+                size = get_dir_size(path)
+            else:
+                size = os.path.getsize(path)
+        except OSError:
+            return None
+
+        # The mtime of a directory reflects only the changes of its direct
+        # children, the time it was touched covers the rest
+        with self._lock:
+            _, previous_mtime = self._entries.get(name, (0, 0))
+        return [size, max(mtime, previous_mtime, touched)]
+
+    def _load(self) -> None:
+        if not self.ledger_path or not os.path.isfile(self.ledger_path):
+            return
+        try:
+            with open(self.ledger_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Cannot read disk usage ledger %r",
+                           self.ledger_path)
+            return
+        if data.get('root') == self.root:
+            self._entries = data.get('entries', {})
+
+    def _save(self) -> None:
+        if not self.ledger_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                data = {'root': self.root, 'entries': dict(self._entries)}
+            tmp_path = self.ledger_path + '.tmp'
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.ledger_path)
+            except OSError:
+                logger.warning("Cannot save disk usage ledger %r",
+                               self.ledger_path)
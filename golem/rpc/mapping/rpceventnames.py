@@ -37,6 +37,7 @@ class Resources:
 class Computation:
     evt_comp_started = 'comp.started'
     evt_comp_finished = 'comp.finished'
+    evt_comp_telemetry = 'evt.comp.telemetry'
 
 
 class Payments:
@@ -15,6 +15,7 @@ from twisted.internet.endpoints import (
     TCP4ClientEndpoint, TCP6ClientEndpoint, SSL4ClientEndpoint
 )
 
+from golem.core.profiler import Profiler
 from golem.rpc.common import X509_COMMON_NAME
 from golem.rpc import utils as rpc_utils
 
@@ -199,8 +200,10 @@ class Session(ApplicationSession):
 
     @inlineCallbacks
     def register_procedures(self, mapping):
+        profiler = Profiler.instance()
         for uri, procedure in mapping.items():
-            deferred = self.register(procedure, uri)
+            deferred = self.register(profiler.timed('rpc.' + uri, procedure),
+                                     uri)
             deferred.addErrback(self._on_error)
             yield deferred
 
@@ -1,11 +1,13 @@
-from copy import copy
 import logging
+import statistics
 from threading import Thread
-from typing import Union
+from typing import Dict, List, Tuple, Union
 
 from apps.core.benchmark.benchmarkrunner import BenchmarkRunner
 from apps.core.task.coretaskstate import TaskDesc
+from golem import hardware
 from golem.core.threads import callback_wrapper
+from golem.docker.image import ImageCache
 from golem.environments.environment import Environment as DefaultEnvironment
 
 from golem.model import Performance
@@ -14,8 +16,28 @@ from golem.task.taskstate import TaskStatus
 
 logger = logging.getLogger(__name__)
 
+# (benchmark, task builder class)
+BenchmarkData = Tuple[object, type]
+
+
+def median_and_dispersion(samples: List[float]) -> Tuple[float, float]:
+    """ Returns the median of the samples and their median absolute
+        deviation, relative to the median """
+    median = statistics.median(samples)
+    if not median:
+        return median, 0.0
+    deviation = statistics.median(abs(sample - median) for sample in samples)
+    return median, deviation / abs(median)
+
 
 class BenchmarkManager(object):
+    # Runs which are not measured, they fill the caches and the page cache
+    WARMUP_RUNS = 1
+    REPETITIONS = 3
+    # Measured runs are repeated when the dispersion is higher
+    MAX_DISPERSION = 0.1
+    MAX_RERUNS = 1
+
     def __init__(self, node_name, task_server, root_path, benchmarks=None):
         self.node_name = node_name
         self.task_server = task_server
@@ -28,24 +50,98 @@ class BenchmarkManager(object):
         ids = set(benchmark.environment_id for benchmark in query)
         return ids
 
+    def fingerprint(self, env_id, task_builder) -> str:
+        """ Benchmark results are valid as long as the hardware,
+            the configured limits and the benchmark images are the same """
+        config_desc = self.task_server.client.config_desc
+        return hardware.fingerprint(
+            env_id,
+            config_desc.num_cores,
+            config_desc.max_memory_size,
+            self._image_digests(task_builder),
+        )
+
+    @staticmethod
+    def _image_digests(task_builder) -> List[str]:
+        """ IDs of the images listed when Docker was started, the daemon is
+            not queried here """
+        try:
+            env = task_builder.TASK_CLASS.ENVIRONMENT_CLASS()
+            images = list(getattr(env, 'docker_images', None) or [])
+        except Exception:  # pylint: disable=broad-except
+            logger.debug("Unable to get benchmark images", exc_info=True)
+            return []
+
+        cache = ImageCache.instance()
+        return [
+            cache.image_id(image.name) or image.id or image.name
+            for image in images
+        ]
+
+    def get_outdated_benchmarks(self) -> Dict[str, BenchmarkData]:
+        """ Returns benchmarks without a result saved for the current
+            fingerprint """
+        if not self.benchmarks:
+            return {}
+        query = Performance.select(Performance.environment_id,
+                                   Performance.fingerprint)
+        saved = {perf.environment_id: perf.fingerprint for perf in query}
+        return {
+            env_id: data for env_id, data in self.benchmarks.items()
+            if saved.get(env_id) != self.fingerprint(env_id, data[1])
+        }
+
     def benchmarks_needed(self):
         if self.benchmarks:
             ids = self.get_saved_benchmarks_ids()
-            return not set(self.benchmarks.keys() |
-                           {DefaultEnvironment.get_id()}).issubset(ids)
+            if DefaultEnvironment.get_id() not in ids:
+                return True
+            return bool(self.get_outdated_benchmarks())
         return False
 
     def run_benchmark(self, benchmark, task_builder, env_id, success=None,
                       error=None):
+        """ Runs WARMUP_RUNS runs, which are discarded, and REPETITIONS
+            measured runs. The measured runs are repeated up to MAX_RERUNS
+            times while their dispersion exceeds MAX_DISPERSION. The median
+            of all measured runs is saved as the performance. """
         logger.info('Running benchmark for %s', env_id)
 
-        from golem_messages.datastructures.p2p import Node
-
-        def success_callback(performance):
-            logger.info('%s performance is %.2f', env_id, performance)
-            Performance.update_or_create(env_id, performance)
+        fingerprint = self.fingerprint(env_id, task_builder)
+        warmup_runs = self.WARMUP_RUNS
+        reruns = 0
+        samples: List[float] = []
+
+        def run():
+            self._run_once(benchmark, task_builder, sample_callback,
+                           error_callback)
+
+        def sample_callback(performance):
+            nonlocal warmup_runs, reruns
+            if warmup_runs > 0:
+                warmup_runs -= 1
+                logger.debug('%s warm-up performance is %.2f',
+                             env_id, performance)
+                return run()
+
+            samples.append(performance)
+            if len(samples) < self.REPETITIONS * (reruns + 1):
+                return run()
+
+            median, dispersion = median_and_dispersion(samples)
+            if dispersion > self.MAX_DISPERSION and reruns < self.MAX_RERUNS:
+                reruns += 1
+                logger.info('%s performance dispersion is %.2f, rerunning',
+                            env_id, dispersion)
+                return run()
+
+            logger.info('%s performance is %.2f (dispersion %.2f, %d runs)',
+                        env_id, median, dispersion, len(samples))
+            Performance.update_or_create(env_id, median, dispersion,
+                                         fingerprint)
             if success:
-                success(performance)
+                success(median)
+            return None
 
         def error_callback(err: Union[str, Exception]):
             logger.error("Unable to run %s benchmark: %s", env_id, str(err))
@@ -54,6 +150,12 @@ class BenchmarkManager(object):
                     err = Exception(err)
                 error(err)
 
+        run()
+
+    def _run_once(self, benchmark, task_builder, success_callback,
+                  error_callback):
+        from golem_messages.datastructures.p2p import Node
+
         task_state = TaskDesc()
         task_state.status = TaskStatus.notStarted
         task_state.definition = benchmark.task_definition
@@ -78,7 +180,9 @@ class BenchmarkManager(object):
                     self.task_server.client.config_desc.num_cores)
 
         def run_non_default_benchmarks(_performance=None):
-            self.run_benchmarks(copy(self.benchmarks), success, error)
+            # Benchmarks saved for the current fingerprint are not repeated
+            self.run_benchmarks(self.get_outdated_benchmarks(), success,
+                                error)
 
         if DefaultEnvironment.get_id() not in self.get_saved_benchmarks_ids():
             # run once in lifetime, since it's for single CPU core
@@ -87,6 +191,8 @@ class BenchmarkManager(object):
             run_non_default_benchmarks()
 
     def run_benchmarks(self, benchmarks, success=None, error=None):
+        """ Runs the benchmarks one after another, so that they do not
+            compete for the cores """
         if not benchmarks:
             if success:
                 success(None)
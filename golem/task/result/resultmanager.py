@@ -5,6 +5,7 @@ import os
 
 from golem.core import golem_async
 from golem.core.fileencrypt import FileEncryptor
+from golem.resource import diskusage
 from .resultpackage import (
     EncryptingTaskResultPackager, ExtractedPackage, ZipTaskResultPackager)
 
@@ -92,6 +93,7 @@ class EncryptedResultPackageManager(TaskResultPackageManager):
             encrypted_package_path,
             task_result.result,
         )
+        diskusage.touch(encrypted_package_path)
 
         package_path = packager.package_name(encrypted_package_path)
         package_size = os.path.getsize(package_path)
@@ -121,8 +123,12 @@ class EncryptedResultPackageManager(TaskResultPackageManager):
             raise ValueError("Empty key / secret")
 
         packager = self.package_class(key_or_secret)
-        return packager.extract(path, output_dir=output_dir)
+        extracted = packager.extract(path, output_dir=output_dir)
+        diskusage.touch(output_dir or path)
+        return extracted
 
     def extract_zip(self, path, output_dir=None) -> ExtractedPackage:
         packager = self.zip_package_class()
-        return packager.extract(path, output_dir=output_dir)
+        extracted = packager.extract(path, output_dir=output_dir)
+        diskusage.touch(output_dir or path)
+        return extracted
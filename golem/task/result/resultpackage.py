@@ -7,7 +7,7 @@ from typing import Dict
 import abc
 import os
 
-from golem.core.fileencrypt import AESFileEncryptor
+from golem.core.fileencrypt import AESFileEncryptor, AESGCMFileEncryptor
 from golem.core.fileshelper import common_dir, relative_path
 from golem.core.printable_object import PrintableObject
 from golem.core.simplehash import SimpleHash
@@ -144,7 +144,9 @@ class ZipPackager(Packager):
 class EncryptingPackager(Packager):
 
     creator_class = ZipPackager
-    encryptor_class = AESFileEncryptor
+    encryptor_class = AESGCMFileEncryptor
+    # Packages created before the segmented format
+    legacy_encryptor_class = AESFileEncryptor
 
     def __init__(self, secret):
         self._packager = self.creator_class()
@@ -167,8 +169,12 @@ class EncryptingPackager(Packager):
         tmp_file_path = self.package_name(input_path)
         backup_rename(tmp_file_path)
 
-        self.encryptor_class.decrypt(input_path, tmp_file_path,
-                                     secret=self._secret)
+        encryptor_class = self.encryptor_class
+        if not encryptor_class.recognizes(input_path):
+            encryptor_class = self.legacy_encryptor_class
+
+        encryptor_class.decrypt(input_path, tmp_file_path,
+                                secret=self._secret)
         os.remove(input_path)
 
         return self._packager.extract(tmp_file_path, output_dir=output_dir)
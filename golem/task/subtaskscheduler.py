@@ -0,0 +1,169 @@
+import logging
+import math
+from typing import Dict, List, NamedTuple, Optional
+
+from peewee import PeeweeException
+
+from golem.model import SubtaskUsage
+
+logger = logging.getLogger(__name__)
+
+
+class Footprint(NamedTuple):
+    """ Resources needed to compute a subtask of an environment """
+    cpus: int
+    memory: int  # KiB
+
+
+class Reservation(NamedTuple):
+    """ Part of the hardware preset given to a single subtask """
+    cpus: List[int]
+    memory: int  # KiB
+
+
+class SubtaskScheduler:
+    """ Partitions the CPU cores and memory of the hardware preset among
+        subtasks computed concurrently.
+
+        Every admitted subtask is given the footprint measured for its
+        environment (see golem.model.SubtaskUsage). A subtask is only
+        admitted when its footprint fits into the free part of the preset,
+        so it is computed as soon as its resources are downloaded and never
+        waits for other subtasks while its deadline runs.
+
+        Environments without enough measurements, or whose subtasks kept the
+        cores they were given busy, get the whole preset. """
+
+    SAMPLES = 20
+    MIN_SAMPLES = 3
+    # CPU time / (wall clock time * cores) above which the cores given to
+    # a subtask are considered to be too few
+    SATURATION = 0.9
+    MEMORY_HEADROOM = 1.25
+    MIN_MEMORY = 256 * 1024  # KiB
+
+    def __init__(
+            self,
+            cpus: List[int],
+            memory: int,
+            max_subtasks: int = 1,
+    ) -> None:
+        self._cpus: List[int] = []
+        self._memory = 0
+        self.max_subtasks = 1
+        self.update_config(cpus, memory, max_subtasks)
+
+        self._footprints: Dict[Optional[str], Footprint] = {}
+        self._environments: Dict[str, Optional[str]] = {}
+        self._reservations: Dict[str, Reservation] = {}
+
+    def update_config(
+            self,
+            cpus: List[int],
+            memory: int,
+            max_subtasks: int,
+    ) -> None:
+        self._cpus = list(cpus)
+        self._memory = memory
+        self.max_subtasks = max(1, max_subtasks)
+        self._footprints = {}
+
+    @property
+    def assigned(self) -> int:
+        return len(self._environments)
+
+    def footprint(self, environment: Optional[str]) -> Footprint:
+        if environment not in self._footprints:
+            self._footprints[environment] = self._measure(environment) \
+                or Footprint(len(self._cpus), self._memory)
+        return self._footprints[environment]
+
+    def _measure(self, environment: Optional[str]) -> Optional[Footprint]:
+        if environment is None:
+            return None
+        try:
+            usages = list(
+                SubtaskUsage.select()
+                .where(
+                    SubtaskUsage.environment == environment,
+                    SubtaskUsage.success == True,  # noqa pylint: disable=singleton-comparison
+                    SubtaskUsage.duration > 0,
+                )
+                .order_by(SubtaskUsage.created_date.desc())
+                .limit(self.SAMPLES)
+            )
+        except PeeweeException:
+            logger.exception("Cannot read usage of environment %r",
+                             environment)
+            return None
+        if len(usages) < self.MIN_SAMPLES:
+            return None
+
+        cores = 0.0
+        for usage in usages:
+            used = usage.cpu_time / usage.duration
+            if used >= self.SATURATION * max(1, usage.cpu_count):
+                return None
+            cores = max(cores, used)
+        memory = max(usage.peak_memory for usage in usages) / 1024
+        return Footprint(
+            cpus=min(len(self._cpus), max(1, math.ceil(cores))),
+            memory=min(self._memory, max(
+                self.MIN_MEMORY, int(memory * self.MEMORY_HEADROOM))),
+        )
+
+    def _free(self) -> Reservation:
+        reserved = [cpu for reservation in self._reservations.values()
+                    for cpu in reservation.cpus]
+        return Reservation(
+            cpus=[cpu for cpu in self._cpus if cpu not in reserved],
+            memory=self._memory - sum(
+                reservation.memory
+                for reservation in self._reservations.values()),
+        )
+
+    def _fits(self, footprint: Footprint) -> bool:
+        free = self._free()
+        return len(free.cpus) >= footprint.cpus \
+            and free.memory >= footprint.memory
+
+    def can_admit(self, environment: Optional[str] = None) -> bool:
+        """ Tells whether a subtask of the environment would be admitted now
+            or, without an environment, whether any subtask would """
+        if self.assigned >= self.max_subtasks:
+            return False
+        if environment is None:
+            return bool(self._free().cpus)
+        return self._fits(self.footprint(environment))
+
+    def admit(self, subtask_id: str, environment: Optional[str]) -> bool:
+        """ Reserves the footprint of the environment for the subtask.
+            Returns False, admitting nothing, if it does not fit. """
+        if self.assigned >= self.max_subtasks:
+            return False
+        footprint = self.footprint(environment)
+        if not self._fits(footprint):
+            return False
+        free = self._free()
+        self._environments[subtask_id] = environment
+        self._reservations[subtask_id] = Reservation(
+            cpus=free.cpus[:footprint.cpus],
+            memory=footprint.memory,
+        )
+        logger.debug("Subtask admitted. subtask_id=%r, environment=%r, "
+                     "reservation=%r", subtask_id, environment,
+                     self._reservations[subtask_id])
+        return True
+
+    def reservation(self, subtask_id: str) -> Optional[Reservation]:
+        """ Returns None unless the subtask is admitted """
+        return self._reservations.get(subtask_id)
+
+    def release(self, subtask_id: str) -> None:
+        """ Frees the resources of a finished or interrupted subtask. The
+            footprint of its environment is measured again. """
+        if subtask_id not in self._environments:
+            return
+        environment = self._environments.pop(subtask_id)
+        self._reservations.pop(subtask_id, None)
+        self._footprints.pop(environment, None)
@@ -1,7 +1,8 @@
 import asyncio
+import functools
 import logging
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING, Callable, Any
+from typing import Optional, TYPE_CHECKING, Callable, Any, Dict, List, Tuple
 
 import os
 import time
@@ -11,9 +12,11 @@ from threading import Lock
 from dataclasses import dataclass
 from golem_messages.message.tasks import ComputeTaskDef, TaskHeader
 from golem_task_api import ProviderAppClient, constants as task_api_constants
+from peewee import PeeweeException
 from pydispatch import dispatcher
 from twisted.internet import defer
 
+from golem import hardware
 from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core.common import deadline_to_timeout
 from golem.core.deferred import sync_wait, deferred_from_future
@@ -21,13 +24,17 @@ from golem.core.statskeeper import IntStatsKeeper
 from golem.docker.image import DockerImage
 from golem.docker.manager import DockerManager
 from golem.docker.task_thread import DockerTaskThread
+from golem.docker.usage import ContainerUsage
 from golem.envs import EnvId, Runtime, EnvStatus
 from golem.envs.docker.cpu import DockerCPUConfig, DockerCPUEnvironment
 from golem.hardware import scale_memory, MemSize
 from golem.manager.nodestatesnapshot import ComputingSubtaskStateSnapshot
+from golem.model import SubtaskUsage
+from golem.resource import diskusage
 from golem.resource.dirmanager import DirManager
 from golem.task.task_api import EnvironmentTaskApiService
 from golem.task.envmanager import EnvironmentManager
+from golem.task.subtaskscheduler import SubtaskScheduler
 from golem.task.timer import ProviderTimer
 from golem.vm.vm import PythonProcVM, PythonTestVM
 
@@ -49,7 +56,13 @@ class CompStats(object):
 
 
 class TaskComputerAdapter:
-    """ This class hides old and new task computer under a single interface. """
+    """ This class hides old and new task computer under a single interface.
+
+    Subtasks of the old computer are computed concurrently, by several
+    TaskComputers sharing the hardware preset as partitioned by
+    a SubtaskScheduler. A task-api subtask is only computed alone. """
+
+    # pylint: disable=too-many-instance-attributes
 
     def __init__(
             self,
@@ -60,12 +73,9 @@ class TaskComputerAdapter:
     ) -> None:
         self.stats = IntStatsKeeper(CompStats)
         self._task_server = task_server
-        self._old_computer = TaskComputer(
-            task_server=task_server,
-            stats_keeper=self.stats,
-            use_docker_manager=use_docker_manager,
-            finished_cb=finished_cb
-        )
+        self._finished_cb = finished_cb
+        self._old_computers: List[TaskComputer] = []
+        self._old_computer = self._create_old_computer(use_docker_manager)
         self._new_computer = NewTaskComputer(
             env_manager=env_manager,
             work_dir=task_server.get_task_computer_root(),
@@ -74,41 +84,124 @@ class TaskComputerAdapter:
         )
         sync_wait(self._new_computer.prepare())
 
+        self._scheduler = SubtaskScheduler(
+            *self._preset(task_server.config_desc))
+        # Subtasks of the old computers, in the order of assignment
+        self._subtasks: Dict[str, TaskComputer] = {}
+
         # Should this node behave as provider and compute tasks?
         self.compute_tasks = task_server.config_desc.accept_tasks \
             and not task_server.config_desc.in_shutdown
         self.runnable = True
         self._listeners = []  # type: ignore
 
+    def _create_old_computer(self, use_docker_manager: bool) -> 'TaskComputer':
+        computer = TaskComputer(
+            task_server=self._task_server,
+            stats_keeper=self.stats,
+            use_docker_manager=use_docker_manager,
+            finished_cb=functools.partial(
+                self._old_task_finished, len(self._old_computers))
+        )
+        self._old_computers.append(computer)
+        return computer
+
+    @staticmethod
+    def _preset(config_desc: ClientConfigDescriptor) \
+            -> Tuple[List[int], int, int]:
+        return (
+            hardware.cpus()[:max(1, config_desc.num_cores)],
+            config_desc.max_memory_size,
+            config_desc.max_concurrent_subtasks,
+        )
+
     @property
     def dir_manager(self) -> DirManager:
         # FIXME: This shouldn't be part of the public interface probably
         return self._old_computer.dir_manager
 
-    def task_given(self, ctd: ComputeTaskDef) -> None:
+    def can_take_task(self, task_header: Optional[TaskHeader] = None) -> bool:
+        """ Tells whether a subtask of the task would be accepted now or,
+            without a task header, whether any subtask would """
+        if self._new_computer.has_assigned_task():
+            return False
+        if task_header is None:
+            return self._scheduler.can_admit()
+        if task_header.environment_prerequisites is not None:
+            return not self._has_old_task()
+        return self._scheduler.can_admit(task_header.environment) \
+            and self._old_computer_of(task_header.task_id) is None
+
+    def task_given(self, ctd: ComputeTaskDef) -> bool:
+        """ Returns False if the subtask does not fit into the free part
+            of the hardware preset """
         assert not self._new_computer.has_assigned_task()
-        assert not self._old_computer.has_assigned_task()
 
         task_id = ctd['task_id']
         task_header = self._task_server.task_keeper.task_headers[task_id]
         if task_header.environment_prerequisites is not None:
+            assert not self._has_old_task()
             self._new_computer.task_given(task_header, ctd)
-        else:
-            self._old_computer.task_given(ctd)
+            return True
+
+        assert self._old_computer_of(task_id) is None
+        if not self._scheduler.admit(
+                ctd['subtask_id'], task_header.environment):
+            logger.warning("Subtask %r does not fit into the free resources",
+                           ctd['subtask_id'])
+            return False
+        computer = self._idle_old_computer()
+        assert computer is not None
+        if not self._subtasks:
+            ProviderTimer.start()
+        self._subtasks[ctd['subtask_id']] = computer
+        computer.task_given(ctd)
+        return True
+
+    def _idle_old_computer(self) -> Optional['TaskComputer']:
+        for computer in self._old_computers:
+            if not computer.has_assigned_task():
+                return computer
+        if len(self._old_computers) < self._scheduler.max_subtasks:
+            # Only the first computer configures the Docker VM
+            computer = self._create_old_computer(use_docker_manager=False)
+            computer.support_direct_computation = \
+                self.support_direct_computation
+            return computer
+        return None
+
+    def _old_computer_of(self, task_id: str) -> Optional['TaskComputer']:
+        for computer in self._old_computers:
+            if computer.assigned_task_id == task_id:
+                return computer
+        return None
+
+    def _has_old_task(self) -> bool:
+        return any(c.has_assigned_task() for c in self._old_computers)
 
     def has_assigned_task(self) -> bool:
-        return self._new_computer.has_assigned_task() \
-            or self._old_computer.has_assigned_task()
+        return self._new_computer.has_assigned_task() or self._has_old_task()
 
     @property
     def assigned_task_id(self) -> Optional[str]:
-        return self._new_computer.assigned_task_id \
-            or self._old_computer.assigned_task_id
+        """ One of the assigned tasks """
+        return self._new_computer.assigned_task_id or next(
+            (c.assigned_task_id for c in self._old_computers
+             if c.assigned_task_id), None)
 
     @property
     def assigned_subtask_id(self) -> Optional[str]:
-        return self._new_computer.assigned_subtask_id \
-            or self._old_computer.assigned_subtask_id
+        """ One of the assigned subtasks """
+        return self._new_computer.assigned_subtask_id or next(
+            (c.assigned_subtask_id for c in self._old_computers
+             if c.assigned_subtask_id), None)
+
+    def get_assigned_subtask_id(self, task_id: str) -> Optional[str]:
+        """ Returns None unless a subtask of the task is assigned """
+        if self._new_computer.assigned_task_id == task_id:
+            return self._new_computer.assigned_subtask_id
+        computer = self._old_computer_of(task_id)
+        return None if computer is None else computer.assigned_subtask_id
 
     @property
     def support_direct_computation(self) -> bool:
@@ -116,7 +209,8 @@ class TaskComputerAdapter:
 
     @support_direct_computation.setter
     def support_direct_computation(self, value: bool) -> None:
-        self._old_computer.support_direct_computation = value
+        for computer in self._old_computers:
+            computer.support_direct_computation = value
 
     def get_task_resources_dir(self) -> Path:
         if not self._new_computer.has_assigned_task():
@@ -125,17 +219,37 @@ class TaskComputerAdapter:
                 'is assigned')
         return self._new_computer.get_task_resources_dir()
 
-    def start_computation(self) -> None:
+    def start_computation(self, task_id: str) -> None:
+        """ Called once the resources of the task's subtask are collected """
         if self._new_computer.has_assigned_task():
             task_id = self.assigned_task_id
             subtask_id = self.assigned_subtask_id
             computation = self._new_computer.compute()
             # Fire and forget because it resolves when computation ends
             self._handle_computation_results(task_id, subtask_id, computation)
-        elif self._old_computer.has_assigned_task():
-            self._old_computer.start_computation()
-        else:
+            return
+
+        computer = self._old_computer_of(task_id)
+        if computer is None:
             raise RuntimeError('start_computation: No task assigned.')
+        subtask_id = computer.assigned_subtask_id
+        reservation = self._scheduler.reservation(subtask_id)
+        assert reservation is not None
+        logger.info("Starting subtask %r on cores %r with %r KiB of memory",
+                    subtask_id, reservation.cpus, reservation.memory)
+        computer.start_computation(
+            cpus=reservation.cpus,
+            memory=reservation.memory)
+
+    def _old_task_finished(self, index: int) -> None:
+        computer = self._old_computers[index]
+        for subtask_id, assigned in list(self._subtasks.items()):
+            if assigned is computer:
+                del self._subtasks[subtask_id]
+                self._scheduler.release(subtask_id)
+        if not self._subtasks:
+            ProviderTimer.finish()
+        self._finished_cb()
 
     # FIXME: Move this code to TaskServer when old TaskComputer is removed
     @defer.inlineCallbacks
@@ -159,29 +273,36 @@ class TaskComputerAdapter:
                 err_msg=str(e)
             )
 
-    def task_interrupted(self) -> None:
+    def task_interrupted(self, task_id: str) -> None:
         if self._new_computer.has_assigned_task():
             self._new_computer.task_interrupted()
-        elif self._old_computer.has_assigned_task():
-            self._old_computer.task_interrupted()
-        else:
+            return
+        computer = self._old_computer_of(task_id)
+        if computer is None:
             raise RuntimeError('task_interrupted: No task assigned.')
+        computer.task_interrupted()
 
     def check_timeout(self) -> None:
         # No active timeout checking is needed for the new computer
-        if self._old_computer.has_assigned_task():
-            self._old_computer.check_timeout()
+        for computer in self._old_computers:
+            if computer.has_assigned_task():
+                computer.check_timeout()
 
     def get_progress(self) -> Optional[ComputingSubtaskStateSnapshot]:
-        if self._old_computer.has_assigned_task():
-            return self._old_computer.get_progress()
+        """ Progress of one of the computed subtasks """
+        for computer in self._old_computers:
+            if computer.has_assigned_task():
+                progress = computer.get_progress()
+                if progress is not None:
+                    return progress
         return None
 
     def get_environment(self) -> Optional[EnvId]:
         if self._new_computer.has_assigned_task():
             return self._new_computer.get_current_computing_env()
-        if self._old_computer.has_assigned_task():
-            return self._old_computer.get_environment()
+        for computer in self._old_computers:
+            if computer.has_assigned_task():
+                return computer.get_environment()
         return None
 
     def register_listener(self, listener):
@@ -192,6 +313,9 @@ class TaskComputerAdapter:
         for l in self._listeners:
             l.lock_config(on)
 
+    def _is_computing(self) -> bool:
+        return any(c.counting_thread is not None for c in self._old_computers)
+
     @defer.inlineCallbacks
     def change_config(
             self,
@@ -200,17 +324,24 @@ class TaskComputerAdapter:
     ) -> defer.Deferred:
         self.compute_tasks = config_desc.accept_tasks \
             and not config_desc.in_shutdown
+        self._scheduler.update_config(*self._preset(config_desc))
         work_dir = Path(self._task_server.get_task_computer_root())
         yield self._new_computer.change_config(
             config_desc=config_desc,
             work_dir=work_dir)
+        for computer in self._old_computers[1:]:
+            yield computer.change_config(
+                config_desc=config_desc,
+                in_background=in_background)
         return (yield self._old_computer.change_config(
             config_desc=config_desc,
-            in_background=in_background))
+            in_background=in_background,
+            status_callback=self._is_computing))
 
     def quit(self) -> None:
         sync_wait(self._new_computer.clean_up())
-        self._old_computer.quit()
+        for computer in self._old_computers:
+            computer.quit()
 
 
 class NewTaskComputer:
@@ -474,7 +605,6 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
     def task_given(self, ctd: ComputeTaskDef) -> None:
         assert self.assigned_subtask is None
         self.assigned_subtask = ctd
-        ProviderTimer.start()
 
     def has_assigned_task(self) -> bool:
         return bool(self.assigned_subtask)
@@ -498,6 +628,7 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
     def task_computed(self, task_thread: TaskThread) -> None:
         if task_thread.end_time is None:
             task_thread.end_time = time.time()
+        diskusage.touch(task_thread.tmp_path)
 
         work_wall_clock_time = task_thread.end_time - task_thread.start_time
         try:
@@ -558,10 +689,44 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
                 "Wrong result format",
             )
 
+        self._save_usage(task_thread, subtask_id, task_id,
+                         task_header.environment, was_success,
+                         self.task_server.config_desc.num_cores)
         dispatcher.send(signal='golem.monitor', event='computation_time_spent',
                         success=was_success, value=work_time_to_be_paid)
         self._task_finished()
 
+    @staticmethod
+    def _save_usage(  # pylint: disable=too-many-arguments
+            task_thread: TaskThread,
+            subtask_id: str,
+            task_id: str,
+            environment: Optional[str],
+            success: bool,
+            cpu_count: int
+    ) -> None:
+        """ Stores container usage measured by DockerTaskThread, also for
+            failed computations. `cpu_count` is the number of cores of the
+            hardware preset, used unless the thread was given fewer. """
+        usage = getattr(task_thread, 'usage', None)
+        if not isinstance(usage, ContainerUsage):
+            return
+        if task_thread.cpus:
+            cpu_count = len(task_thread.cpus)
+        logger.info("Subtask %r used: %r", subtask_id, usage)
+        try:
+            SubtaskUsage.insert(
+                subtask_id=subtask_id,
+                task_id=task_id,
+                environment=environment,
+                success=success,
+                duration=task_thread.end_time - task_thread.start_time,
+                cpu_count=cpu_count,
+                **usage.to_dict(),
+            ).upsert().execute()
+        except PeeweeException:
+            logger.exception("Cannot save usage of subtask %r", subtask_id)
+
     def check_timeout(self):
         if self.counting_thread is not None:
             self.counting_thread.check_timeout()
@@ -613,8 +778,11 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
     def change_config(
             self,
             config_desc: ClientConfigDescriptor,
-            in_background: bool = True
+            in_background: bool = True,
+            status_callback: Optional[Callable[[], bool]] = None
     ) -> defer.Deferred:
+        """ Docker VM settings are applied once `status_callback` (by
+            default: whether this computer is computing) returns False """
 
         self.dir_manager = DirManager(
             self.task_server.get_task_computer_root())
@@ -629,7 +797,7 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             # PyLint thinks dm is of type DockerConfigManager not DockerManager
             # pylint: disable=no-member
             dm.update_config(
-                status_callback=self._is_computing,
+                status_callback=status_callback or self._is_computing,
                 done_callback=deferred.callback,
                 work_dirs=work_dirs,
                 in_background=in_background
@@ -638,7 +806,13 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
 
         return False
 
-    def start_computation(self) -> None:  # pylint: disable=too-many-locals
+    def start_computation(  # pylint: disable=too-many-locals
+            self,
+            cpus: Optional[List[int]] = None,
+            memory: Optional[int] = None
+    ) -> None:
+        """ Docker containers are limited to the given CPU cores and memory
+            (KiB) instead of the whole hardware preset """
         subtask = self.assigned_subtask
         assert subtask is not None
 
@@ -679,7 +853,10 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
             dir_mapping = DockerTaskThread.generate_dir_mapping(resource_dir,
                                                                 temp_dir)
             tt = DockerTaskThread(docker_images, extra_data,
-                                  dir_mapping, task_timeout)
+                                  dir_mapping, task_timeout,
+                                  subtask_id=subtask_id,
+                                  cpus=cpus,
+                                  memory=memory)
         elif self.support_direct_computation:
             tt = PyTaskThread(extra_data, resource_dir, temp_dir,
                               task_timeout)
@@ -705,7 +882,6 @@ class TaskComputer:  # pylint: disable=too-many-instance-attributes
         assert ctd is not None
         self.assigned_subtask = None
 
-        ProviderTimer.finish()
         dispatcher.send(
             signal='golem.taskcomputer',
             event='subtask_finished',
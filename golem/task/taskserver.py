@@ -296,13 +296,14 @@ class TaskServer(
                 < self.config_desc.task_request_interval:
             return
 
-        if self.task_computer.has_assigned_task() \
+        if not self.task_computer.can_take_task() \
                 or (not self.task_computer.compute_tasks) \
                 or (not self.task_computer.runnable):
             return
 
         task_header = self.task_keeper.get_task(self.requested_tasks)
-        if task_header is None:
+        if task_header is None \
+                or not self.task_computer.can_take_task(task_header):
             return
 
         self._last_task_request_time = time.time()
@@ -432,22 +433,27 @@ class TaskServer(
             self,
             msg: message.tasks.TaskToCompute,
     ) -> bool:
-        if self.task_computer.has_assigned_task():
-            logger.error("Trying to assign a task, when it's already assigned")
+        if not self.task_computer.can_take_task(
+                msg.want_to_compute_task.task_header):
+            logger.error("Trying to assign a task, when it cannot be taken")
             return False
 
-        self.task_computer.task_given(msg.compute_task_def)
-        if msg.want_to_compute_task.task_header.environment_prerequisites:
-            deferreds = []
+        if not self.task_computer.task_given(msg.compute_task_def):
+            return False
+        task_header = msg.want_to_compute_task.task_header
+        if task_header.environment_prerequisites:
+            # Prerequisites are installed while the resources are downloaded
+            deferreds = [self._install_prerequisites(task_header)]
             for resource_id in msg.compute_task_def['resources']:
                 deferreds.append(self.new_resource_manager.download(
                     resource_id,
                     self.task_computer.get_task_resources_dir(),
                     msg.resources_options,
                 ))
-            defer.gatherResults(deferreds).addBoth(
+            defer.gatherResults(deferreds, consumeErrors=True).addCallbacks(
                 lambda _: self.resource_collected(msg.task_id),
-                lambda e: self.resource_failure(msg.task_id, e),
+                lambda e: self.resource_failure(
+                    msg.task_id, e.value.subFailure.value),
             )
         else:
             self.request_resource(
@@ -466,21 +472,37 @@ class TaskServer(
         )
         return True
 
+    @inlineCallbacks
+    def _install_prerequisites(
+            self,
+            task_header: dt_tasks.TaskHeader,
+    ) -> Deferred:
+        """ Makes sure the prerequisites checked when the task was requested
+            are still installed """
+        env = self.task_keeper.new_env_manager.environment(
+            task_header.environment)
+        prerequisites = env.parse_prerequisites(
+            task_header.environment_prerequisites)
+        installed = yield env.install_prerequisites(prerequisites)
+        if not installed:
+            raise RuntimeError(
+                f"Installing prerequisites failed: {prerequisites}")
+
     def resource_collected(self, task_id: str) -> bool:
-        if self.task_computer.assigned_task_id != task_id:
+        if self.task_computer.get_assigned_subtask_id(task_id) is None:
             logger.error("Resource collected for a wrong task, %s", task_id)
             return False
 
-        self.task_computer.start_computation()
+        self.task_computer.start_computation(task_id)
         return True
 
     def resource_failure(self, task_id: str, reason: str) -> None:
-        if self.task_computer.assigned_task_id != task_id:
+        subtask_id = self.task_computer.get_assigned_subtask_id(task_id)
+        if subtask_id is None:
             logger.error("Resource failure for a wrong task, %s", task_id)
             return
 
-        subtask_id = self.task_computer.assigned_subtask_id
-        self.task_computer.task_interrupted()
+        self.task_computer.task_interrupted(task_id)
         self.send_task_failed(
             subtask_id,
             task_id,
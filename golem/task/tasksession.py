@@ -559,7 +559,8 @@ class TaskSession(BasicSafeSession, ResourceHandshakeSessionMixin):
 
         reasons = message.tasks.CannotComputeTask.REASON
 
-        if self.task_computer.has_assigned_task():
+        if not self.task_computer.can_take_task(
+                want_to_compute_task.task_header):
             _cannot_compute(reasons.OfferCancelled)
             return
 
@@ -131,7 +131,7 @@ class DatabaseFixture(TempDirFixture):
                                  db_dir=self.tempdir)
 
     def tearDown(self):
-        self.database.db.close()
+        self.database.close()
         super(DatabaseFixture, self).tearDown()
 
 
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Wall-clock time of full BlenderVerifier runs on the bundled test scenes.
+
+Each run starts the verifier image, renders the crops and compares them with
+the result images. Compare images built before and after a change:
+
+    python -m scripts.benchmarks.blender_verifier --tag 1.7 --tag 1.8
+
+Requires Docker and the requested golemfactory/blender_verifier images.
+"""
+import os
+import random
+import shutil
+import time
+from typing import Any, Dict, List
+from unittest import mock
+
+import click
+from golem_messages.message import ComputeTaskDef
+
+from golem.core.common import get_golem_path
+from golem.core.deferred import sync_wait
+from golem.docker.image import DockerImage
+from golem.docker.manager import DockerManager
+from golem.docker.task_thread import DockerTaskThread
+from golem.verifier.blender_verifier import BlenderVerifier
+from scripts.benchmarks.common import Timer, summary, temp_dir
+
+TEST_DATA = os.path.join(
+    get_golem_path(), 'tests', 'apps', 'blender', 'verification', 'test_data')
+SCENE = os.path.join(TEST_DATA, 'chessboard_400x400.blend')
+SCENARIOS = {
+    'good_image': ['chessboard_400x400_1.png'],
+    'bad_image': ['very_bad_image.png'],
+    'two_frames': ['chessboard_400x400_1.png', 'chessboard_400x400_2.png'],
+}
+TIMEOUT = 600
+
+
+def _subtask_info(tmp_dir: str, frames: List[int]) -> Dict[str, Any]:
+    info = dict(
+        scene_file='/golem/resources/chessboard_400x400.blend',
+        resolution=[400, 400],
+        use_compositing=False,
+        samples=30,
+        frames=frames,
+        all_frames=frames,
+        output_format='PNG',
+        use_frames=len(frames) > 1,
+        start_task=1,
+        total_tasks=1,
+        crops=[dict(
+            outfilebasename='GolemTask_1',
+            borders_x=[0.0, 1.0],
+            borders_y=[0.0, 1.0],
+        )],
+        entrypoint='python3 /golem/entrypoints/verifier_entrypoint.py',
+        path_root=TEST_DATA,
+        subtask_id=str(random.randint(1 * 10 ** 36, 9 * 10 ** 36)),
+    )
+    info.update(
+        ctd=ComputeTaskDef(
+            deadline=time.time() + 3600,
+            docker_images=[
+                DockerImage('golemfactory/blender', tag='1.9').to_dict()
+            ],
+            extra_data=dict(info),
+        ),
+        crop_window=[0.0, 1.0, 0.0, 1.0],
+        tmp_dir=tmp_dir,
+        subtask_timeout=TIMEOUT,
+        parts=1,
+    )
+    return info
+
+
+def run_verification(path: str, results: List[str]) -> bool:
+    tmp_dir = os.path.join(path, 'tmp')
+    os.makedirs(tmp_dir)
+    result_paths = []
+    for result in results:
+        result_path = os.path.join(tmp_dir, result)
+        shutil.copyfile(os.path.join(TEST_DATA, result), result_path)
+        result_paths.append(result_path)
+
+    verifier = BlenderVerifier(dict(
+        subtask_info=_subtask_info(
+            tmp_dir, list(range(1, len(results) + 1))),
+        results=result_paths,
+        reference_data=[],
+        resources=[SCENE],
+        paths=TEST_DATA,
+    ), DockerTaskThread)
+    try:
+        sync_wait(verifier.start_verification(), TIMEOUT)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+@click.command()
+@click.option('--tag', '-t', 'tags', multiple=True,
+              default=(BlenderVerifier.DOCKER_TAG,))
+@click.option('--repeat', '-r', default=3)
+def main(tags, repeat):
+    manager = DockerTaskThread.docker_manager = DockerManager.install()
+    with temp_dir() as root:
+        manager.update_config(
+            status_callback=mock.Mock(),
+            done_callback=mock.Mock(),
+            work_dirs=[root],
+            in_background=True)
+
+        for tag in tags:
+            for name, results in SCENARIOS.items():
+                timer = Timer()
+                verdicts = set()
+                for i in range(repeat):
+                    path = os.path.join(root, f'{tag}-{name}-{i}')
+                    with mock.patch.object(BlenderVerifier, 'DOCKER_TAG', tag):
+                        with timer.measure():
+                            verdicts.add(run_verification(path, results))
+                click.echo(
+                    f"tag={tag:5} {name:11}"
+                    f" verdicts={sorted(verdicts)}"
+                    f" total={timer.total:.2f}s {summary(timer.samples)}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,67 @@
+"""Helpers shared by benchmark scripts"""
+import contextlib
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Iterator, List, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary(values: Sequence[float]) -> str:
+    """Formats timings given in seconds"""
+    if not values:
+        return 'n/a'
+    return (
+        f"mean={statistics.mean(values) * 1000:.3f}ms"
+        f" p50={percentile(values, 50) * 1000:.3f}ms"
+        f" p95={percentile(values, 95) * 1000:.3f}ms"
+        f" max={max(values) * 1000:.3f}ms"
+    )
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+
+    @contextlib.contextmanager
+    def measure(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.append(time.perf_counter() - started)
+
+    @property
+    def total(self) -> float:
+        return sum(self.samples)
+
+
+@contextlib.contextmanager
+def temp_dir() -> Iterator[str]:
+    path = tempfile.mkdtemp(prefix='golem-benchmark-')
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def temp_database() -> Iterator[str]:
+    from golem.database import Database
+    from golem.model import db, DB_FIELDS, DB_MODELS
+
+    with temp_dir() as path:
+        database = Database(db, fields=DB_FIELDS, models=DB_MODELS,
+                            db_dir=path)
+        try:
+            yield path
+        finally:
+            database.close()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Time to connect to a node with several addresses, trying them one after
+another versus racing staggered attempts.
+
+Every address is served by a local listener. Blackholed addresses never
+answer and time out after the TCPNetwork timeout, slow addresses answer
+after a fixed delay:
+
+    python -m scripts.benchmarks.connection_race --rounds 3 --slow 1.0
+"""
+from unittest import mock
+
+import click
+from twisted.internet import defer, task
+from twisted.internet.endpoints import TCP4ClientEndpoint
+from twisted.internet.error import TimeoutError as ConnectTimeoutError
+from twisted.internet.protocol import Factory, Protocol
+
+from golem.network.transport.network import ProtocolFactory, \
+    SessionFactory, SessionProtocol
+from golem.network.transport.tcpnetwork import SocketAddress, TCPNetwork
+from golem.network.transport.tcpnetwork_helpers import TCPConnectInfo
+from scripts.benchmarks.common import summary
+
+LIVE = '127.0.0.1'
+SLOW = '127.0.0.2'
+BLACKHOLED = '127.0.0.3'
+
+SCENARIOS = (
+    ('live', [LIVE]),
+    ('blackholed first', [BLACKHOLED, LIVE]),
+    ('slow first', [SLOW, LIVE]),
+    ('NATed', [BLACKHOLED, BLACKHOLED, SLOW, LIVE]),
+)
+
+
+class ClientProtocol(SessionProtocol):
+
+    def __init__(self, _server):
+        super().__init__()
+
+
+class ClientSession:
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.conn_type = None
+
+
+class LocalNetwork(TCPNetwork):
+    """ Connects to the local listener with the behaviour of the address """
+
+    def __init__(self, port, slow, attempt_delay, timeout):
+        super().__init__(
+            ProtocolFactory(ClientProtocol,
+                            session_factory=SessionFactory(ClientSession)),
+            timeout=timeout)
+        self.port = port
+        self.slow = slow
+        # pylint: disable=invalid-name
+        self.CONNECT_ATTEMPT_DELAY = attempt_delay
+
+    def _create_endpoint(self, socket_address):
+        endpoint = TCP4ClientEndpoint(self.reactor, LIVE, self.port,
+                                      self.timeout)
+        if socket_address.address == BLACKHOLED:
+            return mock.Mock(connect=lambda _: task.deferLater(
+                self.reactor, self.timeout, self._time_out))
+        if socket_address.address == SLOW:
+            return mock.Mock(connect=lambda factory: task.deferLater(
+                self.reactor, self.slow, endpoint.connect, factory))
+        return endpoint
+
+    @staticmethod
+    def _time_out():
+        raise ConnectTimeoutError()
+
+
+@defer.inlineCallbacks
+def _connect(reactor, network, addresses):
+    connected = defer.Deferred()
+    connect_info = TCPConnectInfo(
+        [SocketAddress(address, network.port) for address in addresses],
+        lambda session, **_: connected.callback(session),
+        lambda **_: connected.errback(ConnectionError("All attempts failed")))
+
+    started = reactor.seconds()
+    network.connect(connect_info)
+    session = yield connected
+    elapsed = reactor.seconds() - started
+    session.conn.transport.loseConnection()
+    return elapsed
+
+
+@defer.inlineCallbacks
+def run(reactor, rounds, slow, timeout, attempt_delay):
+    listener = reactor.listenTCP(0, Factory.forProtocol(Protocol),
+                                 interface=LIVE)
+    port = listener.getHost().port
+    try:
+        for name, addresses in SCENARIOS:
+            for mode, delay in (('sequential', None), ('race', attempt_delay)):
+                network = LocalNetwork(port, slow, delay, timeout)
+                samples = []
+                for _ in range(rounds):
+                    samples.append((yield _connect(reactor, network,
+                                                   addresses)))
+                click.echo(f"{name:17} {mode:10} {summary(samples)}")
+    finally:
+        yield listener.stopListening()
+
+
+@click.command()
+@click.option('--rounds', '-r', default=3)
+@click.option('--slow', default=1.0, help="Slow address latency, s")
+@click.option('--timeout', default=5, help="Connection timeout, s")
+@click.option('--attempt-delay', default=TCPNetwork.CONNECT_ATTEMPT_DELAY,
+              help="Delay between staggered attempts, s")
+def main(rounds, slow, timeout, attempt_delay):
+    task.react(run, (rounds, slow, timeout, attempt_delay))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Per-subtask container overhead of DockerCPURuntime with and without
+a ContainerPool.
+
+Runs subtasks one after another against an in-process fake Docker API which
+takes a fixed time to create, start and remove a container. The overhead is
+the time spent preparing and starting the runtime plus cleaning it up;
+the computation itself is simulated by a pause between the two:
+
+    python -m scripts.benchmarks.container_pool --subtasks 20 --create 0.3
+"""
+import itertools
+import time
+from unittest import mock
+
+import click
+from twisted.internet import defer, task, threads
+
+from golem.envs import RuntimeStatus
+from golem.envs.docker import DockerRuntimePayload
+from golem.envs.docker import cpu as docker_cpu
+from golem.envs.docker import pool as docker_pool
+from scripts.benchmarks.common import summary
+
+
+class FakeDockerAPI:
+    """Subset of docker.APIClient used by runtimes and the pool"""
+
+    def __init__(self, create, start, remove):
+        self.latency = {'create': create, 'start': start, 'remove': remove}
+        self.calls = {'create': 0, 'remove': 0}
+        self._ids = itertools.count()
+
+    def create_container_config(self, **kwargs):
+        return kwargs
+
+    def create_container_from_config(self, _config):
+        self.calls['create'] += 1
+        time.sleep(self.latency['create'])
+        return {'Id': f'container-{next(self._ids)}', 'Warnings': None}
+
+    def attach_socket(self, *_, **__):
+        return mock.Mock()
+
+    def start(self, _container_id):
+        time.sleep(self.latency['start'])
+
+    def inspect_container(self, _container_id):
+        return {'State': {'Status': 'exited', 'ExitCode': 0}}
+
+    def remove_container(self, _container_id, **_):
+        self.calls['remove'] += 1
+        time.sleep(self.latency['remove'])
+
+
+@defer.inlineCallbacks
+def _run_subtasks(reactor, pool, count, compute):
+    payload = DockerRuntimePayload(
+        image='golemfactory/wasm', tag='0.3.0', command='run')
+    overheads = []
+    for _ in range(count):
+        runtime = docker_cpu.DockerCPURuntime(payload, {}, None, None, pool)
+        started = time.perf_counter()
+        yield runtime.prepare()
+        yield runtime.start()
+        overhead = time.perf_counter() - started
+        assert runtime.status() == RuntimeStatus.STOPPED
+
+        yield task.deferLater(reactor, compute, lambda: None)
+        started = time.perf_counter()
+        yield runtime.clean_up()
+        overheads.append(overhead + time.perf_counter() - started)
+
+    if pool is not None:
+        yield threads.deferToThread(pool.clear)
+    return overheads
+
+
+@defer.inlineCallbacks
+def run(reactor, subtasks, compute, create, start, remove):
+    for pooled in (False, True):
+        api = FakeDockerAPI(create, start, remove)
+        pool = docker_pool.ContainerPool() if pooled else None
+        with mock.patch.object(docker_cpu, 'local_client', return_value=api), \
+                mock.patch.object(docker_pool, 'local_client',
+                                  return_value=api), \
+                mock.patch.object(docker_cpu, 'InputSocket'), \
+                mock.patch.object(docker_cpu.DockerCPURuntime,
+                                  '_watch_container'), \
+                mock.patch.object(docker_cpu.DockerCPURuntime,
+                                  '_unwatch_container'):
+            overheads = yield _run_subtasks(reactor, pool, subtasks, compute)
+        mode = 'pool' if pooled else 'no pool'
+        click.echo(
+            f"{mode:8} subtasks={subtasks}"
+            f" created={api.calls['create']} removed={api.calls['remove']}"
+            f" overhead: {summary(overheads)}")
+
+
+@click.command()
+@click.option('--subtasks', '-n', default=20)
+@click.option('--compute', default=1.0, help="Computation time, s")
+@click.option('--create', default=0.3, help="Container creation time, s")
+@click.option('--start', default=0.15, help="Container start time, s")
+@click.option('--remove', default=0.1, help="Container removal time, s")
+def main(subtasks, compute, create, start, remove):
+    task.react(run, (subtasks, compute, create, start, remove))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
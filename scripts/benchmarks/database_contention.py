@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Write and read latency of the database under contention, with every
+workload writing from its own thread in its own transactions versus
+through the database writer thread.
+
+Message history, ranking, payment and message queue writes run together
+while a reader keeps querying the tables:
+
+    python -m scripts.benchmarks.database_contention --writes 1000
+"""
+import datetime
+import threading
+import time
+from typing import Callable, Dict, List
+from unittest import mock
+
+import click
+import semantic_version
+
+from golem.model import Actor, NetworkMessage, QueuedMessage, \
+    WalletOperation, db
+from golem.ranking.manager import database_manager as dm
+from scripts.benchmarks.common import summary, temp_database
+
+
+def _history(index: int) -> None:
+    NetworkMessage.create(
+        local_role=Actor.Provider,
+        remote_role=Actor.Requestor,
+        node='node',
+        task='task',
+        subtask=f'subtask-{index}',
+        msg_date=datetime.datetime.now(),
+        msg_cls='Message',
+        msg_data=b'\0' * 512,
+    )
+
+
+def _ranking(index: int) -> None:
+    # Queued through the writer, run in place here
+    dm.increase_positive_computed.__wrapped__(f'node-{index % 100}', 1.)
+
+
+def _payment(index: int) -> None:
+    WalletOperation.create(
+        direction=WalletOperation.DIRECTION.outgoing,
+        operation_type=WalletOperation.TYPE.task_payment,
+        status=WalletOperation.STATUS.awaiting,
+        sender_address='0x' + '0' * 40,
+        recipient_address='0x' + f'{index:040x}',
+        amount=index,
+        currency=WalletOperation.CURRENCY.GNT,
+        gas_cost=0,
+    )
+
+
+def _queue(index: int) -> None:
+    QueuedMessage.create(
+        node=f'node-{index % 100}',
+        msg_version=semantic_version.Version('1.0.0'),
+        msg_cls='Message',
+        msg_data=b'\0' * 512,
+    )
+    QueuedMessage.delete().where(
+        QueuedMessage.node == f'node-{(index + 50) % 100}').execute()
+
+
+WORKLOADS: Dict[str, Callable[[int], None]] = {
+    'history': _history,
+    'ranking': _ranking,
+    'payment': _payment,
+    'queue': _queue,
+}
+
+
+def _read(index: int) -> None:
+    dm.get_local_rank(f'node-{index % 100}')
+    NetworkMessage.select() \
+        .where(NetworkMessage.subtask == f'subtask-{index}').count()
+
+
+def _write_direct(fn, index, done):
+    started = time.perf_counter()
+    with db.atomic():
+        fn(index)
+    done(time.perf_counter() - started)
+
+
+def _write_queued(fn, index, done):
+    started = time.perf_counter()
+    db.write(fn, index) \
+        .addCallback(lambda _: done(time.perf_counter() - started))
+
+
+def _run(write, writes):
+    latencies: Dict[str, List[float]] = {name: [] for name in WORKLOADS}
+    latencies['read'] = []
+    stopped = threading.Event()
+
+    def writer(name):
+        for index in range(writes):
+            write(WORKLOADS[name], index, latencies[name].append)
+
+    def reader():
+        index = 0
+        while not stopped.is_set():
+            started = time.perf_counter()
+            _read(index)
+            latencies['read'].append(time.perf_counter() - started)
+            index += 1
+
+    threads = [threading.Thread(target=writer, args=(name, ))
+               for name in WORKLOADS]
+    read_thread = threading.Thread(target=reader)
+    started = time.perf_counter()
+    read_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.writer.stop()
+    elapsed = time.perf_counter() - started
+    stopped.set()
+    read_thread.join()
+    return elapsed, latencies
+
+
+@click.command()
+@click.option('--writes', '-n', default=1000, help="Writes per workload")
+def main(writes):
+    # Without a running reactor, deliver the results in the writer thread
+    with mock.patch('twisted.internet.reactor.callFromThread',
+                    lambda fn, *args: fn(*args)):
+        for mode, write in (('direct', _write_direct),
+                            ('writer', _write_queued)):
+            with temp_database():
+                if mode == 'writer':
+                    db.writer.start()
+                elapsed, latencies = _run(write, writes)
+            total = writes * len(WORKLOADS)
+            click.echo(f"{mode}: {total} writes in {elapsed:.2f}s"
+                       f" ({total / elapsed:.0f} writes/s)")
+            for name, values in latencies.items():
+                click.echo(f"{mode:6} {name:8} {summary(values)}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Time of the resource directory size query and of the periodic cleanup,
+walking all the files versus the disk usage ledger.
+
+A directory of tasks with the given number of files each is generated.
+The size is queried the previous way, by walking all the files, and from
+the ledger after one task has changed. The cleanup removes nothing, all the
+tasks being newer than the given age, and then removes all of them:
+
+    python -m scripts.benchmarks.disk_usage --tasks 200 --files 100
+"""
+import os
+import time
+
+import click
+
+from golem.core.fileshelper import get_dir_size
+from golem.resource.dirmanager import DirManager
+from golem.resource.diskusage import DiskUsageLedger
+from scripts.benchmarks.common import summary, temp_dir
+
+
+def _populate(root, tasks, files, size):
+    for task in range(tasks):
+        task_dir = os.path.join(root, f'task{task}', 'resources')
+        os.makedirs(task_dir)
+        for index in range(files):
+            with open(os.path.join(task_dir, f'{index}.bin'), 'wb') as f:
+                f.write(b'0' * size)
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option('--tasks', '-t', default=200)
+@click.option('--files', '-f', default=100, help="Files per task")
+@click.option('--size', '-s', default=1024, help="File size, bytes")
+@click.option('--rounds', '-r', default=5)
+def main(tasks, files, size, rounds):
+    with temp_dir() as path:
+        root = os.path.join(path, 'root')
+        _populate(root, tasks, files, size)
+        ledger = DiskUsageLedger(root, os.path.join(path, 'ledger.json'))
+        ledger.size()
+        touched = os.path.join(root, 'task0', 'resources', '0.bin')
+        dir_manager = DirManager(path)
+
+        def ledger_size():
+            ledger.touch(touched)
+            ledger.size()
+
+        for name, fn in (
+                ('size, walk', lambda: get_dir_size(root)),
+                ('size, ledger', ledger_size),
+                ('cleanup none, walk',
+                 lambda: dir_manager.clear_dir(root, 3600)),
+                ('cleanup none, ledger', lambda: ledger.clear(3600)),
+        ):
+            samples = [_timed(fn) for _ in range(rounds)]
+            click.echo(f"{name:21} {summary(samples)}")
+
+    for mode in ('walk', 'ledger'):
+        with temp_dir() as path:
+            root = os.path.join(path, 'root')
+            _populate(root, tasks, files, size)
+            if mode == 'walk':
+                elapsed = _timed(lambda: DirManager(path).clear_dir(root))
+            else:
+                ledger = DiskUsageLedger(root)
+                ledger.size()
+                elapsed = _timed(ledger.clear)
+            click.echo(f"{'cleanup all, ' + mode:21} {summary([elapsed])}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
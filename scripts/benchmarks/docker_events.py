@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Docker container status tracking: per-runtime polling vs. shared events stream.
+
+Runs N DockerCPURuntime instances against an in-process fake Docker API whose
+containers exit after a random time. Reports Docker API calls and the delay
+between a container exiting and its runtime noticing.
+
+    python -m scripts.benchmarks.docker_events --runtimes 1 10 50
+"""
+import random
+import threading
+import time
+from queue import Queue
+from unittest import mock
+
+import click
+
+from golem.envs import RuntimeStatus
+from golem.envs.docker import DockerRuntimePayload
+from golem.envs.docker import cpu as docker_cpu
+from golem.envs.docker import events as docker_events
+from scripts.benchmarks.common import summary
+
+POLL_INTERVAL = 1.0  # seconds, former DockerCPURuntime.STATUS_UPDATE_INTERVAL
+
+
+class FakeDockerAPI:
+    """Subset of docker.APIClient used by runtimes and the event watcher"""
+
+    def __init__(self):
+        self.calls = {'inspect_container': 0, 'events': 0}
+        self._lock = threading.Lock()
+        self._containers = {}
+        self._streams = []
+
+    def create_container_config(self, **_):
+        return {}
+
+    def add_container(self, container_id, lifetime):
+        exit_time = time.time() + lifetime
+        self._containers[container_id] = exit_time
+        timer = threading.Timer(lifetime, self._exited, (container_id,))
+        timer.daemon = True
+        timer.start()
+        return exit_time
+
+    def _exited(self, container_id):
+        event = {
+            'Action': 'die',
+            'Actor': {'ID': container_id, 'Attributes': {'exitCode': '0'}},
+            'time': int(time.time()),
+        }
+        for stream in self._streams:
+            stream.put(event)
+
+    def inspect_container(self, container_id):
+        with self._lock:
+            self.calls['inspect_container'] += 1
+        running = time.time() < self._containers[container_id]
+        return {'State': {
+            'Status': 'running' if running else 'exited',
+            'ExitCode': 0,
+        }}
+
+    def events(self, **_):
+        with self._lock:
+            self.calls['events'] += 1
+        stream = FakeEventStream()
+        self._streams.append(stream)
+        return stream
+
+
+class FakeEventStream:
+
+    def __init__(self):
+        self._queue: Queue = Queue()
+
+    def put(self, event):
+        self._queue.put(event)
+
+    def close(self):
+        self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            yield event
+
+
+def _legacy_poll(runtime):
+    while runtime.status() == RuntimeStatus.RUNNING:
+        runtime._update_status()  # pylint: disable=protected-access
+        time.sleep(POLL_INTERVAL)
+
+
+def run(count: int, mode: str):
+    api = FakeDockerAPI()
+    payload = DockerRuntimePayload(image='golemfactory/bench', tag='1.0')
+    detected = {}
+    done = threading.Event()
+
+    def _stopped(runtime, *_):
+        detected[runtime] = time.time()
+        runtime._set_status(RuntimeStatus.STOPPED)  # noqa pylint: disable=protected-access
+        if len(detected) == count:
+            done.set()
+
+    watcher = docker_events.DockerEventWatcher()
+    with mock.patch.object(docker_cpu, 'local_client', return_value=api), \
+            mock.patch.object(docker_events, 'local_client',
+                              return_value=api), \
+            mock.patch.object(docker_events.DockerEventWatcher, '_instance',
+                              watcher), \
+            mock.patch.object(docker_cpu.DockerCPURuntime, '_stopped',
+                              _stopped):
+        exit_times = {}
+        threads_before = threading.active_count()
+        peak_threads = 0
+        for i in range(count):
+            runtime = docker_cpu.DockerCPURuntime(payload, {}, None, None)
+            container_id = 'container-{}'.format(i)
+            runtime._container_id = container_id  # noqa pylint: disable=protected-access
+            runtime._set_status(RuntimeStatus.RUNNING)  # noqa pylint: disable=protected-access
+            exit_times[runtime] = api.add_container(
+                container_id, random.uniform(1., 5.))
+            if mode == 'polling':
+                threading.Thread(
+                    target=_legacy_poll, args=(runtime,), daemon=True).start()
+            else:
+                runtime._watch_container()  # pylint: disable=protected-access
+            peak_threads = max(
+                peak_threads, threading.active_count() - threads_before)
+
+        done.wait(60)
+        watcher.stop()
+
+    latencies = [detected[r] - exit_times[r] for r in detected]
+    click.echo(
+        f"{mode:8} runtimes={count:3}"
+        f" api_calls={sum(api.calls.values()):5}"
+        f" (inspect={api.calls['inspect_container']},"
+        f" events={api.calls['events']})"
+        f" extra_threads={peak_threads:3}"
+        f" latency: {summary(latencies)}")
+
+
+@click.command()
+@click.option('--runtimes', '-n', multiple=True, type=int,
+              default=(1, 10, 50))
+def main(runtimes):
+    random.seed(0)
+    for count in runtimes:
+        for mode in ('polling', 'events'):
+            run(count, mode)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Startup time of DockerManager.check_environment, images checked and pulled
+one by one versus listed at once and pulled concurrently.
+
+The Docker CLI and daemon are replaced by a stand-in of a local registry:
+every image takes a fixed time to pull, every CLI call and every API query
+take a fixed time. Cold start pulls all the images, warm start finds them
+all and checks the environments' images afterwards:
+
+    python -m scripts.benchmarks.docker_images --pull 2.0 --cli 0.05
+"""
+import threading
+import time
+from unittest import mock
+
+import click
+
+from golem.docker import image as docker_image
+from golem.docker.image import DockerImage, ImageCache
+from golem.docker.manager import DockerManager
+from scripts.benchmarks.common import summary
+
+
+class LocalRegistry:
+    """Stands in for the Docker CLI and the daemon API"""
+
+    def __init__(self, pull, cli, api):
+        self.latency = {'pull': pull, 'cli': cli, 'api': api}
+        self.calls = {'cli': 0, 'api': 0}
+        self.images = {}
+        self._lock = threading.Lock()
+
+    def _call(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+        time.sleep(self.latency[kind])
+
+    def command(self, key, args=None, **_):
+        self._call('cli')
+        if key == 'images':
+            return self.images.get(args[0], '')
+        if key == 'pull':
+            time.sleep(self.latency['pull'])
+            self.images[args[0]] = f'sha256:{len(self.images)}'
+        return ''
+
+    # docker.APIClient
+
+    def images_(self):
+        self._call('api')
+        return [{'Id': image_id, 'RepoTags': [name]}
+                for name, image_id in self.images.items()]
+
+    def inspect_image(self, name):
+        self._call('api')
+        return {'Id': self.images[name], 'RepoTags': [name]}
+
+
+class SerialDockerManager(DockerManager):
+    """ Images pulled one at a time """
+
+    def _run_concurrently(self, fn, items):
+        for item in items:
+            fn(item)
+
+
+class UnlistedImageCache(ImageCache):
+    """ Images checked with the CLI and the API one by one """
+
+    def refresh(self):
+        return False
+
+
+def _start(manager_class, registry):
+    client = mock.Mock(images=registry.images_,
+                       inspect_image=registry.inspect_image)
+    manager = manager_class()
+    cache = UnlistedImageCache() if manager_class is SerialDockerManager \
+        else ImageCache()
+    with mock.patch.object(manager_class, 'command', registry.command), \
+            mock.patch.object(docker_image, 'local_client',
+                              return_value=client), \
+            mock.patch.object(ImageCache, '_instance', cache):
+        started = time.perf_counter()
+        manager.pull_images()
+        # Environments check their images after DockerManager
+        for entry in manager._collect_images():  # noqa pylint: disable=protected-access
+            if manager._image_supported(entry):  # noqa pylint: disable=protected-access
+                DockerImage(entry[0], tag=entry[2]).is_available()
+        return time.perf_counter() - started
+
+
+@click.command()
+@click.option('--pull', default=2.0, help="Image pull time, s")
+@click.option('--cli', default=0.05, help="Docker CLI call time, s")
+@click.option('--api', default=0.005, help="Docker API query time, s")
+@click.option('--rounds', '-r', default=3)
+def main(pull, cli, api, rounds):
+    for manager_class in (SerialDockerManager, DockerManager):
+        mode = 'serial' if manager_class is SerialDockerManager \
+            else 'concurrent'
+        for start in ('cold', 'warm'):
+            samples = []
+            calls = {}
+            for _ in range(rounds):
+                registry = LocalRegistry(pull, cli, api)
+                if start == 'warm':
+                    _start(manager_class, registry)
+                    registry.calls = {'cli': 0, 'api': 0}
+                samples.append(_start(manager_class, registry))
+                calls = registry.calls
+            click.echo(
+                f"{mode:10} {start} start: {summary(samples)}"
+                f" cli_calls={calls['cli']} api_calls={calls['api']}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
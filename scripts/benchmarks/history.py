@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+MessageHistoryService throughput and lookup latency.
+
+Stores MESSAGES signed TaskToCompute messages through the background saving
+thread and measures lookups of active (in-memory) and inactive subtasks.
+
+    python -m scripts.benchmarks.history --messages 100000
+"""
+import random
+import time
+
+import click
+from golem_messages.factories.tasks import TaskToComputeFactory
+
+from golem.model import Actor, NetworkMessage
+from golem.network import history
+from scripts.benchmarks.common import Timer, summary, temp_database
+
+
+def _build_messages(count: int, per_subtask: int):
+    template = TaskToComputeFactory()
+    template._fake_sign()  # pylint: disable=protected-access
+    model = history.message_to_model(
+        msg=template,
+        node_id='ab' * 64,
+        local_role=Actor.Provider,
+        remote_role=Actor.Requestor,
+    )
+    msgs = []
+    for i in range(count):
+        msg_dict = dict(model)
+        msg_dict['subtask'] = 'subtask-{}'.format(i // per_subtask)
+        msg_dict['msg_cls'] = 'Msg{}'.format(i % per_subtask)
+        msgs.append(msg_dict)
+    return msgs
+
+
+@click.command()
+@click.option('--messages', default=100000)
+@click.option('--per-subtask', default=10)
+@click.option('--lookups', default=2000)
+def main(messages, per_subtask, lookups):
+    with temp_database():
+        service = history.MessageHistoryService()
+        msgs = _build_messages(messages, per_subtask)
+
+        started = time.perf_counter()
+        service.start()
+        for msg_dict in msgs:
+            service.add(msg_dict)
+        service.stop()
+        elapsed = time.perf_counter() - started
+        assert NetworkMessage.select().count() == messages
+        click.echo(f"save: {messages} messages in {elapsed:.2f}s"
+                   f" ({messages / elapsed:.0f} msg/s)")
+
+        subtasks = messages // per_subtask
+        active = [
+            'subtask-{}'.format(i) for i in
+            range(max(0, subtasks - service.RECENT_SUBTASKS), subtasks)
+        ]
+        hot = Timer()
+        for _ in range(lookups):
+            with hot.measure():
+                service.get_sync(subtask=random.choice(active),
+                                 msg_cls='Msg0')
+        click.echo(f"get_sync (active subtask): {summary(hot.samples)}")
+
+        cold = Timer()
+        for _ in range(lookups):
+            service._recent.clear()  # pylint: disable=protected-access
+            subtask = 'subtask-{}'.format(random.randrange(subtasks))
+            with cold.measure():
+                service.get_sync(subtask=subtask, msg_cls='Msg0')
+        click.echo(f"get_sync (database): {summary(cold.samples)}")
+
+        history.MessageHistoryService.instance = None
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
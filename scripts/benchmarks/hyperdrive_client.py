@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Time to add many resource sets to Hyperdrive with a new connection per
+request versus over pooled keep-alive connections, one request at a time
+or pipelined.
+
+The Hyperdrive daemon is replaced by a local HTTP server answering every
+request after a fixed time:
+
+    python -m scripts.benchmarks.hyperdrive_client -n 500 --latency 0.005
+"""
+import json
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import click
+import requests
+from twisted.internet import defer, task
+
+from golem.core import golem_async
+from golem.network.hyperdrive.client import HyperdriveAsyncClient, \
+    HyperdriveClient, MAX_IN_FLIGHT
+from scripts.benchmarks.common import summary
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """ Stands in for the Hyperdrive daemon API """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Like the daemon, do not delay the body after the headers
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections += 1
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        json.loads(self.rfile.read(length))
+        time.sleep(self.server.latency)
+        body = json.dumps({'hash': str(uuid.uuid4())}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), DaemonHandler)
+        self.latency = latency
+        self.connections = 0
+
+
+class UnpooledClient(HyperdriveClient):
+    """ A new connection per request """
+
+    def _request(self, **data):
+        response = requests.post(url=self._url, headers=self._headers,
+                                 data=json.dumps(data), timeout=self.timeout)
+        response.raise_for_status()
+        return json.loads(response.content.decode('utf-8'))
+
+
+def _measure(server, name, fn):
+    server.connections = 0
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    click.echo(f"{name:24} {summary([elapsed])}"
+               f" connections={server.connections}")
+
+
+@defer.inlineCallbacks
+def _measure_async(reactor, server, name, fn):
+    server.connections = 0
+    started = reactor.seconds()
+    yield fn()
+    elapsed = reactor.seconds() - started
+    click.echo(f"{name:24} {summary([elapsed])}"
+               f" connections={server.connections}")
+
+
+@defer.inlineCallbacks
+def run(reactor, server, count, in_flight):
+    from twisted.web.client import Agent
+
+    kwargs = dict(host='127.0.0.1', port=server.server_address[1],
+                  max_in_flight=in_flight)
+    entries = [({f'/tmp/{index}': str(index)}, None)
+               for index in range(count)]
+
+    # Previous agent, new connection per request and no limit
+    golem_async.AsyncHTTPRequest.agent = Agent(reactor)
+    client = HyperdriveAsyncClient(**dict(kwargs, max_in_flight=count))
+    yield _measure_async(reactor, server, 'async, unpooled',
+                         lambda: client.add_many_async(entries))
+
+    golem_async.AsyncHTTPRequest.agent = None
+    client = HyperdriveAsyncClient(**kwargs)
+    yield _measure_async(reactor, server, 'async, pooled',
+                         lambda: client.add_many_async(entries))
+
+
+@click.command()
+@click.option('--requests', '-n', 'count', default=500)
+@click.option('--latency', default=0.005, help="Daemon response time, s")
+@click.option('--in-flight', default=MAX_IN_FLIGHT,
+              help="Maximum concurrent requests")
+def main(count, latency, in_flight):
+    server = DaemonServer(latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    kwargs = dict(host='127.0.0.1', port=server.server_address[1],
+                  max_in_flight=in_flight)
+    files = {'/tmp/file': 'file'}
+    entries = [(files, None)] * count
+    try:
+        client = UnpooledClient(**kwargs)
+        _measure(server, 'sync, unpooled',
+                 lambda: [client.add(files) for _ in range(count)])
+        client = HyperdriveClient(**kwargs)
+        _measure(server, 'sync, pooled',
+                 lambda: [client.add(files) for _ in range(count)])
+        _measure(server, 'sync, pooled, add_many',
+                 lambda: client.add_many(entries))
+        task.react(run, (server, count, in_flight))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
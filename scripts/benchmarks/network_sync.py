@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Idle CPU and ping latency of the network sync steps, run one after another
+every second by a single service versus by independent, adaptive services.
+
+The sync steps of P2PService, TaskServer, the resource server and ranking
+are replaced by stand-ins that spend a fixed CPU time per run. While idle
+no step has pending work. Under load the task server has work pending and
+every few runs one of its runs takes long, as when it waits for a slow
+disk or peer. The latency is how late the peers are pinged against the
+one second interval:
+
+    python -m scripts.benchmarks.network_sync --duration 20 --slow 1.5
+"""
+import random
+import time
+
+import click
+from twisted.internet import defer, task
+
+from golem.core.service import AdaptiveService, LoopingCallService
+from scripts.benchmarks.common import summary
+
+# Name, max interval as in Client._network_sync_services
+STEPS = (
+    ('ping_peers', 1),
+    ('p2pservice', 4),
+    ('task_server', 4),
+    ('resource_server', 8),
+    ('ranking', 8),
+)
+
+
+class Components:
+    """ Stands in for the components synced with the network """
+
+    def __init__(self, cost, slow, load):
+        self.cost = cost
+        self.slow = slow
+        self.load = load
+        self.pings = []
+        self.runs = 0
+
+    def sync(self, name):
+        self.runs += 1
+        if name == 'ping_peers':
+            self.pings.append(time.perf_counter())
+        elif name == 'task_server' and self.load and random.random() < 0.2:
+            time.sleep(self.slow)
+        deadline = time.perf_counter() + self.cost
+        while time.perf_counter() < deadline:
+            pass
+
+    def pending(self, name):
+        return name == 'ping_peers' or (self.load and name == 'task_server')
+
+
+class SerialSyncService(LoopingCallService):
+    """ All the steps in one service, as DoWorkService used to run them """
+
+    def __init__(self, components):
+        super().__init__(interval_seconds=1)
+        self.components = components
+
+    def _run(self):
+        for name, _ in STEPS:
+            self.components.sync(name)
+
+
+class StepSyncService(AdaptiveService):
+
+    def __init__(self, components, name, max_interval_seconds):
+        super().__init__(name=name, max_interval_seconds=max_interval_seconds)
+        self.components = components
+
+    def _run(self):
+        self.components.sync(self.name)
+        return self.components.pending(self.name)
+
+
+@defer.inlineCallbacks
+def _run(reactor, services, components, duration):
+    started = time.process_time()
+    for service in services:
+        service.start()
+    yield task.deferLater(reactor, duration, lambda: None)
+    for service in services:
+        service.stop()
+    cpu = time.process_time() - started
+
+    pings = components.pings
+    lateness = [max(0.0, later - earlier - 1.0)
+                for earlier, later in zip(pings, pings[1:])]
+    return cpu / duration, lateness
+
+
+@defer.inlineCallbacks
+def run(reactor, duration, cost, slow):
+    for load in (False, True):
+        for mode in ('serial', 'independent'):
+            components = Components(cost, slow, load)
+            if mode == 'serial':
+                services = [SerialSyncService(components)]
+            else:
+                services = [StepSyncService(components, name, max_interval)
+                            for name, max_interval in STEPS]
+            cpu, lateness = yield _run(reactor, services, components,
+                                       duration)
+            click.echo(
+                f"{'load' if load else 'idle':4} {mode:11}"
+                f" cpu={cpu * 100:.2f}% runs={components.runs}"
+                f" ping lateness: {summary(lateness)}")
+
+
+@click.command()
+@click.option('--duration', '-d', default=20, help="Duration of a run, s")
+@click.option('--cost', default=0.002, help="CPU time of a sync step, s")
+@click.option('--slow', default=1.5, help="Slow task server run, s")
+def main(duration, cost, slow):
+    task.react(run, (duration, cost, slow))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
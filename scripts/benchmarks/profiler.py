@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Overhead of the profiler on the hot paths.
+
+Per-call time of a bare function versus the same function timed by the
+profiler, of a dispatcher handler with and without the dispatcher hook, and
+of a reactor heartbeat. Then the time of a fixed amount of reactor work
+with the profiler stopped and started, the watchdog thread sampling the
+stacks of slow calls at the given threshold:
+
+    python -m scripts.benchmarks.profiler --calls 100000 --threshold 0.1
+"""
+import time
+
+import click
+from pydispatch import robustapply
+from twisted.internet import defer, task
+
+from golem.core.profiler import Profiler
+from scripts.benchmarks.common import summary
+
+
+def _handler(value=None, **_):
+    return value
+
+
+def _call():
+    return _handler(1)
+
+
+def _dispatch():
+    return robustapply.robustApply(_handler, value=1, signal='benchmark')
+
+
+def _per_call(name, fn, calls, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - started) / calls)
+    click.echo(f"{name:18} per call {min(samples) * 1e9:.0f}ns")
+
+
+@defer.inlineCallbacks
+def _reactor_work(reactor, calls):
+    started = reactor.seconds()
+    for _ in range(calls):
+        yield task.deferLater(reactor, 0, _handler)
+    return reactor.seconds() - started
+
+
+@defer.inlineCallbacks
+def run(reactor, calls, rounds, threshold):
+    profiler = Profiler(threshold=threshold)
+    _per_call('bare call', _call, calls, rounds)
+    _per_call('timed call', profiler.timed('benchmark', _call), calls, rounds)
+    _per_call('dispatcher', _dispatch, calls, rounds)
+
+    profiler.start()
+    try:
+        _per_call('hooked dispatcher', _dispatch, calls, rounds)
+        _per_call('heartbeat', profiler._beat, calls, rounds)  # noqa pylint: disable=protected-access
+    finally:
+        profiler.stop()
+
+    for mode in ('stopped', 'started'):
+        if mode == 'started':
+            profiler.start()
+        samples = []
+        for _ in range(rounds):
+            samples.append((yield _reactor_work(reactor, calls // 10)))
+        profiler.stop()
+        click.echo(f"reactor work, profiler {mode:7} {summary(samples)}")
+
+
+@click.command()
+@click.option('--calls', '-c', default=100000)
+@click.option('--rounds', '-r', default=5)
+@click.option('--threshold', default=Profiler.THRESHOLD,
+              help="Slow call threshold, s")
+def main(calls, rounds, threshold):
+    task.react(run, (calls, rounds, threshold))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
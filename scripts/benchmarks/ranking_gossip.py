@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Time of the global rank gossip rounds of a node in a simulated network.
+
+Every node of the network has a local rank. Each round the node prepares its
+gossip and merges the gossip of NEIGHBOURS other nodes, each knowing about
+a random part of the network, then checks the convergence. At the end of
+a stage the global ranks are saved, in one bulk upsert versus an upsert per
+node, both in a single transaction:
+
+    python -m scripts.benchmarks.ranking_gossip -n 1000 -n 10000 -n 50000
+"""
+import random
+from unittest import mock
+
+import click
+
+from golem.model import db
+from golem.ranking.helper.min_max_utility import vec_to_trust
+from golem.ranking.manager import database_manager as dm
+from golem.ranking.ranking import Ranking
+from scripts.benchmarks.common import Timer, summary, temp_database
+
+# pylint: disable=protected-access
+
+
+def _local_ranks(node_ids):
+    return [(node_id, ) + tuple(random.randint(0, 100) for _ in range(6))
+            for node_id in node_ids]
+
+
+def _gossip(node_ids, coverage):
+    known = random.sample(node_ids, int(len(node_ids) * coverage))
+    return [[node_id, [[random.random(), random.random()],
+                       [random.random(), random.random()]]]
+            for node_id in known]
+
+
+def _save(ranking, bulk):
+    ranks = [
+        (node_id, vec_to_trust(vector[0]), vec_to_trust(vector[1]),
+         vector[0][1], vector[1][1])
+        for node_id, vector in ranking.working_vec.items()
+    ]
+    with db.atomic():
+        if bulk:
+            dm.upsert_global_ranks.__wrapped__(ranks)
+        else:
+            for rank in ranks:
+                dm.upsert_global_rank.__wrapped__(*rank)
+
+
+@click.command()
+@click.option('--nodes', '-n', multiple=True, type=int,
+              default=[1000, 10000, 50000], help="Size of the network")
+@click.option('--rounds', default=10)
+@click.option('--neighbours', default=4, help="Gossip received per round")
+@click.option('--coverage', default=0.5,
+              help="Part of the network a neighbour's gossip covers")
+# pylint: disable=too-many-locals
+def main(nodes, rounds, neighbours, coverage):
+    for size in nodes:
+        node_ids = [f'{index:0128x}' for index in range(size)]
+        received = [_gossip(node_ids, coverage) for _ in range(neighbours)]
+
+        client = mock.Mock()
+        client.get_neighbours_degree.return_value = {
+            f'neighbour-{index}': neighbours for index in range(neighbours)}
+        client.collect_gossip.return_value = received
+        client.collect_stopped_peers.return_value = set()
+        # Never converges, every round does the full work
+        ranking = Ranking(client, max_steps=rounds + 1, epsilon=0.)
+        ranking.reactor = mock.Mock()
+
+        stage, prepare, merge = Timer(), Timer(), Timer()
+        with mock.patch('golem.ranking.manager.trust_manager'
+                        '.get_local_rank_counts',
+                        lambda: _local_ranks(node_ids)), \
+                stage.measure():
+            ranking._Ranking__init_stage()
+        for _ in range(rounds):
+            with prepare.measure():
+                ranking._Ranking__new_round()
+            with merge.measure():
+                ranking._Ranking__end_round()
+
+        click.echo(f"{size} nodes: stage init {summary(stage.samples)}")
+        click.echo(f"{size} nodes: prepare gossip {summary(prepare.samples)}")
+        click.echo(f"{size} nodes: merge and compare"
+                   f" {summary(merge.samples)}")
+
+        with temp_database():
+            # Insert once, then measure updates of the existing ranks
+            _save(ranking, bulk=True)
+            for bulk in (False, True):
+                save = Timer()
+                with save.measure():
+                    _save(ranking, bulk)
+                mode = 'bulk upsert' if bulk else 'upsert per node'
+                click.echo(f"{size} nodes: save, {mode}"
+                           f" {summary(save.samples)}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
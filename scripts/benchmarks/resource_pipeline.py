@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+Time from TaskToCompute to the start of computation on a provider.
+
+Resources are served by a local Hyperdrive stand-in, which delivers every
+package after a fixed latency plus its size divided by the bandwidth.
+The environment is prepared by a stand-in taking a fixed time. The previous
+flow, in which downloads waited for the next network sync, packages were
+extracted after the last download and the environment was prepared after
+the resources were collected, is compared with BaseResourceServer:
+
+    python -m scripts.benchmarks.resource_pipeline --packages 1 4 --size 64
+"""
+import os
+import random
+import shutil
+from typing import List
+from unittest import mock
+
+import click
+from twisted.internet import defer, task
+
+from golem.core import golem_async
+from golem.resource.base.resourceserver import BaseResourceServer
+from golem.task.result.resultpackage import ZipPackager
+from scripts.benchmarks.common import summary, temp_dir
+
+SYNC_INTERVAL = 1.0  # s, resource server sync interval with work pending
+
+
+class LocalHyperdrive:
+    """ Stands in for HyperdriveResourceManager """
+
+    def __init__(self, root, clock, latency, bandwidth):
+        self.root = root
+        self.clock = clock
+        self.latency = latency
+        self.bandwidth = bandwidth  # bytes per second
+        self.storage = self
+
+    def get_dir(self, res_id):
+        path = os.path.join(self.root, 'storage', res_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def pull_resource(self, entry, res_id, success, error,
+                      client_options=None, async_=True):
+        del client_options, async_
+        source = entry[0]
+        delay = self.latency + os.path.getsize(source) / self.bandwidth
+
+        def _deliver():
+            try:
+                shutil.copy(source, self.get_dir(res_id))
+            except OSError as e:
+                error(e, entry, res_id)
+            else:
+                success(entry, entry[1], res_id)
+
+        self.clock.callLater(delay, _deliver)
+
+
+class Client:
+
+    def __init__(self):
+        self.collected = defer.Deferred()
+        self.task_server = mock.Mock()
+
+    def resource_collected(self, _res_id):
+        self.collected.callback(None)
+
+    def resource_failure(self, _res_id, reason):
+        self.collected.errback(RuntimeError(reason))
+
+
+class SequentialResourceServer(BaseResourceServer):
+    """ The flow before resources were pulled and extracted in a pipeline """
+
+    def download_resources(self, resources, res_id, client_options=None):
+        with self._lock:
+            for resource in resources:
+                self._add_pending_resource(resource, res_id, client_options)
+
+    def _download_success(self, resource, _, res_id):
+        if self._remove_pending_resource(resource, res_id):
+            self._extract_all(res_id)
+
+    def _extract_all(self, res_id):
+        resource_dir = self.resource_manager.storage.get_dir(res_id)
+
+        def extract_packages():
+            for package_file in os.listdir(resource_dir):
+                self.packager.extract(
+                    os.path.join(resource_dir, package_file), resource_dir)
+
+        golem_async.async_run(golem_async.AsyncRequest(extract_packages)) \
+            .addCallback(lambda _: self.client.resource_collected(res_id))
+
+
+def _create_packages(root: str, count: int, size: int) -> List[list]:
+    rand = random.Random(0)
+    packages = []
+    for i in range(count):
+        source = os.path.join(root, f'source-{i}', f'file-{i}.bin')
+        os.makedirs(os.path.dirname(source))
+        with open(source, 'wb') as f:
+            f.write(bytes(rand.getrandbits(8) for _ in range(1024)) *
+                    (size // 1024))
+        package = os.path.join(root, f'package-{i}.zip')
+        ZipPackager().create(package, [source])
+        packages.append([package, [os.path.basename(package)]])
+    return packages
+
+
+@defer.inlineCallbacks
+def _measure(reactor, root, packages, pipelined, prepare, latency,
+             bandwidth, phase):
+    client = Client()
+    manager = LocalHyperdrive(root, reactor, latency, bandwidth)
+    server_class = BaseResourceServer if pipelined \
+        else SequentialResourceServer
+    server = server_class(manager, client)
+    sync = task.LoopingCall(server.sync_network)
+    sync.start(SYNC_INTERVAL, now=False)
+    # TaskToCompute arrives at a random moment between network syncs
+    yield task.deferLater(reactor, phase * SYNC_INTERVAL, lambda: None)
+
+    started = reactor.seconds()
+    res_id = f'task-{started}'
+    server.download_resources(packages, res_id)
+    if pipelined:
+        yield defer.gatherResults([
+            client.collected,
+            task.deferLater(reactor, prepare, lambda: None),
+        ])
+    else:
+        yield client.collected
+        yield task.deferLater(reactor, prepare, lambda: None)
+    sync.stop()
+    shutil.rmtree(manager.get_dir(res_id))
+    return reactor.seconds() - started
+
+
+@defer.inlineCallbacks
+def run(reactor, packages, size, rounds, prepare, latency, bandwidth):
+    for count in packages:
+        with temp_dir() as root:
+            resources = _create_packages(root, count, size * 1024)
+            rand = random.Random(count)
+            for pipelined in (False, True):
+                samples = []
+                for _ in range(rounds):
+                    samples.append((yield _measure(
+                        reactor, root, resources, pipelined, prepare,
+                        latency, bandwidth * 1024, rand.random())))
+                mode = 'pipelined' if pipelined else 'sequential'
+                click.echo(f"packages={count:2} {mode:10} "
+                           f"TaskToCompute -> compute: {summary(samples)}")
+
+
+@click.command()
+@click.option('--packages', '-n', multiple=True, type=int, default=(1, 4))
+@click.option('--size', default=4096, help="Package size, KiB")
+@click.option('--rounds', '-r', default=10)
+@click.option('--prepare', default=0.5, help="Environment preparation, s")
+@click.option('--latency', default=0.2, help="Hyperdrive latency, s")
+@click.option('--bandwidth', default=20480, help="KiB/s per transfer")
+def main(packages, size, rounds, prepare, latency, bandwidth):
+    task.react(run, (packages, size, rounds, prepare, latency, bandwidth))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
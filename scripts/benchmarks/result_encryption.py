@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Throughput of result package encryption and decryption, CBC versus the
+segmented AES-GCM format.
+
+A file of random data is encrypted and decrypted a few times with every
+encryptor; the GCM one uses as many threads as given:
+
+    python -m scripts.benchmarks.result_encryption --size 256 --workers 4
+"""
+import os
+import time
+from unittest import mock
+
+import click
+
+from golem.core.fileencrypt import AESFileEncryptor, AESGCMFileEncryptor, \
+    FileEncryptor
+from scripts.benchmarks.common import summary, temp_dir
+
+ENCRYPTORS = (
+    ('cbc', AESFileEncryptor),
+    ('gcm', AESGCMFileEncryptor),
+)
+
+
+def _write_random(path, size):
+    with open(path, 'wb') as f:
+        for _ in range(size):
+            f.write(os.urandom(1024 * 1024))
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+@click.command()
+@click.option('--rounds', '-r', default=3)
+@click.option('--size', default=256, help="File size, MB")
+@click.option('--workers', default=os.cpu_count() or 1,
+              help="GCM encryption threads")
+def main(rounds, size, workers):
+    secret = FileEncryptor.gen_secret(16, 32)
+    with temp_dir() as path, \
+            mock.patch.object(AESGCMFileEncryptor, 'workers', workers):
+        plain = os.path.join(path, 'plain')
+        encrypted = os.path.join(path, 'encrypted')
+        decrypted = os.path.join(path, 'decrypted')
+        _write_random(plain, size)
+
+        for name, encryptor in ENCRYPTORS:
+            samples = {'encrypt': [], 'decrypt': []}
+            for _ in range(rounds):
+                samples['encrypt'].append(_timed(
+                    encryptor.encrypt, plain, encrypted, secret))
+                samples['decrypt'].append(_timed(
+                    encryptor.decrypt, encrypted, decrypted, secret))
+            for operation, values in samples.items():
+                throughput = size / 1024 / min(values)
+                click.echo(f"{name} {operation:7} {summary(values)}"
+                           f" best={throughput:.3f}GB/s")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Startup time of a node, broken down by subsystem.
+
+Import time of every subsystem is measured in a fresh interpreter. Then
+the startup of a returning user (existing database and an encrypted key,
+password given on the command line) is run in a fresh interpreter, once in
+the previous order, in which the database, the transaction system and
+the keys were initialized before RPC, and once staged, in which RPC comes
+up first while the database, the apps and the keys load in the background.
+The RPC router is replaced by a stand-in taking a fixed time:
+
+    python -m scripts.benchmarks.startup --rounds 5 --rpc 1.5
+"""
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import click
+
+from scripts.benchmarks.common import summary, temp_dir
+
+PASSWORD = 'benchmark'
+
+SUBSYSTEMS = (
+    ('node', 'golem.node'),
+    ('apps', 'apps.appsmanager'),
+    ('database', 'golem.database'),
+    ('docker', 'golem.docker.manager'),
+    ('ethereum', 'golem.ethereum.transactionsystem'),
+    ('keys', 'golem.core.keysauth'),
+    ('rpc', 'golem.rpc.router'),
+)
+
+
+def _import_time(module: str) -> float:
+    code = (
+        "import time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - started)\n"
+    )
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def _start_database(datadir: str) -> None:
+    from golem.database import Database
+    from golem.model import db, DB_FIELDS, DB_MODELS
+    Database(db, fields=DB_FIELDS, models=DB_MODELS, db_dir=datadir)
+
+
+def _start_keys(datadir: str) -> None:
+    from golem.core.keysauth import KeysAuth
+    from golem.core.variables import PRIVATE_KEY
+    KeysAuth(datadir=datadir, private_key_name=PRIVATE_KEY, password=PASSWORD)
+
+
+def _start_ethereum(datadir: str) -> None:
+    from golem.config.active import EthereumConfig
+    from golem.ethereum.transactionsystem import TransactionSystem
+    TransactionSystem(Path(datadir) / 'transaction_system', EthereumConfig())
+
+
+def _start_apps(_datadir: str) -> None:
+    from apps.appsmanager import AppsManager
+    AppsManager().load_all_apps()
+
+
+def _timed(timings: Dict[str, float], name: str,
+           fn: Callable[[str], None], datadir: str) -> None:
+    started = time.perf_counter()
+    fn(datadir)
+    timings[name] = time.perf_counter() - started
+
+
+def _run_child(mode: str, datadir: str, rpc: float) -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    _timed(timings, 'import', lambda _: __import__('golem.node'), datadir)
+
+    if mode == 'eager':
+        _timed(timings, 'ethereum', _start_ethereum, datadir)
+        _timed(timings, 'database', _start_database, datadir)
+        _timed(timings, 'keys', _start_keys, datadir)
+        _timed(timings, 'rpc', lambda _: time.sleep(rpc), datadir)
+        timings['rpc_ready'] = time.perf_counter() - started
+        _timed(timings, 'apps', _start_apps, datadir)
+    else:
+        _timed(timings, 'ethereum', _start_ethereum, datadir)
+        workers = [
+            threading.Thread(target=_timed,
+                             args=(timings, name, fn, datadir))
+            for name, fn in (('database', _start_database),
+                             ('apps', _start_apps))
+        ]
+        for worker in workers:
+            worker.start()
+        _timed(timings, 'rpc', lambda _: time.sleep(rpc), datadir)
+        timings['rpc_ready'] = time.perf_counter() - started
+        _timed(timings, 'keys', _start_keys, datadir)
+        for worker in workers:
+            worker.join()
+
+    timings['ready'] = time.perf_counter() - started
+    return timings
+
+
+def _prepare(datadir: str) -> None:
+    _start_database(datadir)
+    _start_keys(datadir)
+
+
+@click.command()
+@click.option('--rounds', '-r', default=5)
+@click.option('--rpc', default=1.5, help="RPC router start time, s")
+@click.option('--child', type=click.Choice(['eager', 'staged']), hidden=True)
+@click.option('--datadir', hidden=True)
+def main(rounds, rpc, child, datadir):
+    if child:
+        click.echo(json.dumps(_run_child(child, datadir, rpc)))
+        return
+
+    for name, module in SUBSYSTEMS:
+        samples = [_import_time(module) for _ in range(rounds)]
+        click.echo(f"import {name:9} {module:34} {summary(samples)}")
+
+    with temp_dir() as path:
+        _prepare(path)
+        for mode in ('eager', 'staged'):
+            samples: Dict[str, list] = {}
+            for _ in range(rounds):
+                output = subprocess.check_output([
+                    sys.executable, '-m', 'scripts.benchmarks.startup',
+                    '--child', mode, '--datadir', path, '--rpc', str(rpc),
+                ])
+                timings = json.loads(output.decode().strip().splitlines()[-1])
+                for name, value in timings.items():
+                    samples.setdefault(name, []).append(value)
+            for name in ('import', 'ethereum', 'database', 'keys', 'apps',
+                         'rpc', 'rpc_ready', 'ready'):
+                click.echo(f"{mode:6} {name:9} {summary(samples[name])}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
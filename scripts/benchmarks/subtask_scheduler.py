@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Throughput of a provider computing subtasks one at a time versus
+concurrently, as partitioned by SubtaskScheduler.
+
+Simulates a provider with a backlog of subtasks of a single-threaded
+environment (SMALL, its footprint is measured) and of an environment which
+keeps all the cores it is given busy (LARGE, it gets the whole preset).
+Every subtask is admitted only when its footprint fits, then downloads its
+resources, which takes no cores:
+
+    python -m scripts.benchmarks.subtask_scheduler --concurrency 1 2 4 8
+"""
+import heapq
+import random
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+import click
+
+from golem.task.subtaskscheduler import Footprint, SubtaskScheduler
+
+CPUS = 8
+MEMORY = 8 * 1024 ** 2  # KiB
+# Core-seconds of work, cores the work can use, peak memory in KiB
+ENVIRONMENTS = {
+    'SMALL': (60.0, 1, 512 * 1024),
+    'LARGE': (240.0, CPUS, 2 * 1024 ** 2),
+}
+FOOTPRINTS = {
+    'SMALL': Footprint(cpus=1, memory=640 * 1024),
+}
+MIXES = {
+    'small': 0.0,
+    'mixed': 0.25,
+    'large': 1.0,
+}
+
+
+def _workload(count: int, large_share: float, seed: int) \
+        -> List[Tuple[str, float]]:
+    """ Environment and download time of every subtask """
+    rand = random.Random(seed)
+    return [
+        ('LARGE' if rand.random() < large_share else 'SMALL',
+         rand.uniform(5.0, 30.0))
+        for _ in range(count)
+    ]
+
+
+def simulate(workload: List[Tuple[str, float]], concurrency: int) \
+        -> Tuple[float, float]:
+    """ Returns the time needed to compute the workload and the share of
+        core-seconds spent computing """
+    scheduler = SubtaskScheduler(list(range(CPUS)), MEMORY, concurrency)
+    pending = list(enumerate(workload))
+    ready: List[str] = []
+    environments: Dict[str, str] = {}
+    events: List[Tuple[float, int, str, str]] = []
+    now = 0.0
+    busy = 0.0
+    sequence = 0
+
+    def _push(at: float, kind: str, subtask_id: str) -> None:
+        nonlocal sequence
+        sequence += 1
+        heapq.heappush(events, (at, sequence, kind, subtask_id))
+
+    def _admit() -> None:
+        # Subtasks are taken in order, only when they fit
+        while pending and scheduler.can_admit(pending[0][1][0]):
+            index, (environment, download) = pending.pop(0)
+            subtask_id = f'subtask-{index}'
+            environments[subtask_id] = environment
+            scheduler.admit(subtask_id, environment)
+            _push(now + download, 'downloaded', subtask_id)
+
+    def _start() -> None:
+        nonlocal busy
+        for subtask_id in list(ready):
+            reservation = scheduler.reservation(subtask_id)
+            ready.remove(subtask_id)
+            work, parallel, _ = ENVIRONMENTS[environments[subtask_id]]
+            cores = min(parallel, len(reservation.cpus))
+            busy += work
+            _push(now + work / cores, 'computed', subtask_id)
+
+    _admit()
+    while events:
+        now, _, kind, subtask_id = heapq.heappop(events)
+        if kind == 'downloaded':
+            ready.append(subtask_id)
+        else:
+            scheduler.release(subtask_id)
+        _start()
+        _admit()
+    return now, busy / (now * CPUS)
+
+
+def _measure(_scheduler, environment: Optional[str]) -> Optional[Footprint]:
+    return FOOTPRINTS.get(environment)  # type: ignore
+
+
+@click.command()
+@click.option('--concurrency', '-c', multiple=True, type=int,
+              default=(1, 2, 4, 8))
+@click.option('--subtasks', '-n', default=200)
+@click.option('--seed', default=0)
+def main(concurrency, subtasks, seed):
+    with mock.patch.object(SubtaskScheduler, '_measure', _measure):
+        for mix, large_share in MIXES.items():
+            workload = _workload(subtasks, large_share, seed)
+            baseline = None
+            for count in concurrency:
+                makespan, utilisation = simulate(workload, count)
+                throughput = len(workload) / makespan * 3600
+                baseline = baseline or throughput
+                click.echo(
+                    f"{mix:6} concurrency={count}:"
+                    f" {throughput:7.1f} subtasks/h"
+                    f" ({throughput / baseline:4.2f}x)"
+                    f" cores busy {utilisation:6.1%}")
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
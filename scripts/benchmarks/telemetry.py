@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Container telemetry sampling cost as the number of containers grows.
+
+Builds fake cgroup v2 and procfs trees for N containers, samples them with
+ContainerTelemetry and reports the time of a sampling round, the time per
+container and the latency of a p50/p95 query over the full ring buffer:
+
+    python -m scripts.benchmarks.telemetry --containers 1 10 100 --rounds 50
+"""
+import os
+from unittest import mock
+
+import click
+
+from golem.envs.docker import telemetry as docker_telemetry
+from scripts.benchmarks.common import Timer, summary, temp_dir
+
+NET_DEV = (
+    "Inter-|   Receive  |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast"
+    "|bytes    packets errs drop fifo colls carrier compressed\n"
+    "    lo: 100 1 0 0 0 0 0 0 100 1 0 0 0 0 0 0\n"
+    "  eth0: {rx} 1 0 0 0 0 0 0 {tx} 1 0 0 0 0 0 0\n"
+)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def _update(root, pid, step):
+    cgroup = os.path.join(root, 'cgroup', f'docker/container-{pid}')
+    _write(os.path.join(cgroup, 'memory.current'), f'{step * 4096}\n')
+    _write(os.path.join(cgroup, 'cpu.stat'),
+           f'usage_usec {step * 10 ** 6}\nuser_usec 0\n')
+    _write(os.path.join(cgroup, 'io.stat'),
+           f'8:0 rbytes={step} wbytes={step} rios=1 wios=1\n')
+    _write(os.path.join(root, 'proc', str(pid), 'net', 'dev'),
+           NET_DEV.format(rx=step * 10, tx=step * 20))
+
+
+def run(root: str, count: int, rounds: int) -> None:
+    telemetry = docker_telemetry.ContainerTelemetry()
+    for pid in range(1, count + 1):
+        _write(os.path.join(root, 'proc', str(pid), 'cgroup'),
+               f'0::/docker/container-{pid}\n')
+        _update(root, pid, 0)
+
+    def _create_source(container_id):
+        pid = int(container_id.rsplit('-', 1)[1])
+        return docker_telemetry.CgroupSource.find(
+            container_id, pid, os.path.join(root, 'cgroup'),
+            os.path.join(root, 'proc'))
+
+    timer = Timer()
+    now = 0.0
+    with mock.patch.object(docker_telemetry.ContainerTelemetry,
+                           '_create_source', staticmethod(_create_source)), \
+            mock.patch.object(docker_telemetry.time, 'time',
+                              lambda: now):
+        for pid in range(1, count + 1):
+            telemetry.track(f'container-{pid}', f'subtask-{pid}')
+        telemetry.sample()  # Creates the sources
+        for step in range(1, rounds + 1):
+            for pid in range(1, count + 1):
+                _update(root, pid, step)
+            now = step * telemetry.SAMPLE_INTERVAL
+            with timer.measure():
+                telemetry.sample()
+
+        query = Timer()
+        for pid in range(1, count + 1):
+            with query.measure():
+                telemetry.query(f'subtask-{pid}', minutes=60)
+
+    per_container = [sample / count for sample in timer.samples]
+    click.echo(f"containers={count:4} round: {summary(timer.samples)}")
+    click.echo(f"{'':15} per container: {summary(per_container)}")
+    click.echo(f"{'':15} query: {summary(query.samples)}")
+
+
+@click.command()
+@click.option('--containers', '-n', multiple=True, type=int,
+              default=(1, 10, 100))
+@click.option('--rounds', '-r', default=50)
+def main(containers, rounds):
+    for count in containers:
+        with temp_dir() as root:
+            run(root, count, rounds)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
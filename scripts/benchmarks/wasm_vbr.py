@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+"""
+Wasm verification by redundancy: linear scans and pairwise result comparison
+vs. subtask indexes and digest-keyed buckets.
+
+Creates a WasmTask with N subtasks, assigns every instance to providers
+through should_accept_client / query_extra_data and reports results through
+computation_finished, polling get_progress after each result. A fraction of
+providers returns a different result, so verifiers hold more than one bucket.
+
+    python -m scripts.benchmarks.wasm_vbr --subtasks 10000 --redundancy 3
+"""
+import itertools
+import os
+import random
+from unittest import mock
+from uuid import uuid4
+
+import click
+from golem_messages.factories.datastructures import p2p
+
+from apps.wasm.task import (
+    VbrSubtask,
+    WasmTask,
+    WasmTaskBuilder,
+    WasmTaskTypeInfo,
+)
+from golem.task.taskbase import AcceptClientVerdict, Task
+from golem.task.taskstate import SubtaskStatus
+from scripts.benchmarks.common import Timer, summary, temp_dir
+
+
+def legacy_cmp_results(result_list_a, result_list_b):
+    for r1, r2 in zip(result_list_a, result_list_b):
+        with open(r1, 'rb') as f1, open(r2, 'rb') as f2:
+            if f1.read() != f2.read():
+                return False
+    return True
+
+
+class LegacyWasmTask(WasmTask):
+    """Lookups as they were before the indexes were introduced"""
+
+    def _add_vbrsubtask(self, name, params, redundancy_factor) -> VbrSubtask:
+        subtask = super()._add_vbrsubtask(name, params, redundancy_factor)
+        subtask.verifier.key = None
+        subtask.verifier.comparator = legacy_cmp_results
+        return subtask
+
+    def query_extra_data(self, perf_index, node_id=None, node_name=None):
+        for s in self.subtasks:
+            if s.is_finished():
+                continue
+            next_subtask = s.new_instance(node_id)
+            if next_subtask:
+                s_id, s_params = next_subtask
+                self.subtasks_given[s_id] = {
+                    'status': SubtaskStatus.starting,
+                    'node_id': node_id
+                }
+                ctd = self._new_compute_task_def(s_id, s_params, perf_index)
+                return Task.ExtraData(ctd=ctd)
+        raise RuntimeError()
+
+    def _find_vbrsubtask_by_id(self, subtask_id):
+        for subtask in self.subtasks:
+            if subtask.contains(subtask_id):
+                return subtask
+        raise KeyError()
+
+    def should_accept_client(self, node_id, offer_hash):
+        if node_id in self.nodes_blacklist:
+            return AcceptClientVerdict.REJECTED
+        for s in self.subtasks:
+            if s.is_allowed_node(node_id):
+                return AcceptClientVerdict.ACCEPTED
+        return AcceptClientVerdict.SHOULD_WAIT
+
+    def get_progress(self):
+        num_total = self.get_total_tasks()
+        num_finished = len([s for s in self.subtasks if s.is_finished()])
+        return (WasmTask.REDUNDANCY_FACTOR + 1) * num_finished / num_total
+
+
+def _create_task(task_cls, subtasks, output_dir):
+    definition = {
+        'type': 'wasm',
+        'name': 'wasm',
+        'bid': 1,
+        'timeout': '01:00:00',
+        'subtask_timeout': '00:10:00',
+        'options': {
+            'js_name': 'test.js',
+            'wasm_name': 'test.wasm',
+            'input_dir': '/input/dir',
+            'output_dir': output_dir,
+            'subtasks': {
+                f'subtask{i}': {
+                    'exec_args': [str(i)],
+                    'output_file_paths': ['out'],
+                } for i in range(subtasks)
+            },
+        },
+    }
+    task_def = WasmTaskBuilder.build_full_definition(
+        WasmTaskTypeInfo(), definition)
+    task_def.task_id = str(uuid4())
+    return task_cls(total_tasks=subtasks, task_definition=task_def,
+                    root_path='/', owner=p2p.Node())
+
+
+def _write(path, size, seed):
+    rnd = random.Random(seed)
+    with open(path, 'wb') as f:
+        f.write(rnd.getrandbits(size * 8).to_bytes(size, 'little'))
+    return path
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def run(mode, subtasks, redundancy, result_size, bad_fraction, nodes):
+    task_cls = LegacyWasmTask if mode == 'legacy' else WasmTask
+    with temp_dir() as path, \
+            mock.patch.object(WasmTask, 'REDUNDANCY_FACTOR', redundancy), \
+            mock.patch.object(WasmTask, '_new_compute_task_def'):
+        good = _write(os.path.join(path, 'good'), result_size, 0)
+        bad = [_write(os.path.join(path, f'bad{i}'), result_size, i + 1)
+               for i in range(redundancy + 1)]
+        task = _create_task(task_cls, subtasks, os.path.join(path, 'out'))
+        task.save_results = lambda *_: None
+        node_ids = itertools.cycle(f'node{i}' for i in range(nodes))
+
+        schedule, results, progress = Timer(), Timer(), Timer()
+        assigned = []
+        for _ in range(subtasks * (redundancy + 1)):
+            node_id = next(node_ids)
+            with schedule.measure():
+                if task.should_accept_client(node_id, 'offer') \
+                        != AcceptClientVerdict.ACCEPTED:
+                    continue
+                task.query_extra_data(0., node_id)
+            assigned.append(node_id)
+
+        rnd = random.Random(0)
+        for s_id in list(task.subtasks_given):
+            result = good if rnd.random() >= bad_fraction \
+                else rnd.choice(bad)
+            with results.measure():
+                task.computation_finished(s_id, [result], lambda: None)
+            with progress.measure():
+                task.get_progress()
+
+        click.echo(
+            f"{mode:8} subtasks={subtasks} redundancy={redundancy}"
+            f" assigned={len(assigned)} progress={task.get_progress():.2f}")
+        click.echo(f"  schedule total={schedule.total:.2f}s"
+                   f" {summary(schedule.samples)}")
+        click.echo(f"  results  total={results.total:.2f}s"
+                   f" {summary(results.samples)}")
+        click.echo(f"  progress total={progress.total:.2f}s"
+                   f" {summary(progress.samples)}")
+
+
+@click.command()
+@click.option('--subtasks', '-n', default=10000)
+@click.option('--redundancy', '-r', default=3)
+@click.option('--result-size', default=256 * 1024,
+              help="Result file size in bytes")
+@click.option('--bad-fraction', default=0.1)
+@click.option('--nodes', default=100)
+@click.option('--mode', '-m', 'modes', multiple=True,
+              default=('legacy', 'indexed'))
+def main(subtasks, redundancy, result_size, bad_fraction, nodes, modes):
+    for mode in modes:
+        run(mode, subtasks, redundancy, result_size, bad_fraction, nodes)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
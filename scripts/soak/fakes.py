@@ -0,0 +1,255 @@
+"""Local stand-ins for the services a requestor depends on"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ethereum.utils import denoms
+from twisted.internet import defer
+
+from golem.envs import EnvMetadata, EnvStatus
+from golem.envs.docker.cpu import DockerCPUEnvironment
+
+logger = logging.getLogger(__name__)
+
+
+class HyperdriveStore:
+    """ Content addressed sets of files, copied to a directory """
+
+    def __init__(self, root: str) -> None:
+        self._root = root
+        self._lock = threading.Lock()
+        # Hash -> [(name, path)]
+        self._entries: Dict[str, List[Tuple[str, str]]] = {}
+
+    def add(self, files: Dict[str, str]) -> str:
+        """ Share files given as {path: name} """
+        digest = hashlib.sha1()
+        for path, name in sorted(files.items(), key=lambda item: item[1]):
+            digest.update(name.encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            if content_hash in self._entries:
+                return content_hash
+            entry = []
+            for path, name in files.items():
+                stored = os.path.join(self._root, content_hash, name)
+                os.makedirs(os.path.dirname(stored), exist_ok=True)
+                shutil.copyfile(path, stored)
+                entry.append((name, stored))
+            self._entries[content_hash] = entry
+        return content_hash
+
+    def paths(self, content_hash: str) -> List[str]:
+        with self._lock:
+            return [path for _, path in self._entries[content_hash]]
+
+    def download(self, content_hash: str, dest: str) -> List[str]:
+        with self._lock:
+            entry = list(self._entries[content_hash])
+        files = []
+        for name, path in entry:
+            target = os.path.join(dest, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target)
+            files.append(target)
+        return files
+
+    def remove(self, content_hash: str) -> None:
+        with self._lock:
+            if self._entries.pop(content_hash, None) is None:
+                return
+        shutil.rmtree(os.path.join(self._root, content_hash),
+                      ignore_errors=True)
+
+    def __contains__(self, content_hash: str) -> bool:
+        with self._lock:
+            return content_hash in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class HyperdriveHandler(BaseHTTPRequestHandler):
+    """ Answers the Hyperdrive daemon API commands the clients send """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        params = json.loads(self.rfile.read(length))
+        store = self.server.store
+        command = params.get('command')
+
+        try:
+            if command == 'id':
+                response = {'id': 'soak', 'version': '0.2.5'}
+            elif command == 'addresses':
+                response = {'addresses': {'TCP': {
+                    'address': self.server.host,
+                    'port': self.server.port,
+                }}}
+            elif command == 'upload' and params.get('files'):
+                response = {'hash': store.add(params['files'])}
+            elif command == 'upload':
+                if params.get('hash') not in store:
+                    raise KeyError(params.get('hash'))
+                response = {'hash': params['hash']}
+            elif command == 'download':
+                response = {'files': store.download(params['hash'],
+                                                    params['dest'])}
+            elif command == 'cancel':
+                store.remove(params['hash'])
+                response = {'hash': params['hash']}
+            else:
+                self._respond(400, f'Unknown command: {command}'.encode())
+                return
+        except KeyError as exc:
+            self._respond(404, f'Unknown hash: {exc}'.encode())
+            return
+
+        self._respond(200, json.dumps(response).encode())
+
+    def _respond(self, code: int, body: bytes) -> None:
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+class HyperdriveDaemon(ThreadingHTTPServer):
+    """ Stands in for the Hyperdrive daemon of all nodes. Resources are
+        transferred by copying them between directories. """
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, root: str) -> None:
+        super().__init__(('127.0.0.1', 0), HyperdriveHandler)
+        self.host, self.port = self.server_address[:2]
+        self.store = HyperdriveStore(root)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.serve_forever, name='hyperdrive', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.shutdown()
+        self.server_close()
+        self._thread = None
+
+
+class HyperdriveDaemonManager:
+    """ Replaces golem.network.hyperdrive.daemon_manager.HyperdriveDaemonManager
+        to point the client at a running HyperdriveDaemon """
+
+    def __init__(self, daemon: HyperdriveDaemon, *_args, **_kwargs) -> None:
+        self._daemon = daemon
+
+    def start(self):
+        pass
+
+    def stop(self, *_):
+        pass
+
+    def addresses(self, suppress_warning=False):
+        return {'TCP': (self._daemon.host, self._daemon.port)}
+
+    def public_addresses(self, ip, addresses=None):
+        return {protocol: (ip, entry[1])
+                for protocol, entry in (addresses or self.addresses()).items()}
+
+    def ports(self, addresses=None):
+        return {entry[1] for entry in (addresses or self.addresses()).values()}
+
+
+class CPUEnvironment:
+    """ Replaces the Docker CPU environment. The requestor does not compute,
+        the environment only has to be registered. """
+
+    def __init__(self, config) -> None:
+        self._config = config
+        self._status = EnvStatus.DISABLED
+
+    @classmethod
+    def metadata(cls) -> EnvMetadata:
+        return EnvMetadata(
+            id=DockerCPUEnvironment.ENV_ID,
+            description='Soak test CPU environment',
+            supported_counters=[],
+            custom_metadata={},
+        )
+
+    def status(self) -> EnvStatus:
+        return self._status
+
+    def update_config(self, config) -> None:
+        self._config = config
+
+    def prepare(self) -> defer.Deferred:
+        self._status = EnvStatus.ENABLED
+        return defer.succeed(None)
+
+    def clean_up(self) -> defer.Deferred:
+        self._status = EnvStatus.DISABLED
+        return defer.succeed(None)
+
+
+class Payment(NamedTuple):
+    subtask_id: str
+    value: int
+    created_date: datetime.datetime
+
+
+class TransactionSystem:
+    """ Unlimited funds, no Ethereum. Payments are only counted, not kept, so
+        that they do not add to the memory growth. """
+
+    FUNDS = 1000 * denoms.ether
+
+    deposit_contract_available = True
+    deposit_contract_address = '0x' + 40 * '0'
+
+    def __init__(self) -> None:
+        self.payments = 0
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def get_available_gnt(self, account_address=None) -> int:
+        return self.FUNDS
+
+    def get_available_eth(self) -> int:
+        return self.FUNDS
+
+    def eth_for_batch_payment(self, num_payments: int) -> int:
+        return 0
+
+    def lock_funds_for_payments(self, price: int, num: int) -> None:
+        pass
+
+    def unlock_funds_for_payments(self, price: int, num: int) -> None:
+        pass
+
+    def add_payment_info(self, subtask_id: str, value: int,
+                         **_kwargs) -> Payment:
+        self.payments += 1
+        return Payment(subtask_id, value, datetime.datetime.now())
@@ -0,0 +1,144 @@
+"""Periodic measurements of a soak run"""
+import collections
+import csv
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import click
+import psutil
+from twisted.internet.task import LoopingCall
+
+from golem.core.profiler import Profiler
+
+COLUMNS = (
+    'elapsed', 'lag_mean_ms', 'lag_p99', 'lag_max_ms', 'messages_s',
+    'subtasks_s', 'accepted', 'rejected', 'failed', 'disconnected',
+    'tasks_finished', 'rss_mb', 'rss_growth_mb', 'db_mb',
+)
+
+
+def _lag_delta(before: Dict[str, Any], after: Dict[str, Any]) \
+        -> Dict[str, Any]:
+    count = after['count'] - before['count']
+    total = after['mean'] * after['count'] - before['mean'] * before['count']
+    buckets = collections.OrderedDict(
+        (label, value - before['buckets'].get(label, 0))
+        for label, value in after['buckets'].items()
+    )
+    return {'count': count, 'mean': total / count if count else 0.,
+            'buckets': buckets}
+
+
+def _bucket_percentile(buckets: Dict[str, int], pct: float) -> str:
+    """ Upper bound of the bucket holding the given percentile """
+    total = sum(buckets.values())
+    if not total:
+        return 'n/a'
+    seen = 0
+    for label, count in buckets.items():
+        seen += count
+        if seen >= total * pct / 100:
+            return f'<{label}'
+    return 'inf'
+
+
+class Monitor:
+    """ Samples the requestor's process every `interval` seconds """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 stats: collections.Counter,
+                 datadir: str,
+                 finished_tasks: Callable[[], int],
+                 interval: float = 60.,
+                 csv_path: Optional[str] = None) -> None:
+        self._stats = stats
+        self._db_files = [os.path.join(datadir, 'golem.db' + suffix)
+                          for suffix in ('', '-wal', '-shm')]
+        self._finished_tasks = finished_tasks
+        self._interval = interval
+        self._csv_path = csv_path
+        self._process = psutil.Process()
+        self._loop = LoopingCall(self._sample)
+
+        self._started = 0.
+        self._rss_baseline = 0
+        self._last_time = 0.
+        self._last_stats: collections.Counter = collections.Counter()
+        self._last_lag: Dict[str, Any] = {}
+        self.rows: List[Dict[str, Any]] = []
+
+    def start(self) -> None:
+        self._started = self._last_time = time.monotonic()
+        self._rss_baseline = self._process.memory_info().rss
+        self._last_stats = collections.Counter(self._stats)
+        self._last_lag = self._lag()
+        if self._csv_path:
+            with open(self._csv_path, 'w', newline='') as f:
+                csv.writer(f).writerow(COLUMNS)
+        self._loop.start(self._interval, now=False)
+
+    def stop(self) -> None:
+        if self._loop.running:
+            self._loop.stop()
+        self._sample()
+
+    @staticmethod
+    def _lag() -> Dict[str, Any]:
+        empty = {'count': 0, 'mean': 0., 'max': 0., 'buckets': {}}
+        return Profiler.instance().histograms().get('reactor.lag', empty)
+
+    def _db_size(self) -> int:
+        return sum(os.path.getsize(path) for path in self._db_files
+                   if os.path.exists(path))
+
+    def _sample(self) -> None:
+        now = time.monotonic()
+        period = max(now - self._last_time, 1e-9)
+        stats = collections.Counter(self._stats)
+        delta = stats - self._last_stats
+        lag = self._lag()
+        lag_delta = _lag_delta(self._last_lag, lag) if lag['count'] \
+            else {'count': 0, 'mean': 0., 'buckets': {}}
+        rss = self._process.memory_info().rss
+        mb = 1024 * 1024
+
+        row = {
+            'elapsed': round(now - self._started),
+            'lag_mean_ms': round(lag_delta['mean'] * 1000, 3),
+            'lag_p99': _bucket_percentile(lag_delta['buckets'], 99),
+            'lag_max_ms': round(lag['max'] * 1000, 3),
+            'messages_s': round(delta['messages'] / period, 1),
+            'subtasks_s': round(
+                (delta['accepted'] + delta['rejected']) / period, 2),
+            'accepted': stats['accepted'],
+            'rejected': stats['rejected'],
+            'failed': stats['failed'],
+            'disconnected': stats['disconnected'],
+            'tasks_finished': self._finished_tasks(),
+            'rss_mb': round(rss / mb, 1),
+            'rss_growth_mb': round((rss - self._rss_baseline) / mb, 1),
+            'db_mb': round(self._db_size() / mb, 2),
+        }
+        self.rows.append(row)
+        self._last_time, self._last_stats, self._last_lag = now, stats, lag
+
+        click.echo(' '.join(f'{key}={row[key]}' for key in COLUMNS))
+        if self._csv_path:
+            with open(self._csv_path, 'a', newline='') as f:
+                csv.writer(f).writerow([row[key] for key in COLUMNS])
+
+    def summary(self) -> str:
+        if not self.rows:
+            return 'n/a'
+        elapsed = max(self.rows[-1]['elapsed'], 1)
+        last = self.rows[-1]
+        lag_means = [row['lag_mean_ms'] for row in self.rows]
+        return (
+            f"{elapsed}s: {self._stats['messages'] / elapsed:.1f} messages/s,"
+            f" {(last['accepted'] + last['rejected']) / elapsed:.2f}"
+            f" subtasks/s, lag mean={max(lag_means):.3f}ms (worst interval)"
+            f" max={last['lag_max_ms']}ms, rss={last['rss_mb']}MB"
+            f" ({last['rss_growth_mb']:+}MB), db={last['db_mb']}MB"
+        )
@@ -0,0 +1,468 @@
+"""Simulated providers speaking the task protocol to a real requestor"""
+import collections
+import logging
+import os
+import random
+import shutil
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from eth_utils import encode_hex
+from golem_messages import message
+from golem_messages.cryptography import mk_privkey, privtopub
+from golem_messages.datastructures import p2p as dt_p2p
+from golem_messages.datastructures import tasks as dt_tasks
+from golem_messages.utils import pubkey_to_address
+from twisted.internet import reactor, threads
+
+import golem
+from golem.core import variables
+from golem.core.fileencrypt import FileEncryptor
+from golem.network.hyperdrive.client import HyperdriveClient, to_hyperg_peer
+from golem.network.transport.network import ProtocolFactory, SessionFactory
+from golem.network.transport.session import BasicSafeSession
+from golem.network.transport.tcpnetwork import SafeProtocol, SocketAddress, \
+    TCPConnectInfo, TCPListenInfo, TCPNetwork
+from golem.resource.resourcehandshake import ResourceHandshake
+from golem.task.result.resultpackage import EncryptingTaskResultPackager
+from scripts.soak.fakes import HyperdriveDaemon
+
+logger = logging.getLogger(__name__)
+
+# Returns the headers of the tasks offered by the requestor
+Market = Callable[[], List[dt_tasks.TaskHeader]]
+
+
+class Behaviour(NamedTuple):
+    latency: float = 1.0  # mean time to compute a subtask, s
+    jitter: float = 0.5  # spread of the latency, as its fraction
+    failure_rate: float = 0.  # share of subtasks reported as failed
+    bad_result_rate: float = 0.  # share of results failing verification
+    disconnect_rate: float = 0.  # share of subtasks abandoned mid-way
+    request_interval: float = 1.0  # delay between the subtasks, s
+
+    def compute_time(self) -> float:
+        return max(0., random.gauss(self.latency, self.latency * self.jitter))
+
+
+class ProviderSession(BasicSafeSession):
+    """ Session of a simulated provider with the requestor. Handshakes like
+        TaskSession and hands the task messages over to the provider. """
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self.provider: 'SimulatedProvider' = conn.server
+        self.conn_id = None
+        self.can_be_unverified.extend([
+            message.base.Hello,
+            message.base.RandVal,
+        ])
+        self.can_be_not_encrypted.append(message.base.Hello)
+        self._interpretation.update({
+            message.base.Hello: self._react_to_hello,
+            message.base.RandVal: self._react_to_rand_val,
+        })
+        for msg_cls, handler in self.provider.handlers().items():
+            self._interpretation[msg_cls] = \
+                lambda msg, handler=handler: handler(self, msg)
+
+    @property
+    def my_private_key(self) -> bytes:
+        return self.provider.private_key
+
+    def interpret(self, msg):
+        self.provider.stats['messages'] += 1
+        super().interpret(msg)
+
+    def send(self, msg, send_unverified=False):
+        self.provider.stats['messages'] += 1
+        super().send(msg, send_unverified=send_unverified)
+
+    def dropped(self):
+        super().dropped()
+        self.provider.session_dropped(self)
+
+    def send_hello(self):
+        self.send(
+            message.base.Hello(
+                client_ver=golem.__version__,
+                rand_val=self.rand_val,
+                proto_id=variables.PROTOCOL_CONST.ID,
+                node_info=self.provider.node,
+            ),
+            send_unverified=True
+        )
+
+    def _react_to_hello(self, msg):
+        if self.key_id is None:
+            self.key_id = msg.node_info.key
+            self.send_hello()
+        self.send(
+            message.base.RandVal(rand_val=msg.rand_val),
+            send_unverified=True
+        )
+
+    def _react_to_rand_val(self, msg):
+        if self.key_id is None:
+            return
+        if self.rand_val != msg.rand_val:
+            self.disconnect(message.base.Disconnect.REASON.Unverified)
+            return
+        self.verified = True
+        self.provider.session_verified(self)
+
+
+class SimulatedProvider:
+    """ Offers to compute the requestor's subtasks and reports results or
+        failures after a simulated computation, as told by its behaviour.
+
+        All provider work runs in the reactor thread shared with the
+        requestor, except for packaging the results. """
+
+    # Give up an offer that was neither accepted nor rejected
+    OFFER_TIMEOUT = 60.  # s
+    PERF_INDEX = 1000.
+    MAX_SIZE = 10 * 1024 * 1024  # KiB
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 index: int,
+                 daemon: HyperdriveDaemon,
+                 market: Market,
+                 behaviour: Behaviour,
+                 stats: collections.Counter,
+                 work_dir: str,
+                 host: str = '127.0.0.1') -> None:
+        self.behaviour = behaviour
+        self.stats = stats
+        self.pending_sessions: set = set()
+
+        self.private_key = mk_privkey(f'soak-provider-{index}')
+        public_key = privtopub(self.private_key)
+        self.key_id = encode_hex(public_key)[2:]
+        self.eth_addr = pubkey_to_address(public_key)
+        self.node = dt_p2p.Node(
+            node_name=f'soak-{index}',
+            key=self.key_id,
+            prv_addr=host,
+            pub_addr=host,
+            hyperdrive_prv_port=daemon.port,
+            hyperdrive_pub_port=daemon.port,
+        )
+
+        self._daemon = daemon
+        self._market = market
+        self._work_dir = work_dir
+        self._network = TCPNetwork(ProtocolFactory(
+            SafeProtocol, self, SessionFactory(ProviderSession)))
+        self._listen_info: Optional[TCPListenInfo] = None
+
+        self._requestor: Optional[dt_p2p.Node] = None
+        self._session: Optional[ProviderSession] = None
+        self._connecting = False
+        self._outbox: List[message.base.Message] = []
+
+        self._running = False
+        self._header: Optional[dt_tasks.TaskHeader] = None
+        self._offer_timeout = None
+        self._handshake: Optional[ResourceHandshake] = None
+        # Subtask id -> hash of the shared result
+        self._results: Dict[str, str] = {}
+
+    def start(self) -> None:
+        self._running = True
+        self._listen_info = TCPListenInfo(
+            0, established_callback=self._listening)
+        self._network.listen(self._listen_info)
+
+    def stop(self) -> None:
+        self._running = False
+        self._cancel_offer_timeout()
+        if self._session:
+            self._session.dropped()
+        for content_hash in self._results.values():
+            self._daemon.store.remove(content_hash)
+        self._results.clear()
+
+    def handlers(self) -> Dict[type, Callable]:
+        return {
+            message.tasks.TaskToCompute: self._react_to_task_to_compute,
+            message.tasks.CannotAssignTask: self._react_to_cannot_assign_task,
+            message.tasks.AckReportComputedTask:
+                self._react_to_ack_report_computed_task,
+            message.tasks.RejectReportComputedTask:
+                self._react_to_reject_report_computed_task,
+            message.tasks.SubtaskResultsAccepted:
+                self._react_to_subtask_results_accepted,
+            message.tasks.SubtaskResultsRejected:
+                self._react_to_subtask_results_rejected,
+            message.resources.ResourceHandshakeStart:
+                self._react_to_resource_handshake_start,
+            message.resources.ResourceHandshakeNonce:
+                self._react_to_resource_handshake_nonce,
+            message.resources.ResourceHandshakeVerdict:
+                self._react_to_resource_handshake_verdict,
+        }
+
+    # ########################
+    #        SESSIONS
+    # ########################
+
+    def new_connection(self, session: ProviderSession) -> None:
+        pass
+
+    def session_verified(self, session: ProviderSession) -> None:
+        if self._session not in (None, session):
+            self._session.dropped()
+        self._session = session
+        outbox, self._outbox = self._outbox, []
+        for msg in outbox:
+            session.send(msg)
+
+    def session_dropped(self, session: ProviderSession) -> None:
+        if self._session is session:
+            self._session = None
+
+    def _listening(self, port: int) -> None:
+        self.node.prv_port = self.node.pub_port = port
+        self._schedule_request(random.uniform(0, self.behaviour.latency))
+
+    def _send(self, msg: message.base.Message) -> None:
+        if self._session is not None and self._session.verified:
+            self._session.send(msg)
+            return
+        self._outbox.append(msg)
+        self._connect()
+
+    def _connect(self) -> None:
+        if self._connecting or self._session is not None:
+            return
+        self._connecting = True
+        self._network.connect(TCPConnectInfo(
+            [SocketAddress(self._requestor.prv_addr, self._requestor.prv_port)],
+            established_callback=self._connected,
+            failure_callback=self._connection_failed,
+        ))
+
+    def _connected(self, session: ProviderSession, **_kwargs) -> None:
+        self._connecting = False
+        session.key_id = self._requestor.key
+        self._session = session
+        session.send_hello()
+
+    def _connection_failed(self, **_kwargs) -> None:
+        self._connecting = False
+        self.stats['connection_failures'] += 1
+        self._outbox.clear()
+        self._idle()
+
+    # ########################
+    #         OFFERS
+    # ########################
+
+    def _schedule_request(self, delay: float) -> None:
+        if self._running:
+            reactor.callLater(delay, self._request)
+
+    def _request(self) -> None:
+        if not self._running or self._header is not None:
+            return
+        headers = self._market()
+        if not headers:
+            self._schedule_request(self.behaviour.request_interval)
+            return
+
+        self._header = random.choice(headers)
+        self._requestor = self._header.task_owner
+        self._offer_timeout = reactor.callLater(
+            self.OFFER_TIMEOUT, self._offer_expired)
+        self._send(self._want_to_compute())
+        self.stats['offers'] += 1
+
+    def _want_to_compute(self) -> message.tasks.WantToComputeTask:
+        return message.tasks.WantToComputeTask(
+            perf_index=self.PERF_INDEX,
+            price=self._header.max_price,
+            max_resource_size=self.MAX_SIZE,
+            max_memory_size=self.MAX_SIZE,
+            concent_enabled=False,
+            provider_public_key=self.key_id,
+            provider_ethereum_address=self.eth_addr,
+            task_header=self._header,
+        )
+
+    def _offer_expired(self) -> None:
+        self._offer_timeout = None
+        self.stats['offers_expired'] += 1
+        self._idle()
+
+    def _cancel_offer_timeout(self) -> None:
+        if self._offer_timeout and self._offer_timeout.active():
+            self._offer_timeout.cancel()
+        self._offer_timeout = None
+
+    def _idle(self) -> None:
+        self._cancel_offer_timeout()
+        self._header = None
+        self._schedule_request(self.behaviour.request_interval)
+
+    def _react_to_cannot_assign_task(self, _session, _msg) -> None:
+        self.stats['cannot_assign'] += 1
+        self._idle()
+
+    # ########################
+    #        HANDSHAKE
+    # ########################
+
+    def _share_options(self) -> dict:
+        return HyperdriveClient.build_options(peers=[
+            to_hyperg_peer(self._daemon.host, self._daemon.port),
+        ]).__dict__
+
+    def _react_to_resource_handshake_start(self, session, msg) -> None:
+        if not self._handshake or self._handshake.success():
+            self._handshake = ResourceHandshake()
+            self._handshake.start(self._work_dir)
+            nonce_file = self._handshake.file
+            self._handshake.hash = self._daemon.store.add(
+                {nonce_file: os.path.basename(nonce_file)})
+            os.remove(nonce_file)
+            session.send(message.resources.ResourceHandshakeStart(
+                resource=self._handshake.hash,
+                options=self._share_options(),
+            ))
+
+        try:
+            nonce_file = self._daemon.store.paths(msg.resource)[0]
+        except (KeyError, IndexError):
+            logger.warning("Unknown handshake resource: %r", msg.resource)
+            session.dropped()
+            return
+        session.send(message.resources.ResourceHandshakeNonce(
+            nonce=ResourceHandshake.read_nonce(nonce_file),
+        ))
+
+    def _react_to_resource_handshake_nonce(self, session, msg) -> None:
+        accepted = bool(self._handshake and
+                        self._handshake.verify_local(msg.nonce))
+        session.send(message.resources.ResourceHandshakeVerdict(
+            nonce=msg.nonce,
+            accepted=accepted,
+        ))
+        self._finalize_handshake()
+
+    def _react_to_resource_handshake_verdict(self, _session, msg) -> None:
+        if self._handshake:
+            self._handshake.remote_verdict(msg.accepted)
+            self._finalize_handshake()
+
+    def _finalize_handshake(self) -> None:
+        handshake = self._handshake
+        if not handshake.finished():
+            return
+        self._daemon.store.remove(handshake.hash)
+        if not handshake.success():
+            self.stats['handshake_failures'] += 1
+            self._handshake = None
+            self._idle()
+        elif self._header is not None:
+            # The offer sent before the handshake was ignored
+            self._send(self._want_to_compute())
+
+    # ########################
+    #       COMPUTATION
+    # ########################
+
+    def _react_to_task_to_compute(self, session, msg) -> None:
+        self._cancel_offer_timeout()
+        behaviour = self.behaviour
+        compute_time = behaviour.compute_time()
+
+        if random.random() < behaviour.disconnect_rate:
+            self.stats['disconnected'] += 1
+            session.dropped()
+            reactor.callLater(compute_time, self._idle)
+        elif random.random() < behaviour.failure_rate:
+            reactor.callLater(compute_time, self._fail, msg)
+        else:
+            bad = random.random() < behaviour.bad_result_rate
+            reactor.callLater(compute_time, self._report, msg, bad)
+
+    def _fail(self, ttc: message.tasks.TaskToCompute) -> None:
+        self.stats['failed'] += 1
+        self._send(message.tasks.TaskFailure(
+            task_to_compute=ttc,
+            err='Simulated failure',
+        ))
+        self._idle()
+
+    def _report(self, ttc: message.tasks.TaskToCompute, bad: bool) -> None:
+        deferred = threads.deferToThread(self._package, ttc, bad)
+        deferred.addCallback(self._send_report, ttc)
+        deferred.addErrback(self._package_error)
+
+    def _package(self, ttc: message.tasks.TaskToCompute, bad: bool):
+        extra_data = ttc.compute_task_def['extra_data']
+        subtask_dir = os.path.join(self._work_dir, ttc.subtask_id)
+        os.makedirs(subtask_dir)
+        try:
+            result = os.path.join(
+                subtask_dir, os.path.basename(extra_data['result_file']))
+            with open(result, 'w') as f:
+                f.write('0' * (extra_data['result_size'] + bad))
+
+            secret = FileEncryptor.gen_secret(16, 32)
+            name = f'{ttc.task_id}.{ttc.subtask_id}'
+            path = os.path.join(subtask_dir, name)
+            _, sha1 = EncryptingTaskResultPackager(secret).create(
+                path, [result])
+            content_hash = self._daemon.store.add({path: name})
+            return content_hash, secret, sha1, os.path.getsize(path)
+        finally:
+            shutil.rmtree(subtask_dir, ignore_errors=True)
+
+    def _send_report(self, result, ttc: message.tasks.TaskToCompute) -> None:
+        content_hash, secret, sha1, size = result
+        self._results[ttc.subtask_id] = content_hash
+        self._send(message.tasks.ReportComputedTask(
+            task_to_compute=ttc,
+            address=self.node.prv_addr,
+            port=self.node.prv_port,
+            key_id=self.key_id,
+            node_info=self.node.to_dict(),
+            extra_data=[],
+            size=size,
+            package_hash='sha1:' + sha1,
+            multihash=content_hash,
+            secret=secret,
+            options=self._share_options(),
+        ))
+        self.stats['reported'] += 1
+        self._idle()
+
+    def _package_error(self, failure) -> None:
+        logger.error("Cannot package the result: %r", failure.value)
+        self._idle()
+
+    # ########################
+    #         RESULTS
+    # ########################
+
+    def _react_to_ack_report_computed_task(self, _session, _msg) -> None:
+        self.stats['acknowledged'] += 1
+
+    def _react_to_reject_report_computed_task(self, _session, msg) -> None:
+        self.stats['report_rejected'] += 1
+        self._forget_result(msg.subtask_id)
+
+    def _react_to_subtask_results_accepted(self, _session, msg) -> None:
+        self.stats['accepted'] += 1
+        self._forget_result(msg.subtask_id)
+
+    def _react_to_subtask_results_rejected(self, _session, msg) -> None:
+        self.stats['rejected'] += 1
+        self._forget_result(msg.report_computed_task.subtask_id)
+
+    def _forget_result(self, subtask_id: str) -> None:
+        content_hash = self._results.pop(subtask_id, None)
+        if content_hash:
+            self._daemon.store.remove(content_hash)
@@ -0,0 +1,191 @@
+"""A real requestor node with its external services replaced by local fakes"""
+import contextlib
+import functools
+import logging
+import os
+from typing import Iterator, List, Set
+from unittest import mock
+
+import faker
+from golem_messages.datastructures import tasks as dt_tasks
+
+from apps.appsmanager import AppsManager
+from golem.appconfig import AppConfig
+from golem.clientconfigdescriptor import ClientConfigDescriptor
+from golem.core import common, hostaddress
+from golem.core.variables import CONCENT_CHOICES
+from golem.database import Database
+from golem.model import db, DB_FIELDS, DB_MODELS
+from golem.task import rpc as task_rpc
+from scripts.soak import fakes
+
+logger = logging.getLogger(__name__)
+
+DUMMY_RESOURCE = os.path.join(
+    common.get_golem_path(), 'apps', 'dummy', 'test_data', 'in.data')
+
+
+class SoakAppsManager(AppsManager):
+    """ The requestor does not compute, no benchmarks are run """
+
+    @staticmethod
+    def _benchmark_enabled(env):
+        return False
+
+
+def _ipv4_networks():
+    # Providers listen on the loopback interface, which is not considered
+    # a part of any network the requestor might connect to
+    return hostaddress.ipv4_networks() + [('127.0.0.0', '8')]
+
+
+class Requestor:
+    """ Runs a Client the way a node does, keeping a number of Dummy tasks
+        in progress """
+
+    def __init__(self,
+                 datadir: str,
+                 daemon: fakes.HyperdriveDaemon,
+                 offer_pooling_interval: float = 1.0) -> None:
+        from golem.client import Client
+        from golem.core.keysauth import KeysAuth
+        from golem.hardware.presets import HardwarePresets
+
+        self.datadir = datadir
+        self._daemon = daemon
+        self._tasks: Set[str] = set()
+        self._finished = 0
+
+        app_config = AppConfig.load_config(datadir)
+        config_desc = ClientConfigDescriptor()
+        config_desc.init_from_app_config(app_config)
+        config_desc.use_upnp = False
+        config_desc.node_name = '[Requestor] SOAK'
+        config_desc.node_address = '127.0.0.1'
+        config_desc.seed_host = ''
+        config_desc.hyperdrive_rpc_address = daemon.host
+        config_desc.hyperdrive_rpc_port = daemon.port
+        config_desc.offer_pooling_interval = offer_pooling_interval
+        config_desc.net_masking_enabled = False
+        # Keep providers sending bad results in the load
+        config_desc.computing_trust = -1.0
+
+        with mock.patch.dict('ethereum.keys.PBKDF2_CONSTANTS', {'c': 1}):
+            keys_auth = KeysAuth(
+                datadir=datadir,
+                private_key_name=faker.Faker().pystr(),
+                password='password',
+            )
+
+        database = Database(
+            db, fields=DB_FIELDS, models=DB_MODELS, db_dir=datadir)
+        db.writer.start()
+        HardwarePresets.initialize(datadir)
+        HardwarePresets.update_config('default', config_desc)
+
+        apps_manager = SoakAppsManager()
+        apps_manager.load_all_apps()
+
+        self.transaction_system = fakes.TransactionSystem()
+        self.client = Client(
+            datadir=datadir,
+            app_config=app_config,
+            config_desc=config_desc,
+            keys_auth=keys_auth,
+            database=database,
+            transaction_system=self.transaction_system,
+            use_monitor=False,
+            connect_to_known_hosts=False,
+            use_docker_manager=False,
+            apps_manager=apps_manager,
+            concent_variant=CONCENT_CHOICES['disabled'],
+        )
+        self.client.are_terms_accepted = lambda: True
+        # No STUN lookup
+        self.client.node.pub_addr = '127.0.0.1'
+
+    @contextlib.contextmanager
+    def _fakes(self) -> Iterator[None]:
+        with mock.patch('golem.client.HyperdriveDaemonManager',
+                        functools.partial(fakes.HyperdriveDaemonManager,
+                                          self._daemon)), \
+                mock.patch('golem.task.taskserver.'
+                           'NonHypervisedDockerCPUEnvironment',
+                           fakes.CPUEnvironment), \
+                mock.patch('golem.network.transport.tcpserver.ipv4_networks',
+                           _ipv4_networks):
+            yield
+
+    def start(self) -> None:
+        """ Blocking, to be run in a thread """
+        with self._fakes():
+            self.client.start()
+
+    def quit(self) -> None:
+        self.client.quit()
+        db.writer.stop()
+
+    @property
+    def task_manager(self):
+        return self.client.task_server.task_manager
+
+    @property
+    def ready(self) -> bool:
+        task_server = self.client.task_server
+        return task_server is not None and bool(task_server.cur_port)
+
+    @property
+    def finished_tasks(self) -> int:
+        return self._finished
+
+    def active_headers(self) -> List[dt_tasks.TaskHeader]:
+        if not self.ready:
+            return []
+        task_manager = self.task_manager
+        return [
+            task_manager.tasks[task_id].header
+            for task_id in self._tasks
+            if task_id in task_manager.tasks
+            and task_manager.tasks_states[task_id].status.is_active()
+            and task_manager.tasks[task_id].needs_computation()
+        ]
+
+    def keep_tasks(self, count: int, subtasks: int,
+                   subtask_timeout: int) -> None:
+        """ Replace finished tasks with new ones """
+        if not self.ready:
+            return
+
+        states = self.task_manager.tasks_states
+        for task_id in list(self._tasks):
+            state = states.get(task_id)
+            if state is None or state.status.is_completed():
+                self._tasks.discard(task_id)
+                self._finished += 1
+
+        while len(self._tasks) < count:
+            self._tasks.add(self._create_task(subtasks, subtask_timeout))
+
+    def _create_task(self, subtasks: int, subtask_timeout: int) -> str:
+        index = self._finished + len(self._tasks)
+        task_id, error = task_rpc.ClientProvider(self.client).create_task({
+            'type': 'Dummy',
+            'name': f'soak {index}',
+            'bid': 1.0,
+            'compute_on': 'cpu',
+            'concent_enabled': False,
+            'options': {
+                'difficulty': 0,
+                'output_path': os.path.join(self.datadir, 'output'),
+                'subtask_data_size': 128,
+            },
+            'resources': [DUMMY_RESOURCE],
+            'subtask_timeout': common.timeout_to_string(subtask_timeout),
+            'subtasks_count': subtasks,
+            'timeout': common.timeout_to_string(
+                subtask_timeout * subtasks * 2),
+        })
+        if error:
+            raise RuntimeError(f"Cannot create a task: {error}")
+        logger.info("Created task %s", task_id)
+        return task_id
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Soak test of a single requestor against many simulated providers.
+
+The requestor is a real Client listening on the loopback interface. The
+providers speak the task protocol to it over TCP with real golem_messages,
+offering to compute its Dummy tasks and reporting results, failures and
+bad results after a simulated computation, or disconnecting mid-way, at
+the given rates. Docker, the Hyperdrive daemon and Ethereum are replaced
+by local fakes and the Concent is disabled.
+
+Every interval the reactor lag, messages/s, subtasks/s, memory growth and
+the database size are reported:
+
+    python -m scripts.soak.run --providers 200 --duration 3600
+
+The behaviour of the providers can be changed during the run with
+a script, a JSON list of phases overriding the command line values:
+
+    [{"at": 600, "failure_rate": 0.2}, {"at": 1200, "latency": 0.1}]
+
+The providers share the reactor with the requestor. Their own cost is
+the same between runs, so that a regression in the requestor shows up in
+the comparison of two runs with the same parameters.
+"""
+import collections
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import click
+from twisted.internet import reactor, threads
+from twisted.internet.task import LoopingCall
+
+from golem.core.common import config_logging
+from golem.core.profiler import Profiler
+from scripts.soak import fakes
+from scripts.soak.metrics import Monitor
+from scripts.soak.provider import Behaviour, SimulatedProvider
+from scripts.soak.requestor import Requestor
+
+logger = logging.getLogger(__name__)
+
+# Spread the start of the providers
+PROVIDERS_PER_SECOND = 50
+
+
+def _load_script(path):
+    if not path:
+        return []
+    with open(path) as f:
+        phases = json.load(f)
+    for phase in phases:
+        unknown = set(phase) - {'at'} - set(Behaviour._fields)
+        if unknown:
+            raise click.BadParameter(f"Unknown fields: {sorted(unknown)}")
+    return phases
+
+
+@click.command()
+@click.option('--providers', '-p', default=100)
+@click.option('--duration', '-d', default=3600, help="Seconds")
+@click.option('--interval', default=60., help="Reporting interval, s")
+@click.option('--tasks', default=5, help="Tasks kept in progress")
+@click.option('--subtasks', default=50, type=click.IntRange(1, 50))
+@click.option('--subtask-timeout', default=600, help="Seconds")
+@click.option('--latency', default=Behaviour.latency,
+              help="Mean subtask computation time, s")
+@click.option('--jitter', default=Behaviour.jitter)
+@click.option('--failure-rate', default=Behaviour.failure_rate)
+@click.option('--bad-result-rate', default=Behaviour.bad_result_rate)
+@click.option('--disconnect-rate', default=Behaviour.disconnect_rate)
+@click.option('--request-interval', default=Behaviour.request_interval,
+              help="Delay between the subtasks of a provider, s")
+@click.option('--script', type=click.Path(exists=True, dir_okay=False),
+              help="JSON list of behaviour changes")
+@click.option('--offer-pooling', default=1.0,
+              help="Requestor's offer pooling interval, s")
+@click.option('--datadir', type=click.Path(file_okay=False),
+              help="Kept after the run; a temporary one by default")
+@click.option('--csv', 'csv_path', type=click.Path(dir_okay=False))
+@click.option('--loglevel', default='WARNING')
+# pylint: disable=too-many-arguments,too-many-locals
+def main(providers, duration, interval, tasks, subtasks, subtask_timeout,
+         latency, jitter, failure_rate, bad_result_rate, disconnect_rate,
+         request_interval, script, offer_pooling, datadir, csv_path,
+         loglevel):
+    phases = _load_script(script)
+    temporary = datadir is None
+    datadir = datadir or tempfile.mkdtemp(prefix='golem-soak-')
+    requestor_dir = os.path.join(datadir, 'requestor')
+    providers_dir = os.path.join(datadir, 'providers')
+    os.makedirs(requestor_dir, exist_ok=True)
+    config_logging(datadir=requestor_dir, loglevel=loglevel)
+
+    daemon = fakes.HyperdriveDaemon(os.path.join(datadir, 'hyperdrive'))
+    daemon.start()
+    requestor = Requestor(requestor_dir, daemon, offer_pooling)
+
+    stats: collections.Counter = collections.Counter()
+    behaviour = Behaviour(latency, jitter, failure_rate, bad_result_rate,
+                          disconnect_rate, request_interval)
+    simulated = []
+    for index in range(providers):
+        work_dir = os.path.join(providers_dir, str(index))
+        os.makedirs(work_dir, exist_ok=True)
+        simulated.append(SimulatedProvider(
+            index, daemon, requestor.active_headers, behaviour, stats,
+            work_dir))
+
+    monitor = Monitor(stats, requestor_dir, lambda: requestor.finished_tasks,
+                      interval=interval, csv_path=csv_path)
+    feeder = LoopingCall(requestor.keep_tasks, tasks, subtasks,
+                         subtask_timeout)
+
+    def change_behaviour(phase):
+        changes = {k: v for k, v in phase.items() if k != 'at'}
+        click.echo(f"Changing behaviour: {changes}")
+        for provider in simulated:
+            provider.behaviour = provider.behaviour._replace(**changes)
+
+    def started(_):
+        click.echo(f"Requestor started, {providers} providers")
+        feeder.start(1.0)
+        for index, provider in enumerate(simulated):
+            reactor.callLater(index / PROVIDERS_PER_SECOND, provider.start)
+        for phase in phases:
+            reactor.callLater(phase['at'], change_behaviour, phase)
+        monitor.start()
+        reactor.callLater(duration, stop)
+
+    def failed(failure):
+        click.echo(f"Requestor failed to start: {failure.value}", err=True)
+        reactor.stop()
+
+    def stop():
+        monitor.stop()
+        if feeder.running:
+            feeder.stop()
+        for provider in simulated:
+            provider.stop()
+        click.echo(monitor.summary())
+        threads.deferToThread(requestor.quit) \
+            .addBoth(lambda _: reactor.stop())
+
+    def start():
+        Profiler.instance().start()
+        threads.deferToThread(requestor.start).addCallbacks(started, failed)
+
+    reactor.callWhenRunning(start)
+    try:
+        reactor.run()
+    finally:
+        daemon.stop()
+        if temporary:
+            shutil.rmtree(datadir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
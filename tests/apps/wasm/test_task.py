@@ -1,7 +1,9 @@
+import os
 from unittest import TestCase
 from uuid import uuid4
 
 from golem_messages.factories.datastructures import p2p
+from golem.task.taskbase import AcceptClientVerdict
 from golem.testutils import TempDirFixture
 
 from apps.wasm.task import (
@@ -11,6 +13,7 @@ from apps.wasm.task import (
     WasmTaskOptions,
     WasmTaskTypeInfo
 )
+from apps.wasm.vbr import VerificationResult
 
 
 class WasmTaskOptionsTestCase(TestCase):
@@ -167,3 +170,71 @@ class WasmTaskTestCase(TempDirFixture):
             all([item in subt_extra_data.items()
                  for item in expected_dict.items()])
         )
+
+    def _write_result(self, name, content):
+        path = os.path.join(self.tempdir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_digest_results(self):
+        a = self._write_result('a', b'result' * 1000)
+        b = self._write_result('b', b'result' * 1000)
+        c = self._write_result('c', b'other')
+
+        self.assertEqual(
+            WasmTask.digest_results([a, c]),
+            WasmTask.digest_results([b, c]),
+        )
+        self.assertNotEqual(
+            WasmTask.digest_results([a]),
+            WasmTask.digest_results([c]),
+        )
+        self.assertTrue(WasmTask.cmp_results([a], [b]))
+        self.assertFalse(WasmTask.cmp_results([a], [c]))
+
+    def test_find_vbrsubtask_by_id(self):
+        s_id, _ = self.task.subtasks[1].new_instance('node_id')
+        self.assertIs(
+            self.task._find_vbrsubtask_by_id(s_id), self.task.subtasks[1])
+        with self.assertRaises(KeyError):
+            self.task._find_vbrsubtask_by_id('unknown')
+
+    def test_should_accept_client(self):
+        for subtask in self.task.subtasks:
+            subtask.new_instance('node1')
+        # node1 already computes both subtasks
+        self.assertEqual(
+            self.task.should_accept_client('node1', 'offer'),
+            AcceptClientVerdict.SHOULD_WAIT,
+        )
+        self.assertEqual(
+            self.task.should_accept_client('node2', 'offer'),
+            AcceptClientVerdict.ACCEPTED,
+        )
+        for subtask in self.task.subtasks:
+            subtask.new_instance('node2')
+        # no subtask needs more actors
+        self.assertEqual(
+            self.task.should_accept_client('node3', 'offer'),
+            AcceptClientVerdict.SHOULD_WAIT,
+        )
+
+    def test_progress(self):
+        result = self._write_result('result', b'result')
+        subtask = self.task.subtasks[0]
+        s_id1, _ = subtask.new_instance('node1')
+        s_id2, _ = subtask.new_instance('node2')
+        self.assertEqual(self.task.get_progress(), 0.0)
+
+        subtask.add_result(s_id1, [result])
+        self.assertEqual(self.task.get_progress(), 0.0)
+        subtask.add_result(s_id2, [result])
+
+        self.assertEqual(self.task.get_progress(), 0.5)
+        self.assertEqual(self.task.get_active_tasks(), 2)
+        self.assertFalse(self.task.finished_computation())
+        self.assertEqual(
+            [v for _, v in subtask.get_verdicts()],
+            [VerificationResult.SUCCESS, VerificationResult.SUCCESS],
+        )
@@ -250,3 +250,31 @@ def test_r1_result_already_added_value_error():
 
     with pytest.raises(ValueError):
         verifier.add_result(actors[1], 1)
+
+
+def test_r2_keyed_buckets():
+    keys = []
+
+    def key(result):
+        keys.append(result)
+        return result['digest']
+
+    def comparator(_x, _y):
+        raise AssertionError("comparator should not be used")
+
+    verifier = BucketVerifier(2, comparator, 0, key=key)
+    for actor in actors[1:4]:
+        verifier.add_actor(actor)
+
+    verifier.add_result(actors[1], {'digest': 'a'})
+    verifier.add_result(actors[2], {'digest': 'b'})
+    verifier.add_result(actors[3], {'digest': 'a'})
+
+    # the key is computed once per result
+    assert len(keys) == 3
+    assert len(verifier.buckets) == 2
+
+    d = verdicts_to_dict(verifier.get_verdicts())
+    assert d[actors[1]] == VerificationResult.SUCCESS
+    assert d[actors[2]] == VerificationResult.FAIL
+    assert d[actors[3]] == VerificationResult.SUCCESS
@@ -2,8 +2,10 @@ import os
 import random
 
 from io import IOBase
+from unittest import mock
 
-from golem.core.fileencrypt import FileHelper, FileEncryptor, AESFileEncryptor
+from golem.core.fileencrypt import FileHelper, FileEncryptor, \
+    AESFileEncryptor, AESGCMFileEncryptor
 from golem.resource.dirmanager import DirManager
 from golem.tools.testdirfixture import TestDirFixture
 
@@ -115,6 +117,83 @@ class TestAESFileEncryptor(TestDirFixture):
         self.assertEqual(len(iv), iv_len)
 
 
+@mock.patch.object(AESGCMFileEncryptor, 'workers', 2)
+@mock.patch.object(AESGCMFileEncryptor, 'segment_size', 1000)
+class TestAESGCMFileEncryptor(TestDirFixture):
+    """ Test encryption using AESGCMFileEncryptor """
+
+    def setUp(self):
+        TestDirFixture.setUp(self)
+
+        self.secret = FileEncryptor.gen_secret(10, 20)
+        self.test_file_path = os.path.join(self.path, 'test_file')
+        self.enc_file_path = os.path.join(self.path, 'test_file.enc')
+        self.dec_file_path = os.path.join(self.path, 'test_file.dec')
+        self.data = os.urandom(10 * 1000 + 123)
+
+        with open(self.test_file_path, 'wb') as f:
+            f.write(self.data)
+
+    def _encrypt(self):
+        AESGCMFileEncryptor.encrypt(self.test_file_path, self.enc_file_path,
+                                    self.secret)
+
+    def _decrypt(self, secret=None):
+        AESGCMFileEncryptor.decrypt(self.enc_file_path, self.dec_file_path,
+                                    secret or self.secret)
+        with open(self.dec_file_path, 'rb') as f:
+            return f.read()
+
+    def _corrupt(self, offset):
+        with open(self.enc_file_path, 'r+b') as f:
+            f.seek(offset)
+            byte = f.read(1)
+            f.seek(offset)
+            f.write(bytes([byte[0] ^ 1]))
+
+    def test_decrypt(self):
+        self._encrypt()
+        self.assertTrue(AESGCMFileEncryptor.recognizes(self.enc_file_path))
+        self.assertFalse(AESGCMFileEncryptor.recognizes(self.test_file_path))
+        self.assertEqual(self._decrypt(), self.data)
+
+    def test_decrypt_empty(self):
+        self.data = b''
+        open(self.test_file_path, 'wb').close()
+        self._encrypt()
+        self.assertEqual(self._decrypt(), b'')
+
+    def test_decrypt_wrong_secret(self):
+        self._encrypt()
+        with self.assertRaisesRegex(ValueError, 'Segment 0'):
+            self._decrypt(self.secret + b'0')
+
+    def test_decrypt_corrupted_segment(self):
+        self._encrypt()
+        self._corrupt(os.path.getsize(self.enc_file_path) - 500)
+        with self.assertRaisesRegex(ValueError, 'Segment 9'):
+            self._decrypt()
+
+    def test_decrypt_corrupted_header(self):
+        self._encrypt()
+        self._corrupt(len(AESGCMFileEncryptor.magic))
+        with self.assertRaisesRegex(ValueError, 'Segment 0'):
+            self._decrypt()
+
+    def test_decrypt_truncated(self):
+        self._encrypt()
+        with open(self.enc_file_path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.enc_file_path) - 139)
+        with self.assertRaisesRegex(ValueError, 'Segment 9'):
+            self._decrypt()
+
+    def test_decrypt_unknown_format(self):
+        AESFileEncryptor.encrypt(self.test_file_path, self.enc_file_path,
+                                 self.secret)
+        with self.assertRaisesRegex(ValueError, 'Unknown'):
+            self._decrypt()
+
+
 class TestFileHelper(TestDirFixture):
     """ Tests for FileHelper class """
 
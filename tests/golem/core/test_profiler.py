@@ -0,0 +1,143 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+from pydispatch import robustapply
+
+from golem.core.profiler import BUCKETS, Histogram, Profiler
+
+
+class TestHistogram(TestCase):
+
+    def test_add(self):
+        histogram = Histogram()
+        histogram.add(0.0005)
+        histogram.add(0.001)
+        histogram.add(0.003)
+        histogram.add(10.0)
+
+        assert histogram.count == 4
+        assert histogram.max == 10.0
+        assert histogram.counts[0] == 2
+        assert histogram.counts[2] == 1
+        assert histogram.counts[len(BUCKETS)] == 1
+
+    def test_to_dict(self):
+        histogram = Histogram()
+        histogram.add(0.002)
+        histogram.add(0.004)
+
+        result = histogram.to_dict()
+        assert result['count'] == 2
+        assert result['mean'] == 0.003
+        assert result['max'] == 0.004
+        assert result['buckets']['2ms'] == 1
+        assert result['buckets']['5ms'] == 1
+        assert result['buckets']['inf'] == 0
+
+    def test_to_dict_empty(self):
+        assert Histogram().to_dict()['mean'] == 0.0
+
+
+class TestProfiler(TestCase):
+
+    def setUp(self):
+        self.profiler = Profiler(threshold=0.01)
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_timed(self):
+        def fn(value):
+            return value * 2
+
+        timed = self.profiler.timed('fn', fn)
+        assert timed.__name__ == 'fn'
+        assert timed(2) == 4
+        assert timed(3) == 6
+
+        histograms = self.profiler.histograms()
+        assert histograms['fn']['count'] == 2
+
+    def test_timed_raises(self):
+        def fn():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            self.profiler.timed('fn', fn)()
+
+        assert self.profiler.histograms()['fn']['count'] == 1
+        assert not self.profiler._calls[threading.get_ident()]
+
+    def test_sample_slow_call(self):
+        sampled = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            with self.profiler.measure('slow'):
+                sampled.wait(1)
+                release.set()
+
+        thread = threading.Thread(target=slow)
+        thread.start()
+        time.sleep(0.02)
+        self.profiler._sample()
+        self.profiler._sample()
+        sampled.set()
+        release.wait(1)
+        thread.join()
+
+        slow_calls = self.profiler.profile()['slow_calls']
+        assert len(slow_calls) == 1
+        assert slow_calls[0]['name'] == 'slow'
+        assert slow_calls[0]['thread'] == thread.ident
+        assert any('slow' in line for line in slow_calls[0]['stack'])
+
+    def test_sample_fast_call(self):
+        with self.profiler.measure('fast'):
+            self.profiler._sample()
+        assert not self.profiler.profile()['slow_calls']
+
+    def test_sample_reactor_blocked(self):
+        self.profiler._reactor_thread = threading.get_ident()
+        self.profiler._last_beat = \
+            time.perf_counter() - Profiler.LAG_INTERVAL - 1
+        self.profiler._sample()
+        self.profiler._sample()
+
+        slow_calls = self.profiler.profile()['slow_calls']
+        assert len(slow_calls) == 1
+        assert slow_calls[0]['name'] == 'reactor'
+
+    def test_beat(self):
+        with mock.patch('golem.core.profiler.time.perf_counter',
+                        side_effect=[10.0, 10.6]):
+            self.profiler._beat()
+            self.profiler._beat()
+
+        lag = self.profiler.histograms()['reactor.lag']
+        assert lag['count'] == 1
+        assert abs(lag['max'] - 0.1) < 1e-6
+
+    @mock.patch('twisted.internet.task.LoopingCall')
+    def test_start_stop(self, _):
+        robust_apply = robustapply.robustApply
+
+        self.profiler.start()
+        assert self.profiler.running
+        assert robustapply.robustApply is not robust_apply
+
+        self.profiler.stop()
+        assert not self.profiler.running
+        assert robustapply.robustApply is robust_apply
+
+    @mock.patch('twisted.internet.task.LoopingCall')
+    def test_dispatcher_hook(self, _):
+        def on_event(**_):
+            pass
+
+        self.profiler.start()
+        robustapply.robustApply(on_event, signal='profiler.test')
+
+        name = 'dispatcher.' + on_event.__qualname__
+        assert self.profiler.histograms()[name]['count'] == 1
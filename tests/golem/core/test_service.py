@@ -1,10 +1,12 @@
 import logging
 from io import StringIO
 from unittest import TestCase
+from unittest.mock import patch
 
 import pytest
-from golem.core.service import LoopingCallService, log
+from golem.core.service import AdaptiveService, LoopingCallService, log
 from golem.tools.testwithreactor import TestWithReactor
+from twisted.internet.defer import Deferred, fail, succeed
 from twisted.internet.task import Clock
 
 
@@ -154,3 +156,110 @@ class TestExceptionalService(TestCase):
         assert service.running           # But can be started again.
 
         log.removeHandler(hdlr)
+
+
+class PendingService(AdaptiveService):
+    def __init__(self, **kwargs):
+        super().__init__(interval_seconds=1, max_interval_seconds=8,
+                         budget_seconds=2, **kwargs)
+        self.clock = Clock()
+        self.count = 0
+        self.pending = False
+        self.deferred = None
+
+    def _run_async(self):
+        self.count += 1
+        if self.deferred:
+            return self.deferred
+        return succeed(self.pending)
+
+
+class TestAdaptiveService(TestCase):
+
+    def test_start_stop(self):
+        service = PendingService()
+        assert not service.running
+        service.start()
+        assert service.running
+        assert service.count == 1
+        service.stop()
+        assert not service.running
+        service.clock.advance(10)
+        assert service.count == 1
+
+        with pytest.raises(RuntimeError):
+            service.stop()
+
+    def test_invalid_start(self):
+        service = PendingService()
+        service.start()
+        with pytest.raises(RuntimeError):
+            service.start()
+
+    def test_idle_backoff(self):
+        service = PendingService()
+        service.start()
+        delays = []
+        for _ in range(5):
+            delays.append(service.delay)
+            service.clock.advance(service.delay)
+        assert delays == [2, 4, 8, 8, 8]
+        assert service.count == 6
+
+    def test_pending_catch_up(self):
+        service = PendingService()
+        service.start()
+        service.clock.advance(2)
+        service.clock.advance(4)
+        assert service.delay == 8
+
+        service.pending = True
+        service.clock.advance(8)
+        assert service.delay == 1
+        service.clock.advance(1)
+        assert service.count == 5
+
+    def test_next_run_after_finished(self):
+        service = PendingService()
+        service.deferred = Deferred()
+        service.start()
+        service.clock.advance(5)
+        assert service.count == 1
+
+        service.deferred.callback(True)
+        service.deferred = None
+        service.clock.advance(1)
+        assert service.count == 2
+
+    def test_overrun(self):
+        service = PendingService()
+        service.deferred = Deferred()
+        with patch.object(log, 'warning') as warning:
+            service.start()
+            service.clock.advance(1)
+            warning.assert_not_called()
+            service.clock.advance(1)
+            warning.assert_called_once()
+        assert service.overruns == 1
+
+        service.deferred.callback(False)
+        assert service.running
+        assert service.clock.getDelayedCalls()[0].getTime() == 4
+
+    def test_stop_in_progress(self):
+        service = PendingService()
+        service.deferred = Deferred()
+        service.start()
+        service.stop()
+        service.deferred.callback(True)
+        assert not service.clock.getDelayedCalls()
+
+    def test_exception(self):
+        service = PendingService()
+        service._run_async = AdaptiveService._run_async.__get__(service)
+        with patch('golem.core.service.golem_async.async_run',
+                   side_effect=lambda request, error: fail(
+                       RuntimeError()).addErrback(error)):
+            service.start()
+        assert service.running
+        assert service.delay == 2
@@ -0,0 +1,87 @@
+import threading
+from unittest import mock
+
+from peewee import IntegrityError
+
+from golem import model as m
+from golem.testutils import DatabaseFixture
+
+
+def call_now(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+
+@mock.patch('twisted.internet.reactor.callFromThread', call_now)
+class TestDatabaseWriter(DatabaseFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.writer = self.database.db.writer
+
+    def tearDown(self):
+        self.writer.stop()
+        super().tearDown()
+
+    @staticmethod
+    def _create(name, value='value'):
+        return m.GenericKeyValue.create(key=name, value=value).key
+
+    @staticmethod
+    def _keys():
+        return {kv.key for kv in m.GenericKeyValue.select()}
+
+    def test_write_in_place(self):
+        assert not self.writer.running
+
+        deferred = self.database.db.write(self._create, 'key')
+        assert deferred.called
+        assert deferred.result == 'key'
+        assert self._keys() == {'key'}
+
+    def test_write_batched(self):
+        results = []
+        blocked = threading.Event()
+        release = threading.Event()
+
+        def block():
+            blocked.set()
+            release.wait(5)
+
+        self.writer.start()
+        self.writer.write(block)
+        blocked.wait(5)
+        for index in range(3):
+            self.writer.write(self._create, str(index)) \
+                .addCallback(results.append)
+
+        with mock.patch.object(self.writer, '_commit',
+                               wraps=self.writer._commit) as commit:
+            release.set()
+            self.writer.stop()
+
+        assert commit.call_count == 1
+        assert len(commit.call_args[0][0]) == 3
+        assert results == ['0', '1', '2']
+        assert self._keys() == {'0', '1', '2'}
+
+    def test_failing_write_rolled_back_alone(self):
+        errors = []
+        self.writer.start()
+        self.writer.write(self._create, 'key')
+        self.writer.write(self._create, 'key') \
+            .addErrback(lambda failure: errors.append(failure.value))
+        self.writer.write(self._create, 'other')
+        self.writer.stop()
+
+        assert len(errors) == 1
+        assert isinstance(errors[0], IntegrityError)
+        assert self._keys() == {'key', 'other'}
+
+    def test_stop_commits_queued(self):
+        self.writer.start()
+        for index in range(10):
+            self.writer.write(self._create, str(index))
+        self.writer.stop()
+
+        assert not self.writer.running
+        assert len(self._keys()) == 10
@@ -0,0 +1,20 @@
+import json
+from unittest import TestCase
+
+from golem.core.profiler import Profiler
+from golem.diag.profiler import ProfilerDiagnosticsProvider
+from golem.diag.service import DiagnosticsOutputFormat
+
+
+class TestProfilerDiagnosticsProvider(TestCase):
+    def test_format_outputs(self):
+        profiler = Profiler()
+        profiler.record('rpc.test', 0.003)
+        provider = ProfilerDiagnosticsProvider(profiler)
+
+        diag = provider.get_diagnostics(DiagnosticsOutputFormat.data)
+        assert diag['histograms']['rpc.test']['count'] == 1
+        json.dumps(diag)
+        diag = provider.get_diagnostics(DiagnosticsOutputFormat.json)
+        json.loads(diag)
+        provider.get_diagnostics(DiagnosticsOutputFormat.string)
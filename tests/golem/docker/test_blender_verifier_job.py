@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import shutil
+
+from PIL import Image
+
+from golem.core.common import get_golem_path
+from .test_docker_job import TestDockerJob
+
+logger = logging.getLogger(__name__)
+
+# Runs in the verifier image. Evaluates every crop/result pair the way the
+# 1.7 image did, converting and loading the images and the classifier anew
+# for each crop, and with the shared MetricsCalculator used by make_verdict.
+COMPARE_SCRIPT = """
+import json
+import sys
+import time
+
+sys.path.insert(0, '/golem/entrypoints')
+
+from scripts.verifier_tools import image_metrics_calculator as imc
+from scripts.verifier_tools import verifier
+from scripts.verifier_tools.image_metrics import MyEncoder
+
+with open('/golem/resources/jobs.json') as f:
+    jobs = [tuple(job) for job in json.load(f)]
+
+
+def per_crop(reference_crop_path, result_path, x, y):
+    reference = imc.convert_to_png_if_needed(reference_crop_path)
+    result = imc.get_providers_result_crop(
+        imc.convert_to_png_if_needed(result_path), x, y, *reference.size)
+    classifier, labels, metrics = imc.get_metrics()
+    compare_metrics = imc.compare_images(reference, result, metrics)
+    try:
+        compare_metrics['Label'] = imc.classify_with_tree(
+            compare_metrics, classifier, labels)
+    except Exception:  # pylint: disable=broad-except
+        compare_metrics['Label'] = imc.VERIFICATION_FAIL
+    return compare_metrics
+
+
+started = time.perf_counter()
+old = [per_crop(*job) for job in jobs]
+old_time = time.perf_counter() - started
+
+started = time.perf_counter()
+new = verifier._compute_metrics(jobs)
+new_time = time.perf_counter() - started
+
+with open('/golem/output/verdicts.json', 'w') as f:
+    json.dump({
+        'old': old,
+        'new': new,
+        'old_time': old_time,
+        'new_time': new_time,
+    }, f, cls=MyEncoder)
+"""
+
+# (x, y, width, height) of the reference crops cut out of the good image
+CROPS = [(0, 0, 40, 40), (120, 200, 60, 30), (300, 310, 100, 90)]
+RESULTS = [
+    'chessboard_400x400_2.png',
+    'almost_good_image.png',
+    'very_bad_image.png',
+]
+
+
+class TestBlenderVerifierDockerJob(TestDockerJob):
+    """ Tests the shared metrics calculator of golem/blender_verifier
+        against the per-crop evaluation it replaced """
+
+    TEST_IMAGE = "golemfactory/blender_verifier:1.8"
+
+    def _get_test_repository(self):
+        return "golemfactory/blender_verifier"
+
+    def _get_test_tag(self):
+        return "1.8"
+
+    def _prepare_jobs(self):
+        data_dir = os.path.join(
+            get_golem_path(), 'tests/apps/blender/verification/test_data')
+        for name in RESULTS:
+            shutil.copy(os.path.join(data_dir, name), self.resources_dir)
+
+        reference = Image.open(
+            os.path.join(data_dir, 'chessboard_400x400_1.png'))
+        jobs = []
+        for crop_id, (x, y, width, height) in enumerate(CROPS):
+            crop_name = f'crop{crop_id}.png'
+            reference.crop((x, y, x + width, y + height)).save(
+                os.path.join(self.resources_dir, crop_name))
+            jobs.extend(
+                (f'/golem/resources/{crop_name}', f'/golem/resources/{name}',
+                 x, y)
+                for name in RESULTS)
+
+        with open(os.path.join(self.resources_dir, 'jobs.json'), 'w') as f:
+            json.dump(jobs, f)
+        with open(os.path.join(self.resources_dir, 'compare.py'), 'w') as f:
+            f.write(COMPARE_SCRIPT)
+        return jobs
+
+    def test_verdicts_match_per_crop(self):
+        jobs = self._prepare_jobs()
+
+        with self._create_test_job(
+                script='/golem/resources/compare.py') as job:
+            job.start()
+            exit_code = job.wait(timeout=300)
+            self.assertEqual(exit_code, 0)
+
+        with open(os.path.join(self.output_dir, 'verdicts.json')) as f:
+            verdicts = json.load(f)
+        logger.info(
+            "Metrics of %d crops: per crop %.2fs, shared calculator %.2fs",
+            len(jobs), verdicts['old_time'], verdicts['new_time'])
+
+        self.assertEqual(len(verdicts['new']), len(jobs))
+        self.assertEqual(verdicts['new'], verdicts['old'])
@@ -1,10 +1,14 @@
+import json
+import os
 import unittest
+from unittest import mock
 
 import requests
 from docker import errors
 
 from golem.docker.client import local_client
-from golem.docker.image import DockerImage
+from golem.docker.image import DockerImage, ImageCache
+from golem.testutils import TempDirFixture
 from golem.tools.ci import ci_skip
 
 
@@ -111,3 +115,70 @@ class TestDockerImage(DockerTestCase):
                            image_id=self.TEST_ENV_ID)
         assert not img.cmp_name_and_tag(img4)
         assert not img4.cmp_name_and_tag(img)
+
+
+class TestImageCache(TempDirFixture):
+
+    LISTING = [
+        {'Id': 'sha256:1', 'RepoTags': ['golemfactory/base:1.6']},
+        {'Id': 'sha256:2', 'RepoTags': ['golemfactory/dummy:1.3',
+                                        'golemfactory/dummy:latest']},
+        {'Id': 'sha256:3', 'RepoTags': None},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.cache_path = os.path.join(self.tempdir, 'images.json')
+        patcher = mock.patch('golem.docker.image.local_client')
+        self.client = patcher.start().return_value
+        self.client.images.return_value = self.LISTING
+        self.addCleanup(patcher.stop)
+
+    def test_not_listed(self):
+        cache = ImageCache(self.cache_path)
+        self.assertIsNone(cache.image_id('golemfactory/base:1.6'))
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_refresh(self):
+        cache = ImageCache(self.cache_path)
+        self.assertTrue(cache.refresh())
+        self.client.images.assert_called_once_with()
+        self.assertEqual(cache.image_id('golemfactory/base:1.6'), 'sha256:1')
+        self.assertEqual(cache.image_id('golemfactory/dummy:1.3'), 'sha256:2')
+        self.assertIsNone(cache.image_id('golemfactory/wasm:0.4.1'))
+        with open(self.cache_path) as f:
+            self.assertEqual(len(json.load(f)), 3)
+
+    def test_refresh_error(self):
+        cache = ImageCache(self.cache_path)
+        cache.refresh()
+        self.client.images.side_effect = errors.APIError('test')
+        self.assertFalse(cache.refresh())
+        self.assertIsNone(cache.image_id('golemfactory/base:1.6'))
+
+    @mock.patch('golem.docker.image.log')
+    def test_changed_since_last_run(self, log):
+        with open(self.cache_path, 'w') as f:
+            json.dump({'golemfactory/base:1.6': 'sha256:0',
+                       'golemfactory/dummy:1.3': 'sha256:2'}, f)
+        ImageCache(self.cache_path).refresh()
+        log.warning.assert_called_once_with(
+            mock.ANY, 'golemfactory/base:1.6')
+
+    def test_is_available(self):
+        cache = ImageCache()
+        cache.refresh()
+        with mock.patch.object(ImageCache, '_instance', cache):
+            self.assertTrue(
+                DockerImage('golemfactory/base', tag='1.6').is_available())
+            self.assertTrue(DockerImage(
+                'golemfactory/base', tag='1.6', image_id='sha256:1'
+            ).is_available())
+            self.client.inspect_image.assert_not_called()
+
+            # Images missing from the listing may have been pulled since
+            self.client.inspect_image.return_value = {'Id': 'sha256:4'}
+            self.assertTrue(
+                DockerImage('golemfactory/wasm', tag='0.4.1').is_available())
+            self.client.inspect_image.assert_called_once_with(
+                'golemfactory/wasm:0.4.1')
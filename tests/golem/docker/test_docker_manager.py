@@ -281,7 +281,9 @@ class TestDockerManager(TestCase):  # pylint: disable=too-many-public-methods
         assert not dmm.build_images.called
         assert dmm._env_checked
 
-    def test_pull_images(self):
+    @mock.patch('golem.docker.manager.ImageCache.refresh',
+                return_value=False)
+    def test_pull_images(self, _):
         pulls = [0]
 
         def command(key, *args, **kwargs):
@@ -304,8 +306,9 @@ class TestDockerManager(TestCase):  # pylint: disable=too-many-public-methods
 
         assert pulls[0] == expected
 
-    @mock.patch('os.chdir')
-    def test_build_images(self, os_chdir):
+    @mock.patch('golem.docker.manager.ImageCache.refresh',
+                return_value=False)
+    def test_build_images(self, _):
 
         builds = [0]
         tags = [0]
@@ -333,7 +336,78 @@ class TestDockerManager(TestCase):  # pylint: disable=too-many-public-methods
 
         assert builds[0] == expected
         assert tags[0] == expected
-        assert len(os_chdir.mock_calls) == 2 * expected
+
+    @mock.patch('golem.docker.manager.ImageCache.image_id')
+    @mock.patch('golem.docker.manager.ImageCache.refresh', return_value=True)
+    def test_pull_listed_images(self, _, image_id):
+        image_id.side_effect = \
+            lambda version: None if 'blender' in version else 'sha256:1'
+
+        with mock.patch.object(MockDockerManager, 'command') as command:
+            dmm = MockDockerManager()
+            dmm.pull_images()
+
+        # The daemon is not asked image by image
+        pulled = sorted(c[1]['args'][0] for c in command.call_args_list
+                        if c[0][0] == 'pull')
+        assert all(c[0][0] == 'pull' for c in command.call_args_list)
+        assert pulled == sorted(
+            version for version in
+            (dmm._image_version(entry) for entry in dmm._collect_images()
+             if dmm._image_supported(entry))
+            if 'blender' in version)
+
+    @mock.patch('golem.docker.manager.ImageCache.refresh', return_value=True)
+    def test_pull_error(self, _):
+        pulled = []
+
+        def command(key, args):
+            if args[0] == 'golemfactory/base:1.6':
+                raise CalledProcessError(1, 'pull')
+            pulled.append(args[0])
+
+        with mock.patch.object(MockDockerManager, 'command',
+                               side_effect=command):
+            dmm = MockDockerManager()
+            entries = [['golemfactory/base', '', '1.6'],
+                       ['golemfactory/dummy', '', '1.3']]
+            with self.assertRaises(CalledProcessError):
+                dmm._pull_images(entries)
+
+        # The remaining images are pulled nonetheless
+        assert pulled == ['golemfactory/dummy:1.3']
+
+    @mock.patch('golem.docker.manager.ImageCache.refresh', return_value=True)
+    def test_build_order(self, _):
+        built = []
+
+        def command(key, args):
+            if key == 'tag':
+                built.append(args[1])
+
+        entries = [
+            ['golemfactory/blender_verifier',
+             'blender/resources/images/blender_verifier.Dockerfile', '1.7',
+             'blender/resources/images/'],
+            ['golemfactory/dummy', 'dummy/resources/images/Dockerfile',
+             '1.3', 'dummy/resources/images'],
+            ['golemfactory/blender',
+             'blender/resources/images/blender.Dockerfile', '1.11',
+             'blender/resources/images/'],
+            ['golemfactory/base', 'core/resources/images/base.Dockerfile',
+             '1.6', '.'],
+        ]
+        with mock.patch.object(MockDockerManager, 'command',
+                               side_effect=command):
+            dmm = MockDockerManager()
+            dmm._build_images(entries)
+
+        assert sorted(built) == sorted(dmm._image_version(e) for e in entries)
+        assert built.index('golemfactory/base:1.6') < \
+            built.index('golemfactory/blender:1.11') < \
+            built.index('golemfactory/blender_verifier:1.7')
+        assert built.index('golemfactory/base:1.6') < \
+            built.index('golemfactory/dummy:1.3')
 
     def test_recover_vm_connectivity(self):
         callback = mock.Mock()
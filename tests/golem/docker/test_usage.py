@@ -0,0 +1,198 @@
+import json
+import os
+from threading import Event
+from unittest import TestCase
+from unittest.mock import patch
+
+from golem.docker.usage import (
+    ContainerUsage,
+    ContainerUsageMonitor,
+    DockerStatsReader,
+    from_cgroup_stats,
+    from_docker_stats,
+    read_stats_file,
+)
+from golem.testutils import TempDirFixture
+
+CGROUP_STATS = {
+    'cpu_stats': {
+        'cpu_usage': {
+            'total_usage': 2500000000,
+            'usage_in_kernelmode': 100000000,
+            'usage_in_usermode': 2400000000,
+        },
+    },
+    'memory_stats': {
+        'cache': 4096,
+        'usage': {'usage': 1024, 'max_usage': 4096, 'limit': 2 ** 30},
+    },
+    'blkio_stats': {
+        'io_service_bytes_recursive': [
+            {'major': 8, 'minor': 0, 'op': 'Read', 'value': 100},
+            {'major': 8, 'minor': 0, 'op': 'Write', 'value': 200},
+            {'major': 8, 'minor': 0, 'op': 'Sync', 'value': 300},
+            {'major': 8, 'minor': 16, 'op': 'Read', 'value': 10},
+        ],
+    },
+}
+
+
+def _docker_stats(usage, max_usage=None, cpu=0, read=0, write=0):
+    memory_stats = {'usage': usage}
+    if max_usage is not None:
+        memory_stats['max_usage'] = max_usage
+    return {
+        'memory_stats': memory_stats,
+        'cpu_stats': {'cpu_usage': {'total_usage': cpu}},
+        'blkio_stats': {
+            'io_service_bytes_recursive': [
+                {'major': 8, 'minor': 0, 'op': 'read', 'value': read},
+                {'major': 8, 'minor': 0, 'op': 'write', 'value': write},
+            ],
+        },
+    }
+
+
+class TestParsing(TestCase):
+
+    def test_cgroup_stats(self):
+        self.assertEqual(
+            from_cgroup_stats(CGROUP_STATS),
+            ContainerUsage(
+                peak_memory=4096, cpu_time=2.5, io_read=110, io_write=200))
+
+    def test_cgroup_stats_empty(self):
+        self.assertEqual(from_cgroup_stats({}), ContainerUsage())
+
+    def test_docker_stats_cgroup_v1(self):
+        usage = from_docker_stats(
+            _docker_stats(10, max_usage=20, cpu=10 ** 9, read=1, write=2))
+        self.assertEqual(usage, ContainerUsage(20, 1.0, 1, 2))
+
+    def test_docker_stats_cgroup_v2(self):
+        usage = from_docker_stats(_docker_stats(10))
+        self.assertEqual(usage.peak_memory, 10)
+
+    def test_docker_stats_no_blkio(self):
+        stats = _docker_stats(10)
+        stats['blkio_stats'] = {'io_service_bytes_recursive': None}
+        self.assertEqual(from_docker_stats(stats).io_read, 0)
+
+    def test_merge(self):
+        merged = ContainerUsage(10, 2.0, 0, 5).merge(
+            ContainerUsage(5, 3.0, 1, 0))
+        self.assertEqual(merged, ContainerUsage(10, 3.0, 1, 5))
+
+    def test_to_dict(self):
+        self.assertEqual(ContainerUsage(1, 2.0, 3, 4).to_dict(), {
+            'peak_memory': 1,
+            'cpu_time': 2.0,
+            'io_read': 3,
+            'io_write': 4,
+        })
+
+
+class TestStatsFile(TempDirFixture):
+
+    def test_missing(self):
+        self.assertIsNone(read_stats_file(os.path.join(self.path, 'x.json')))
+
+    def test_invalid(self):
+        path = os.path.join(self.path, 'stats.json')
+        with open(path, 'w') as f:
+            f.write('{"memory_stats": ')
+        self.assertIsNone(read_stats_file(path))
+
+    def test_valid(self):
+        path = os.path.join(self.path, 'stats.json')
+        with open(path, 'w') as f:
+            json.dump(CGROUP_STATS, f)
+        self.assertEqual(read_stats_file(path).peak_memory, 4096)
+
+
+@patch('golem.docker.usage.local_client')
+class TestDockerStatsReader(TestCase):
+
+    def test_peak_and_counters(self, local_client):
+        local_client().stats.return_value = iter([
+            _docker_stats(100, cpu=10 ** 9, read=5),
+            _docker_stats(300, cpu=2 * 10 ** 9, read=10),
+            # Entry sent after the container has stopped
+            _docker_stats(0),
+        ])
+        reader = DockerStatsReader('Id')
+        reader.start()
+        reader.stop()
+
+        local_client().stats.assert_called_once_with(
+            'Id', decode=True, stream=True)
+        self.assertEqual(reader.usage, ContainerUsage(300, 2.0, 10, 0))
+
+    def test_stream_error(self, local_client):
+        local_client().stats.side_effect = ConnectionError
+        reader = DockerStatsReader('Id')
+        reader.start()
+        reader.stop()
+        self.assertIsNone(reader.usage)
+
+    def test_stop_blocked_stream(self, local_client):
+        closed = Event()
+
+        class Stream:
+            def __iter__(self):
+                closed.wait(5)
+                return iter(())
+
+            @staticmethod
+            def close():
+                closed.set()
+
+        local_client().stats.return_value = Stream()
+        reader = DockerStatsReader('Id')
+        reader.start()
+        reader.stop(timeout=0.01)
+        self.assertTrue(closed.is_set())
+
+
+class TestContainerUsageMonitor(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.stats_file = os.path.join(self.path, 'stats.json')
+
+    def _write_stats_file(self):
+        with open(self.stats_file, 'w') as f:
+            json.dump(CGROUP_STATS, f)
+
+    @patch('golem.docker.usage.DockerStatsReader')
+    def test_stats_file(self, reader):
+        self._write_stats_file()
+        monitor = ContainerUsageMonitor(self.stats_file, False)
+        monitor.start('Id')
+        reader.assert_not_called()
+        self.assertEqual(monitor.stop(), from_cgroup_stats(CGROUP_STATS))
+
+    @patch('golem.docker.usage.DockerStatsReader')
+    def test_no_statistics(self, _):
+        monitor = ContainerUsageMonitor(self.stats_file, False)
+        monitor.start('Id')
+        self.assertIsNone(monitor.stop())
+
+    @patch('golem.docker.usage.DockerStatsReader')
+    def test_stats_stream(self, reader):
+        reader().usage = ContainerUsage(1, 1.0, 1, 1)
+        monitor = ContainerUsageMonitor(self.stats_file, True)
+        monitor.start('Id')
+        reader.assert_called_with('Id')
+        reader().start.assert_called_once_with()
+        self.assertEqual(monitor.stop(), ContainerUsage(1, 1.0, 1, 1))
+        reader().stop.assert_called_once_with()
+
+    @patch('golem.docker.usage.DockerStatsReader')
+    def test_both_merged(self, reader):
+        self._write_stats_file()
+        reader().usage = ContainerUsage(8192, 1.0, 1, 1)
+        monitor = ContainerUsageMonitor(self.stats_file, True)
+        monitor.start('Id')
+        self.assertEqual(
+            monitor.stop(), ContainerUsage(8192, 2.5, 110, 200))
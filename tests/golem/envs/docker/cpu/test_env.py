@@ -2,6 +2,7 @@ from logging import Logger
 from pathlib import Path
 from unittest.mock import patch, Mock, MagicMock, ANY
 
+from twisted.internet.defer import Deferred, succeed
 from twisted.trial.unittest import TestCase
 
 from golem.docker.config import CONSTRAINT_KEYS
@@ -11,9 +12,10 @@ from golem.docker.hypervisor.dummy import DummyHypervisor
 from golem.docker.hypervisor.hyperv import HyperVHypervisor
 from golem.docker.hypervisor.virtualbox import VirtualBoxHypervisor
 from golem.docker.task_thread import DockerBind
-from golem.envs import EnvStatus
+from golem.envs import EnvStatus, RuntimeStatus
 from golem.envs.docker import DockerPrerequisites, DockerRuntimePayload
 from golem.envs.docker.cpu import DockerCPUEnvironment, DockerCPUConfig
+from golem.envs.docker.pool import ContainerPool
 
 cpu = CONSTRAINT_KEYS['cpu']
 mem = CONSTRAINT_KEYS['mem']
@@ -246,12 +248,14 @@ class TestCleanup(TestDockerCPUEnv):
 
     def test_ok(self):
         self.env._status = EnvStatus.ENABLED
+        self.env._container_pool = Mock(spec=ContainerPool)
         env_disabled = self._patch_env_async('_env_disabled')
 
         deferred = self.env.clean_up()
         self.assertEqual(self.env.status(), EnvStatus.CLEANING_UP)
 
         def _check(_):
+            self.env._container_pool.clear.assert_called_once_with()
             env_disabled.assert_called_once_with()
         deferred.addCallback(_check)
         return deferred
@@ -328,6 +332,33 @@ class TestInstallPrerequisites(TestDockerCPUEnv):
         deferred.addCallback(_check)
         return deferred
 
+    def test_concurrent_pulls(self):
+        self.env._status = EnvStatus.ENABLED
+        self._patch_async('Whitelist.is_whitelisted', return_value=True)
+        pulls = []
+        self._patch_async(
+            'deferToThread', side_effect=lambda _: pulls.append(Deferred())
+            or pulls[-1])
+
+        image = DockerPrerequisites(image='repo/img', tag='1.0')
+        other = DockerPrerequisites(image='repo/other', tag='1.0')
+        first = self.env.install_prerequisites(image)
+        second = self.env.install_prerequisites(image)
+        third = self.env.install_prerequisites(other)
+        # The same image is pulled once, other images are not waiting
+        self.assertEqual(len(pulls), 2)
+
+        results = []
+        for deferred in (first, second, third):
+            deferred.addBoth(results.append)
+        pulls[1].callback(True)
+        self.assertEqual(results, [True])
+        pulls[0].callback(True)
+        self.assertEqual(results, [True, True, True])
+
+        self.env.install_prerequisites(image)
+        self.assertEqual(len(pulls), 3)
+
 
 class TestUpdateConfig(TestDockerCPUEnv):
 
@@ -536,7 +567,7 @@ class TestRuntime(TestDockerCPUEnv):
 
         create_host_config.assert_called_once_with(self.config, payload)
         runtime_mock.assert_called_once_with(
-            payload, create_host_config(), None, ANY)
+            payload, create_host_config(), None, ANY, ANY)
         self.assertEqual(runtime, runtime_mock())
 
     @patch_cpu('Whitelist.is_whitelisted', return_value=True)
@@ -549,7 +580,7 @@ class TestRuntime(TestDockerCPUEnv):
 
         create_host_config.assert_called_once_with(config, payload)
         runtime_mock.assert_called_once_with(
-            payload, create_host_config(), None, ANY)
+            payload, create_host_config(), None, ANY, ANY)
         self.assertEqual(runtime, runtime_mock())
 
     @patch_cpu('Whitelist.is_whitelisted', return_value=True)
@@ -566,9 +597,41 @@ class TestRuntime(TestDockerCPUEnv):
             payload,
             create_host_config(),
             [target_dir],
+            ANY,
             ANY)
         self.assertEqual(runtime, runtime_mock())
 
+    @patch_cpu('Whitelist.is_whitelisted', return_value=True)
+    @patch_cpu('DockerCPURuntime')
+    def test_container_pool(self, runtime_mock, _):
+        payload = mock_docker_runtime_payload()
+        self.env.runtime(payload)
+        runtime_mock.assert_called_once_with(
+            payload,
+            ANY,
+            ANY,
+            ANY,
+            self.env._container_pool,
+        )
+
+    @patch_cpu('Whitelist.is_whitelisted', return_value=True)
+    @patch_cpu('DockerCPURuntime')
+    @patch_env('_create_host_config')
+    @patch_env('install_prerequisites', return_value=succeed(True))
+    def test_benchmark_not_pooled(self, _install, _host, runtime_mock, _):
+        runtime = runtime_mock.return_value
+        runtime.prepare.return_value = succeed(None)
+        runtime.start.return_value = succeed(None)
+        runtime.wait_until_stopped.return_value = succeed(None)
+        runtime.clean_up.return_value = succeed(None)
+        runtime.status.return_value = RuntimeStatus.STOPPED
+        runtime.stdout.return_value = iter(['1.5'])
+
+        deferred = self.env.run_benchmark()
+
+        self.assertEqual(self.successResultOf(deferred), 1.5)
+        runtime_mock.assert_called_once_with(ANY, ANY, None, ANY, None)
+
     @patch_cpu('Whitelist.is_whitelisted', return_value=True)
     @patch_cpu('DockerCPURuntime')
     def test_port_mapping(self, runtime_mock, _):
@@ -580,6 +643,7 @@ class TestRuntime(TestDockerCPUEnv):
             ANY,
             ANY,
             self.env._port_mapper,
+            ANY,
         )
         self.assertEqual(runtime, runtime_mock())
 
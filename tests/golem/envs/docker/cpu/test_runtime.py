@@ -1,14 +1,14 @@
-from threading import Thread
 from unittest.mock import Mock, patch as _patch, call, ANY
 
-import pytest
 from docker.errors import APIError
+from twisted.internet.defer import maybeDeferred
 from twisted.trial.unittest import TestCase
 
 from golem.envs import RuntimeStatus
 from golem.envs.docker import DockerRuntimePayload
 from golem.envs.docker.cpu import DockerCPURuntime, DockerOutput, DockerInput, \
     InputSocket
+from golem.envs.docker.pool import ContainerPool
 
 
 def patch(name: str, *args, **kwargs):
@@ -189,30 +189,101 @@ class TestUpdateStatus(TestDockerCPURuntime):
         error_occurred.assert_called_once_with(
             None, "Unexpected container status: '(╯°□°)╯︵ ┻━┻'.")
 
+    @patch_runtime('_unwatch_container')
+    @patch_runtime('_error_occurred')
+    def test_inspect_error_unwatches(self, error_occurred, unwatch):
+        error_occurred.side_effect = \
+            lambda *_: self.runtime._set_status(RuntimeStatus.FAILURE)
+        self._update_status(inspect_error=APIError("error"))
+        unwatch.assert_called_once()
 
-class TestUpdateStatusLoop(TestDockerCPURuntime):
+    @patch_runtime('_unwatch_container')
+    @patch_runtime('_stopped')
+    def test_container_exited_unwatches(self, stopped, unwatch):
+        stopped.side_effect = \
+            lambda: self.runtime._set_status(RuntimeStatus.STOPPED)
+        self._update_status(inspect_result=("exited", 0))
+        unwatch.assert_called_once()
 
-    # Timeout not to enter an infinite loop if there's a bug in the method
-    @pytest.mark.timeout(0.1)
-    @patch('sleep')
-    @patch_runtime('_update_status')
-    def test_not_running(self, update_status, sleep):
-        self.runtime._update_status_loop()
-        update_status.assert_not_called()
-        sleep.assert_not_called()
-
-    # Timeout not to enter an infinite loop if there's a bug in the method
-    @pytest.mark.timeout(0.1)
-    @patch('sleep')
-    @patch_runtime('_update_status')
-    def test_updated(self, update_status, sleep):
+    @patch_runtime('_unwatch_container')
+    def test_container_running_still_watched(self, unwatch):
+        self._update_status(inspect_result=("running", 0))
+        unwatch.assert_not_called()
+
+
+class TestContainerState(TestDockerCPURuntime):
+
+    def setUp(self):
+        super().setUp()
+        self.watcher = self._patch_async('DockerEventWatcher').instance()
+        self.telemetry = self._patch_async('ContainerTelemetry').instance()
+
+    def test_watch(self):
+        self.runtime._container_id = "Id"
+        self.runtime._watch_container()
+        self.watcher.watch.assert_called_once_with(
+            "Id",
+            on_state=self.runtime._on_container_state,
+            poll=self.runtime._update_status)
+        self.telemetry.track.assert_called_once_with("Id")
+
+    def test_unwatch(self):
+        self.runtime._container_id = "Id"
+        self.runtime._unwatch_container()
+        self.watcher.unwatch.assert_called_once_with("Id")
+        self.telemetry.untrack.assert_called_once_with("Id")
+
+    @patch_runtime('_stopped')
+    def test_exited_ok(self, stopped):
+        self.runtime._container_id = "Id"
         self.runtime._set_status(RuntimeStatus.RUNNING)
-        update_status.side_effect = \
+        stopped.side_effect = \
             lambda: self.runtime._set_status(RuntimeStatus.STOPPED)
 
-        self.runtime._update_status_loop()
-        update_status.assert_called_once()
-        sleep.assert_called_once_with(DockerCPURuntime.STATUS_UPDATE_INTERVAL)
+        self.runtime._on_container_state("exited", 0)
+        stopped.assert_called_once()
+        self.watcher.unwatch.assert_called_once_with("Id")
+
+    @patch_runtime('_error_occurred')
+    def test_exited_error(self, error_occurred):
+        self.runtime._container_id = "Id"
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        error_occurred.side_effect = \
+            lambda *_: self.runtime._set_status(RuntimeStatus.FAILURE)
+
+        self.runtime._on_container_state("exited", 1)
+        error_occurred.assert_called_once_with(
+            None, "Container stopped with exit code 1.")
+        self.watcher.unwatch.assert_called_once_with("Id")
+
+    @patch_runtime('_stopped')
+    def test_not_running(self, stopped):
+        self.runtime._container_id = "Id"
+        self.runtime._set_status(RuntimeStatus.STOPPED)
+
+        self.runtime._on_container_state("exited", 0)
+        stopped.assert_not_called()
+
+    @patch_runtime('_inspect_container', return_value=("exited", 0))
+    @patch_runtime('_stopped')
+    def test_polled_exit_untracks(self, stopped, _):
+        self.runtime._container_id = "Id"
+        self.runtime._set_status(RuntimeStatus.RUNNING)
+        stopped.side_effect = \
+            lambda: self.runtime._set_status(RuntimeStatus.STOPPED)
+
+        self.runtime._update_status()
+        self.telemetry.untrack.assert_called_once_with("Id")
+
+    @patch_runtime('_torn_down')
+    def test_clean_up_untracks(self, _):
+        self.runtime._container_id = "Id"
+        self.runtime._set_status(RuntimeStatus.STOPPED)
+        self.runtime._stdin_socket = Mock(spec=InputSocket)
+
+        self.runtime.clean_up()
+        self.watcher.unwatch.assert_called_once_with("Id")
+        self.telemetry.untrack.assert_called_once_with("Id")
 
 
 class TestPrepare(TestDockerCPURuntime):
@@ -358,6 +429,66 @@ class TestPrepare(TestDockerCPURuntime):
         deferred.addCallback(_check)
         return deferred
 
+    def _pool(self, container_id):
+        self._patch_async('deferToThread', side_effect=maybeDeferred)
+        self._patch_async('InputSocket')
+        pool = self.runtime._container_pool = Mock(spec=ContainerPool)
+        pool.acquire.return_value = container_id
+        return pool
+
+    def test_pooled(self):
+        pool = self._pool("Id")
+        prepared = self._patch_runtime_async('_prepared')
+
+        deferred = self.runtime.prepare()
+
+        def _check(_):
+            self.assertEqual(self.runtime._container_id, "Id")
+            pool.acquire.assert_called_once_with(self.container_config)
+            self.client.create_container_from_config.assert_not_called()
+            self.client.attach_socket.assert_called_once_with(
+                "Id", params={"stdin": True, "stream": True})
+            prepared.assert_called_once()
+            pool.create.assert_called_once_with(self.container_config)
+
+        deferred.addCallback(_check)
+        return deferred
+
+    def test_pool_empty(self):
+        pool = self._pool(None)
+        self.client.create_container_from_config.return_value = {
+            "Id": "Id",
+            "Warnings": None
+        }
+        prepared = self._patch_runtime_async('_prepared')
+
+        deferred = self.runtime.prepare()
+
+        def _check(_):
+            self.assertEqual(self.runtime._container_id, "Id")
+            self.client.create_container_from_config.assert_called_once_with(
+                self.container_config)
+            prepared.assert_called_once()
+            pool.create.assert_called_once_with(self.container_config)
+
+        deferred.addCallback(_check)
+        return deferred
+
+    def test_pool_create_error(self):
+        pool = self._pool("Id")
+        pool.create.side_effect = APIError("test")
+        error_occurred = self._patch_runtime_async('_error_occurred')
+
+        deferred = self.runtime.prepare()
+
+        def _check(_):
+            self.assertEqual(self.runtime.status(), RuntimeStatus.PREPARED)
+            error_occurred.assert_not_called()
+            self.logger.warning.assert_called_once()
+
+        deferred.addCallback(_check)
+        return deferred
+
 
 class TestCleanup(TestDockerCPURuntime):
 
@@ -395,9 +526,11 @@ class TestCleanup(TestDockerCPURuntime):
         self.runtime._stdin_socket = Mock(spec=InputSocket)
         torn_down = self._patch_runtime_async('_torn_down')
         error_occurred = self._patch_runtime_async('_error_occurred')
+        unwatch = self._patch_runtime_async('_unwatch_container')
 
         deferred = self.runtime.clean_up()
         self.assertEqual(self.runtime.status(), RuntimeStatus.CLEANING_UP)
+        unwatch.assert_called_once()
 
         def _check(_):
             self.client.remove_container.assert_called_once_with("Id")
@@ -408,13 +541,57 @@ class TestCleanup(TestDockerCPURuntime):
         deferred.addCallback(_check)
         return deferred
 
+    def test_pooled(self):
+        self.runtime._set_status(RuntimeStatus.STOPPED)
+        self.runtime._container_id = "Id"
+        self.runtime._stdin_socket = Mock(spec=InputSocket)
+        pool = self.runtime._container_pool = Mock(spec=ContainerPool)
+        self._patch_async('deferToThread', side_effect=maybeDeferred)
+        torn_down = self._patch_runtime_async('_torn_down')
+
+        deferred = self.runtime.clean_up()
+
+        def _check(_):
+            pool.remove.assert_called_once_with("Id")
+            self.client.remove_container.assert_not_called()
+            self.runtime._stdin_socket.close.assert_called_once()
+            torn_down.assert_called_once()
+
+        deferred.addCallback(_check)
+        return deferred
+
+    def test_pooled_error(self):
+        self.runtime._set_status(RuntimeStatus.STOPPED)
+        self.runtime._container_id = "Id"
+        self.runtime._stdin_socket = Mock(spec=InputSocket)
+        pool = self.runtime._container_pool = Mock(spec=ContainerPool)
+        error = APIError("test")
+        pool.remove.side_effect = error
+        self._patch_async('deferToThread', side_effect=maybeDeferred)
+        torn_down = self._patch_runtime_async('_torn_down')
+        error_occurred = self._patch_runtime_async('_error_occurred')
+
+        deferred = self.runtime.clean_up()
+        deferred = self.assertFailure(deferred, APIError)
+
+        def _check(_):
+            self.runtime._stdin_socket.close.assert_called_once()
+            torn_down.assert_not_called()
+            error_occurred.assert_called_once_with(
+                error, "Failed to remove container 'Id'.")
+
+        deferred.addCallback(_check)
+        return deferred
+
 
 class TestStart(TestDockerCPURuntime):
 
     def setUp(self):
         super().setUp()
-        self.update_status_loop = \
-            self._patch_runtime_async('_update_status_loop')
+        self.watch_container = self._patch_runtime_async('_watch_container')
+        self.unwatch_container = \
+            self._patch_runtime_async('_unwatch_container')
+        self.update_status = self._patch_runtime_async('_update_status')
 
     def test_invalid_status(self):
         self._generic_test_invalid_status(
@@ -434,9 +611,9 @@ class TestStart(TestDockerCPURuntime):
         deferred = self.assertFailure(deferred, APIError)
 
         def _check(_):
-            self.assertIsNone(self.runtime._status_update_thread)
             self.client.start.assert_called_once_with("Id")
-            self.update_status_loop.assert_not_called()
+            self.watch_container.assert_not_called()
+            self.unwatch_container.assert_called_once()
             started.assert_not_called()
             error_occurred.assert_called_once_with(
                 error, "Starting container 'Id' failed.")
@@ -457,10 +634,8 @@ class TestStart(TestDockerCPURuntime):
             self.client.start.assert_called_once_with("Id")
             started.assert_called_once()
             error_occurred.assert_not_called()
-
-            self.assertIsInstance(self.runtime._status_update_thread, Thread)
-            self.runtime._status_update_thread.join(0.1)
-            self.update_status_loop.assert_called_once()
+            self.watch_container.assert_called_once()
+            self.update_status.assert_called_once()
 
         deferred.addCallback(_check)
 
@@ -469,6 +644,11 @@ class TestStart(TestDockerCPURuntime):
 
 class TestStop(TestDockerCPURuntime):
 
+    def setUp(self):
+        super().setUp()
+        self.unwatch_container = \
+            self._patch_runtime_async('_unwatch_container')
+
     def test_invalid_status(self):
         self._generic_test_invalid_status(
             method=self.runtime.stop,
@@ -478,8 +658,6 @@ class TestStop(TestDockerCPURuntime):
         self.runtime._set_status(RuntimeStatus.RUNNING)
         self.runtime._container_id = "Id"
         self.runtime._stdin_socket = Mock(spec=InputSocket)
-        self.runtime._status_update_thread = Mock(spec=Thread)
-        self.runtime._status_update_thread.is_alive.return_value = False
         error = APIError("test")
         self.client.stop.side_effect = error
         stopped = self._patch_runtime_async('_stopped')
@@ -489,7 +667,7 @@ class TestStop(TestDockerCPURuntime):
 
         def _check(_):
             self.client.stop.assert_called_once_with("Id")
-            self.runtime._status_update_thread.join.assert_called_once()
+            self.unwatch_container.assert_called_once()
             self.runtime._stdin_socket.close.assert_called_once()
             stopped.assert_not_called()
             error_occurred.assert_called_once_with(
@@ -498,34 +676,10 @@ class TestStop(TestDockerCPURuntime):
         deferred.addCallback(_check)
         return deferred
 
-    def test_failed_to_join_status_update_thread(self):
-        self.runtime._set_status(RuntimeStatus.RUNNING)
-        self.runtime._container_id = "Id"
-        self.runtime._stdin_socket = Mock(spec=InputSocket)
-        self.runtime._status_update_thread = Mock(spec=Thread)
-        self.runtime._status_update_thread.is_alive.return_value = True
-        stopped = self._patch_runtime_async('_stopped')
-        error_occurred = self._patch_runtime_async('_error_occurred')
-
-        deferred = self.runtime.stop()
-
-        def _check(_):
-            self.client.stop.assert_called_once_with("Id")
-            self.runtime._status_update_thread.join.assert_called_once()
-            self.runtime._stdin_socket.close.assert_called_once()
-            self.logger.warning.assert_called_once()
-            stopped.assert_called_once()
-            error_occurred.assert_not_called()
-
-        deferred.addCallback(_check)
-        return deferred
-
     def test_ok(self):
         self.runtime._set_status(RuntimeStatus.RUNNING)
         self.runtime._container_id = "Id"
         self.runtime._stdin_socket = Mock(spec=InputSocket)
-        self.runtime._status_update_thread = Mock(spec=Thread)
-        self.runtime._status_update_thread.is_alive.return_value = False
         stopped = self._patch_runtime_async('_stopped')
         error_occurred = self._patch_runtime_async('_error_occurred')
 
@@ -533,7 +687,7 @@ class TestStop(TestDockerCPURuntime):
 
         def _check(_):
             self.client.stop.assert_called_once_with("Id")
-            self.runtime._status_update_thread.join.assert_called_once()
+            self.unwatch_container.assert_called_once()
             self.runtime._stdin_socket.close.assert_called_once()
             self.logger.warning.assert_not_called()
             stopped.assert_called_once()
@@ -0,0 +1,128 @@
+from queue import Queue
+from threading import Event
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from golem.envs.docker.events import DockerEventWatcher
+
+
+def _die_event(container_id, exit_code=0, timestamp=1):
+    return {
+        'Type': 'container',
+        'Action': 'die',
+        'Actor': {
+            'ID': container_id,
+            'Attributes': {'exitCode': str(exit_code)},
+        },
+        'time': timestamp,
+    }
+
+
+class FakeEventStream:
+
+    def __init__(self):
+        self.queue: Queue = Queue()
+
+    def __iter__(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.queue.put(None)
+
+
+class TestDispatch(TestCase):
+
+    def setUp(self):
+        self.watcher = DockerEventWatcher()
+        self.on_state = Mock()
+        self.poll = Mock()
+        self.watcher._subscriptions['Id'] = Mock(
+            on_state=self.on_state, poll=self.poll)
+
+    def test_die(self):
+        self.watcher._dispatch(_die_event('Id', exit_code=3))
+        self.on_state.assert_called_once_with('exited', 3)
+
+    def test_other_container(self):
+        self.watcher._dispatch(_die_event('other'))
+        self.on_state.assert_not_called()
+
+    def test_other_event(self):
+        event = _die_event('Id')
+        event['Action'] = 'start'
+        self.watcher._dispatch(event)
+        self.on_state.assert_not_called()
+
+    def test_invalid_exit_code(self):
+        event = _die_event('Id')
+        event['Actor']['Attributes']['exitCode'] = 'x'
+        self.watcher._dispatch(event)
+        self.on_state.assert_called_once_with('exited', -1)
+
+    def test_callback_error(self):
+        self.on_state.side_effect = ValueError
+        self.watcher._dispatch(_die_event('Id'))
+
+    def test_unwatch(self):
+        self.watcher.unwatch('Id')
+        self.watcher._dispatch(_die_event('Id'))
+        self.on_state.assert_not_called()
+
+
+@patch('golem.envs.docker.events.local_client')
+class TestStream(TestCase):
+
+    def setUp(self):
+        self.watcher = DockerEventWatcher()
+        self.watcher.POLL_INTERVAL = 0.01
+        self.watcher.RECONNECT_INTERVAL = 0.05
+
+    def tearDown(self):
+        self.watcher.stop()
+
+    def test_events_dispatched(self, local_client):
+        stream = FakeEventStream()
+        local_client().events.return_value = stream
+        received = Event()
+        on_state = Mock(side_effect=lambda *_: received.set())
+        poll = Mock()
+
+        self.watcher.watch('Id', on_state=on_state, poll=poll)
+        stream.queue.put(_die_event('Id', timestamp=2 ** 31))
+
+        self.assertTrue(received.wait(5))
+        on_state.assert_called_once_with('exited', 0)
+        # Checked once after connecting
+        poll.assert_called_once_with()
+        self.assertTrue(self.watcher.connected)
+        self.assertEqual(self.watcher._since, 2 ** 31)
+
+    def test_fallback_polling(self, local_client):
+        polled = Event()
+        local_client().events.side_effect = ConnectionError
+        poll = Mock(side_effect=lambda: polled.set())
+
+        self.watcher.watch('Id', on_state=Mock(), poll=poll)
+
+        self.assertTrue(polled.wait(5))
+        self.assertFalse(self.watcher.connected)
+
+    def test_reconnect(self, local_client):
+        stream = FakeEventStream()
+        local_client().events.side_effect = [ConnectionError, stream]
+        received = Event()
+
+        self.watcher.watch(
+            'Id', on_state=lambda *_: received.set(), poll=Mock())
+        stream.queue.put(_die_event('Id'))
+
+        self.assertTrue(received.wait(5))
+        self.assertEqual(local_client().events.call_count, 2)
+
+    def test_instance(self, _):
+        self.assertIs(
+            DockerEventWatcher.instance(), DockerEventWatcher.instance())
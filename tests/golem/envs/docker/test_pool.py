@@ -0,0 +1,93 @@
+from itertools import count
+from unittest import TestCase
+from unittest.mock import patch
+
+from docker.errors import APIError
+
+from golem.envs.docker.pool import ContainerPool
+
+
+class TestContainerPool(TestCase):
+
+    def setUp(self):
+        patcher = patch('golem.envs.docker.pool.local_client')
+        self.client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        ids = count()
+        self.client.create_container_from_config.side_effect = \
+            lambda _: {'Id': f'container-{next(ids)}'}
+
+        patcher = patch('golem.envs.docker.pool.time')
+        self.monotonic = patcher.start().monotonic
+        self.monotonic.return_value = 0.0
+        self.addCleanup(patcher.stop)
+
+        self.pool = ContainerPool(max_idle=2, max_age=60.0)
+        self.config = {'Image': 'image:1.0', 'HostConfig': {'CpusetCpus': '0'}}
+
+    def _removed(self):
+        return [c[0][0] for c in self.client.remove_container.call_args_list]
+
+    def test_empty(self):
+        self.assertIsNone(self.pool.acquire(self.config))
+
+    def test_acquire(self):
+        container_id = self.pool.create(self.config)
+        self.client.create_container_from_config.assert_called_once_with(
+            self.config)
+        self.assertEqual(len(self.pool), 1)
+
+        # Equal configs match regardless of the key order
+        config = dict(reversed(list(self.config.items())))
+        self.assertEqual(self.pool.acquire(config), container_id)
+        self.assertIsNone(self.pool.acquire(config))
+        self.client.remove_container.assert_not_called()
+
+    def test_other_config(self):
+        self.pool.create(self.config)
+        config = {'Image': 'image:1.0', 'HostConfig': {'CpusetCpus': '0,1'}}
+        self.assertIsNone(self.pool.acquire(config))
+        self.assertEqual(len(self.pool), 1)
+
+    def test_max_idle(self):
+        first = self.pool.create(self.config)
+        self.pool.create(self.config)
+        self.pool.create(self.config)
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(self._removed(), [first])
+
+    def test_no_idle(self):
+        pool = ContainerPool(max_idle=0)
+        self.assertIsNone(pool.create(self.config))
+        self.client.create_container_from_config.assert_not_called()
+
+    def test_expired(self):
+        first = self.pool.create(self.config)
+        self.monotonic.return_value = 30.0
+        second = self.pool.create(self.config)
+        self.monotonic.return_value = 61.0
+
+        self.assertEqual(self.pool.acquire(self.config), second)
+        self.assertEqual(self._removed(), [first])
+        self.assertEqual(len(self.pool), 0)
+
+    def test_remove(self):
+        container_id = self.pool.create(self.config)
+        self.pool.remove(container_id)
+        self.assertEqual(len(self.pool), 0)
+        self.client.remove_container.assert_called_once_with(
+            container_id, force=True)
+
+    def test_remove_error(self):
+        container_id = self.pool.create(self.config)
+        self.client.remove_container.side_effect = APIError('test')
+        with self.assertRaises(APIError):
+            self.pool.remove(container_id)
+        self.assertEqual(len(self.pool), 0)
+
+    def test_clear(self):
+        ids = [self.pool.create(self.config) for _ in range(2)]
+        self.client.remove_container.side_effect = [APIError('test'), None]
+        self.pool.clear()
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self._removed(), ids)
@@ -0,0 +1,303 @@
+import json
+import os
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from golem.envs.docker.telemetry import (
+    CgroupSource,
+    ContainerTelemetry,
+    DockerStatsSource,
+    METRICS,
+    RingBuffer,
+    TelemetryService,
+)
+from golem.rpc.mapping.rpceventnames import Computation
+from golem.testutils import TempDirFixture
+
+CONTAINER_ID = 'c0ffee'
+NET_DEV = """Inter-|   Receive                            |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:     100       1    0    0    0     0          0         0      100       1    0    0    0     0       0          0
+  eth0:    2000      20    0    0    0     0          0         0     3000      30    0    0    0     0       0          0
+"""  # noqa pylint: disable=line-too-long
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def _counters(cpu=0.0, memory=0, disk_read=0, disk_write=0, net_rx=0,
+              net_tx=0):
+    return dict(cpu=cpu, memory=memory, disk_read=disk_read,
+                disk_write=disk_write, net_rx=net_rx, net_tx=net_tx)
+
+
+class TestRingBuffer(TestCase):
+
+    def test_empty(self):
+        buffer = RingBuffer(3, ['a'])
+        self.assertEqual(len(buffer), 0)
+        self.assertIsNone(buffer.last())
+        self.assertEqual(buffer.window(0), {'time': [], 'a': []})
+
+    def test_window(self):
+        buffer = RingBuffer(3, ['a'])
+        buffer.append(1.0, {'a': 10})
+        buffer.append(2.0, {'a': 20})
+        self.assertEqual(buffer.window(2.0), {'time': [2.0], 'a': [20.0]})
+        self.assertEqual(buffer.last(), {'time': 2.0, 'a': 20.0})
+
+    def test_overwrite_oldest(self):
+        buffer = RingBuffer(3, ['a'])
+        for i in range(5):
+            buffer.append(float(i), {'a': i})
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.window(0)['a'], [2.0, 3.0, 4.0])
+
+
+class TestCgroupSource(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.cgroup_root = os.path.join(self.path, 'cgroup')
+        self.proc_root = os.path.join(self.path, 'proc')
+        _write(os.path.join(self.proc_root, '7', 'net', 'dev'), NET_DEV)
+
+    def _find(self):
+        return CgroupSource.find(
+            CONTAINER_ID, 7, self.cgroup_root, self.proc_root)
+
+    def test_not_found(self):
+        self.assertIsNone(CgroupSource.find(
+            CONTAINER_ID, 8, self.cgroup_root, self.proc_root))
+
+    def test_other_cgroup(self):
+        _write(os.path.join(self.proc_root, '7', 'cgroup'),
+               '0::/user.slice/session-1.scope\n')
+        self.assertIsNone(self._find())
+
+    def test_cgroup_v1(self):
+        path = f'docker/{CONTAINER_ID}'
+        _write(os.path.join(self.proc_root, '7', 'cgroup'),
+               f'12:memory:/{path}\n'
+               f'11:cpu,cpuacct:/{path}\n'
+               f'10:blkio:/{path}\n')
+        _write(os.path.join(
+            self.cgroup_root, 'memory', path, 'memory.usage_in_bytes'),
+               '4096\n')
+        _write(os.path.join(self.cgroup_root, 'cpuacct', path,
+                            'cpuacct.usage'), '1500000000\n')
+        _write(os.path.join(self.cgroup_root, 'blkio', path,
+                            'blkio.throttle.io_service_bytes'),
+               '8:0 Read 100\n8:0 Write 200\n8:0 Sync 300\nTotal 300\n')
+
+        self.assertEqual(self._find().read(), _counters(
+            cpu=1.5, memory=4096, disk_read=100, disk_write=200,
+            net_rx=2000, net_tx=3000))
+
+    def test_cgroup_v2(self):
+        path = f'system.slice/docker-{CONTAINER_ID}.scope'
+        _write(os.path.join(self.proc_root, '7', 'cgroup'), f'0::/{path}\n')
+        _write(os.path.join(self.cgroup_root, path, 'memory.current'),
+               '8192\n')
+        _write(os.path.join(self.cgroup_root, path, 'cpu.stat'),
+               'usage_usec 2500000\nuser_usec 2000000\n')
+        _write(os.path.join(self.cgroup_root, path, 'io.stat'),
+               '8:0 rbytes=10 wbytes=20 rios=1 wios=2\n'
+               '8:16 rbytes=1 wbytes=2 rios=1 wios=1\n')
+
+        self.assertEqual(self._find().read(), _counters(
+            cpu=2.5, memory=8192, disk_read=11, disk_write=22,
+            net_rx=2000, net_tx=3000))
+
+    def test_exited(self):
+        _write(os.path.join(self.proc_root, '7', 'cgroup'),
+               f'0::/docker/{CONTAINER_ID}\n')
+        self.assertIsNone(self._find().read())
+
+
+@patch('golem.envs.docker.telemetry.DockerStatsReader')
+class TestDockerStatsSource(TestCase):
+
+    def test_no_entry(self, reader):
+        reader().latest = None
+        self.assertIsNone(DockerStatsSource(CONTAINER_ID).read())
+
+    def test_read(self, reader):
+        reader().latest = {
+            'memory_stats': {'usage': 100},
+            'cpu_stats': {'cpu_usage': {'total_usage': 3 * 10 ** 9}},
+            'blkio_stats': {'io_service_bytes_recursive': [
+                {'op': 'Read', 'value': 1},
+                {'op': 'Write', 'value': 2},
+            ]},
+            'networks': {
+                'eth0': {'rx_bytes': 10, 'tx_bytes': 20},
+                'eth1': {'rx_bytes': 1, 'tx_bytes': 2},
+            },
+        }
+        source = DockerStatsSource(CONTAINER_ID)
+        reader().start.assert_called_once_with()
+        self.assertEqual(source.read(), _counters(
+            cpu=3.0, memory=100, disk_read=1, disk_write=2,
+            net_rx=11, net_tx=22))
+
+        source.close()
+        reader().stop.assert_called_once_with(timeout=0)
+
+
+@patch('golem.envs.docker.telemetry.time')
+class TestContainerTelemetry(TestCase):
+
+    def setUp(self):
+        self.telemetry = ContainerTelemetry()
+        self.source = Mock()
+        patcher = patch.object(
+            ContainerTelemetry, '_create_source', return_value=self.source)
+        self.create_source = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _sample(self, time_mock, now, **counters):
+        time_mock.time.return_value = now
+        self.source.read.return_value = _counters(**counters)
+        self.telemetry.sample()
+
+    def test_rates(self, time_mock):
+        self.telemetry.track(CONTAINER_ID, 'subtask')
+        self._sample(time_mock, 100.0, cpu=1.0, memory=10, net_rx=100)
+        self._sample(time_mock, 110.0, cpu=6.0, memory=20, net_rx=600)
+
+        self.create_source.assert_called_once_with(CONTAINER_ID)
+        last = self.telemetry.containers()[0]['last']
+        self.assertEqual(last['time'], 110.0)
+        self.assertEqual(last['cpu'], 0.5)
+        self.assertEqual(last['memory'], 20)
+        self.assertEqual(last['net_rx'], 50.0)
+
+    def test_query(self, time_mock):
+        self.telemetry.track(CONTAINER_ID, 'subtask')
+        for i in range(21):
+            # The CPU usage rate grows by 0.1 core every sample
+            self._sample(time_mock, i * 10.0, cpu=sum(range(i)))
+
+        result = self.telemetry.query('subtask', minutes=0.75)
+        self.assertEqual(result['container_id'], CONTAINER_ID)
+        self.assertEqual(result['samples'], 5)
+        self.assertAlmostEqual(result['cpu']['p50'], 1.7)
+        self.assertAlmostEqual(result['cpu']['p95'], 1.9)
+        self.assertAlmostEqual(result['cpu']['max'], 1.9)
+        self.assertEqual(set(result), {
+            'container_id', 'subtask_id', 'samples', *METRICS})
+
+    def test_query_metrics(self, time_mock):
+        self.telemetry.track(CONTAINER_ID)
+        self._sample(time_mock, 0.0)
+        self._sample(time_mock, 10.0, memory=10)
+
+        result = self.telemetry.query(
+            CONTAINER_ID, metrics=['memory'], percentiles=[99])
+        self.assertEqual(result['memory']['p99'], 10)
+        self.assertNotIn('cpu', result)
+        with self.assertRaises(ValueError):
+            self.telemetry.query(CONTAINER_ID, metrics=['gpu'])
+
+    def test_query_empty_window(self, time_mock):
+        self.telemetry.track(CONTAINER_ID)
+        self._sample(time_mock, 0.0)
+        time_mock.time.return_value = 3600.0
+
+        result = self.telemetry.query(CONTAINER_ID, metrics=['cpu'])
+        self.assertEqual(result['samples'], 0)
+        self.assertEqual(result['cpu'], {
+            'p50': None, 'p95': None, 'mean': None, 'max': None})
+        json.dumps(result, allow_nan=False)
+
+    def test_query_unknown(self, time_mock):
+        time_mock.time.return_value = 0.0
+        self.assertIsNone(self.telemetry.query('unknown'))
+
+    def test_untrack(self, time_mock):
+        self.telemetry.track(CONTAINER_ID, 'subtask')
+        self._sample(time_mock, 0.0)
+        self.telemetry.untrack(CONTAINER_ID)
+        self.source.close.assert_called_once_with()
+
+        self.telemetry.sample()
+        self.assertEqual(self.source.read.call_count, 1)
+        self.assertEqual(
+            self.telemetry.containers()[0]['stopped'], 0.0)
+        self.assertIsNotNone(self.telemetry.query('subtask'))
+
+    def test_stopped_evicted(self, time_mock):
+        time_mock.time.return_value = 0.0
+        self.telemetry.MAX_STOPPED = 2
+        for i in range(3):
+            self.telemetry.track(f'container{i}')
+            self.telemetry.untrack(f'container{i}')
+        self.assertEqual(
+            [c['container_id'] for c in self.telemetry.containers()],
+            ['container1', 'container2'])
+
+    def test_source_error(self, time_mock):
+        self.telemetry.track(CONTAINER_ID)
+        self.telemetry.track('other')
+        self.source.read.side_effect = [OSError, _counters()]
+        time_mock.time.return_value = 0.0
+        self.telemetry.sample()
+        self.assertEqual(self.source.read.call_count, 2)
+
+    def test_series(self, time_mock):
+        self.telemetry.track(CONTAINER_ID, 'subtask')
+        self._sample(time_mock, 0.0, memory=10)
+        self._sample(time_mock, 10.0, memory=30)
+        self._sample(time_mock, 20.0, memory=20)
+        self.telemetry.track('idle')
+
+        series = self.telemetry.series(30)
+        self.assertEqual(list(series), [CONTAINER_ID])
+        self.assertEqual(series[CONTAINER_ID]['subtask_id'], 'subtask')
+        self.assertEqual(
+            series[CONTAINER_ID]['memory'], {'mean': 25.0, 'max': 30.0})
+
+    def test_instance(self, _):
+        self.assertIs(
+            ContainerTelemetry.instance(), ContainerTelemetry.instance())
+
+
+@patch('golem.envs.docker.telemetry.time')
+class TestTelemetryService(TestCase):
+
+    def setUp(self):
+        self.telemetry = Mock(SAMPLE_INTERVAL=5.0)
+        self.publish = Mock()
+
+    def test_publish_interval(self, time_mock):
+        time_mock.time.return_value = 0.0
+        service = TelemetryService(
+            self.publish, self.telemetry, publish_interval=30.0)
+
+        time_mock.time.return_value = 10.0
+        service._publish_series()
+        self.publish.assert_not_called()
+
+        time_mock.time.return_value = 30.0
+        service._publish_series()
+        self.telemetry.series.assert_called_once_with(30.0)
+        self.publish.assert_called_once_with(
+            Computation.evt_comp_telemetry, self.telemetry.series())
+
+    def test_nothing_to_publish(self, time_mock):
+        time_mock.time.return_value = 0.0
+        service = TelemetryService(
+            self.publish, self.telemetry, publish_interval=30.0)
+        self.telemetry.series.return_value = {}
+        time_mock.time.return_value = 60.0
+        service._publish_series()
+        self.publish.assert_not_called()
+
+    def test_run_samples(self, _):
+        service = TelemetryService(self.publish, self.telemetry)
+        service._run()
+        self.telemetry.sample.assert_called_once_with()
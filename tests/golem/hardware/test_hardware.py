@@ -42,3 +42,11 @@ class TestHardware(TempDirFixture):
         assert hardware.cap_disk(1e7) == 1e7
         assert hardware.cap_disk(7e9) == 7e9
         assert hardware.cap_disk(9e19) == 7e9
+
+    @patch('golem.hardware.cpu_model', return_value='CPU')
+    def test_fingerprint(self, *_):
+        fingerprint = hardware.fingerprint('image')
+        assert fingerprint == hardware.fingerprint('image')
+        assert fingerprint != hardware.fingerprint('other image')
+        with patch('golem.hardware.cpus', return_value=[1, 2]):
+            assert fingerprint != hardware.fingerprint('image')
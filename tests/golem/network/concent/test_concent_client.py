@@ -1,7 +1,9 @@
 # pylint: disable=protected-access, no-self-use
+import concurrent.futures
 import datetime
 import gc
 import logging
+import threading
 import time
 from unittest import mock, TestCase
 import urllib
@@ -259,6 +261,25 @@ class TestConcentClientService(testutils.TempDirFixture):
         loop_mock.assert_called_once_with()
         receive_mock.assert_called_once_with()
 
+    @mock.patch('golem.network.concent.client.ConcentClientService.receive')
+    def test_stop_waits_for_loop(self, *_):
+        looping = threading.Event()
+
+        def _loop():
+            looping.set()
+            time.sleep(.5)
+            # Submitted after stop() was called
+            self.concent_service._executor.submit(lambda: None)
+
+        with mock.patch.object(self.concent_service, '_loop',
+                               side_effect=_loop):
+            self.concent_service.start()
+            looping.wait()
+            self.concent_service.stop()
+
+        assert not self.concent_service.is_alive()
+        assert self.concent_service._executor._shutdown
+
     def test_submit(self, *_):
         self.concent_service.submit(
             'key',
@@ -285,6 +306,12 @@ class TestConcentClientService(testutils.TempDirFixture):
 
         assert 'key' not in self.concent_service._delayed
 
+    def _loop(self):
+        self.concent_service._loop()
+        concurrent.futures.wait(
+            [future for _, future in self.concent_service._in_flight])
+        self.concent_service._reap()
+
     def test_loop_exception(self, send_mock, *_):
         self.concent_service.submit(
             'key',
@@ -293,19 +320,77 @@ class TestConcentClientService(testutils.TempDirFixture):
         )
 
         send_mock.side_effect = exceptions.ConcentRequestError
-        mock_path = ("golem.network.concent.client.ConcentClientService"
-                     "._grace_sleep")
-        with mock.patch(mock_path) as sleep_mock:
-            self.concent_service._loop()
-            sleep_mock.assert_called_once_with()
+        self._loop()
 
         send_mock.assert_called_once_with(
             self.msg,
             self.concent_service.keys_auth._private_key,
             concent_variant=self.concent_service.variant,
+            session=self.concent_service._session,
         )
 
         assert not self.concent_service._delayed
+        assert not self.concent_service._retries
+        assert self.concent_service.get_queue_stats()['failed'] == 1
+
+    def test_loop_unavailable_retry(self, send_mock, *_):
+        self.concent_service.submit(
+            'key',
+            self.msg,
+            delay=datetime.timedelta(),
+        )
+        other_msg = message.concents.ForceSubtaskResults()
+        self.concent_service.submit(
+            'other',
+            other_msg,
+            delay=datetime.timedelta(),
+        )
+
+        sent = []
+
+        def send(msg, *_args, **_kwargs):
+            sent.append(msg)
+            if msg is self.msg and sent.count(msg) == 1:
+                raise exceptions.ConcentUnavailableError
+
+        send_mock.side_effect = send
+        with mock.patch(
+            'golem.network.concent.client.ConcentClientService'
+            '.react_to_concent_message'
+        ) as react_mock:
+            self._loop()
+        react_mock.assert_called_once_with(None, response_to=other_msg)
+
+        retries = self.concent_service._retries
+        assert [p.msg for p in retries] == [self.msg]
+        assert retries[0].not_before > time.time() + \
+            self.concent_service.MIN_GRACE_TIME - 1
+
+        # Not sent again before its backoff passes
+        self._loop()
+        assert send_mock.call_count == 2
+
+        retries[0].not_before = 0
+        self._loop()
+        assert send_mock.call_count == 3
+        assert not self.concent_service._retries
+
+    def test_loop_retry_limit(self, send_mock, *_):
+        send_mock.side_effect = exceptions.ConcentServiceError
+        self.concent_service.submit(
+            'key',
+            self.msg,
+            delay=datetime.timedelta(),
+        )
+
+        for _ in range(self.concent_service.MAX_ATTEMPTS):
+            for pending in self.concent_service._retries:
+                pending.not_before = 0
+            self._loop()
+
+        assert send_mock.call_count == self.concent_service.MAX_ATTEMPTS
+        assert not self.concent_service._retries
+        assert self.concent_service.get_queue_stats()['failed'] == 1
 
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
@@ -320,14 +405,60 @@ class TestConcentClientService(testutils.TempDirFixture):
             delay=datetime.timedelta(),
         )
 
-        self.concent_service._loop()
+        self._loop()
         send_mock.assert_called_once_with(
             self.msg,
             self.concent_service.keys_auth._private_key,
             concent_variant=self.concent_service.variant,
+            session=self.concent_service._session,
         )
         react_mock.assert_called_once_with(data, response_to=self.msg)
 
+    @mock.patch(
+        'golem.network.concent.client.ConcentClientService'
+        '.react_to_concent_message'
+    )
+    def test_loop_pipeline(self, react_mock, send_mock, *_):
+        msgs = [message.concents.ForceReportComputedTask() for _ in range(6)]
+        first_sent = threading.Event()
+        release = threading.Event()
+
+        def send(msg, *_args, **_kwargs):
+            if msg is msgs[0]:
+                first_sent.set()
+                release.wait(5)
+            return msg
+
+        send_mock.side_effect = send
+        for i, msg in enumerate(msgs):
+            self.concent_service.submit(
+                str(i), msg, delay=datetime.timedelta())
+
+        self.concent_service._loop()
+        first_sent.wait(5)
+        in_flight = self.concent_service.max_in_flight
+        stats = self.concent_service.get_queue_stats()
+        assert stats['in_flight'] == in_flight
+        assert stats['queued'] == len(msgs) - in_flight
+
+        # Replies are not processed before the reply to the first message
+        concurrent.futures.wait(
+            [f for _, f in list(self.concent_service._in_flight)[1:]])
+        self.concent_service._reap()
+        react_mock.assert_not_called()
+
+        release.set()
+        while self.concent_service._in_flight or \
+                self.concent_service._queue.qsize():
+            self._loop()
+
+        assert react_mock.call_args_list == [
+            mock.call(msg, response_to=msg) for msg in msgs
+        ]
+        stats = self.concent_service.get_queue_stats()
+        assert stats['sent'] == len(msgs)
+        assert stats['latency']['max'] >= stats['round_trip']['max']
+
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
         '.react_to_concent_message'
@@ -339,6 +470,7 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=self.concent_service.keys_auth._private_key,
             public_key=self.concent_service.keys_auth.public_key,
             concent_variant=self.concent_service.variant,
+            session=self.concent_service._session,
         )
         react_mock.assert_has_calls(
             (
@@ -348,7 +480,7 @@ class TestConcentClientService(testutils.TempDirFixture):
 
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
-        '._grace_sleep'
+        '._grace_backoff'
     )
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
@@ -356,7 +488,7 @@ class TestConcentClientService(testutils.TempDirFixture):
     )
     def test_receive_concent_error(self,
                                    react_mock,
-                                   sleep_mock,
+                                   backoff_mock,
                                    _send_mock,
                                    receive_mock,
                                    *_):
@@ -366,13 +498,14 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=mock.ANY,
             public_key=mock.ANY,
             concent_variant=self.concent_service.variant,
+            session=mock.ANY,
         )
-        sleep_mock.assert_called_once_with()
+        backoff_mock.assert_called_once_with()
         react_mock.assert_not_called()
 
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
-        '._grace_sleep'
+        '._grace_backoff'
     )
     @mock.patch(
         'golem.network.concent.client.ConcentClientService'
@@ -380,7 +513,7 @@ class TestConcentClientService(testutils.TempDirFixture):
     )
     def test_receive_exception(self,
                                react_mock,
-                               sleep_mock,
+                               backoff_mock,
                                _send_mock,
                                receive_mock,
                                *_):
@@ -390,10 +523,18 @@ class TestConcentClientService(testutils.TempDirFixture):
             signing_key=mock.ANY,
             public_key=mock.ANY,
             concent_variant=mock.ANY,
+            session=mock.ANY,
         )
-        sleep_mock.assert_called_once_with()
+        backoff_mock.assert_called_once_with()
         react_mock.assert_not_called()
 
+    def test_grace_backoff(self, *_):
+        self.concent_service._grace_backoff()
+        assert self.concent_service._receive_not_before > time.time()
+        assert self.concent_service._grace_time == \
+            self.concent_service.MIN_GRACE_TIME \
+            * self.concent_service.GRACE_FACTOR
+
     def test_react_to_concent_message_none(self, *_):
         result = self.concent_service.react_to_concent_message(None)
         self.assertIsNone(result)
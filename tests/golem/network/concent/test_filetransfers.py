@@ -1,8 +1,13 @@
 import base64
+import http.server
+import os
 import queue
+import threading
+import time
 import unittest
 
 import mock
+import requests
 
 from golem_messages.factories.concents import (
     FileTransferTokenFactory, FileInfoFactory)
@@ -63,6 +68,8 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
 
     def tearDown(self):
         self.assertFalse(self.cfs.running)
+        if self.cfs._executor:
+            self.cfs._executor.shutdown(wait=True)
 
     def test_init(self):
         self.assertIsInstance(self.cfs._transfers, queue.Queue)
@@ -113,6 +120,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         ftt = FileTransferTokenFactory()
         self.cfs.transfer(path, ftt)
         self.cfs._run()
+        self.cfs._transfers.join()
         process_mock.assert_called_once()
         request = process_mock.call_args[0][0]
         self.assertIsInstance(request, filetransfers.ConcentFileRequest)
@@ -185,7 +193,67 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         file.write_text('meh')
         return str(file)
 
-    @mock.patch('golem.network.concent.filetransfers.requests.post')
+    @mock.patch('golem.network.concent.filetransfers.'
+                'ConcentFiletransferService.process')
+    def test_run_concurrency_limit(self, process_mock):
+        self.cfs.max_concurrent_transfers = 2
+        self.cfs._in_progress = [mock.Mock(), mock.Mock()]
+        self.cfs.transfer('/some.file', FileTransferTokenFactory())
+        self.cfs._run()
+        process_mock.assert_not_called()
+        self.assertEqual(self.cfs.queue_size, 1)
+
+        self.cfs._in_progress.pop()
+        self.cfs._run()
+        self.cfs._transfers.join()
+        process_mock.assert_called_once()
+
+    def test_process_retry(self):
+        self.cfs.retry_delay = 0
+        request = ConcentFileRequestFactory(
+            file_transfer_token__upload=True,
+        )
+        response = mock.Mock(ok=True)
+        with mock.patch.object(
+            self.cfs, 'upload',
+            side_effect=[requests.ConnectionError(),
+                         mock.Mock(ok=False, status_code=503, text=''),
+                         response]) as upload_mock:
+            self.assertIs(self.cfs.process(request), response)
+
+        self.assertEqual(upload_mock.call_count, 3)
+        self.assertEqual(request.attempts, 3)
+
+    def test_process_retry_limit(self):
+        self.cfs.retry_delay = 0
+        error = mock.Mock()
+        request = ConcentFileRequestFactory(
+            file_transfer_token__upload=True,
+            error=error,
+        )
+        with mock.patch.object(
+                self.cfs, 'upload',
+                side_effect=requests.ConnectionError()) as upload_mock:
+            self.cfs.process(request)
+
+        self.assertEqual(upload_mock.call_count, self.cfs.max_attempts)
+        error.assert_called_once()
+
+    def test_process_no_retry_on_client_error(self):
+        request = ConcentFileRequestFactory(
+            file_transfer_token__upload=True,
+            error=mock.Mock(),
+        )
+        with mock.patch.object(
+            self.cfs, 'upload',
+            return_value=mock.Mock(ok=False, status_code=403,
+                                   text='')) as upload_mock:
+            self.cfs.process(request)
+
+        upload_mock.assert_called_once()
+        request.error.assert_called_once()
+
+    @mock.patch('requests.Session.post')
     def test_upload(self, requests_mock):
         path = self._init_uploaded_file('something.good')
 
@@ -210,7 +278,7 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         self.assertIsNotNone(kwargs.get('headers').pop('Concent-Auth'))
         self.assertEqual(kwargs.get('headers'), headers)
 
-    @mock.patch('golem.network.concent.filetransfers.requests.post')
+    @mock.patch('requests.Session.post')
     def test_upload_multiple_files(self, requests_mock):
         path = self._init_uploaded_file('obsta.cles')
         category = FileTransferToken.FileInfo.Category.resources
@@ -238,7 +306,8 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
         concent_upload_path = kwargs.get('headers').get('Concent-Upload-Path')
         self.assertEqual(concent_upload_path, ftt.files[1].get('path'))  # noqa pylint:disable=unsubscriptable-object
 
-    @mock.patch('golem.network.concent.filetransfers.requests.get')
+    @mock.patch('requests.Session.get',
+                return_value=mock.MagicMock(headers={}))
     def test_download(self, requests_mock):
         path = self.path + '/gotwell.soon'
 
@@ -264,7 +333,8 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
             self._mock_get_auth_headers(ftt)
         )
 
-    @mock.patch('golem.network.concent.filetransfers.requests.get')
+    @mock.patch('requests.Session.get',
+                return_value=mock.MagicMock(headers={}))
     def test_download_multiple_files(self, requests_mock):
         path = self.path + '/spanish.sahara'
         category = FileTransferToken.FileInfo.Category.resources
@@ -290,3 +360,159 @@ class ConcentFiletransferServiceTest(testutils.TempDirFixture):
 
         requests_mock.assert_called_once()
         self.assertEqual(requests_mock.call_args[0], (download_address, ))
+
+
+class ConcentStorageStandIn(http.server.ThreadingHTTPServer):
+    """Local stand-in for the Concent storage cluster"""
+
+    def __init__(self):
+        self.files = {}
+        self.failures = 0
+        self.requests = 0
+        super().__init__(('127.0.0.1', 0), ConcentStorageHandler)
+
+    @property
+    def address(self):
+        return 'http://{}:{}/'.format(*self.server_address)
+
+
+class ConcentStorageHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *_):
+        pass
+
+    def _fail(self):
+        self.server.requests += 1
+        if self.server.failures:
+            self.server.failures -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+        return False
+
+    def do_POST(self):  # noqa pylint: disable=invalid-name
+        length = int(self.headers['Content-Length'])
+        body = self.rfile.read(length)
+        if self._fail():
+            return
+        self.server.files[self.headers['Concent-Upload-Path']] = body
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):  # noqa pylint: disable=invalid-name
+        if self._fail():
+            return
+        body = self.server.files[self.path[len('/download/'):]]
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ConcentFiletransferStandInTest(testutils.TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.server = ConcentStorageStandIn()
+        self.server_thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+        keys_auth = keysauth.KeysAuth(
+            datadir=self.path,
+            private_key_name='priv_key',
+            password='password',
+        )
+        self.cfs = filetransfers.ConcentFiletransferService(
+            keys_auth=keys_auth,
+            variant=variables.CONCENT_CHOICES['dev'],
+            max_concurrent_transfers=3,
+            retry_delay=0,
+        )
+
+    def tearDown(self):
+        if self.cfs._executor:
+            self.cfs._executor.shutdown(wait=True)
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def _ftt(self, path, **kwargs):
+        return FileTransferTokenFactory(
+            storage_cluster_address=self.server.address,
+            files=[FileInfoFactory(
+                path=path,
+                category=FileTransferToken.FileInfo.Category.results,
+            )],
+            **kwargs,
+        )
+
+    def _drain(self):
+        while self.cfs.queue_size:
+            self.cfs._run()
+            time.sleep(0.01)
+        self.cfs._transfers.join()
+
+    def test_concurrent_upload_and_download(self):
+        contents = {'file{}'.format(i): os.urandom(1024 * (i + 1))
+                    for i in range(6)}
+        progress = {}
+        for name, data in contents.items():
+            path = os.path.join(self.path, name)
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.cfs.transfer(
+                path, self._ftt(name, upload=True),
+                progress=lambda done, total, name=name:
+                progress.__setitem__(name, (done, total)),
+            )
+        self._drain()
+
+        self.assertEqual(self.server.files, contents)
+        self.assertEqual(
+            progress,
+            {name: (len(data), len(data)) for name, data in contents.items()},
+        )
+
+        for name in contents:
+            self.cfs.transfer(
+                os.path.join(self.path, name + '.downloaded'),
+                self._ftt(name, download=True),
+            )
+        self._drain()
+
+        for name, data in contents.items():
+            with open(os.path.join(self.path, name + '.downloaded'),
+                      'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_threaded_callbacks_in_reactor(self):
+        path = os.path.join(self.path, 'result.zip')
+        with open(path, 'wb') as f:
+            f.write(b'result')
+        success = mock.Mock()
+        request = filetransfers.ConcentFileRequest(
+            path, self._ftt('result.zip', upload=True), success=success)
+
+        with mock.patch('twisted.internet.reactor.callFromThread') as call:
+            self.cfs.process(request, threaded=True)
+
+        success.assert_not_called()
+        call.assert_called_once_with(success, mock.ANY)
+
+    def test_retry_on_server_error(self):
+        path = os.path.join(self.path, 'result.zip')
+        with open(path, 'wb') as f:
+            f.write(b'result')
+        self.server.failures = 2
+        success = mock.Mock()
+
+        self.cfs.process(filetransfers.ConcentFileRequest(
+            path, self._ftt('result.zip', upload=True), success=success))
+
+        success.assert_called_once()
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.server.files, {'result.zip': b'result'})
@@ -470,6 +470,18 @@ class FiletransfersTestBase(TaskServerMessageHandlerTestBase):
         cft_patch.start()
         self.addCleanup(cft_patch.stop)
 
+        # Callbacks of the transfer threads are made in place
+        reactor_patch = mock.patch(
+            'twisted.internet.reactor.callFromThread',
+            lambda fn, *args: fn(*args),
+        )
+        reactor_patch.start()
+        self.addCleanup(reactor_patch.stop)
+
+    def _run_transfers(self):
+        self._run_transfers()
+        self.cft._transfers.join()
+
 
 class FileTransferTokenTestsBase:
 
@@ -536,7 +548,7 @@ class ForceGetTaskResultUploadTest(FileTransferTokenTests,  # noqa pylint:disabl
             '.ConcentFiletransferService.upload',
             mock.Mock(return_value=response)
         ) as upload_mock:
-            self.cft._run()
+            self._run_transfers()
 
         upload_mock.assert_called_once()
         self.assertEqual(
@@ -565,7 +577,7 @@ class ForceGetTaskResultUploadTest(FileTransferTokenTests,  # noqa pylint:disabl
             '.ConcentFiletransferService.upload',
             mock.Mock(side_effect=exception)
         ):
-            self.cft._run()
+            self._run_transfers()
 
         log_mock.assert_called_with(
             "Concent results upload failed: %r, %s",
@@ -620,7 +632,7 @@ class ForceGetTaskResultDownloadTest(FileTransferTokenTests,  # noqa pylint:disa
             'golem.network.concent.filetransfers'
             '.ConcentFiletransferService.download',
         ) as download_mock:
-            self.cft._run()
+            self._run_transfers()
 
         download_mock.assert_called_once()
         self.assertEqual(
@@ -645,7 +657,7 @@ class ForceGetTaskResultDownloadTest(FileTransferTokenTests,  # noqa pylint:disa
             '.ConcentFiletransferService.download',
             mock.Mock(side_effect=exception)
         ):
-            self.cft._run()
+            self._run_transfers()
 
         log_mock.assert_called_with(
             "Concent download failed: %r, %s",
@@ -667,7 +679,7 @@ class ForceGetTaskResultDownloadTest(FileTransferTokenTests,  # noqa pylint:disa
             'golem.network.concent.filetransfers'
             '.ConcentFiletransferService.download',
         ):
-            self.cft._run()
+            self._run_transfers()
 
         extract.assert_called_once()
         log_mock.assert_called_with(
@@ -781,8 +793,8 @@ class SubtaskResultsVerifyTest(FileTransferTokenTestsBase,  # noqa pylint:disabl
             self.wtr.task_id, [self.path])
         asrv = self.get_asrv()
         library.interpret(asrv)
-        self.cft._run()
-        self.cft._run()
+        self._run_transfers()
+        self._run_transfers()
         self.assertEqual(upload_mock.call_count, 2)
         resources_call, results_call = upload_mock.call_args_list
 
@@ -825,8 +837,8 @@ class SubtaskResultsVerifyTest(FileTransferTokenTestsBase,  # noqa pylint:disabl
             self.wtr.task_id, [self.path])
         asrv = self.get_asrv()
         library.interpret(asrv)
-        self.cft._run()
-        self.cft._run()
+        self._run_transfers()
+        self._run_transfers()
         self.assertEqual(upload_mock.call_count, 1)
         self.assertIn('Cannot find the subtask', log_mock.call_args[0][0])
 
@@ -838,8 +850,8 @@ class SubtaskResultsVerifyTest(FileTransferTokenTestsBase,  # noqa pylint:disabl
         self.task_server.results_to_send[self.wtr.subtask_id] = self.wtr
         asrv = self.get_asrv()
         library.interpret(asrv)
-        self.cft._run()
-        self.cft._run()
+        self._run_transfers()
+        self._run_transfers()
         self.assertEqual(upload_mock.call_count, 1)
         self.assertIn('Cannot upload resources', log_mock.call_args[0][0])
 
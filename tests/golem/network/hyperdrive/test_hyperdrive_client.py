@@ -24,7 +24,7 @@ response = {
 response_str = json.dumps(response)
 
 
-@mock.patch('golem.network.hyperdrive.client.requests.post',
+@mock.patch('golem.network.hyperdrive.client.requests.Session.post',
             return_value=mock.Mock(text=response_str,
                                    content=response_str.encode()))
 class TestHyperdriveClient(TestCase):
@@ -74,8 +74,36 @@ class TestHyperdriveClient(TestCase):
         response_hash = response['hash']
         assert client.cancel(content_hash) == response_hash
 
+    def test_add_many(self, post):
+        client = self.get_client()
+        files = {'path/to/file': 'file'}
+
+        result = client.add_many([(files, None)] * 3)
+
+        assert result == [response['hash']] * 3
+        assert post.call_count == 3
+
+    def test_restore_many_error(self, post):
+        client = self.get_client()
+        exception = HTTPError()
+        post.side_effect = [
+            mock.Mock(content=response_str.encode()),
+            mock.Mock(raise_for_status=mock.Mock(side_effect=exception),
+                      text=None),
+        ]
+
+        result = client.restore_many([('hash1', None), ('hash2', None)])
+
+        assert response['hash'] in result
+        assert exception in result
+
+    def test_keep_alive(self, _):
+        client = self.get_client()
+        adapter = client._session.get_adapter(client._url)
+        assert adapter._pool_maxsize == client.max_in_flight
+
     @mock.patch('json.loads')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_request(self, post, json_loads, _):
         client = self.get_client()
         resp = mock.Mock()
@@ -218,6 +246,76 @@ class TestHyperdriveClientAsync(TestCase):
             assert isinstance(wrapper.result, str)
 
 
+class TestHyperdriveClientAsyncPool(TestCase):
+
+    @staticmethod
+    def body(*_):
+        d = Deferred()
+        d.callback(b'{"hash": "0a0b0c0d"}')
+        return d
+
+    def test_in_flight_limit(self):
+        client = HyperdriveAsyncClient(
+            max_in_flight=2, **hyperdrive_client_kwargs(wrapped=False))
+        requests = []
+
+        def run(*_):
+            requests.append(Deferred())
+            return requests[-1]
+
+        with mock.patch('twisted.web.client.readBody',
+                        side_effect=self.body), \
+            mock.patch('golem.core.golem_async.AsyncHTTPRequest.run',
+                       side_effect=run):
+
+            results = [client.restore_async('hash') for _ in range(3)]
+            assert len(requests) == 2
+
+            requests[0].callback(mock.Mock(code=200))
+            assert results[0].called
+            assert len(requests) == 3
+
+    def test_download_and_cancel_not_limited(self):
+        client = HyperdriveAsyncClient(
+            max_in_flight=1, **hyperdrive_client_kwargs(wrapped=False))
+        requests = []
+
+        def run(*_):
+            requests.append(Deferred())
+            return requests[-1]
+
+        with mock.patch('golem.core.golem_async.AsyncHTTPRequest.run',
+                        side_effect=run):
+            client.get_async('hash', client_options=None, filepath='.')
+            client.get_async('hash', client_options=None, filepath='.')
+            client.add_async({'path/to/file': 'file'})
+            client.restore_async('hash')
+            client.cancel_async('hash')
+
+        # The restore waits for the upload, nothing waits for downloads
+        assert len(requests) == 4
+
+    def test_restore_many_async(self):
+        client = HyperdriveAsyncClient(**hyperdrive_client_kwargs(
+            wrapped=False))
+        responses = [
+            TestHyperdriveClientAsync.success,
+            TestHyperdriveClientAsync.failure,
+        ]
+
+        with mock.patch('twisted.web.client.readBody',
+                        side_effect=self.body), \
+            mock.patch('golem.core.golem_async.AsyncHTTPRequest.run',
+                       side_effect=lambda *args: responses.pop(0)(*args)):
+
+            deferred = client.restore_many_async([('hash1', None),
+                                                  ('hash2', None)])
+
+        assert deferred.called
+        assert deferred.result[0] == '0a0b0c0d'
+        assert isinstance(deferred.result[1], Exception)
+
+
 class TestHyperdriveClientOptions(TestCase):
 
     def test_clone(self):
@@ -1,5 +1,6 @@
 # pylint: disable=protected-access
 import datetime
+import pickle
 import queue
 import uuid
 import unittest
@@ -8,6 +9,7 @@ import unittest.mock as mock
 from faker import Faker
 from freezegun import freeze_time
 from peewee import DataError, PeeweeException, IntegrityError
+import semantic_version
 
 from golem_messages import factories as msg_factories
 
@@ -54,7 +56,7 @@ class TestMessageHistoryService(MessageHistoryServiceTestBase):
         return NetworkMessage(**cls._build_dict(task, subtask))
 
     def test_add(self):
-        msg = self._build_msg()
+        msg = self._build_dict()
 
         self.service.add(msg)
         assert self.service._save_queue.get(block=False) is msg
@@ -215,11 +217,11 @@ class TestMessageHistoryService(MessageHistoryServiceTestBase):
     def test_loop_add_sync(self):
         self.service._sweep = mock.Mock()
         self.service._queue_timeout = 0.1
-        self.service.add_sync = mock.Mock()
+        self.service._save_batch = mock.Mock()
 
         # No message
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service._save_batch.called
 
         # Add message
         msg = self._build_dict()
@@ -227,12 +229,115 @@ class TestMessageHistoryService(MessageHistoryServiceTestBase):
 
         # With message
         self.service._loop()
-        assert self.service.add_sync.called
+        self.service._save_batch.assert_called_once_with([msg])
 
         # No message again, since it was popped from the queue
-        self.service.add_sync.reset_mock()
+        self.service._save_batch.reset_mock()
         self.service._loop()
-        assert not self.service.add_sync.called
+        assert not self.service._save_batch.called
+
+    def test_loop_saves_batch(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        msgs = [self._build_dict("task") for _ in range(5)]
+        for msg in msgs:
+            self.service.add(msg)
+
+        with mock.patch.object(self.service, 'SAVE_BATCH_SIZE', 3):
+            self.service._loop()
+            assert message_count() == 3
+            self.service._loop()
+            assert message_count() == 5
+
+    def test_save_batch_invalid_message(self):
+        msgs = [self._build_dict("task") for _ in range(3)]
+        del msgs[1]['node']
+
+        self.service._save_batch(msgs)
+        assert message_count() == 2
+
+    def test_save_batch_temporary_error(self):
+        msgs = [self._build_dict("task") for _ in range(3)]
+
+        with mock.patch('peewee.InsertQuery.execute',
+                        side_effect=PeeweeException):
+            self.service._save_batch(msgs)
+        assert message_count() == 0
+        assert self.service._save_queue.qsize() == 3
+
+
+class TestRecentMessages(MessageHistoryServiceTestBase):
+    @staticmethod
+    def _build_dict(task="task", subtask="subtask"):
+        return dict(
+            task=task,
+            subtask=subtask,
+            node=str(uuid.uuid4()),
+            msg_date=datetime.datetime.now(),
+            msg_cls='Hello',
+            msg_data=b'0' * 64,
+            local_role=Actor.Provider,
+            remote_role=Actor.Requestor,
+        )
+
+    def test_get_sync_active_subtask_does_not_query(self):
+        msg = self._build_dict()
+        self.service.add_sync(msg)
+        self.service.get_sync(subtask="subtask")
+
+        with mock.patch('golem.model.NetworkMessage.select') as select:
+            result = self.service.get_sync(subtask="subtask", node=msg['node'])
+        select.assert_not_called()
+        assert len(result) == 1
+        assert result[0].msg_data == msg['msg_data']
+
+    def test_get_sync_merges_stored_messages(self):
+        stored = self._build_dict()
+        NetworkMessage(**stored).save()
+        self.service.add(self._build_dict())
+
+        result = self.service.get_sync(subtask="subtask")
+        assert [m.node for m in result] == [
+            stored['node'],
+            self.service._save_queue.queue[0]['node'],
+        ]
+
+    def test_loop_completes_subtasks(self):
+        self.service._sweep = mock.Mock()
+        self.service._queue_timeout = 0.1
+        self.service.add(self._build_dict())
+        assert not self.service._recent.is_complete("subtask")
+
+        self.service._loop()
+        assert self.service._recent.is_complete("subtask")
+
+    def test_remove(self):
+        msg = self._build_dict()
+        self.service.add_sync(msg)
+        assert len(self.service.get_sync(subtask="subtask")) == 1
+
+        self.service.remove("task", subtask="subtask")
+        assert not self.service.get_sync(subtask="subtask")
+
+    def test_sweep(self):
+        msg = self._build_dict()
+        msg['msg_date'] -= (
+            self.service.MESSAGE_LIFETIME + datetime.timedelta(hours=1)
+        )
+        self.service.add_sync(msg)
+        assert len(self.service.get_sync(subtask="subtask")) == 1
+
+        self.service._sweep()
+        assert "subtask" not in self.service._recent
+        assert not self.service.get_sync(subtask="subtask")
+
+    def test_eviction(self):
+        recent = history.RecentMessages(max_subtasks=2)
+        for subtask in ("a", "b", "c"):
+            recent.add(self._build_dict(subtask=subtask))
+
+        assert len(recent) == 2
+        assert "a" not in recent
 
     def test_loop_remove_sync(self):
         self.service._sweep = mock.Mock()
@@ -284,8 +389,8 @@ class TestMessageHistoryGet(MessageHistoryServiceTestBase):
 
         self.assertEqual(self.msg, msg_retrieved)
 
-    def test_get_pickle_fail(self):
-        with mock.patch('golem.model.pickle.loads',
+    def test_get_load_fail(self):
+        with mock.patch('golem.model.golem_messages.load',
                         mock.Mock(side_effect=AttributeError)):
             msg_retrieved = history.get(
                 'TaskToCompute',
@@ -295,6 +400,35 @@ class TestMessageHistoryGet(MessageHistoryServiceTestBase):
 
         self.assertIsNone(msg_retrieved)
 
+    def test_get_version_mismatch(self):
+        NetworkMessage.update(
+            msg_version=semantic_version.Version('0.0.1'),
+        ).execute()
+        history.MessageHistoryService.instance._recent.clear()
+
+        msg_retrieved = history.get(
+            'TaskToCompute',
+            subtask_id=self.msg.subtask_id,
+            node_id=self.node_id,
+        )
+
+        self.assertIsNone(msg_retrieved)
+
+    def test_get_legacy_pickle(self):
+        NetworkMessage.update(
+            msg_data=pickle.dumps(self.msg),
+            msg_version=None,
+        ).execute()
+        history.MessageHistoryService.instance._recent.clear()
+
+        msg_retrieved = history.get(
+            'TaskToCompute',
+            subtask_id=self.msg.subtask_id,
+            node_id=self.node_id,
+        )
+
+        self.assertEqual(self.msg, msg_retrieved)
+
 
 @mock.patch("golem.network.history.MessageHistoryService.add")
 class TestAdd(unittest.TestCase):
@@ -395,6 +529,7 @@ class TestMessageToModel(unittest.TestCase):
             'msg_date': datetime.datetime.now(),
             'msg_cls': 'TaskToCompute',
             'msg_data': mock.ANY,
+            'msg_version': mock.ANY,
             'local_role': local_role,
             'remote_role': remote_role,
         }
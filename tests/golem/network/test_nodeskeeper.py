@@ -1,4 +1,9 @@
+import datetime
+import itertools
+from unittest import mock
+
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+from golem import model
 from golem import testutils
 from golem.network import nodeskeeper
 
@@ -13,3 +18,92 @@ class TestNodesKeeper(testutils.DatabaseFixture):
             self.node,
             nodeskeeper.get(self.node.key),
         )
+
+    def test_sweep(self):
+        cache = nodeskeeper.NodesCache(max_stored=2)
+        with mock.patch.object(nodeskeeper.NodesCache, '_instance', cache):
+            for _ in range(3):
+                nodeskeeper.store(dt_p2p_factory.Node())
+            # Over the limit, e.g. written before the eviction on store
+            cache._max_stored = 1  # pylint: disable=protected-access
+            nodeskeeper.sweep()
+        self.assertEqual(model.CachedNode.select().count(), 1)
+
+
+class TestNodesCache(testutils.DatabaseFixture):
+    def setUp(self):
+        super().setUp()
+        self.cache = nodeskeeper.NodesCache(max_cached=3, max_stored=3)
+
+    def test_get_unknown(self):
+        self.assertIsNone(self.cache.get('unknown'))
+        with mock.patch('golem.model.CachedNode.select') as select:
+            self.assertIsNone(self.cache.get('unknown'))
+        select.assert_not_called()
+        counters = self.cache.stats()['counters']
+        self.assertEqual(counters['misses'], 1)
+        self.assertEqual(counters['negative_hits'], 1)
+
+    def test_store_unknown(self):
+        node = dt_p2p_factory.Node()
+        self.assertIsNone(self.cache.get(node.key))
+        self.cache.store(node)
+        self.assertEqual(self.cache.get(node.key), node)
+
+    def test_get_stored(self):
+        node = dt_p2p_factory.Node()
+        self.cache.store(node)
+        cache = nodeskeeper.NodesCache()
+        self.assertEqual(cache.get(node.key), node)
+        self.assertEqual(cache.get(node.key), node)
+        self.assertEqual(cache.stats()['hit_rate'], 0.5)
+
+    def test_store_coalesced(self):
+        node = dt_p2p_factory.Node(node_name='first')
+        other = dt_p2p_factory.Node()
+        with mock.patch.object(model.db, 'write') as write:
+            self.cache.store(node)
+            node = dt_p2p_factory.Node(key=node.key, node_name='second')
+            self.cache.store(node)
+            self.cache.store(other)
+            self.assertEqual(self.cache.get(node.key), node)
+        write.assert_called_once_with(self.cache.flush)
+        self.assertEqual(model.CachedNode.select().count(), 0)
+
+        self.cache.flush()
+        self.assertEqual(model.CachedNode.select().count(), 2)
+        self.assertEqual(
+            nodeskeeper.NodesCache().get(node.key).node_name, 'second')
+        self.assertEqual(self.cache.stats()['counters']['coalesced'], 1)
+
+    def test_evict(self):
+        nodes = [dt_p2p_factory.Node() for _ in range(5)]
+        start = datetime.datetime(2019, 1, 1, tzinfo=datetime.timezone.utc)
+        dates = (start + datetime.timedelta(minutes=i)
+                 for i in itertools.count())
+        with mock.patch('golem.model.default_now',
+                        side_effect=lambda: next(dates)):
+            for node in nodes:
+                self.cache.store(node)
+        stored = [row.node for row in model.CachedNode.select()]
+        self.assertCountEqual(stored, [node.key for node in nodes[2:]])
+        self.assertEqual(self.cache.stats()['counters']['evicted'], 2)
+
+    def test_lru(self):
+        nodes = [dt_p2p_factory.Node() for _ in range(4)]
+        for node in nodes[:3]:
+            self.cache.store(node)
+        self.cache.get(nodes[0].key)
+        self.cache.store(nodes[3])
+        self.assertEqual(self.cache.stats()['cached'], 3)
+        with mock.patch('golem.model.CachedNode.select') as select:
+            self.cache.get(nodes[0].key)
+            self.cache.get(nodes[3].key)
+        select.assert_not_called()
+
+    def test_database_switched(self):
+        self.assertIsNone(self.cache.get('unknown'))
+        with mock.patch.object(model.db, 'database', 'other.db'):
+            self.assertEqual(self.cache.stats()['cached'], 1)
+            self.cache.get('unknown')
+        self.assertEqual(self.cache.stats()['counters']['misses'], 2)
@@ -10,6 +10,8 @@ from golem_messages import exceptions as msg_exceptions
 from golem_messages import message
 from golem_messages import factories as msg_factories
 from golem_messages.factories.datastructures import p2p as dt_p2p_factory
+from twisted.internet.defer import Deferred
+from twisted.internet.task import Clock
 
 from golem import testutils
 from golem.network.transport import tcpnetwork
@@ -194,3 +196,78 @@ class TestTCPNetworkConnections(unittest.TestCase):
         connect_all(TCPConnectInfo(self.addresses, mock.Mock(), mock.Mock()))
         assert not connect.called
         assert call.called
+
+
+class TestConnectionRace(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.network = mock.Mock(reactor=self.clock, CONNECT_ATTEMPT_DELAY=0.25)
+        self.attempts = {}
+        self.network._connect_to_address.side_effect = \
+            lambda address: self.attempts.setdefault(address.address,
+                                                     Deferred())
+        self.addresses = [
+            SocketAddress('10.0.0.1', 40102),
+            SocketAddress('10.0.0.2', 40102),
+            SocketAddress('10.0.0.3', 40102),
+        ]
+        self.established = mock.Mock()
+        self.failure = mock.Mock()
+        self.connect_info = TCPConnectInfo(
+            self.addresses, self.established, self.failure)
+        self.race = tcpnetwork.ConnectionRace(
+            self.network, self.connect_info, self.addresses)
+
+    def test_staggered(self):
+        self.race.start()
+        assert list(self.attempts) == ['10.0.0.1']
+        self.clock.advance(0.25)
+        assert list(self.attempts) == ['10.0.0.1', '10.0.0.2']
+
+        conn = mock.Mock()
+        self.attempts['10.0.0.2'].callback(conn)
+        self.established.assert_called_once_with(
+            conn.session, conn_id=self.connect_info.id)
+        # The remaining attempts are cancelled or never started
+        assert self.attempts['10.0.0.1'].called
+        self.clock.advance(1)
+        assert list(self.attempts) == ['10.0.0.1', '10.0.0.2']
+        self.failure.assert_not_called()
+
+    def test_next_after_failure(self):
+        self.race.start()
+        self.attempts['10.0.0.1'].errback(ConnectionRefusedError())
+        assert list(self.attempts) == ['10.0.0.1', '10.0.0.2']
+        self.clock.advance(0.25)
+        assert len(self.attempts) == 3
+
+    def test_all_failed(self):
+        self.race.start()
+        self.clock.advance(0.5)
+        for address in self.addresses:
+            self.attempts[address.address].errback(ConnectionRefusedError())
+        self.failure.assert_called_once_with(conn_id=self.connect_info.id)
+        self.established.assert_not_called()
+
+    def test_redundant_connection_aborted(self):
+        self.network.CONNECT_ATTEMPT_DELAY = None
+        self.race.start()
+        self.attempts['10.0.0.1'].errback(ConnectionRefusedError())
+        assert list(self.attempts) == ['10.0.0.1', '10.0.0.2']
+
+        self.race._attempt_next()
+        # Connected before the cancellation took effect
+        self.attempts['10.0.0.3'].cancel = mock.Mock()
+        first, second = mock.Mock(), mock.Mock()
+        self.attempts['10.0.0.2'].callback(first)
+        self.attempts['10.0.0.3'].callback(second)
+        self.established.assert_called_once_with(
+            first.session, conn_id=self.connect_info.id)
+        second.transport.abortConnection.assert_called_once_with()
+
+    def test_sequential(self):
+        self.network.CONNECT_ATTEMPT_DELAY = None
+        self.race.start()
+        self.clock.advance(10)
+        assert list(self.attempts) == ['10.0.0.1']
@@ -185,6 +185,40 @@ class TestPendingConnectionServer(unittest.TestCase):
         assert pending_conn.status == PenConnStatus.Connected
         assert SocketAddress("10.10.10.1", self.port) == pending_conn.socket_addresses[0]
 
+    def test_last_address_first(self):
+        server = PendingConnectionsServer(None, Network())
+        req_type = 0
+        server.conn_established_for_type[req_type] = lambda x: x
+        server.conn_failure_for_type[req_type] = server.final_conn_failure
+        server.conn_final_failure_for_type[req_type] = lambda *_, **__: None
+        server._is_address_accessible = Mock(return_value=True)
+
+        def add_request():
+            server.pending_connections = {}
+            server._add_pending_request(
+                req_type,
+                self.node_info,
+                prv_port=self.node_info.prv_port,
+                pub_port=self.node_info.pub_port,
+                args={}
+            )
+            return next(iter(server.pending_connections.values()))
+
+        pending_conn = add_request()
+        assert pending_conn.node_key == self.node_info.key
+        prv_address = SocketAddress("10.10.10.2", self.node_info.prv_port)
+        assert pending_conn.socket_addresses[1] == prv_address
+
+        server._mark_connected(pending_conn.id, "10.10.10.2",
+                               self.node_info.prv_port)
+        assert server.last_node_addresses[self.node_info.key] == prv_address
+
+        pending_conn = add_request()
+        assert pending_conn.socket_addresses == [
+            prv_address,
+            SocketAddress("10.10.10.1", self.node_info.pub_port),
+        ]
+
     def test_sync_pending(self):
         network = Network()
         server = PendingConnectionsServer(None, network)
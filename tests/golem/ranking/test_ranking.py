@@ -1,9 +1,14 @@
 from threading import Thread
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+from twisted.internet.defer import fail
 
 from golem.client import Client
+from golem.model import GlobalRank
 from golem.ranking.helper.trust import Trust
 from golem.ranking.manager import database_manager as dm
+from golem.ranking.manager import trust_manager as tm
 from golem.ranking.ranking import Ranking
 from golem.tools.assertlogs import LogTestCase
 from golem.tools.testwithdatabase import TestWithDatabase
@@ -74,6 +79,26 @@ class TestRankingDatabase(TestWithDatabase):
         self.assertEqual(gr.gossip_weight_computing, 0.9)
         self.assertEqual(gr.gossip_weight_requesting, 0.8)
 
+    def test_global_ranks(self):
+        dm.upsert_global_rank("ABC", 0.3, 0.2, 1.0, 1.0)
+        dm.upsert_global_ranks([("ABC", 0.4, 0.1, 0.8, 0.7),
+                                ("DEF", 0.1, 0.2, 0.9, 0.8)])
+        gr = dm.get_global_rank("ABC")
+        self.assertEqual(gr.computing_trust_value, 0.4)
+        self.assertEqual(gr.requesting_trust_value, 0.1)
+        self.assertEqual(gr.gossip_weight_computing, 0.8)
+        self.assertEqual(gr.gossip_weight_requesting, 0.7)
+        gr = dm.get_global_rank("DEF")
+        self.assertEqual(gr.computing_trust_value, 0.1)
+        self.assertEqual(gr.requesting_trust_value, 0.2)
+        self.assertEqual(gr.gossip_weight_computing, 0.9)
+        self.assertEqual(gr.gossip_weight_requesting, 0.8)
+
+        ranks = [("node{}".format(i), 0.1, 0.2, 1.0, 1.0)
+                 for i in range(dm.GLOBAL_RANK_BATCH_SIZE * 2 + 1)]
+        dm.upsert_global_ranks(ranks)
+        self.assertEqual(GlobalRank.select().count(), len(ranks) + 2)
+
     def test_neighbour_rank(self):
         self.assertIsNone(dm.get_neighbour_loc_rank("ABC", "DEF"))
         dm.upsert_neighbour_loc_rank("ABC", "DEF", (0.2, 0.3))
@@ -114,6 +139,52 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
         result = min_max_utility.count_trust(1, 999999999)
         self.assertGreaterEqual(result, min_max_utility.MIN_TRUST)
 
+    def test_count_trusts(self):
+        from golem.ranking.helper import min_max_utility
+
+        pos = np.array([600, 999999999, 1, 0, 10])
+        neg = np.array([200, 1, 999999999, 0, 3])
+        result = min_max_utility.count_trusts(pos, neg)
+        expected = [min_max_utility.count_trust(p, n)
+                    for p, n in zip(pos, neg)]
+        np.testing.assert_allclose(result, expected)
+
+    def test_vecs_to_trust(self):
+        from golem.ranking.helper import min_max_utility
+
+        vectors = [[0.2, 0.5], [0.0, 0.5], [0.3, 0.0], [2.0, 1.0],
+                   [-0.1, 0.3]]
+        values, weights = np.array(vectors).T
+        result = min_max_utility.vecs_to_trust(values, weights)
+        expected = [min_max_utility.vec_to_trust(v) for v in vectors]
+        np.testing.assert_allclose(result, expected)
+
+    def test_local_trusts(self):
+        node_ids, trusts = tm.local_trusts()
+        self.assertEqual(node_ids, [])
+        self.assertEqual(trusts.shape, (0, 2))
+
+        Trust.COMPUTED.increase("ABC", 30)
+        Trust.WRONG_COMPUTED.increase("ABC", 5)
+        Trust.PAYMENT.increase("DEF", 40)
+        Trust.REQUESTED.decrease("DEF", 2)
+        node_ids, trusts = tm.local_trusts()
+        self.assertEqual(sorted(node_ids), ["ABC", "DEF"])
+        for node_id, (comp_trust, req_trust) in zip(node_ids, trusts):
+            local_rank = dm.get_local_rank(node_id)
+            self.assertAlmostEqual(
+                comp_trust, tm.computed_trust_local(local_rank))
+            self.assertAlmostEqual(
+                req_trust, tm.requested_trust_local(local_rank))
+
+    def test_trust_write_failure_logged(self):
+        with patch('golem.ranking.manager.database_manager.db.write',
+                   return_value=fail(Exception('database is locked'))), \
+                self.assertLogs('golem.ranking.helper.trust',
+                                level='WARNING') as logs:
+            Trust.COMPUTED.increase("ABC", 1)
+        self.assertIn('database is locked', logs.output[0])
+
     def test_increase_trust_thread_safety(self):
         c = MagicMock(spec=Client)
         r = Ranking(c)
@@ -296,3 +367,23 @@ class TestRanking(TestWithDatabase, LogTestCase, PEP8MixIn):
         #
         # assert r.get_computing_trust("UnknownNode") == 0.0
         # assert r.get_requesting_trust("UnknownNode") == 0.0
+
+    def test_wrong_gossip(self):
+        r = Ranking(MagicMock(spec=Client))
+        r.received_gossip = [
+            [["ABC", [[0.2, 0.5], [0.1, 0.5]]],
+             ["DEF", [[0.2, 0.5]]],
+             "GHI",
+             ["ABC", [[0.1, 0.5], [0.1, 0.5]]]],
+            [["DEF", [[0.3, 0.5], [0.1, 0.5]]]],
+        ]
+        with self.assertLogs(level="ERROR") as logs:
+            r._Ranking__add_gossip()
+        assert len(logs.output) == 2
+        assert len(r.received_gossip) == 0
+        assert len(r.working_vec) == 2
+        np.testing.assert_allclose(r.working_vec["ABC"],
+                                   [[0.3, 1.0], [0.2, 1.0]])
+        np.testing.assert_allclose(r.working_vec["DEF"],
+                                   [[0.3, 0.5], [0.1, 0.5]])
+        assert "GHI" not in r.working_vec
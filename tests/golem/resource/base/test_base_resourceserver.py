@@ -5,11 +5,15 @@ import os
 import shutil
 import time
 import uuid
+from threading import Thread
 
 from twisted.internet.defer import succeed
 
 from golem.core.deferred import sync_wait
-from golem.resource.base.resourceserver import BaseResourceServer
+from golem.resource.base.resourceserver import (
+    BaseResourceServer,
+    TransferStatus,
+)
 from golem.resource.dirmanager import DirManager
 from golem.resource.hyperdrive.resourcesmanager import DummyResourceManager
 from golem.tools import testwithreactor
@@ -138,7 +142,8 @@ class TestResourceServer(testwithreactor.TestDirFixtureWithReactor):
         resources = self.resource_manager.storage.get_resources(self.task_id)
         assert len(self.resource_server.pending_resources) == 0
 
-        self.resource_server.download_resources(resources, self.task_id)
+        with mock.patch.object(self.resource_server, '_download_resources'):
+            self.resource_server.download_resources(resources, self.task_id)
         pending = self.resource_server.pending_resources[self.task_id]
         assert len(pending) == len(resources)
 
@@ -161,11 +166,12 @@ class TestResourceServer(testwithreactor.TestDirFixtureWithReactor):
         task_path = manager.storage.get_dir(task_id)
 
         server = BaseResourceServer(manager, self.client)
-        server.download_resources(resources, task_id)
+        with mock.patch.object(server, '_download_resources'):
+            server.download_resources(resources, task_id)
 
         def run(*args, **kwargs):
             del args, kwargs
-            return succeed(True)
+            return succeed([])
 
         with mock.patch('golem.core.golem_async.async_run', run):
             server._download_resources(async_=False)
@@ -182,18 +188,65 @@ class TestResourceServer(testwithreactor.TestDirFixtureWithReactor):
         ]
 
         assert not self.resource_server.pending_resources
-        self.resource_server.download_resources(test_files, self.task_id)
+        with mock.patch.object(self.resource_server, '_download_resources'):
+            self.resource_server.download_resources(test_files, self.task_id)
         assert len(self.resource_server.pending_resources[self.task_id]) == len(
             test_files)
 
         return self.resource_server, test_files
 
+    def testDownloadStarted(self):
+        with mock.patch.object(self.resource_manager, 'pull_resource') \
+                as pull_resource:
+            self.resource_server.download_resources(
+                [['file1.txt', '1']], self.task_id)
+        pull_resource.assert_called_once()
+        entry = self.resource_server.pending_resources[self.task_id][0]
+        assert entry.status == TransferStatus.transferring
+
+    def testDownloadStartedOnce(self):
+        with mock.patch.object(self.resource_manager, 'pull_resource') \
+                as pull_resource:
+            self.resource_server.download_resources(
+                [['file1.txt', '1']], self.task_id)
+            # Network syncs racing the reactor
+            threads = [Thread(target=self.resource_server.sync_network)
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        pull_resource.assert_called_once()
+
+    def testNothingToDownload(self):
+        self.resource_server.download_resources([], self.task_id)
+        assert self.client.downloaded
+
+    @staticmethod
+    def _run(request, *_):
+        return succeed(request.method(*request.args))
+
     def testDownloadSuccess(self):
         rs, file_names = self.testAddFilesToGet()
+        rs.packager = mock.Mock()
+        ctk = self.client.task_server.task_manager.comp_task_keeper
         resources = list(rs.pending_resources[self.task_id])
         for entry in resources:
-            rs._download_success(entry.resource, None, self.task_id)
+            entry.status = TransferStatus.transferring
+
+        with mock.patch('golem.core.golem_async.async_run', self._run):
+            rs._download_success(resources[0].resource, None, self.task_id)
+            # Extracted before the remaining resources are downloaded
+            assert rs.packager.extract.call_count == 1
+            assert not self.client.downloaded
+
+            rs._download_success(resources[1].resource, None, self.task_id)
+
         assert not rs.pending_resources
+        assert self.client.downloaded
+        resource_dir = self.resource_manager.storage.get_dir(self.task_id)
+        ctk.add_package_paths.assert_called_once_with(self.task_id, [
+            os.path.join(resource_dir, name[1]) for name in file_names])
 
     def testDownloadError(self):
         rs, file_names = self.testAddFilesToGet()
@@ -201,3 +254,18 @@ class TestResourceServer(testwithreactor.TestDirFixtureWithReactor):
         for entry in resources:
             rs._download_error(Exception(), entry.resource, self.task_id)
         assert not rs.pending_resources
+        assert self.client.failed
+
+    def testCancelled(self):
+        rs, _ = self.testAddFilesToGet()
+        resources = list(rs.pending_resources[self.task_id])
+        for entry in resources:
+            entry.status = TransferStatus.transferring
+        rs.cancel_resources(self.task_id)
+
+        with mock.patch('golem.core.golem_async.async_run', self._run):
+            rs._download_success(resources[0].resource, None, self.task_id)
+        rs._download_error(Exception(), resources[1].resource, self.task_id)
+        assert resources[0].status == TransferStatus.cancelled
+        assert not self.client.downloaded
+        assert not self.client.failed
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from unittest.mock import patch
+
+from golem.resource import diskusage
+from golem.resource.diskusage import DiskUsageLedger
+from golem.testutils import TempDirFixture
+
+
+class TestDiskUsageLedger(TempDirFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.path, 'root')
+        self.ledger_path = os.path.join(self.path, 'ledger.json')
+        os.makedirs(self.root)
+        self.ledger = DiskUsageLedger(self.root, self.ledger_path)
+
+    def _write(self, *parts, size=100):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'0' * size)
+        return path
+
+    def test_size(self):
+        assert self.ledger.size() == 0
+
+        self._write('task1', 'output', 'result.png')
+        self._write('task2', 'resources', 'scene.blend', size=200)
+        self._write('file', size=50)
+
+        size = self.ledger.size()
+        assert size >= 350
+        assert size < 350 + 5 * os.path.getsize(self.root)
+
+    def test_size_measures_new_and_touched_entries(self):
+        self._write('task1', 'result.png')
+        self._write('task2', 'result.png')
+        self.ledger.size()
+
+        with patch('golem.resource.diskusage.get_dir_size',
+                   return_value=1000) as get_dir_size:
+            self.ledger.size()
+            get_dir_size.assert_not_called()
+
+            path = self._write('task1', 'output', 'result.png')
+            self.ledger.touch(path)
+            self._write('task3', 'result.png')
+            self.ledger.size()
+
+        assert get_dir_size.call_count == 2
+
+    def test_size_removed_entry(self):
+        self._write('task1', 'result.png')
+        self.ledger.size()
+
+        os.remove(os.path.join(self.root, 'task1', 'result.png'))
+        os.rmdir(os.path.join(self.root, 'task1'))
+        assert self.ledger.size() == 0
+
+    def test_touch_outside(self):
+        self.ledger.touch(self.path)
+        self.ledger.touch(os.path.join(self.path, 'root2', 'file'))
+        assert not self.ledger._dirty
+
+    def test_clear(self):
+        self._write('task1', 'result.png')
+        self._write('file')
+
+        self.ledger.clear()
+
+        assert os.listdir(self.root) == []
+        assert self.ledger.size() == 0
+
+    def test_clear_older_than(self):
+        self._write('old', 'result.png')
+        self.ledger.size()
+        self.ledger._entries['old'][1] = time.time() - 60
+        self._write('new', 'result.png')
+
+        self.ledger.clear(older_than_seconds=30)
+
+        assert os.listdir(self.root) == ['new']
+
+    def test_clear_touched(self):
+        self._write('task1', 'result.png')
+        self.ledger.size()
+        self.ledger._entries['task1'][1] = time.time() - 60
+        self.ledger.touch(os.path.join(self.root, 'task1', 'output'))
+
+        self.ledger.clear(older_than_seconds=30)
+
+        assert os.listdir(self.root) == ['task1']
+
+    def test_reconcile(self):
+        self._write('task1', 'result.png')
+        self.ledger.size()
+        size = self.ledger.size()
+
+        # Written without touching the entry
+        self._write('task1', 'output', 'result.png', size=1000)
+        assert self.ledger.size() == size
+
+        self.ledger.reconcile()
+        assert self.ledger.size() > size + 1000
+
+    def test_persistence(self):
+        self._write('task1', 'result.png')
+        size = self.ledger.size()
+
+        ledger = DiskUsageLedger(self.root, self.ledger_path)
+        assert ledger._entries == self.ledger._entries
+        with patch('golem.resource.diskusage.get_dir_size') as get_dir_size:
+            assert ledger.size() == size
+        get_dir_size.assert_not_called()
+
+    def test_concurrent_saves(self):
+        self._write('task1', 'result.png')
+        self.ledger.size()
+
+        def save():
+            for _ in range(20):
+                self.ledger._save()
+
+        threads = [threading.Thread(target=save) for _ in range(8)]
+        with patch('golem.resource.diskusage.logger') as logger:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        logger.warning.assert_not_called()
+        assert not os.path.exists(self.ledger_path + '.tmp')
+        ledger = DiskUsageLedger(self.root, self.ledger_path)
+        assert ledger._entries == self.ledger._entries
+
+    def test_persistence_other_root(self):
+        self._write('task1', 'result.png')
+        self.ledger.size()
+
+        other_root = os.path.join(self.path, 'other')
+        os.makedirs(other_root)
+        ledger = DiskUsageLedger(other_root, self.ledger_path)
+        assert not ledger._entries
+
+    def test_corrupted_ledger(self):
+        with open(self.ledger_path, 'w') as f:
+            f.write('{')
+        ledger = DiskUsageLedger(self.root, self.ledger_path)
+        assert not ledger._entries
+
+
+class TestTouch(TempDirFixture):
+
+    def test_touch(self):
+        root = os.path.join(self.path, 'root')
+        os.makedirs(root)
+        ledger = diskusage.ledger(root)
+        assert diskusage.ledger(root) is ledger
+
+        diskusage.touch(os.path.join(root, 'task1', 'output'))
+        assert 'task1' in ledger._dirty
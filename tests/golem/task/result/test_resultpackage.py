@@ -2,8 +2,9 @@ import uuid
 from os import makedirs, listdir
 from os.path import basename, exists, join, relpath
 from pathlib import Path
+from unittest import mock
 
-from golem.core.fileencrypt import FileEncryptor
+from golem.core.fileencrypt import AESFileEncryptor, FileEncryptor
 from golem.resource.dirmanager import DirManager
 from golem.task.result.resultpackage import EncryptingPackager, \
     EncryptingTaskResultPackager, ExtractedPackage, ZipPackager, backup_rename
@@ -148,6 +149,15 @@ class TestEncryptingPackager(PackageDirContentsFixture):
 
         self.assertTrue(len(files) == len(self.all_files))
 
+    def testExtractLegacy(self):
+        ep = EncryptingPackager(self.secret)
+        with mock.patch.object(EncryptingPackager, 'encryptor_class',
+                               AESFileEncryptor):
+            ep.create(self.out_path, self.disk_files)
+        files, _ = ep.extract(self.out_path)
+
+        self.assertEqual(len(files), len(self.all_files))
+
 
 class TestEncryptingTaskResultPackager(PackageDirContentsFixture):
 
@@ -1,10 +1,13 @@
 import types
+from unittest import TestCase
 from unittest.mock import Mock, patch
 
 from apps.appsmanager import AppsManager
+from golem.docker.image import DockerImage
 from golem.environments.environment import Environment as DefaultEnvironment
 from golem.model import Performance
-from golem.task.benchmarkmanager import BenchmarkManager
+from golem.task.benchmarkmanager import BenchmarkManager, \
+    median_and_dispersion
 from golem.testutils import DatabaseFixture, PEP8MixIn
 
 
@@ -35,6 +38,7 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
         am._benchmark_enabled = Mock(return_value=True)
         self.b = BenchmarkManager("NODE1", Mock(), self.path,
                                   am.get_benchmarks())
+        self.b._image_digests = Mock(return_value=['digest'])
 
     def test_benchmarks_not_needed_wo_apps(self):
         assert not BenchmarkManager(None, None, None).benchmarks_needed()
@@ -46,14 +50,50 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
 
     def test_benchmarks_not_needed_when_results_saved(self):
         # given
-        for env_id in self.b.benchmarks:
-            Performance.update_or_create(env_id, 100)
+        for env_id, (_, builder) in self.b.benchmarks.items():
+            Performance.update_or_create(
+                env_id, 100, fingerprint=self.b.fingerprint(env_id, builder))
 
         Performance.update_or_create(DefaultEnvironment.get_id(), 3)
 
         # then
         assert not self.b.benchmarks_needed()
 
+    def test_benchmarks_needed_when_fingerprint_changed(self):
+        # given
+        for env_id, (_, builder) in self.b.benchmarks.items():
+            Performance.update_or_create(
+                env_id, 100, fingerprint=self.b.fingerprint(env_id, builder))
+        Performance.update_or_create(DefaultEnvironment.get_id(), 3)
+
+        # when
+        self.b._image_digests.return_value = ['new digest']
+
+        # then
+        self.b.benchmarks_needed = types.MethodType(benchmarks_needed, self.b)
+        assert self.b.benchmarks_needed()
+        assert self.b.get_outdated_benchmarks().keys() == \
+            self.b.benchmarks.keys()
+
+    @patch('golem.docker.image.local_client')
+    def test_image_digests_from_cache(self, local_client):
+        images = [DockerImage('golemfactory/blender', tag='1.11'),
+                  DockerImage('golemfactory/dummy', image_id='id', tag='1.3')]
+        builder = Mock()
+        builder.TASK_CLASS.ENVIRONMENT_CLASS.return_value = Mock(
+            docker_images=images)
+        cache = Mock(image_id=lambda name: {
+            'golemfactory/blender:1.11': 'sha256:blender'}.get(name))
+
+        with patch('golem.docker.image.ImageCache.instance',
+                   return_value=cache):
+            digests = BenchmarkManager._image_digests(builder)
+
+        assert digests == ['sha256:blender', 'id']
+        local_client.assert_not_called()
+
+    @patch.object(BenchmarkManager, 'WARMUP_RUNS', 0)
+    @patch.object(BenchmarkManager, 'REPETITIONS', 1)
     @patch("golem.task.benchmarkmanager.Thread", MockThread)
     @patch("golem.environments.environment.make_perf_test")
     @patch("golem.task.benchmarkmanager.BenchmarkRunner")
@@ -80,6 +120,8 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
             assert (1 + idx) * 100 == \
                    Performance.get(Performance.environment_id == env_id).value
 
+    @patch.object(BenchmarkManager, 'WARMUP_RUNS', 0)
+    @patch.object(BenchmarkManager, 'REPETITIONS', 1)
     @patch("golem.task.benchmarkmanager.Thread", MockThread)
     @patch("golem.environments.environment.make_perf_test")
     @patch("golem.task.benchmarkmanager.BenchmarkRunner")
@@ -104,3 +146,103 @@ class TestBenchmarkManager(DatabaseFixture, PEP8MixIn):
         for idx, env_id in enumerate(reversed(list(self.b.benchmarks))):
             assert (1 + idx) * 100 == \
                    Performance.get(Performance.environment_id == env_id).value
+
+    @patch("golem.task.benchmarkmanager.BenchmarkRunner")
+    def test_run_all_benchmarks_cached(self, br_mock):
+        # given
+        Performance.update_or_create(DefaultEnvironment.get_id(), 3)
+        for env_id, (_, builder) in self.b.benchmarks.items():
+            Performance.update_or_create(
+                env_id, 100, fingerprint=self.b.fingerprint(env_id, builder))
+        success = Mock()
+
+        # when
+        self.b.run_all_benchmarks(success)
+
+        # then
+        br_mock.assert_not_called()
+        success.assert_called_once_with(None)
+
+    def _run_benchmark(self, br_mock, performances):
+        performances = iter(performances)
+
+        def _run():
+            success_callback = br_mock.call_args[1].get('success_callback')
+            return success_callback(next(performances))
+        br_mock.return_value.run.side_effect = _run
+
+        env_id, (benchmark, builder) = next(iter(self.b.benchmarks.items()))
+        success, error = Mock(), Mock()
+        self.b.run_benchmark(benchmark, builder, env_id, success, error)
+        error.assert_not_called()
+        return env_id, success
+
+    @patch("golem.task.benchmarkmanager.BenchmarkRunner")
+    def test_run_benchmark_median(self, br_mock):
+        # The warm-up run is discarded
+        env_id, success = self._run_benchmark(br_mock, [10, 98, 100, 103])
+
+        assert br_mock.call_count == 4
+        success.assert_called_once_with(100)
+        perf = Performance.get(Performance.environment_id == env_id)
+        assert perf.value == 100
+        assert perf.dispersion == 0.02
+        assert perf.fingerprint == self.b.fingerprint(
+            env_id, self.b.benchmarks[env_id][1])
+
+    @patch("golem.task.benchmarkmanager.BenchmarkRunner")
+    def test_run_benchmark_rerun_on_dispersion(self, br_mock):
+        env_id, success = self._run_benchmark(
+            br_mock, [10, 50, 150, 100, 99, 101, 100])
+
+        assert br_mock.call_count == 7
+        success.assert_called_once_with(100)
+        perf = Performance.get(Performance.environment_id == env_id)
+        assert perf.value == 100
+        assert perf.dispersion == 0.01
+
+    @patch("golem.task.benchmarkmanager.BenchmarkRunner")
+    def test_run_benchmark_error(self, br_mock):
+        def _run():
+            error_callback = br_mock.call_args[1].get('error_callback')
+            return error_callback("failed")
+        br_mock.return_value.run.side_effect = _run
+
+        env_id, (benchmark, builder) = next(iter(self.b.benchmarks.items()))
+        success, error = Mock(), Mock()
+        self.b.run_benchmark(benchmark, builder, env_id, success, error)
+
+        assert br_mock.call_count == 1
+        success.assert_not_called()
+        error.assert_called_once()
+
+    def test_run_benchmarks_sequentially(self):
+        runs = []
+        self.b.run_benchmark = \
+            lambda _b, _c, env_id, success, _e: runs.append((env_id, success))
+        success = Mock()
+
+        self.b.run_benchmarks(dict(self.b.benchmarks), success)
+        env_ids = []
+        while runs:
+            # the next benchmark starts once the previous one has finished
+            assert len(runs) == 1
+            env_id, callback = runs.pop(0)
+            env_ids.append(env_id)
+            success.assert_not_called()
+            callback(100)
+
+        assert sorted(env_ids) == sorted(self.b.benchmarks)
+        success.assert_called_once_with(None)
+
+
+class TestMedianAndDispersion(TestCase):
+
+    def test_single(self):
+        assert median_and_dispersion([5.0]) == (5.0, 0.0)
+
+    def test_samples(self):
+        assert median_and_dispersion([90, 100, 120]) == (100, 0.1)
+
+    def test_zero(self):
+        assert median_and_dispersion([0, 0]) == (0, 0.0)
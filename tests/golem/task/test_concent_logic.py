@@ -76,7 +76,7 @@ class TaskToComputeConcentTestCase(testutils.TempDirFixture):
 
         self.task_session.concent_service.enabled = True
         self.task_session.concent_service.required_as_provider = True
-        self.task_session.task_computer.has_assigned_task.return_value = False
+        self.task_session.task_computer.can_take_task.return_value = True
         self.task_session.task_server.keys_auth.ecc.raw_pubkey = \
             self.keys.raw_pubkey
         self.task_session.task_server.config_desc.max_resource_size = \
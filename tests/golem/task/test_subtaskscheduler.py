@@ -0,0 +1,136 @@
+from unittest import TestCase, mock
+
+from golem.model import SubtaskUsage
+from golem.task.subtaskscheduler import (
+    Footprint,
+    Reservation,
+    SubtaskScheduler,
+)
+from golem.testutils import DatabaseFixture
+
+GiB = 1024 ** 2  # KiB
+
+
+def _usage(subtask_id, cpu_time, peak_memory, environment='BLENDER',
+           duration=10.0, cpu_count=4, success=True):
+    SubtaskUsage.create(
+        subtask_id=subtask_id,
+        task_id='task',
+        environment=environment,
+        success=success,
+        peak_memory=peak_memory,
+        cpu_time=cpu_time,
+        duration=duration,
+        cpu_count=cpu_count,
+    )
+
+
+class TestFootprint(DatabaseFixture):
+
+    def setUp(self):
+        super().setUp()
+        self.scheduler = SubtaskScheduler([0, 1, 2, 3], 4 * GiB, 4)
+
+    def test_unknown_environment(self):
+        self.assertEqual(self.scheduler.footprint('BLENDER'),
+                         Footprint(cpus=4, memory=4 * GiB))
+        self.assertEqual(self.scheduler.footprint(None),
+                         Footprint(cpus=4, memory=4 * GiB))
+
+    def test_too_few_samples(self):
+        _usage('s1', cpu_time=10.0, peak_memory=2 ** 29)
+        _usage('s2', cpu_time=10.0, peak_memory=2 ** 29)
+        _usage('s3', cpu_time=10.0, peak_memory=2 ** 29, success=False)
+        _usage('s4', cpu_time=10.0, peak_memory=2 ** 29, duration=0.0)
+        self.assertEqual(self.scheduler.footprint('BLENDER'),
+                         Footprint(cpus=4, memory=4 * GiB))
+
+    def test_measured(self):
+        _usage('s1', cpu_time=10.0, peak_memory=2 ** 29)
+        _usage('s2', cpu_time=15.0, peak_memory=2 ** 30)
+        _usage('s3', cpu_time=5.0, peak_memory=2 ** 28)
+        _usage('s4', cpu_time=40.0, peak_memory=2 ** 32, environment='OTHER')
+        # 1.5 cores, 1 GiB of memory with the headroom
+        self.assertEqual(self.scheduler.footprint('BLENDER'),
+                         Footprint(cpus=2, memory=int(1.25 * GiB)))
+
+    def test_minimal_memory(self):
+        for i in range(3):
+            _usage(f's{i}', cpu_time=1.0, peak_memory=1024)
+        self.assertEqual(self.scheduler.footprint('BLENDER'),
+                         Footprint(cpus=1, memory=SubtaskScheduler.MIN_MEMORY))
+
+    def test_saturated(self):
+        _usage('s1', cpu_time=10.0, peak_memory=2 ** 29)
+        _usage('s2', cpu_time=10.0, peak_memory=2 ** 29)
+        _usage('s3', cpu_time=19.0, peak_memory=2 ** 29, cpu_count=2)
+        self.assertEqual(self.scheduler.footprint('BLENDER'),
+                         Footprint(cpus=4, memory=4 * GiB))
+
+    def test_cached(self):
+        self.assertEqual(self.scheduler.footprint('BLENDER').cpus, 4)
+        for i in range(3):
+            _usage(f's{i}', cpu_time=1.0, peak_memory=2 ** 29)
+        self.assertEqual(self.scheduler.footprint('BLENDER').cpus, 4)
+
+        self.scheduler.update_config([0, 1], 2 * GiB, 2)
+        self.assertEqual(self.scheduler.footprint('BLENDER'),
+                         Footprint(cpus=1, memory=int(0.625 * GiB)))
+
+
+class TestScheduling(TestCase):
+
+    def setUp(self):
+        self.scheduler = SubtaskScheduler([0, 1, 2, 3], 4 * GiB, 3)
+        self.footprints = {
+            'SMALL': Footprint(cpus=1, memory=GiB),
+            'LARGE': Footprint(cpus=3, memory=2 * GiB),
+        }
+        patcher = mock.patch.object(
+            self.scheduler, '_measure', side_effect=self.footprints.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_partitioned(self):
+        self.assertTrue(self.scheduler.admit('s1', 'SMALL'))
+        self.assertTrue(self.scheduler.admit('s2', 'LARGE'))
+        self.assertEqual(self.scheduler.reservation('s1'),
+                         Reservation(cpus=[0], memory=GiB))
+        self.assertEqual(self.scheduler.reservation('s2'),
+                         Reservation(cpus=[1, 2, 3], memory=2 * GiB))
+        self.assertEqual(self.scheduler.assigned, 2)
+
+    def test_max_subtasks(self):
+        for i in range(3):
+            self.assertTrue(self.scheduler.admit(f's{i}', 'SMALL'))
+        self.assertFalse(self.scheduler.can_admit())
+        self.assertFalse(self.scheduler.admit('s3', 'SMALL'))
+
+        self.scheduler.release('s0')
+        self.assertTrue(self.scheduler.can_admit())
+
+    def test_not_fitting(self):
+        self.assertTrue(self.scheduler.admit('s1', 'LARGE'))
+        self.assertTrue(self.scheduler.can_admit())
+        self.assertTrue(self.scheduler.can_admit('SMALL'))
+        self.assertFalse(self.scheduler.can_admit('LARGE'))
+        self.assertFalse(self.scheduler.admit('s2', 'LARGE'))
+        self.assertIsNone(self.scheduler.reservation('s2'))
+        self.assertEqual(self.scheduler.assigned, 1)
+
+        self.scheduler.release('s1')
+        self.assertTrue(self.scheduler.admit('s2', 'LARGE'))
+        self.assertEqual(self.scheduler.reservation('s2'),
+                         Reservation(cpus=[0, 1, 2], memory=2 * GiB))
+
+    def test_unknown_footprint(self):
+        self.assertTrue(self.scheduler.admit('s1', None))
+        self.assertFalse(self.scheduler.can_admit())
+        self.assertFalse(self.scheduler.admit('s2', 'SMALL'))
+
+        self.scheduler.release('s1')
+        self.assertTrue(self.scheduler.can_admit('SMALL'))
+
+    def test_release_unknown(self):
+        self.scheduler.release('unknown')
+        self.assertEqual(self.scheduler.assigned, 0)
@@ -13,7 +13,9 @@ from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core.common import timeout_to_deadline
 from golem.core.deferred import sync_wait
 from golem.docker.manager import DockerManager
+from golem.docker.usage import ContainerUsage
 from golem.envs.docker.cpu import DockerCPUEnvironment
+from golem.model import SubtaskUsage
 from golem.task.taskcomputer import TaskComputer, PyTaskThread
 from golem.task.taskserver import TaskServer
 from golem.testutils import DatabaseFixture
@@ -295,6 +297,41 @@ class TestTaskThread(DatabaseFixture):
                             timeout=20)
 
 
+class TestSaveUsage(DatabaseFixture):
+
+    def test_save(self):
+        task_thread = mock.Mock(
+            usage=ContainerUsage(1024, 2.5, 10, 20), cpus=None,
+            start_time=10.0, end_time=15.0)
+        TaskComputer._save_usage(
+            task_thread, 'subtask', 'task', 'BLENDER', False, 4)
+
+        usage = SubtaskUsage.get(SubtaskUsage.subtask_id == 'subtask')
+        self.assertEqual(usage.task_id, 'task')
+        self.assertEqual(usage.environment, 'BLENDER')
+        self.assertFalse(usage.success)
+        self.assertEqual(usage.peak_memory, 1024)
+        self.assertEqual(usage.cpu_time, 2.5)
+        self.assertEqual(usage.io_read, 10)
+        self.assertEqual(usage.io_write, 20)
+        self.assertEqual(usage.duration, 5.0)
+        self.assertEqual(usage.cpu_count, 4)
+
+    def test_save_reserved_cpus(self):
+        task_thread = mock.Mock(
+            usage=ContainerUsage(), cpus=[2, 3], start_time=0.0, end_time=1.0)
+        TaskComputer._save_usage(
+            task_thread, 'subtask', 'task', 'BLENDER', True, 4)
+        usage = SubtaskUsage.get(SubtaskUsage.subtask_id == 'subtask')
+        self.assertEqual(usage.cpu_count, 2)
+
+    def test_no_usage(self):
+        task_thread = mock.Mock(spec=PyTaskThread)
+        TaskComputer._save_usage(
+            task_thread, 'subtask', 'task', 'BLENDER', True, 4)
+        self.assertFalse(SubtaskUsage.select().exists())
+
+
 class TestTaskMonitor(DatabaseFixture):
 
     def test_task_computed(self):
@@ -423,21 +460,18 @@ class TestChangeConfig(TestTaskComputerBase):
         self.docker_manager.update_config.assert_called_once()
 
 
-@mock.patch('golem.task.taskcomputer.ProviderTimer')
 class TestTaskGiven(TestTaskComputerBase):
 
-    def test_ok(self, provider_timer):
+    def test_ok(self):
         ctd = mock.Mock()
         self.task_computer.task_given(ctd)
         self.assertEqual(self.task_computer.assigned_subtask, ctd)
-        provider_timer.start.assert_called_once_with()
 
-    def test_already_assigned(self, provider_timer):
+    def test_already_assigned(self):
         self.task_computer.assigned_subtask = mock.Mock()
         ctd = mock.Mock()
         with self.assertRaises(AssertionError):
             self.task_computer.task_given(ctd)
-        provider_timer.start.assert_not_called()
 
 
 class TestTaskInterrupted(TestTaskComputerBase):
@@ -460,8 +494,7 @@ class TestTaskFinished(TestTaskComputerBase):
             self.task_computer._task_finished()
 
     @mock.patch('golem.task.taskcomputer.dispatcher')
-    @mock.patch('golem.task.taskcomputer.ProviderTimer')
-    def test_ok(self, provider_timer, dispatcher):
+    def test_ok(self, dispatcher):
         ctd = ComputeTaskDef(
             task_id='test_task',
             subtask_id='test_subtask',
@@ -474,7 +507,6 @@ class TestTaskFinished(TestTaskComputerBase):
         self.task_computer._task_finished()
         self.assertIsNone(self.task_computer.assigned_subtask)
         self.assertIsNone(self.task_computer.counting_thread)
-        provider_timer.finish.assert_called_once_with()
         dispatcher.send.assert_called_once_with(
             signal='golem.taskcomputer',
             event='subtask_finished',
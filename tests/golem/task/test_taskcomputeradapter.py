@@ -7,6 +7,7 @@ from twisted.trial.unittest import TestCase as TwistedTestCase
 
 from golem.core.statskeeper import IntStatsKeeper
 from golem.task.envmanager import EnvironmentManager
+from golem.task.subtaskscheduler import Footprint
 from golem.task.taskcomputer import (
     NewTaskComputer,
     TaskComputer,
@@ -40,6 +41,11 @@ class TaskComputerAdapterTestBase(TwistedTestCase):
             task_server=self.task_server,
             env_manager=self.env_manager
         )
+        # No usage measured, every subtask gets the whole preset
+        patcher = mock.patch.object(
+            self.adapter._scheduler, '_measure', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
 
 class TestInit(TaskComputerAdapterTestBase):
@@ -53,6 +59,13 @@ class TestInit(TaskComputerAdapterTestBase):
 
 class TestTaskGiven(TaskComputerAdapterTestBase):
 
+    def _set_task_header(self, environment_prerequisites=None):
+        task_header = mock.Mock(
+            environment='ENV',
+            environment_prerequisites=environment_prerequisites)
+        self.task_server.task_keeper.task_headers = {'test': task_header}
+        return task_header
+
     def test_new_computer_has_assigned_task(self):
         self.new_computer.has_assigned_task.return_value = True
         self.old_computer.has_assigned_task.return_value = False
@@ -62,32 +75,70 @@ class TestTaskGiven(TaskComputerAdapterTestBase):
     def test_old_computer_has_assigned_task(self):
         self.new_computer.has_assigned_task.return_value = False
         self.old_computer.has_assigned_task.return_value = True
+        self._set_task_header()
         with self.assertRaises(AssertionError):
-            self.adapter.task_given(ComputeTaskDef())
+            self.adapter.task_given(ComputeTaskDef(task_id='test'))
+
+    def test_new_task_old_computer_has_assigned_task(self):
+        self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_assigned_task.return_value = True
+        self._set_task_header(environment_prerequisites=mock.Mock())
+        with self.assertRaises(AssertionError):
+            self.adapter.task_given(ComputeTaskDef(task_id='test'))
 
     def test_new_task_ok(self):
         self.new_computer.has_assigned_task.return_value = False
         self.old_computer.has_assigned_task.return_value = False
         ctd = ComputeTaskDef(task_id='test')
-        task_header = mock.Mock(environment_prerequisites=mock.Mock())
-        self.task_server.task_keeper.task_headers = {
-            'test': task_header
-        }
+        task_header = self._set_task_header(
+            environment_prerequisites=mock.Mock())
         self.adapter.task_given(ctd)
         self.new_computer.task_given.assert_called_once_with(task_header, ctd)
         self.old_computer.task_given.assert_not_called()
 
-    def test_old_task_ok(self):
+    @mock.patch('golem.task.taskcomputer.ProviderTimer')
+    def test_old_task_ok(self, provider_timer):
         self.new_computer.has_assigned_task.return_value = False
         self.old_computer.has_assigned_task.return_value = False
-        ctd = ComputeTaskDef(task_id='test')
-        task_header = mock.Mock(environment_prerequisites=None)
-        self.task_server.task_keeper.task_headers = {
-            'test': task_header
-        }
+        self.old_computer.assigned_task_id = None
+        ctd = ComputeTaskDef(task_id='test', subtask_id='subtask')
+        self._set_task_header()
         self.adapter.task_given(ctd)
         self.new_computer.task_given.assert_not_called()
         self.old_computer.task_given.assert_called_once_with(ctd)
+        provider_timer.start.assert_called_once_with()
+
+
+class TestCanTakeTask(TaskComputerAdapterTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_assigned_task.return_value = False
+        self.old_computer.assigned_task_id = None
+
+    def test_idle(self):
+        self.assertTrue(self.adapter.can_take_task())
+        self.assertTrue(self.adapter.can_take_task(
+            mock.Mock(task_id='test', environment_prerequisites=None)))
+
+    def test_new_computer_has_assigned_task(self):
+        self.new_computer.has_assigned_task.return_value = True
+        self.assertFalse(self.adapter.can_take_task())
+
+    def test_new_task_old_computer_has_assigned_task(self):
+        self.old_computer.has_assigned_task.return_value = True
+        self.assertFalse(self.adapter.can_take_task(
+            mock.Mock(environment_prerequisites=mock.Mock())))
+
+    def test_same_task_assigned(self):
+        self.old_computer.assigned_task_id = 'test'
+        self.assertFalse(self.adapter.can_take_task(
+            mock.Mock(task_id='test', environment_prerequisites=None)))
+
+    def test_scheduler_full(self):
+        self.adapter._scheduler.admit('subtask', None)
+        self.assertFalse(self.adapter.can_take_task())
 
 
 class TestHasAssignedTask(TaskComputerAdapterTestBase):
@@ -149,8 +200,9 @@ class TestStartComputation(TaskComputerAdapterTestBase):
     def test_no_assigned_task(self):
         self.new_computer.has_assigned_task.return_value = False
         self.old_computer.has_assigned_task.return_value = False
+        self.old_computer.assigned_task_id = None
         with self.assertRaises(RuntimeError):
-            self.adapter.start_computation()
+            self.adapter.start_computation('test_task')
 
     @mock.patch('golem.task.taskcomputer.TaskComputerAdapter.'
                 '_handle_computation_results')
@@ -160,7 +212,7 @@ class TestStartComputation(TaskComputerAdapterTestBase):
         self.new_computer.assigned_task_id = 'test_task'
         self.new_computer.assigned_subtask_id = 'test_subtask'
 
-        self.adapter.start_computation()
+        self.adapter.start_computation('test_task')
 
         self.new_computer.compute.assert_called_once()
         self.old_computer.start_computation.assert_not_called()
@@ -169,19 +221,108 @@ class TestStartComputation(TaskComputerAdapterTestBase):
             'test_subtask',
             self.new_computer.compute())
 
+    @mock.patch('golem.task.taskcomputer.ProviderTimer')
     @mock.patch('golem.task.taskcomputer.TaskComputerAdapter.'
                 '_handle_computation_results')
-    def test_assigned_old_task(self, handle_results):
+    def test_assigned_old_task(self, handle_results, _):
         self.new_computer.has_assigned_task.return_value = False
-        self.old_computer.has_assigned_task.return_value = True
+        self.old_computer.has_assigned_task.return_value = False
+        self.old_computer.assigned_task_id = None
+        self.task_server.task_keeper.task_headers = {
+            'test_task': mock.Mock(
+                environment='ENV', environment_prerequisites=None)
+        }
+        self.adapter.task_given(ComputeTaskDef(
+            task_id='test_task', subtask_id='test_subtask'))
+        self.old_computer.assigned_task_id = 'test_task'
+        self.old_computer.assigned_subtask_id = 'test_subtask'
 
-        self.adapter.start_computation()
+        self.adapter.start_computation('test_task')
 
         self.new_computer.compute.assert_not_called()
-        self.old_computer.start_computation.assert_called_once()
+        self.old_computer.start_computation.assert_called_once_with(
+            cpus=self.adapter._scheduler.reservation('test_subtask').cpus,
+            memory=self.adapter._scheduler.reservation('test_subtask').memory)
         handle_results.assert_not_called()
 
 
+@mock.patch('golem.task.taskcomputer.ProviderTimer')
+@mock.patch('golem.task.taskcomputer.TaskComputer', spec=TaskComputer)
+class TestConcurrentSubtasks(TaskComputerAdapterTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.new_computer.has_assigned_task.return_value = False
+        self.old_computer.has_assigned_task.return_value = False
+        self.old_computer.assigned_task_id = None
+        self.adapter._scheduler.update_config([0, 1], 2 * 1024 ** 2, 2)
+        patcher = mock.patch.object(
+            TaskComputerAdapter, 'support_direct_computation', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.task_server.task_keeper.task_headers = {
+            task_id: mock.Mock(
+                task_id=task_id,
+                environment='ENV',
+                environment_prerequisites=None)
+            for task_id in ('task1', 'task2')
+        }
+
+    def _give(self, computer, task_id, subtask_id):
+        self.adapter.task_given(ComputeTaskDef(
+            task_id=task_id, subtask_id=subtask_id))
+        computer.task_given.assert_called_once()
+        computer.has_assigned_task.return_value = True
+        computer.assigned_task_id = task_id
+        computer.assigned_subtask_id = subtask_id
+
+    def test_partitioned(self, task_computer, provider_timer):
+        other_computer = task_computer()
+        footprint = Footprint(cpus=1, memory=1024 ** 2)
+        with mock.patch.object(
+                self.adapter._scheduler, '_measure', return_value=footprint):
+            self._give(self.old_computer, 'task1', 'subtask1')
+            task_header = self.task_server.task_keeper.task_headers['task2']
+            self.assertFalse(self.adapter.can_take_task(
+                self.task_server.task_keeper.task_headers['task1']))
+            self.assertTrue(self.adapter.can_take_task(task_header))
+            self._give(other_computer, 'task2', 'subtask2')
+        self.assertFalse(self.adapter.can_take_task())
+        provider_timer.start.assert_called_once_with()
+        self.assertEqual(self.adapter.get_assigned_subtask_id('task2'),
+                         'subtask2')
+
+        self.adapter.start_computation('task1')
+        self.adapter.start_computation('task2')
+        self.old_computer.start_computation.assert_called_once_with(
+            cpus=[0], memory=1024 ** 2)
+        other_computer.start_computation.assert_called_once_with(
+            cpus=[1], memory=1024 ** 2)
+
+        self.adapter._old_task_finished(0)
+        provider_timer.finish.assert_not_called()
+        self.adapter._old_task_finished(1)
+        provider_timer.finish.assert_called_once_with()
+
+    def test_not_fitting(self, task_computer, _):
+        other_computer = task_computer()
+        self._give(self.old_computer, 'task1', 'subtask1')
+        task_header = self.task_server.task_keeper.task_headers['task2']
+        self.assertFalse(self.adapter.can_take_task(task_header))
+        self.assertFalse(self.adapter.task_given(ComputeTaskDef(
+            task_id='task2', subtask_id='subtask2')))
+        other_computer.task_given.assert_not_called()
+
+        self.adapter.start_computation('task1')
+        self.old_computer.start_computation.assert_called_once_with(
+            cpus=[0, 1], memory=2 * 1024 ** 2)
+
+        self.adapter._old_task_finished(0)
+        self.old_computer.has_assigned_task.return_value = False
+        self.old_computer.assigned_task_id = None
+        self.assertTrue(self.adapter.can_take_task(task_header))
+
+
 class TestHandleComputationResults(TaskComputerAdapterTestBase):
 
     @defer.inlineCallbacks
@@ -219,21 +360,20 @@ class TestTaskInterrupted(TaskComputerAdapterTestBase):
 
     def test_no_assigned_task(self):
         self.new_computer.has_assigned_task.return_value = False
-        self.old_computer.has_assigned_task.return_value = False
+        self.old_computer.assigned_task_id = None
         with self.assertRaises(RuntimeError):
-            self.adapter.task_interrupted()
+            self.adapter.task_interrupted('test_task')
 
     def test_assigned_new_task(self):
         self.new_computer.has_assigned_task.return_value = True
-        self.old_computer.has_assigned_task.return_value = False
-        self.adapter.task_interrupted()
+        self.adapter.task_interrupted('test_task')
         self.new_computer.task_interrupted.assert_called_once()
         self.old_computer.task_interrupted.assert_not_called()
 
     def test_assigned_old_task(self):
         self.new_computer.has_assigned_task.return_value = False
-        self.old_computer.has_assigned_task.return_value = True
-        self.adapter.task_interrupted()
+        self.old_computer.assigned_task_id = 'test_task'
+        self.adapter.task_interrupted('test_task')
         self.new_computer.task_interrupted.assert_not_called()
         self.old_computer.task_interrupted.assert_called_once()
 
@@ -356,7 +496,8 @@ class TestChangeConfig(TaskComputerAdapterTestBase):
         )
         self.old_computer.change_config.assert_called_once_with(
             config_desc=config_desc,
-            in_background=True
+            in_background=True,
+            status_callback=self.adapter._is_computing,
         )
 
 
@@ -1259,7 +1259,7 @@ class TestTaskGiven(TaskServerTestBase):
             self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
             request_resource):
 
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.can_take_task.return_value = True
         ttc = msg_factories.tasks.TaskToComputeFactory()
 
         result = self.ts.task_given(ttc)
@@ -1290,7 +1290,7 @@ class TestTaskGiven(TaskServerTestBase):
             self, logger_mock, dispatcher_mock, update_requestor_assigned_sum,
             request_resource):
 
-        self.ts.task_computer.has_assigned_task.return_value = True
+        self.ts.task_computer.can_take_task.return_value = False
         result = self.ts.task_given(Mock())
         self.assertEqual(result, False)
 
@@ -1300,19 +1300,39 @@ class TestTaskGiven(TaskServerTestBase):
         dispatcher_mock.send.assert_not_called()
         logger_mock.error.assert_called()
 
+    def test_not_admitted(
+            self, _logger_mock, dispatcher_mock,
+            update_requestor_assigned_sum, request_resource):
+
+        self.ts.task_computer.can_take_task.return_value = True
+        self.ts.task_computer.task_given.return_value = False
+        ttc = msg_factories.tasks.TaskToComputeFactory()
+        result = self.ts.task_given(ttc)
+        self.assertEqual(result, False)
+
+        request_resource.assert_not_called()
+        update_requestor_assigned_sum.assert_not_called()
+        dispatcher_mock.send.assert_not_called()
+
     def test_task_api(
             self, _logger_mock, _dispatcher_mock,
             _update_requestor_assigned_sum, _request_resource):
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.can_take_task.return_value = True
         ttc = msg_factories.tasks.TaskToComputeFactory()
         ttc.want_to_compute_task.task_header.environment_prerequisites = Mock()
         self.assertTrue(ttc.compute_task_def['resources'])  # noqa pylint: disable=unsubscriptable-object
         self.ts.new_resource_manager = \
             Mock(spec=resourcemanager.ResourceManager)
+        self.ts.new_resource_manager.download.return_value = \
+            defer.succeed(None)
         self.ts.task_computer._new_computer = Mock()
 
-        self.ts.task_given(ttc)
+        with patch.object(self.ts, '_install_prerequisites',
+                          return_value=defer.succeed(None)) as install, \
+                patch.object(self.ts, 'resource_collected') as collected:
+            self.ts.task_given(ttc)
 
+        install.assert_called_once_with(ttc.want_to_compute_task.task_header)
         for resource in ttc.compute_task_def['resources']:  # noqa pylint: disable=unsubscriptable-object
             self.ts.new_resource_manager.download.assert_any_call(
                 resource,
@@ -1323,24 +1343,72 @@ class TestTaskGiven(TaskServerTestBase):
             len(ttc.compute_task_def['resources']),  # noqa pylint: disable=unsubscriptable-object
             self.ts.new_resource_manager.download.call_count,
         )
+        collected.assert_called_once_with(ttc.task_id)
+
+    def test_task_api_prerequisites_failed(
+            self, _logger_mock, _dispatcher_mock,
+            _update_requestor_assigned_sum, _request_resource):
+        self.ts.task_computer.can_take_task.return_value = True
+        ttc = msg_factories.tasks.TaskToComputeFactory()
+        ttc.want_to_compute_task.task_header.environment_prerequisites = Mock()
+        self.ts.new_resource_manager = \
+            Mock(spec=resourcemanager.ResourceManager)
+        self.ts.new_resource_manager.download.return_value = \
+            defer.succeed(None)
+        error = RuntimeError('not installed')
+
+        with patch.object(self.ts, '_install_prerequisites',
+                          return_value=defer.fail(error)), \
+                patch.object(self.ts, 'resource_failure') as failure:
+            self.ts.task_given(ttc)
+
+        failure.assert_called_once_with(ttc.task_id, error)
+
+
+class TestInstallPrerequisites(TaskServerTestBase):
+
+    def _install(self, installed):
+        task_header = Mock()
+        with patch.object(self.ts.task_keeper, 'new_env_manager') as manager:
+            env = manager.environment.return_value
+            env.install_prerequisites.return_value = defer.succeed(installed)
+            deferred = self.ts._install_prerequisites(task_header)
+        manager.environment.assert_called_once_with(task_header.environment)
+        env.parse_prerequisites.assert_called_once_with(
+            task_header.environment_prerequisites)
+        return deferred
+
+    def test_installed(self):
+        results = []
+        self._install(True).addCallback(results.append)
+        self.assertEqual(results, [None])
+
+    def test_not_installed(self):
+        failures = []
+        self._install(False).addErrback(failures.append)
+        self.assertTrue(failures[0].check(RuntimeError))
 
 
 @patch('golem.task.taskserver.logger')
 class TestResourceCollected(TaskServerTestBase):
 
     def test_wrong_task_id(self, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.get_assigned_subtask_id.return_value = None
         result = self.ts.resource_collected('wrong_id')
         self.assertFalse(result)
         logger_mock.error.assert_called_once()
         self.ts.task_computer.start_computation.assert_not_called()
 
     def test_ok(self, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.get_assigned_subtask_id.return_value = \
+            'test_subtask'
         result = self.ts.resource_collected('test')
         self.assertTrue(result)
         logger_mock.error.assert_not_called()
-        self.ts.task_computer.start_computation.assert_called_once_with()
+        self.ts.task_computer.get_assigned_subtask_id.assert_called_once_with(
+            'test')
+        self.ts.task_computer.start_computation.assert_called_once_with(
+            'test')
 
 
 @patch('golem.task.taskserver.logger')
@@ -1348,18 +1416,19 @@ class TestResourceCollected(TaskServerTestBase):
 class TestResourceFailure(TaskServerTestBase):
 
     def test_wrong_task_id(self, send_task_failed, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test'
+        self.ts.task_computer.get_assigned_subtask_id.return_value = None
         self.ts.resource_failure('wrong_id', 'reason')
         logger_mock.error.assert_called_once()
         self.ts.task_computer.task_interrupted.assert_not_called()
         send_task_failed.assert_not_called()
 
     def test_ok(self, send_task_failed, logger_mock):
-        self.ts.task_computer.assigned_task_id = 'test_task'
-        self.ts.task_computer.assigned_subtask_id = 'test_subtask'
+        self.ts.task_computer.get_assigned_subtask_id.return_value = \
+            'test_subtask'
         self.ts.resource_failure('test_task', 'test_reason')
         logger_mock.error.assert_not_called()
-        self.ts.task_computer.task_interrupted.assert_called_once_with()
+        self.ts.task_computer.task_interrupted.assert_called_once_with(
+            'test_task')
         send_task_failed.assert_called_once_with(
             'test_subtask',
             'test_task',
@@ -1385,7 +1454,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_already_assigned(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = True
+        self.ts.task_computer.can_take_task.return_value = False
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
 
@@ -1397,7 +1466,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_computer_not_accepting_tasks(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.can_take_task.return_value = True
         self.ts.task_computer.compute_tasks = False
         self.ts.task_computer.runnable = True
 
@@ -1409,7 +1478,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_task_computer_not_runnable(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.can_take_task.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = False
 
@@ -1421,7 +1490,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_no_supported_tasks_in_task_keeper(self):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.can_take_task.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
         self.ts.task_keeper.get_task.return_value = None
@@ -1435,7 +1504,7 @@ class TestRequestRandomTask(TaskServerTestBase):
     def test_ok(self, request_task):
         self.ts.config_desc.task_request_interval = 1.0
         self.ts._last_task_request_time = time.time() - 1.0
-        self.ts.task_computer.has_assigned_task.return_value = False
+        self.ts.task_computer.can_take_task.return_value = True
         self.ts.task_computer.compute_tasks = True
         self.ts.task_computer.runnable = True
         task_header = Mock()
@@ -1447,6 +1516,20 @@ class TestRequestRandomTask(TaskServerTestBase):
             'tasks_requested')
         request_task.assert_called_once_with(task_header)
 
+    @freezegun.freeze_time()
+    @patch('golem.task.taskserver.TaskServer._request_task')
+    def test_task_cannot_be_taken(self, request_task):
+        self.ts.config_desc.task_request_interval = 1.0
+        self.ts._last_task_request_time = time.time() - 1.0
+        self.ts.task_computer.can_take_task.side_effect = \
+            lambda task_header=None: task_header is None
+        self.ts.task_computer.compute_tasks = True
+        self.ts.task_computer.runnable = True
+        self.ts.task_keeper.get_task.return_value = Mock()
+
+        self.ts._request_random_task()
+        request_task.assert_not_called()
+
 
 class TaskServerAsyncTestBase(TaskServerTestBase, TwistedTestCase):
 
@@ -388,7 +388,7 @@ class TaskSessionReactToTaskToComputeTest(TaskSessionTestBase):
 
     def setUp(self):
         super().setUp()
-        self.task_session.task_computer.has_assigned_task.return_value = False
+        self.task_session.task_computer.can_take_task.return_value = True
         self.task_session.concent_service.enabled = False
         self.task_session.send = Mock(
             side_effect=lambda msg: print(f"send {msg}"))
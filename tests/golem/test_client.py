@@ -1,4 +1,5 @@
 # pylint: disable=protected-access,too-many-lines
+import datetime
 import os
 import time
 import uuid
@@ -24,7 +25,7 @@ from golem.appconfig import (
     DEFAULT_HYPERDRIVE_RPC_PORT, DEFAULT_HYPERDRIVE_RPC_ADDRESS
 )
 from golem.client import Client, ClientTaskComputerEventListener, \
-    DoWorkService, MonitoringPublisherService, \
+    DiskUsageService, MonitoringPublisherService, \
     NetworkConnectionPublisherService, \
     ResourceCleanerService, TaskArchiverService, \
     TaskCleanerService
@@ -396,95 +397,77 @@ class TestClientRestartSubtasks(TestClientBase):
             self.subtask_price, 1)
 
 
-class TestDoWorkService(testwithreactor.TestWithReactor):
+class TestNetworkSyncServices(TestCase):
 
     def setUp(self):
         super().setUp()
 
         client = Mock()
-        client.p2pservice = Mock()
         client.p2pservice.peers = {str(uuid.uuid4()): Mock()}
-        client.task_server = Mock()
-        client.resource_server = Mock()
-        client.ranking = Mock()
+        client.p2pservice.pending_connections = {}
+        client.p2pservice.pending_sessions = set()
+        client.task_server.pending_connections = {}
+        client.task_server.pending_sessions = set()
+        client.task_server.forwarded_session_requests = {}
+        client.task_server.results_to_send = {}
+        client.task_server.task_computer.has_assigned_task.return_value = \
+            False
+        client.resource_server.pending_resources = {}
         client.config_desc.send_pings = False
         self.client = client
-        self.do_work_service = DoWorkService(client)
+        self.services = {
+            service.name: service
+            for service in Client._network_sync_services(client)
+        }
 
-    @patch('golem.client.logger')
-    def test_run(self, logger):
-        self.do_work_service._run()
+    def test_sync(self):
+        for service in self.services.values():
+            service._run()
 
         self.client.p2pservice.ping_peers.assert_not_called()
-        logger.exception.assert_not_called()
-        self.client.p2pservice.sync_network.assert_called()
-        self.client.resource_server.sync_network.assert_called()
-        self.client.ranking.sync_network.assert_called()
+        self.client.p2pservice.sync_network.assert_called_once_with()
+        self.client.task_server.sync_network.assert_called_once_with()
+        self.client.resource_server.sync_network.assert_called_once_with()
+        self.client.ranking.sync_network.assert_called_once_with()
 
-    @patch('golem.client.logger')
-    def test_pings(self, logger):
+    def test_pings(self):
         self.client.config_desc.send_pings = True
+        self.client.config_desc.pings_interval = 10
 
-        # Make methods throw exceptions
-        def raise_exc():
-            raise Exception('Test exception')
-
-        self.client.p2pservice.sync_network = raise_exc
-        self.client.task_server.sync_network = raise_exc
-        self.client.resource_server.sync_network = raise_exc
-        self.client.ranking.sync_network = raise_exc
+        assert self.services['ping_peers']._run()
+        self.client.p2pservice.ping_peers.assert_called_once_with(10)
 
-        self.do_work_service._run()
+        self.client.p2pservice.peers = {}
+        assert not self.services['ping_peers']._run()
 
-        self.client.p2pservice.ping_peers.assert_called()
-        assert logger.exception.call_count == 4
+    def test_independent(self):
+        self.client.task_server.sync_network.side_effect = Exception
 
-    @freeze_time("2018-01-01 00:00:00")
-    def test_time_for(self):
-        key = 'payments'
-        interval = 4.0
+        with self.assertRaises(Exception):
+            self.services['task_server']._run()
+        self.services['p2pservice']._run()
 
-        assert key not in self.do_work_service._check_ts
-        assert self.do_work_service._time_for(key, interval)
-        assert key in self.do_work_service._check_ts
+        self.client.p2pservice.sync_network.assert_called_once_with()
 
-        next_check = self.do_work_service._check_ts[key]
+    def test_idle(self):
+        for name in ('p2pservice', 'task_server', 'resource_server',
+                     'ranking'):
+            assert not self.services[name]._run()
 
-        with freeze_time("2018-01-01 00:00:01"):
-            assert not self.do_work_service._time_for(key, interval)
-            assert self.do_work_service._check_ts[key] == next_check
+    def test_pending(self):
+        self.client.p2pservice.pending_sessions = {Mock()}
+        self.client.task_server.results_to_send = {'subtask_id': Mock()}
+        self.client.resource_server.pending_resources = {'task_id': Mock()}
 
-        with freeze_time("2018-01-01 00:01:00"):
-            assert self.do_work_service._time_for(key, interval)
-            assert self.do_work_service._check_ts[
-                key] == time.time() + interval
+        assert self.services['p2pservice']._run()
+        assert self.services['task_server']._run()
+        assert self.services['resource_server']._run()
 
-    @freeze_time("2018-01-01 00:00:00")
-    def test_intervals(self):
-        self.do_work_service._run()
+    def test_pending_computation(self):
+        task_computer = self.client.task_server.task_computer
+        task_computer.has_assigned_task.return_value = True
 
-        assert self.client.p2pservice.sync_network.called
-        assert self.client.task_server.sync_network.called
-        assert self.client.resource_server.sync_network.called
-        assert self.client.ranking.sync_network.called
-
-        self.client.reset_mock()
-
-        with freeze_time("2018-01-01 00:00:02"):
-            self.do_work_service._run()
-
-            assert self.client.p2pservice.sync_network.called
-            assert self.client.task_server.sync_network.called
-            assert self.client.resource_server.sync_network.called
-            assert self.client.ranking.sync_network.called
-
-        with freeze_time("2018-01-01 00:01:00"):
-            self.do_work_service._run()
-
-            assert self.client.p2pservice.sync_network.called
-            assert self.client.task_server.sync_network.called
-            assert self.client.resource_server.sync_network.called
-            assert self.client.ranking.sync_network.called
+        assert self.services['task_server']._run()
 
 
 class TestMonitoringPublisherService(testwithreactor.TestWithReactor):
@@ -540,6 +523,18 @@ class TestTaskArchiverService(testwithreactor.TestWithReactor):
         self.task_archiver.do_maintenance.assert_called()
 
 
+class TestDiskUsageService(testwithreactor.TestWithReactor):
+
+    def setUp(self):
+        self.client = Mock()
+        self.service = DiskUsageService(self.client, pause=0.5)
+
+    def test_run(self):
+        self.service._run()
+
+        self.client.reconcile_disk_usage.assert_called_once_with(0.5)
+
+
 class TestResourceCleanerService(testwithreactor.TestWithReactor):
 
     def setUp(self):
@@ -615,6 +610,24 @@ class TestClientRPCMethods(TestClientBase, LogTestCase):
         self.assertIsInstance(c.get_public_key(), bytes)
         self.assertEqual(c.get_public_key(), c.keys_auth.public_key)
 
+    def test_subtasks_usage(self, *_):
+        for i, env in enumerate(['BLENDER', 'BLENDER', 'WASM']):
+            model.SubtaskUsage.create(
+                subtask_id=f'subtask{i}', task_id='task', environment=env,
+                peak_memory=i * 1024, cpu_time=i * 1.5,
+                created_date=datetime.datetime(
+                    2019, 1, i + 1, tzinfo=datetime.timezone.utc))
+
+        usage = self.client.get_subtasks_usage()
+        self.assertEqual(
+            [u['subtask_id'] for u in usage],
+            ['subtask2', 'subtask1', 'subtask0'])
+        self.assertEqual(usage[1]['peak_memory'], 1024)
+        self.assertEqual(usage[1]['cpu_time'], 1.5)
+
+        usage = self.client.get_subtasks_usage(limit=1, environment='BLENDER')
+        self.assertEqual([u['subtask_id'] for u in usage], ['subtask1'])
+
     def test_directories(self, *_):
         c = self.client
 
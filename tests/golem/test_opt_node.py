@@ -4,7 +4,8 @@ import unittest
 from unittest.mock import patch, Mock, ANY, MagicMock
 
 from click.testing import CliRunner
-from twisted.internet.defer import Deferred, succeed, FirstError
+from twisted.internet.defer import Deferred, succeed, FirstError, \
+    maybeDeferred
 from twisted.python.failure import Failure
 
 import golem.argsparser as argsparser
@@ -13,6 +14,7 @@ from golem.clientconfigdescriptor import ClientConfigDescriptor
 from golem.core import variables
 from golem.network.transport.tcpnetwork_helpers import SocketAddress
 from golem.node import Node, ShutdownResponse
+from golem.report import Component, Stage
 from golem.testutils import TempDirFixture
 from golem.tools.ci import ci_skip
 from golem.tools.testwithdatabase import TestWithDatabase
@@ -217,6 +219,20 @@ class TestNode(TestWithDatabase):
                                      password=None,
                                      crossbar_serializer=None)
 
+    @patch('golem.node.threads.deferToThread', maybeDeferred)
+    def test_password_unlocked_after_start(self, *_):
+        node = Node(**self.node_kwargs, password='password')
+        assert not node.is_account_unlocked()
+        node.rpc_session = Mock()
+
+        with patch.object(node, '_unlock', return_value=False) as unlock:
+            deferred = node._start_keys_auth()
+
+        unlock.assert_called_once_with('password')
+        failure = deferred.result
+        deferred.addErrback(lambda _: None)
+        self.assertEqual(str(failure.value), "Password incorrect")
+
     @patch('golem.node.Client')
     def test_mainnet_should_be_passed_to_client(self, mock_client, *_):
         # when
@@ -727,6 +743,62 @@ class TestOptNode(TempDirFixture):
         self.node.client.connect.assert_called_with(parsed_peer[0])
         assert reactor.addSystemEventTrigger.call_count == 2
 
+    def test_start_database_and_apps(self, *_):
+        self.node = Node(**self.node_kwargs)
+        assert not self.node._db
+        self.node._setup_client = Mock()
+
+        with patch('golem.node.StatusPublisher.publish') as publish, \
+                patch.object(self.node.apps_manager, 'load_all_apps') as load:
+            self.node.start()
+
+        assert self.node._db
+        load.assert_called_once_with()
+        publish.assert_any_call(Component.database, 'start', Stage.post)
+        publish.assert_any_call(Component.apps, 'load', Stage.post)
+        assert self.node._setup_client.called
+
+    def test_database_procedures_after_database(self, _reactor, mock_session,
+                                                *_):
+        mock_session.return_value = mock_session
+        mock_session.connect.return_value = mock_session
+        mock_session.addCallbacks.side_effect = \
+            lambda callback, _: callback(None)
+
+        self.node = Node(**self.node_kwargs)
+        self.node._setup_client = Mock()
+        self.node._check_terms = Mock(return_value=succeed(None))
+        database = Deferred()
+
+        with patch.object(self.node, '_start_database',
+                          return_value=database):
+            self.node.start()
+
+        registered = mock_session.add_procedures.call_args_list
+        assert len(registered) == 1
+        assert 'golem.terms' not in registered[0][0][0]
+        assert 'env.hw.presets' not in registered[0][0][0]
+        self.node._check_terms.assert_not_called()
+        self.node._setup_client.assert_not_called()
+
+        database.callback(None)
+
+        assert len(registered) == 2
+        assert 'golem.terms' in registered[1][0][0]
+        assert 'env.hw.presets' in registered[1][0][0]
+        assert 'env.hw.caps' not in registered[1][0][0]
+        self.node._check_terms.assert_called_once_with()
+        assert self.node._setup_client.called
+
+    def test_set_password(self, *_):
+        self.node = Node(**self.node_kwargs)
+
+        with patch.object(self.node, '_unlock', return_value=True) as unlock:
+            deferred = self.node.set_password('password')
+
+        unlock.assert_called_once_with('password')
+        assert deferred.result is True
+
     @patch('golem.node.gatherResults')
     def test_start_prints_exception_message(self, *_):
         # given